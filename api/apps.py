@@ -2,10 +2,28 @@
 Configuración de la aplicación API
 """
 
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
 
 
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "api"
     verbose_name = "API de Pacientes"
+
+    def ready(self):
+        from api import signals  # noqa: F401  (registra los receivers)
+
+        # Cargar el modelo de ML al iniciar evita pagar la carga en el
+        # primer upload; es opcional porque también corre en cada comando
+        if getattr(settings, "ML_PRELOAD_ON_STARTUP", False):
+            from api.services.scoring import preload_artifacts
+
+            try:
+                preload_artifacts()
+            except Exception as e:
+                logger.warning(f"No se pudo precargar el modelo de ML: {e}")
@@ -0,0 +1,131 @@
+"""
+Comando de Django para medir las estadísticas de episodios calculadas en
+Python (recorriendo el queryset) vs agregadas en la base de datos
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from api.models import Episodio, Paciente
+
+
+class Command(BaseCommand):
+    help = "Compara estadísticas de episodios en Python y agregadas en SQL (datos sintéticos, se revierten)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=500_000,
+            help="Cantidad de episodios sintéticos (default: 500000)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Semilla para generar los episodios sintéticos",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            start = time.perf_counter()
+            self._create_episodios(options["rows"], options["seed"])
+            self.stdout.write(
+                f"📊 {options['rows']} episodios sintéticos creados en "
+                f"{time.perf_counter() - start:.1f}s"
+            )
+
+            start = time.perf_counter()
+            before = self._estadisticas_python()
+            before_secs = time.perf_counter() - start
+
+            start = time.perf_counter()
+            after = self._estadisticas_sql()
+            after_secs = time.perf_counter() - start
+
+            self.stdout.write(f"  Python: {before_secs:.2f}s")
+            self.stdout.write(f"  SQL:    {after_secs:.2f}s")
+            self.stdout.write(f"  Aceleración: x{before_secs / after_secs:.1f}")
+            if before != after:
+                self.stdout.write(
+                    self.style.WARNING(f"⚠️  Resultados difieren: {before} vs {after}")
+                )
+
+            # No dejar los datos sintéticos en la base de datos
+            transaction.set_rollback(True)
+
+    def _create_episodios(self, rows: int, seed: int) -> None:
+        rng = random.Random(seed)
+        paciente = Paciente.objects.create(
+            rut="benchmark-estadisticas",
+            nombre="Paciente Benchmark",
+            sexo="F",
+            fecha_nacimiento=date(1980, 1, 1),
+        )
+        ahora = timezone.now()
+        episodios = []
+        for i in range(rows):
+            ingreso = ahora - timedelta(minutes=rng.randint(0, 60 * 24 * 365 * 3))
+            egreso = None
+            if rng.random() < 0.9:
+                egreso = min(
+                    ingreso + timedelta(minutes=rng.randint(0, 60 * 24 * 40)), ahora
+                )
+            episodios.append(
+                Episodio(
+                    paciente=paciente,
+                    episodio_cmbd=i,
+                    fecha_ingreso=ingreso,
+                    fecha_egreso=egreso,
+                    tipo_actividad="Hospitalización",
+                    estancia_norma_grd=rng.choice([None, 3.5, 5, 8.2, 12]),
+                )
+            )
+        Episodio.objects.bulk_create(episodios, batch_size=5000)
+
+    def _estadisticas_python(self) -> tuple:
+        """Cálculo anterior de /api/episodios/estadisticas/"""
+        queryset = Episodio.objects.all()
+        activos = queryset.filter(fecha_egreso__isnull=True)
+        egresados = queryset.filter(fecha_egreso__isnull=False)
+        hoy = timezone.now().date()
+
+        total_dias = 0
+        count = 0
+        for ep in egresados:
+            total_dias += (ep.fecha_egreso.date() - ep.fecha_ingreso.date()).days
+            count += 1
+        for ep in activos:
+            total_dias += (hoy - ep.fecha_ingreso.date()).days
+            count += 1
+
+        criticas = 0
+        for ep in activos:
+            dias = (hoy - ep.fecha_ingreso.date()).days
+            if ep.estancia_norma_grd and dias > ep.estancia_norma_grd * (4 / 3):
+                criticas += 1
+
+        return (
+            queryset.count(),
+            activos.count(),
+            round(total_dias / count, 1) if count else 0,
+            criticas,
+            egresados.filter(fecha_egreso__date=hoy).count(),
+        )
+
+    def _estadisticas_sql(self) -> tuple:
+        """Cálculo agregado usado por la vista"""
+        totales = Episodio.objects.estadisticas()
+        total = totales["total"]
+        return (
+            total,
+            totales["activos"],
+            round((totales["dias"] or 0) / total, 1) if total else 0,
+            totales["criticas"],
+            totales["altas_hoy"],
+        )
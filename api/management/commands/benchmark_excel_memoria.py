@@ -0,0 +1,78 @@
+"""
+Comando de Django para medir la memoria de la lectura de Excel completa vs
+proyectada a las columnas que usa cada etapa
+"""
+
+import os
+import tempfile
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from api.management.modules.excel_processor import COMBINE_COLUMNS, read_excel_file
+
+
+class Command(BaseCommand):
+    help = "Compara el pico de memoria al leer un Excel completo y solo sus columnas necesarias"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=2000,
+            help="Filas de cada planilla sintética (default: 2000)",
+        )
+        parser.add_argument(
+            "--widths",
+            type=int,
+            nargs="+",
+            default=[10, 50, 150],
+            help="Cantidad de columnas extra de cada planilla (default: 10 50 150)",
+        )
+
+    def handle(self, *args, **options):
+        columns = COMBINE_COLUMNS["excel3"]
+        self.stdout.write(
+            f"📊 {options['rows']} filas, columnas pedidas: episodio + {columns}"
+        )
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for width in options["widths"]:
+                path = os.path.join(tmp_dir, f"excel3_{width}.xlsx")
+                self._write_workbook(path, options["rows"], width)
+
+                full_mb = self._peak_mb(read_excel_file, path)
+                projected_mb = self._peak_mb(
+                    read_excel_file, path, columns, ("episodio",)
+                )
+                self.stdout.write(
+                    f"  {width + 3:>4} columnas: completa {full_mb:7.1f} MB | "
+                    f"proyectada {projected_mb:7.1f} MB"
+                )
+
+    def _peak_mb(self, func, *args) -> float:
+        """Pico de memoria asignada durante la llamada, en MB"""
+        tracemalloc.start()
+        try:
+            func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return peak / (1024 * 1024)
+
+    def _write_workbook(self, path: str, rows: int, width: int) -> None:
+        """Planilla tipo excel3: episodio, cama, habitación y columnas de relleno"""
+        rng = np.random.default_rng(width)
+        df = pd.DataFrame(
+            {
+                "EPISODIO": np.arange(rows),
+                "CAMA": [f"C{i % 300:03d}" for i in range(rows)],
+                "HABITACION": [f"H{i % 100:03d}" for i in range(rows)],
+            }
+        )
+        extra = pd.DataFrame(
+            rng.random((rows, width)), columns=[f"Columna {i}" for i in range(width)]
+        )
+        pd.concat([df, extra], axis=1).to_excel(path, index=False)
@@ -0,0 +1,78 @@
+"""
+Comando de Django para medir el parseo de fechas (valor a valor vs columna)
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand
+
+from api.management.modules.date_parser import DateParser
+
+
+class Command(BaseCommand):
+    help = "Compara filas/segundo del parseo de fechas valor a valor y por columna"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=100_000,
+            help="Cantidad de filas de la columna sintética (default: 100000)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Semilla para generar la columna sintética",
+        )
+
+    def handle(self, *args, **options):
+        values = self._synthetic_column(options["rows"], options["seed"])
+        self.stdout.write(
+            f"📅 Columna sintética: {len(values)} filas, {values.nunique()} valores distintos"
+        )
+
+        parser = DateParser()
+        start = time.perf_counter()
+        before = [parser.parse_value(value) for value in values]
+        before_secs = time.perf_counter() - start
+
+        parser = DateParser()
+        start = time.perf_counter()
+        after = parser.parse_strings(values)
+        after_secs = time.perf_counter() - start
+
+        differences = sum(1 for a, b in zip(before, after) if a != b)
+
+        self.stdout.write(
+            f"  Valor a valor: {before_secs:.2f}s ({len(values) / before_secs:,.0f} filas/s)"
+        )
+        self.stdout.write(
+            f"  Por columna:   {after_secs:.2f}s ({len(values) / after_secs:,.0f} filas/s)"
+        )
+        self.stdout.write(
+            f"  Formato detectado: {parser.column_formats.get(values.name)}"
+        )
+        self.stdout.write(f"  Aceleración: x{before_secs / after_secs:.1f}")
+        if differences:
+            self.stdout.write(self.style.WARNING(f"⚠️  {differences} valores difieren"))
+
+    def _synthetic_column(self, rows: int, seed: int) -> pd.Series:
+        """
+        Fechas de ingreso con hora en formato dd/mm/yyyy HH:MM, como en el
+        Excel, con un 1% de outliers en otros formatos o inválidos
+        """
+        rng = np.random.default_rng(seed)
+        base = pd.Timestamp("2020-01-01")
+        minutes = rng.integers(0, 5 * 365 * 24 * 60, size=rows)
+        fechas = base + pd.to_timedelta(minutes, unit="m")
+        values = fechas.strftime("%d/%m/%Y %H:%M").to_numpy(dtype=object)
+
+        outliers = rng.random(rows) < 0.01
+        values[outliers] = rng.choice(
+            ["2024-10-26", "2024-10-26T15:30:00", "26.10.2024", "sin fecha", " "],
+            size=int(outliers.sum()),
+        )
+        return pd.Series(values, name="Fecha Ingreso completa")
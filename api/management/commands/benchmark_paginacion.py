@@ -0,0 +1,116 @@
+"""
+Comando de Django para medir la latencia por página del listado de episodios
+con paginación por página (OFFSET + COUNT) y por cursor (keyset), al inicio
+y en una página profunda
+"""
+
+import statistics
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.models import Episodio, Paciente
+from api.pagination import KeysetPagination
+from api.views import EpisodioViewSet
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Compara la latencia por página de /api/episodios/ por página y por cursor (datos sintéticos, se revierten)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--page",
+            type=int,
+            default=10_000,
+            help="Página profunda a medir (default: 10000)",
+        )
+        parser.add_argument(
+            "--repeticiones",
+            type=int,
+            default=5,
+            help="Veces que se mide cada página (se informa la mediana)",
+        )
+
+    def handle(self, *args, **options):
+        page = options["page"]
+        page_size = 20
+        rows = page * page_size + page_size
+
+        with transaction.atomic():
+            start = time.perf_counter()
+            self._create_episodios(rows)
+            self.stdout.write(
+                f"📊 {rows} episodios sintéticos creados en "
+                f"{time.perf_counter() - start:.1f}s"
+            )
+
+            self.user = User.objects.create_user(
+                email="benchmark-paginacion@ucchristus.cl",
+                password="benchmark",
+                nombre="Benchmark",
+                apellido="Paginación",
+                rut="99.999.999-9",
+            )
+            self.view = EpisodioViewSet.as_view({"get": "list"})
+            self.factory = APIRequestFactory()
+
+            # Cursor que apunta al final de la página anterior a la profunda
+            ultima = Episodio.objects.order_by("-fecha_ingreso", "-id").values(
+                "fecha_ingreso", "id"
+            )[(page - 1) * page_size - 1]
+            cursor = KeysetPagination.cursor_para(ultima["fecha_ingreso"], ultima["id"])
+
+            mediciones = [
+                ("Por página, página 1", {"page": 1}),
+                (f"Por página, página {page}", {"page": page}),
+                ("Cursor, página 1", {"paginacion": "cursor"}),
+                (f"Cursor, página {page}", {"cursor": cursor}),
+            ]
+            for nombre, params in mediciones:
+                segundos = self._medir(params, options["repeticiones"])
+                self.stdout.write(f"  {nombre:<28} {segundos * 1000:8.1f} ms")
+
+            # No dejar los datos sintéticos en la base de datos
+            transaction.set_rollback(True)
+
+    def _medir(self, params, repeticiones: int) -> float:
+        tiempos = []
+        for _ in range(repeticiones):
+            request = self.factory.get(
+                "/api/episodios/", params, SERVER_NAME="localhost"
+            )
+            force_authenticate(request, user=self.user)
+            start = time.perf_counter()
+            response = self.view(request)
+            response.render()
+            tiempos.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.data
+        return statistics.median(tiempos)
+
+    def _create_episodios(self, rows: int) -> None:
+        paciente = Paciente.objects.create(
+            rut="99.999.999-9",
+            nombre="Paciente Benchmark",
+            sexo="F",
+            fecha_nacimiento=date(1980, 1, 1),
+        )
+        ahora = timezone.now()
+        Episodio.objects.bulk_create(
+            (
+                Episodio(
+                    paciente=paciente,
+                    episodio_cmbd=i,
+                    fecha_ingreso=ahora - timedelta(minutes=i),
+                    tipo_actividad="Hospitalización",
+                )
+                for i in range(rows)
+            ),
+            batch_size=5000,
+        )
@@ -12,7 +12,9 @@ from django.core.management.base import BaseCommand, CommandError
 
 from api.management.modules.data_mapper import DataMapper
 from api.management.modules.db_importer import DatabaseImporter
+from api.management.modules.excel_cache import default_cache_dir
 from api.management.modules.excel_processor import ExcelProcessor
+from api.management.modules.fingerprints import FingerprintFilter
 
 # Configurar logging
 logger = logging.getLogger(__name__)
@@ -43,6 +45,32 @@ class Command(BaseCommand):
             type=str,
             help="Exportar datos combinados a un archivo Excel (ej: --export-combined combined_data.xlsx)",
         )
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            help="Importar por lotes (bulk_create/bulk_update) en vez de fila a fila",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Cantidad de filas por lote en modo --bulk (default: 1000)",
+        )
+        parser.add_argument(
+            "--full",
+            action="store_true",
+            help="Enviar todos los episodios, aunque su huella no haya cambiado desde la última importación",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Procesos para leer los Excel en paralelo (default: settings.EXCEL_LOAD_WORKERS)",
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Parsear los Excel aunque ya estén en la caché de planillas parseadas",
+        )
         parser.add_argument(
             "--list-files",
             action="store_true",
@@ -71,7 +99,13 @@ class Command(BaseCommand):
 
             # Procesar archivos Excel
             self.stdout.write("🔄 Procesando archivos Excel...")
-            excel_processor = ExcelProcessor()
+            processor_kwargs = {}
+            if options.get("workers"):
+                processor_kwargs["max_workers"] = options["workers"]
+            excel_processor = ExcelProcessor(**processor_kwargs)
+            # Reintentos y re-ejecuciones leen la caché en vez de parsear
+            if not options.get("no_cache"):
+                excel_processor.cache_dir = default_cache_dir()
             processed_data = excel_processor.process_local_files(excel_files)
 
             if self.verbosity >= 2:
@@ -112,13 +146,29 @@ class Command(BaseCommand):
                 self.stdout.write(f"📝 Episodios a procesar: {episodios_count}")
                 self.stdout.write(f"💼 Gestiones a procesar: {gestiones_count}")
 
+            # Importación incremental: solo episodios nuevos o con cambios
+            fingerprints = None
+            if not options.get("full"):
+                fingerprints = FingerprintFilter()
+                mapped_data = fingerprints.filter_changed(mapped_data)
+                self.stdout.write(
+                    f"⏭️  Episodios sin cambios omitidos: {fingerprints.skipped} "
+                    f"({fingerprints.sent} nuevos o con cambios)"
+                )
+
             # Importar a la base de datos (o simular)
             if options["dry_run"]:
                 self.stdout.write("🧪 MODO DRY-RUN: Simulando importación...")
                 self._simulate_import(mapped_data)
             else:
                 self.stdout.write("💾 Importando datos a la base de datos...")
-                db_importer = DatabaseImporter()
+                importer_kwargs = {}
+                if options.get("bulk"):
+                    importer_kwargs = {
+                        "bulk": True,
+                        "chunk_size": options.get("chunk_size", 1000),
+                    }
+                db_importer = DatabaseImporter(**importer_kwargs)
                 results = db_importer.import_data(mapped_data)
 
                 # Verificar si hay errores antes de mostrar resultados
@@ -126,6 +176,16 @@ class Command(BaseCommand):
                     raise CommandError(f"Error en estructura de resultados: {results}")
 
                 self._show_import_results(results["details"])
+                self._show_cache_stats(results.get("cache"))
+
+                # Solo los episodios que el importador reporta como importados
+                # sin errores; si la transacción se revirtió, ninguno
+                if fingerprints is not None and results.get("success"):
+                    guardadas = fingerprints.save(results["succeeded_episodios"])
+                    if self.verbosity >= 2:
+                        self.stdout.write(
+                            f"🔖 Huellas de episodio guardadas: {guardadas}"
+                        )
 
             self.stdout.write(self.style.SUCCESS("✅ Proceso completado exitosamente!"))
 
@@ -296,3 +356,16 @@ class Command(BaseCommand):
             self.stdout.write(f"❌ Total errores: {total_errors}")
         else:
             self.stdout.write("✅ Sin errores")
+
+    def _show_cache_stats(self, cache_stats):
+        """Muestra aciertos/fallos de la caché de búsquedas del importador"""
+        if not cache_stats or self.verbosity < 2:
+            return
+
+        self.stdout.write("🗂️  Caché de búsquedas:")
+        for name, counts in cache_stats.items():
+            total = counts["hits"] + counts["misses"]
+            ratio = counts["hits"] / total * 100 if total else 0
+            self.stdout.write(
+                f"  {name}: {counts['hits']} aciertos, {counts['misses']} fallos ({ratio:.1f}%)"
+            )
@@ -0,0 +1,140 @@
+"""
+Comando de Django que ejecuta los trabajos en segundo plano (procesamiento de
+Excel) encolados por las vistas de carga. Levanta N procesos que reclaman
+trabajos de la tabla `trabajos`; el proceso principal recupera los trabajos
+atascados y reinicia los workers que mueran.
+
+    python manage.py run_workers --procesos 4
+"""
+
+import multiprocessing
+import signal
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from api.services import trabajos
+
+
+def _loop_worker(intervalo):
+    """Cuerpo de cada proceso worker: reclama y ejecuta hasta recibir SIGTERM"""
+    detener = False
+
+    def _terminar(signum, frame):
+        nonlocal detener
+        detener = True
+
+    signal.signal(signal.SIGTERM, _terminar)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    worker = trabajos.worker_id()
+    while not detener:
+        try:
+            trabajo = trabajos.reclamar(worker)
+        except Exception:
+            # Base caída o conexión cortada: se reabre en la próxima vuelta
+            connections.close_all()
+            trabajo = None
+        if trabajo is not None:
+            # Termina el trabajo en curso aunque llegue SIGTERM
+            trabajos.ejecutar(trabajo)
+        else:
+            time.sleep(intervalo)
+    connections.close_all()
+
+
+def _iniciar_worker(contexto, intervalo):
+    """
+    Proceso worker no daemon: un proceso daemon no puede tener hijos y la
+    carga de Excel lee los archivos en un ProcessPoolExecutor. Por eso el
+    comando los termina y espera explícitamente al detenerse
+    """
+    proceso = contexto.Process(target=_loop_worker, args=(intervalo,), daemon=False)
+    proceso.start()
+    return proceso
+
+
+class Command(BaseCommand):
+    help = "Ejecuta los trabajos en segundo plano de la cola (procesamiento de Excel)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--procesos",
+            type=int,
+            default=settings.TRABAJOS_PROCESOS,
+            help="Procesos worker en paralelo (default: TRABAJOS_PROCESOS)",
+        )
+        parser.add_argument(
+            "--intervalo",
+            type=float,
+            default=2.0,
+            help="Segundos de espera cuando la cola está vacía",
+        )
+        parser.add_argument(
+            "--una-vez",
+            action="store_true",
+            help="Procesa los trabajos pendientes en este proceso y termina",
+        )
+
+    def handle(self, *args, **options):
+        if options["una_vez"]:
+            recuperados = trabajos.recuperar_atascados()
+            procesados = trabajos.procesar_pendientes()
+            self.stdout.write(
+                f"✅ {procesados} trabajos procesados "
+                f"({recuperados} recuperados de workers caídos)"
+            )
+            return
+
+        # Las importaciones invalidan la caché de respuestas (versiones por
+        # modelo) desde estos procesos: con locmem gunicorn no se enteraría
+        if isinstance(caches["default"], LocMemCache):
+            raise CommandError(
+                "run_workers necesita una caché compartida con el proceso web "
+                "(CACHE_BACKEND=file con el mismo CACHE_DIR, o redis); "
+                "locmem es local a cada proceso"
+            )
+
+        self.detener = False
+        signal.signal(signal.SIGTERM, self._terminar)
+        signal.signal(signal.SIGINT, self._terminar)
+
+        # fork hereda Django ya configurado; las conexiones no se comparten
+        contexto = multiprocessing.get_context("fork")
+        procesos = []
+        self.stdout.write(f"🚀 Iniciando {options['procesos']} workers")
+        try:
+            while not self.detener:
+                procesos = [p for p in procesos if p.is_alive()]
+                while len(procesos) < options["procesos"]:
+                    connections.close_all()
+                    proceso = _iniciar_worker(contexto, options["intervalo"])
+                    procesos.append(proceso)
+                    self.stdout.write(f"Worker {proceso.pid} iniciado")
+
+                try:
+                    recuperados = trabajos.recuperar_atascados()
+                    if recuperados:
+                        self.stdout.write(
+                            self.style.WARNING(
+                                f"⚠️ {recuperados} trabajos atascados vuelven a la cola"
+                            )
+                        )
+                except Exception as e:
+                    self.stderr.write(f"Error recuperando trabajos atascados: {e}")
+                    connections.close_all()
+                time.sleep(max(options["intervalo"], 1))
+        finally:
+            # Los workers no son daemon: sin esto quedarían huérfanos
+            self.stdout.write("Deteniendo workers (terminan su trabajo en curso)...")
+            for proceso in procesos:
+                proceso.terminate()
+            for proceso in procesos:
+                proceso.join()
+            self.stdout.write(self.style.SUCCESS("Workers detenidos"))
+
+    def _terminar(self, signum, frame):
+        self.detener = True
@@ -3,21 +3,62 @@ Mapeador para transformar datos de pandas a estructuras de modelos Django
 """
 
 import logging
-from datetime import date, datetime
+from datetime import date, datetime, time
 from typing import Any, Dict, List, Optional
 
+import numpy as np
 import pandas as pd
 from django.core.exceptions import ValidationError
 
+from api.management.modules.date_parser import DateParser
+
 logger = logging.getLogger(__name__)
 
+RUT_PATTERN = r"^\d{1,2}\.\d{3}\.\d{3}-[\dkK]$"
+RUT_COLUMNS = ["RUT", "rut", "RUT_PACIENTE", "rut_paciente"]
+NOMBRE_COLUMNS = [
+    "Nombre",
+    "nombre",
+    "NOMBRE_PACIENTE",
+    "nombre_paciente",
+    "Nombre del Paciente",
+]
+CAMA_COLUMNS = ["Cama", "cama", "CAMA"]
+
+# Formatos de hora de finalización de traslado
+HORA_FORMATS = [
+    "%I:%M:%S %p",  # "1:41:00 PM"
+    "%I:%M %p",  # "1:41 PM"
+    "%H:%M:%S",  # "13:41:00"
+    "%H:%M",  # "13:41"
+]
+
+# Tipos de gestión del Excel combinado -> valores del modelo
+TIPO_GESTION_COMBINED_MAPPING = {
+    "homecare uccc": "HOMECARE_UCCC",
+    "homecare": "HOMECARE",
+    "traslado": "TRASLADO",
+    "transferencia": "TRASLADO",  # Transferencia ahora es TRASLADO
+    "activación beneficio isapre": "ACTIVACION_BENEFICIO_ISAPRE",
+    "autorización procedimiento": "AUTORIZACION_PROCEDIMIENTO",
+    "cobertura": "COBERTURA",
+    "Corte Cuentas": "CORTE_CUENTAS",
+}
+
 
 class DataMapper:
     """
     Transforma datos de pandas DataFrames a estructuras compatibles con modelos Django
     """
 
-    def __init__(self):
+    def __init__(self, vectorized: bool = True):
+        """
+        Args:
+            vectorized: Si es True, mapea columnas completas (ver
+                _map_*_columnar); si es False, recorre fila a fila
+        """
+        self.vectorized = vectorized
+        self.date_parser = DateParser()
         self.mapped_data = {
             "pacientes": [],
             "episodios": [],
@@ -75,6 +116,9 @@ class DataMapper:
         """
         Mapea datos de pacientes desde el DataFrame combinado
         """
+        if self.vectorized:
+            return self._map_pacientes_columnar(df)
+
         pacientes = []
         logger.info(f"Mapeando pacientes desde {len(df)} registros combinados")
 
@@ -158,6 +202,9 @@ class DataMapper:
         """
         Mapea datos de camas desde el DataFrame combinado
         """
+        if self.vectorized:
+            return self._map_camas_columnar(df)
+
         camas = []
         logger.info(f"Mapeando camas desde {len(df)} registros combinados")
 
@@ -222,6 +269,9 @@ class DataMapper:
         """
         Mapea datos de episodios desde el DataFrame combinado
         """
+        if self.vectorized:
+            return self._map_episodios_columnar(df)
+
         episodios = []
         logger.info(f"Mapeando episodios desde {len(df)} registros combinados")
 
@@ -310,6 +360,9 @@ class DataMapper:
         """
         Mapea datos de gestiones desde el DataFrame combinado
         """
+        if self.vectorized:
+            return self._map_gestiones_columnar(df)
+
         gestiones = []
         logger.info(f"Mapeando gestiones desde {len(df)} registros combinados")
 
@@ -325,18 +378,7 @@ class DataMapper:
                     continue
 
                 # Mapear tipos de gestión a los valores del modelo
-                tipo_gestion_mapping = {
-                    "homecare uccc": "HOMECARE_UCCC",
-                    "homecare": "HOMECARE",
-                    "traslado": "TRASLADO",
-                    "transferencia": "TRASLADO",  # Transferencia ahora es TRASLADO
-                    "activación beneficio isapre": "ACTIVACION_BENEFICIO_ISAPRE",
-                    "autorización procedimiento": "AUTORIZACION_PROCEDIMIENTO",
-                    "cobertura": "COBERTURA",
-                    "Corte Cuentas": "CORTE_CUENTAS",
-                }
-
-                tipo_gestion = tipo_gestion_mapping.get(
+                tipo_gestion = TIPO_GESTION_COMBINED_MAPPING.get(
                     str(tipo_gestion_raw).lower(), ""
                 )
 
@@ -441,23 +483,7 @@ class DataMapper:
                 return fecha
 
             # Parsear la hora
-            hora_str_clean = str(hora_str).strip()
-
-            # Intentar diferentes formatos de hora
-            hora_formats = [
-                "%I:%M:%S %p",  # "1:41:00 PM"
-                "%I:%M %p",  # "1:41 PM"
-                "%H:%M:%S",  # "13:41:00"
-                "%H:%M",  # "13:41"
-            ]
-
-            hora_obj = None
-            for fmt in hora_formats:
-                try:
-                    hora_obj = datetime.strptime(hora_str_clean, fmt).time()
-                    break
-                except ValueError:
-                    continue
+            hora_obj = self._hora_finalizacion(hora_str)
 
             if hora_obj:
                 # Combinar fecha y hora
@@ -482,8 +508,7 @@ class DataMapper:
 
     def _extract_rut_from_row(self, row: pd.Series) -> str:
         """Extrae el RUT de una fila, manejando diferentes nombres de columnas"""
-        rut_cols = ["RUT", "rut", "RUT_PACIENTE", "rut_paciente"]
-        for col in rut_cols:
+        for col in RUT_COLUMNS:
             if col in row.index:
                 rut_value = self._safe_get(row, col)
                 if rut_value and str(rut_value) != "nan":
@@ -492,14 +517,7 @@ class DataMapper:
 
     def _extract_nombre_from_row(self, row: pd.Series) -> str:
         """Extrae el nombre de una fila, manejando diferentes nombres de columnas"""
-        nombre_cols = [
-            "Nombre",
-            "nombre",
-            "NOMBRE_PACIENTE",
-            "nombre_paciente",
-            "Nombre del Paciente",
-        ]
-        for col in nombre_cols:
+        for col in NOMBRE_COLUMNS:
             if col in row.index:
                 nombre_value = self._safe_get(row, col)
                 if nombre_value and str(nombre_value) != "nan":
@@ -510,8 +528,7 @@ class DataMapper:
         """Extrae código de cama de una fila, manejando columnas separadas o combinadas"""
 
         # Buscar en columnas separadas
-        cama_cols = ["Cama", "cama", "CAMA"]
-        for col in cama_cols:
+        for col in CAMA_COLUMNS:
             if col in row.index:
                 cama_info = self._safe_get(row, col)
                 if cama_info and str(cama_info) != "nan":
@@ -565,6 +582,9 @@ class DataMapper:
         Returns:
             Lista de diccionarios para modelo Episodio
         """
+        if self.vectorized:
+            return self._map_episodios_table_columnar(df)
+
         episodios = []
 
         logger.info(f"Mapeando {len(df)} registros de episodios")
@@ -657,6 +677,9 @@ class DataMapper:
         Returns:
             Lista de diccionarios para modelo Gestion
         """
+        if self.vectorized:
+            return self._map_gestiones_table_columnar(df)
+
         gestiones = []
 
         logger.info(f"Mapeando {len(df)} registros de gestiones")
@@ -805,8 +828,7 @@ class DataMapper:
         """Valida formato de RUT chileno"""
         import re
 
-        pattern = r"^\d{1,2}\.\d{3}\.\d{3}-[\dkK]$"
-        return bool(re.match(pattern, rut))
+        return bool(re.match(RUT_PATTERN, rut))
 
     def _map_sexo(self, sexo: str) -> str:
         """
@@ -864,72 +886,7 @@ class DataMapper:
         Función universal para parsear fechas en cualquier formato
         Reemplaza a _parse_date_string y _parse_datetime
         """
-        if pd.isna(date_value) or date_value is None:
-            return None
-
-        try:
-            # Si ya es datetime, retornarlo
-            if isinstance(date_value, datetime):
-                return date_value
-
-            # Si es date, convertir a datetime
-            if isinstance(date_value, date):
-                return datetime.combine(date_value, datetime.min.time())
-
-            # Si es timestamp de pandas
-            if pd.api.types.is_datetime64_any_dtype(type(date_value)):
-                return pd.to_datetime(date_value).to_pydatetime()
-
-            # Si es string, parsear con múltiples formatos
-            if isinstance(date_value, str):
-                date_value = date_value.strip()
-                if not date_value:
-                    return None
-
-                # Formatos ordenados por prioridad (más específicos primero)
-                formats = [
-                    "%Y-%m-%d %H:%M:%S",  # 2024-10-26 15:30:00
-                    "%Y-%m-%d",  # 2024-10-26
-                    "%d/%m/%Y %H:%M:%S",  # 26/10/2024 15:30:00
-                    "%d/%m/%Y %H:%M",  # 26/10/2024 15:30
-                    "%d/%m/%Y",  # 26/10/2024
-                    "%m/%d/%Y %H:%M:%S",  # 10/26/2024 15:30:00
-                    "%m/%d/%Y %H:%M",  # 10/26/2024 15:30
-                    "%m/%d/%Y",  # 10/26/2024
-                    "%d-%m-%Y %H:%M:%S",  # 26-10-2024 15:30:00
-                    "%d-%m-%Y",  # 26-10-2024
-                    "%m-%d-%Y %H:%M:%S",  # 10-26-2024 15:30:00
-                    "%m-%d-%Y",  # 10-26-2024
-                    "%Y/%m/%d",  # 2024/10/26
-                    "%d.%m.%Y",  # 26.10.2024
-                    "%Y.%m.%d",  # 2024.10.26
-                    "%d/%m/%y %H:%M",  # 26/10/24 15:30
-                    "%d/%m/%y",  # 26/10/24
-                    "%m/%d/%y %H:%M",  # 10/26/24 15:30
-                    "%m/%d/%y",  # 10/26/24
-                    "%m-%d-%y %H:%M",  # 10-26-24 15:30
-                    "%m-%d-%y",  # 10-26-24
-                    "%d-%m-%y",  # 26-10-24
-                ]
-
-                for fmt in formats:
-                    try:
-                        return datetime.strptime(date_value, fmt)
-                    except ValueError:
-                        continue
-
-                # Último intento con pandas
-                try:
-                    return pd.to_datetime(date_value).to_pydatetime()
-                except:
-                    pass
-
-        except Exception as e:
-            logger.warning(f"No se pudo parsear la fecha {date_value}: {e}")
-
-        return None
-
-        return None
+        return self.date_parser.parse_value(date_value)
 
     def _map_tipo_gestion(self, tipo: str) -> str:
         """Mapea tipos de gestión a valores válidos del modelo"""
@@ -985,6 +942,562 @@ class DataMapper:
             if key in estado_str:
                 return value
 
+    # ------------------------------------------------------------------
+    # Mapeo columnar: aplica las mismas reglas que el mapeo fila a fila
+    # (_safe_get, _clean_rut, _map_sexo, _parse_date_universal, ...) sobre
+    # columnas completas y emite los registros con to_dict("records")
+    # ------------------------------------------------------------------
+
+    def _column(self, df: pd.DataFrame, column: str, default: Any = None) -> pd.Series:
+        """Equivalente columnar de _safe_get: nulos y columnas ausentes -> default"""
+        if column not in df.columns or isinstance(df[column], pd.DataFrame):
+            return pd.Series([default] * len(df), index=df.index, dtype=object)
+        values = df[column]
+        return values.astype(object).where(values.notna(), default)
+
+    def _empty_column(self, index: pd.Index) -> pd.Series:
+        """Columna de objetos con None en todas las filas"""
+        return pd.Series([None] * len(index), index=index, dtype=object)
+
+    def _assign(self, values: pd.Series, mask: pd.Series, new: Any) -> pd.Series:
+        """
+        values con new en las filas de mask. Trabaja sobre arrays de objetos
+        para que pandas no convierta datetime en Timestamp al asignar
+        """
+        result = values.to_numpy(dtype=object, copy=True)
+        if isinstance(new, pd.Series):
+            new = new.to_numpy(dtype=object)
+        result[np.asarray(mask)] = new
+        return pd.Series(result, index=values.index, dtype=object)
+
+    def _truthy(self, values: pd.Series) -> pd.Series:
+        """Máscara con la veracidad de cada valor (como `if value:`)"""
+        return values.astype(bool)
+
+    def _has_text(self, values: pd.Series) -> pd.Series:
+        """Máscara de `value and str(value) != "nan"`"""
+        return self._truthy(values) & (values.astype(str) != "nan")
+
+    def _strip_column(self, values: pd.Series) -> pd.Series:
+        """str(value).strip() sobre toda la columna"""
+        return values.astype(str).str.strip()
+
+    def _map_unique(self, values: pd.Series, func) -> pd.Series:
+        """Aplica func una vez por valor distinto y propaga el resultado"""
+        try:
+            codes, uniques = pd.factorize(values, use_na_sentinel=False)
+        except TypeError:
+            return values.map(func).astype(object)
+        mapped = np.empty(len(uniques), dtype=object)
+        for i, value in enumerate(uniques):
+            mapped[i] = func(None if pd.isna(value) else value)
+        return pd.Series(mapped[codes], index=values.index, dtype=object)
+
+    def _int_column(self, df: pd.DataFrame, column: str) -> pd.Series:
+        """Equivalente columnar de _convert_to_int(_safe_get(...))"""
+        if column in df.columns and pd.api.types.is_numeric_dtype(df[column]):
+            numbers = df[column].astype(float)
+            finite = np.isfinite(numbers)
+            result = self._empty_column(df.index)
+            result[finite] = numbers[finite].astype(np.int64).astype(object)
+            return result
+        return self._map_unique(self._column(df, column), self._convert_to_int)
+
+    def _float_column(self, df: pd.DataFrame, column: str) -> pd.Series:
+        """Equivalente columnar de _safe_get_float"""
+        if column in df.columns and pd.api.types.is_numeric_dtype(df[column]):
+            numbers = df[column].astype(float)
+            return numbers.astype(object).where(numbers.notna(), None)
+
+        def to_float(value):
+            if value is None:
+                return None
+            try:
+                return float(value)
+            except:
+                return None
+
+        return self._map_unique(self._column(df, column), to_float)
+
+    def _clean_rut_column(self, ruts: pd.Series) -> pd.Series:
+        """Equivalente columnar de _clean_rut para valores de texto"""
+        ruts = ruts.str.strip()
+        valid = ruts.str.match(RUT_PATTERN)
+        clean = ruts.str.replace(r"[^0-9kK]", "", regex=True)
+        cuerpo = clean.str[:-1]
+        formatted = (
+            cuerpo.str[:-6]
+            + "."
+            + cuerpo.str[-6:-3]
+            + "."
+            + cuerpo.str[-3:]
+            + "-"
+            + clean.str[-1]
+        )
+        return ruts.where(valid, formatted.where(clean.str.len() >= 8, ruts))
+
+    def _first_text_column(
+        self, df: pd.DataFrame, columns: List[str], transform
+    ) -> pd.Series:
+        """
+        Primera columna (en orden) con texto válido para cada fila, como hacen
+        _extract_rut_from_row / _extract_nombre_from_row
+        """
+        result = self._empty_column(df.index)
+        pending = pd.Series(True, index=df.index)
+        for column in columns:
+            if column not in df.columns:
+                continue
+            values = self._column(df, column)
+            found = pending & self._has_text(values)
+            if found.any():
+                result = self._assign(
+                    result, found, transform(values[found].astype(str))
+                )
+                pending &= ~found
+        return result
+
+    def _rut_column(self, df: pd.DataFrame) -> pd.Series:
+        return self._first_text_column(df, RUT_COLUMNS, self._clean_rut_column)
+
+    def _sexo_column(self, values: pd.Series) -> pd.Series:
+        """Equivalente columnar de _map_sexo"""
+        present = self._truthy(values)
+        sexo = values.astype(str).str.lower().str.strip()
+        mapped = np.select(
+            [
+                present & sexo.isin(["m", "masculino", "hombre", "male"]),
+                present & sexo.isin(["f", "femenino", "mujer", "female"]),
+            ],
+            ["M", "F"],
+            "O",
+        )
+        return pd.Series(mapped, index=values.index).astype(object)
+
+    def _datetime_column(self, values: pd.Series) -> pd.Series:
+        """Equivalente columnar de _parse_date_universal"""
+        result = self._empty_column(values.index)
+        present = values.notna()
+        if not present.any():
+            return result
+
+        values = values[present]
+        kind = pd.api.types.infer_dtype(values, skipna=True)
+        if kind == "string":
+            parsed = self.date_parser.parse_strings(values)
+        elif kind == "datetime":
+            parsed = values
+        else:
+            parsed = self._map_unique(values, self._parse_date_universal)
+        return self._assign(result, present, parsed)
+
+    def _date_column(self, values: pd.Series) -> pd.Series:
+        """Equivalente columnar de _parse_date"""
+        result = self._empty_column(values.index)
+        present = values.notna()
+        if not present.any():
+            return result
+
+        values = values[present]
+        kind = pd.api.types.infer_dtype(values, skipna=True)
+        if kind == "string":
+            parsed = self.date_parser.parse_strings(values)
+        elif kind in ("datetime", "date"):
+            parsed = values
+        else:
+            parsed = self._map_unique(values, self._parse_date)
+        return self._assign(result, present, parsed)
+
+    def _hora_finalizacion(self, hora: Any) -> Optional[time]:
+        """Hora de finalización de traslado en alguno de los formatos conocidos"""
+        hora_str_clean = str(hora).strip()
+        for fmt in HORA_FORMATS:
+            try:
+                return datetime.strptime(hora_str_clean, fmt).time()
+            except ValueError:
+                continue
+        return None
+
+    def _traslado_finalization_column(
+        self, fechas: pd.Series, horas: pd.Series
+    ) -> pd.Series:
+        """Equivalente columnar de _parse_traslado_finalization_date"""
+        fecha_ok = self._has_text(fechas)
+        parsed = self._datetime_column(fechas.where(fecha_ok, None))
+        hora_ok = self._has_text(horas)
+        hora_objs = self._map_unique(
+            horas.where(hora_ok, None), self._hora_finalizacion
+        )
+
+        result = []
+        for fecha, con_hora, hora_obj in zip(parsed, hora_ok, hora_objs):
+            if not fecha:
+                result.append(None)
+            elif not con_hora or not hora_obj:
+                result.append(fecha)
+            else:
+                try:
+                    result.append(datetime.combine(fecha.date(), hora_obj))
+                except Exception as e:
+                    logger.warning(
+                        f"Error parseando fecha de finalización de traslado {fecha} {hora_obj}: {e}"
+                    )
+                    result.append(None)
+        return pd.Series(result, index=fechas.index, dtype=object)
+
+    def _servicios_traslado_column(self, df: pd.DataFrame) -> List[List[Dict]]:
+        """Equivalente columnar de _extract_servicios_traslado"""
+        conjuntos = self._column(df, "Conjunto de Servicios Traslado")
+        try:
+            codigos = conjuntos.str.findall(r"\[([^\]]+)\]")
+        except AttributeError:
+            # Ningún valor es texto
+            return [[] for _ in range(len(df))]
+        codigos = [c if isinstance(c, list) else [] for c in codigos]
+
+        max_traslados = max((len(c) for c in codigos), default=0)
+        fechas = [
+            self._datetime_column(self._column(df, f"Fecha       (tr{i+1})")).to_numpy()
+            for i in range(max_traslados)
+        ]
+
+        return [
+            [
+                {"codigo": codigo, "fecha": fechas[i][pos], "tipo": "TRASLADO"}
+                for i, codigo in enumerate(row_codigos)
+            ]
+            for pos, row_codigos in enumerate(codigos)
+        ]
+
+    def _map_pacientes_columnar(self, df: pd.DataFrame) -> List[Dict]:
+        """Versión columnar de _map_pacientes_from_combined"""
+        logger.info(f"Mapeando pacientes desde {len(df)} registros combinados")
+        df = df.reset_index(drop=True)
+
+        ruts = self._rut_column(df)
+        ruts = ruts[ruts.notna()]
+        if ruts.empty:
+            logger.warning("No se encontraron registros con RUT válido")
+            return []
+
+        # Primer registro de cada RUT, ordenados por RUT (como groupby)
+        ruts = ruts.drop_duplicates().sort_values(kind="stable")
+        df = df.loc[ruts.index]
+
+        convenio = self._column(df, "Convenio")
+        aseguradora = self._column(df, "Nombre de la aseguradora")
+        tiene_convenio = self._truthy(convenio)
+        prevision_1 = convenio.where(
+            tiene_convenio, aseguradora.where(self._truthy(aseguradora), "OTRO")
+        )
+        prevision_2 = aseguradora.where(tiene_convenio, None)
+
+        records = pd.DataFrame(
+            {
+                "rut": ruts,
+                "nombre": self._first_text_column(
+                    df, NOMBRE_COLUMNS, self._strip_column
+                ),
+                "sexo": self._sexo_column(self._column(df, "Sexo  (Desc)")),
+                "fecha_nacimiento": self._date_column(
+                    self._column(df, "Fecha de Nacimiento")
+                ),
+                "prevision_1": prevision_1.astype(str).str[:20],
+                "prevision_2": prevision_2.astype(str)
+                .str[:20]
+                .where(self._truthy(prevision_2), None),
+                "convenio": convenio,
+                "score_social": self._column(df, "score_social"),
+            }
+        )
+
+        completos = self._truthy(records["rut"]) & self._truthy(records["nombre"])
+        if not completos.all():
+            logger.warning(
+                f"{(~completos).sum()} pacientes sin datos básicos (RUT o nombre)"
+            )
+
+        pacientes = records[completos].to_dict("records")
+        logger.info(f"Mapeados {len(pacientes)} pacientes únicos")
+        return pacientes
+
+    def _map_camas_columnar(self, df: pd.DataFrame) -> List[Dict]:
+        """Versión columnar de _map_camas_from_combined"""
+        logger.info(f"Mapeando camas desde {len(df)} registros combinados")
+
+        if "CAMA" not in df.columns:
+            logger.warning("No se encontraron columnas de cama en datos combinados")
+            return []
+        if "HABITACION" not in df.columns:
+            logger.warning("No se encontró columna de habitación en datos combinados")
+            return []
+
+        df = df.reset_index(drop=True)
+        codigo_raw = self._column(df, "CAMA")
+        codigo = self._strip_column(codigo_raw)
+        habitacion_raw = self._column(df, "HABITACION")
+        habitacion = self._strip_column(habitacion_raw).where(
+            self._truthy(habitacion_raw), ""
+        )
+
+        validas = self._truthy(codigo_raw) & (codigo != "") & (codigo != "nan")
+        camas = pd.DataFrame(
+            {"codigo_cama": codigo[validas], "habitacion": habitacion[validas]}
+        ).drop_duplicates()
+
+        # Si no hay habitación, generar una por defecto
+        sin_habitacion = camas["habitacion"].isin(["", "nan"])
+        camas["habitacion"] = "HAB-" + camas["habitacion"].where(
+            ~sin_habitacion, "HAB-" + camas["codigo_cama"]
+        )
+
+        camas = camas.to_dict("records")
+        logger.info(f"Mapeadas {len(camas)} camas únicas")
+        return camas
+
+    def _map_episodios_columnar(self, df: pd.DataFrame) -> List[Dict]:
+        """Versión columnar de _map_episodios_from_combined"""
+        logger.info(f"Mapeando episodios desde {len(df)} registros combinados")
+        df = df.reset_index(drop=True)
+
+        fecha_ingreso = self._datetime_column(
+            self._column(df, "Fecha Ingreso completa")
+        )
+        # Para fecha de egreso, solo Excel2 (fecha real de alta); si no hay,
+        # el episodio sigue abierto
+        fecha_alta = self._column(df, "Fecha alta")
+        fecha_egreso = self._datetime_column(
+            fecha_alta.where(self._has_text(fecha_alta), None)
+        )
+
+        servicio_ingreso = self._column(df, "Servicio Ingreso (Código)")
+        servicio_ingreso = self._strip_column(servicio_ingreso).where(
+            self._has_text(servicio_ingreso), None
+        )
+        servicio_egreso = self._column(df, "Servicio Egreso (Código)_2")
+        servicio_egreso = self._strip_column(servicio_egreso).where(
+            self._has_text(servicio_egreso), None
+        )
+        servicios = [
+            [
+                {"codigo": ingreso, "fecha": f_ingreso, "tipo": "INGRESO"},
+                *traslados,
+                {"codigo": egreso, "fecha": f_egreso, "tipo": "EGRESO"},
+            ]
+            for ingreso, f_ingreso, traslados, egreso, f_egreso in zip(
+                servicio_ingreso,
+                fecha_ingreso,
+                self._servicios_traslado_column(df),
+                servicio_egreso,
+                fecha_egreso,
+            )
+        ]
+
+        records = pd.DataFrame(
+            {
+                "episodio_cmbd": self._int_column(df, "CÓDIGO EPISODIO CMBD"),
+                "rut_paciente": self._rut_column(df),
+                "fecha_ingreso": fecha_ingreso,
+                "fecha_egreso": fecha_egreso,
+                "tipo_actividad": self._column(df, "Tipo Actividad"),
+                "inlier_outlier_flag": self._column(df, "Estancia Inlier / Outlier"),
+                "especialidad": self._column(
+                    df, "Especialidad médica de la intervención (des)"
+                ),
+                "estancia_prequirurgica": self._float_column(
+                    df, "Estancias Prequirurgicas Int  -Episodio-"
+                ),
+                "estancia_postquirurgica": self._float_column(
+                    df, "Estancias Postquirurgicas Int  -Episodio-"
+                ),
+                "estancia_norma_grd": self._float_column(df, "Estancia Norma GRD"),
+                "codigo_cama": self._first_text_column(
+                    df, CAMA_COLUMNS, self._strip_column
+                ),
+                "servicios": pd.Series(servicios, index=df.index, dtype=object),
+            }
+        )
+
+        completos = self._truthy(records["episodio_cmbd"]) & self._truthy(
+            records["rut_paciente"]
+        )
+        if not completos.all():
+            logger.warning(
+                f"{(~completos).sum()} episodios sin datos básicos (CMBD o RUT)"
+            )
+
+        episodios = records[completos].to_dict("records")
+        logger.info(f"Mapeados {len(episodios)} episodios")
+        return episodios
+
+    def _map_gestiones_columnar(self, df: pd.DataFrame) -> List[Dict]:
+        """Versión columnar de _map_gestiones_from_combined"""
+        logger.info(f"Mapeando gestiones desde {len(df)} registros combinados")
+
+        gestion_col = "¿Qué gestión se solicito?"
+        if gestion_col not in df.columns:
+            logger.warning(f"Columna '{gestion_col}' no encontrada")
+            return []
+
+        df = df.reset_index(drop=True)
+        tipo_gestion_raw = self._column(df, gestion_col)
+        df = df[self._has_text(tipo_gestion_raw)]
+        tipo_gestion_raw = tipo_gestion_raw[df.index]
+
+        tipo_gestion = (
+            tipo_gestion_raw.astype(str)
+            .str.lower()
+            .map(TIPO_GESTION_COMBINED_MAPPING)
+            .fillna("")
+            .astype(object)
+        )
+
+        # Usar fecha de admisión como fecha_inicio; si no hay, fecha actual
+        fecha_inicio = self._datetime_column(self._column(df, "Fecha admisión"))
+        sin_fecha = ~self._truthy(fecha_inicio)
+        if sin_fecha.any():
+            from django.utils import timezone
+
+            fecha_inicio = self._assign(fecha_inicio, sin_fecha, timezone.now())
+
+        informe = self._column(df, "Informe")
+        records = pd.DataFrame(
+            {
+                "episodio_cmbd": self._int_column(df, "CÓDIGO EPISODIO CMBD"),
+                "tipo_gestion": tipo_gestion,
+                "estado_gestion": "INICIADA",
+                "fecha_inicio": fecha_inicio,
+                "informe": informe.where(
+                    self._truthy(informe),
+                    "Gestión de tipo " + tipo_gestion_raw.astype(str),
+                ),
+            },
+            index=df.index,
+        )
+
+        validas = self._truthy(records["episodio_cmbd"])
+        records = records[validas]
+        df = df[validas]
+        gestiones = records.to_dict("records")
+
+        # Campos de traslado solo para gestiones de tipo TRASLADO
+        es_traslado = (records["tipo_gestion"] == "TRASLADO").to_numpy()
+        if es_traslado.any():
+            traslados = df[es_traslado]
+            estado = self._column(traslados, "Estado")
+            campos_traslado = pd.DataFrame(
+                {
+                    "estado_traslado": estado.where(
+                        self._has_text(estado), "PENDIENTE"
+                    ),
+                    "tipo_traslado": self._column(traslados, "Tipo de Traslado"),
+                    "motivo_traslado": self._column(traslados, "Motivo de traslado"),
+                    "centro_destinatario": self._column(
+                        traslados, "Centro de Destinatario"
+                    ),
+                    "tipo_solicitud_traslado": self._column(
+                        traslados, "Tipo de Solicitud"
+                    ),
+                    "nivel_atencion_traslado": self._column(
+                        traslados, "Nivel de atencion"
+                    ),
+                    "motivo_rechazo_traslado": self._column(
+                        traslados, "Motivo de Rechazo"
+                    ),
+                    "motivo_cancelacion_traslado": self._column(
+                        traslados, "Motivo de Cancelación"
+                    ),
+                    "fecha_finalizacion_traslado": self._traslado_finalization_column(
+                        self._column(traslados, "Fecha de Finalización"),
+                        self._column(traslados, "Hora de Finalización"),
+                    ),
+                }
+            )
+            for pos, campos in zip(
+                np.flatnonzero(es_traslado), campos_traslado.to_dict("records")
+            ):
+                gestiones[pos].update(campos)
+
+        logger.info(f"Mapeadas {len(gestiones)} gestiones")
+        return gestiones
+
+    def _map_episodios_table_columnar(self, df: pd.DataFrame) -> List[Dict]:
+        """Versión columnar de _map_episodios"""
+        logger.info(f"Mapeando {len(df)} registros de episodios")
+        df = df.reset_index(drop=True)
+
+        records = pd.DataFrame(
+            {
+                "episodio_cmbd": self._int_column(df, "episodio_cmbd"),
+                "rut_paciente": self._column(df, "rut"),
+                "nombre_paciente": self._column(df, "nombre"),
+                "fecha_ingreso": self._datetime_column(
+                    self._column(df, "fecha_ingreso")
+                ),
+                "fecha_egreso": self._datetime_column(self._column(df, "fecha_alta")),
+                "tipo_actividad": self._column(df, "tipo_actividad", "Hospitalización"),
+                "especialidad": self._column(df, "servicio"),
+                "cama": self._column(df, "cama"),
+                "habitacion": self._column(df, "habitacion"),
+                "diagnostico_principal": self._column(df, "diagnostico_principal"),
+                "estado": self._column(df, "estado"),
+                "estancia_dias": self._int_column(df, "estancia_dias"),
+                "inlier_outlier_flag": self._column(df, "inlier_outlier_flag"),
+                "estancia_prequirurgica": self._float_column(
+                    df, "estancia_prequirurgica"
+                ),
+                "estancia_postquirurgica": self._float_column(
+                    df, "estancia_postquirurgica"
+                ),
+                "estancia_norma_grd": self._float_column(df, "estancia_norma_grd"),
+            }
+        )
+
+        records = records[self._truthy(records["episodio_cmbd"])]
+
+        sin_fecha = ~self._truthy(records["fecha_ingreso"])
+        if sin_fecha.any():
+            logger.warning(f"{sin_fecha.sum()} episodios sin fecha de ingreso")
+            # Usar fecha actual como fallback
+            records["fecha_ingreso"] = self._assign(
+                records["fecha_ingreso"], sin_fecha, datetime.now()
+            )
+
+        episodios = records.to_dict("records")
+        logger.info(f"Episodios mapeados: {len(episodios)}")
+        return episodios
+
+    def _map_gestiones_table_columnar(self, df: pd.DataFrame) -> List[Dict]:
+        """Versión columnar de _map_gestiones"""
+        logger.info(f"Mapeando {len(df)} registros de gestiones")
+        df = df.reset_index(drop=True)
+
+        records = pd.DataFrame(
+            {
+                "episodio_cmbd": self._int_column(df, "episodio_cmbd"),
+                "tipo_gestion": self._map_unique(
+                    self._column(df, "tipo_gestion"), self._map_tipo_gestion
+                ),
+                "estado_gestion": self._map_unique(
+                    self._column(df, "estado_gestion"), self._map_estado_gestion
+                ),
+                "fecha_inicio": self._datetime_column(self._column(df, "fecha_inicio")),
+                "fecha_fin": self._datetime_column(self._column(df, "fecha_fin")),
+                "informe": self._column(df, "observaciones"),
+                "usuario_email": self._column(df, "usuario_responsable"),
+                "valor_gestion": self._float_column(df, "valor_gestion"),
+            }
+        )
+
+        records = records[
+            self._truthy(records["episodio_cmbd"])
+            & self._truthy(records["tipo_gestion"])
+        ]
+
+        gestiones = records.to_dict("records")
+        logger.info(f"Gestiones mapeadas: {len(gestiones)}")
+        return gestiones
+
     def map_processed_data(
         self, processed_data: Dict[str, pd.DataFrame]
     ) -> Dict[str, List[Dict]]:
@@ -0,0 +1,176 @@
+"""
+Parseo de fechas compartido por el procesador de Excel y el mapeador
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Formatos de fecha ordenados por prioridad (más específicos primero)
+DATE_FORMATS = [
+    "%Y-%m-%d %H:%M:%S",  # 2024-10-26 15:30:00
+    "%Y-%m-%d",  # 2024-10-26
+    "%d/%m/%Y %H:%M:%S",  # 26/10/2024 15:30:00
+    "%d/%m/%Y %H:%M",  # 26/10/2024 15:30
+    "%d/%m/%Y",  # 26/10/2024
+    "%m/%d/%Y %H:%M:%S",  # 10/26/2024 15:30:00
+    "%m/%d/%Y %H:%M",  # 10/26/2024 15:30
+    "%m/%d/%Y",  # 10/26/2024
+    "%d-%m-%Y %H:%M:%S",  # 26-10-2024 15:30:00
+    "%d-%m-%Y",  # 26-10-2024
+    "%m-%d-%Y %H:%M:%S",  # 10-26-2024 15:30:00
+    "%m-%d-%Y",  # 10-26-2024
+    "%Y/%m/%d",  # 2024/10/26
+    "%d.%m.%Y",  # 26.10.2024
+    "%Y.%m.%d",  # 2024.10.26
+    "%d/%m/%y %H:%M",  # 26/10/24 15:30
+    "%d/%m/%y",  # 26/10/24
+    "%m/%d/%y %H:%M",  # 10/26/24 15:30
+    "%m/%d/%y",  # 10/26/24
+    "%m-%d-%y %H:%M",  # 10-26-24 15:30
+    "%m-%d-%y",  # 10-26-24
+    "%d-%m-%y",  # 26-10-24
+]
+
+
+class DateParser:
+    """
+    Parsea fechas en los formatos que llegan en los Excel
+
+    Un valor suelto se prueba contra cada formato en orden de prioridad y, si
+    ninguno calza, con pd.to_datetime. Para una columna completa se detecta el
+    formato ganador con una muestra de sus valores distintos, se parsea toda la
+    columna con una sola llamada a pd.to_datetime(format=...) y solo los
+    valores que no calzan (outliers) pasan por los demás formatos y, al final,
+    por el parseo valor a valor.
+
+    El formato detectado se recuerda por nombre de columna. Los valores
+    ambiguos (01/02/2024) se resuelven con el formato de su columna.
+    """
+
+    def __init__(self, formats: Sequence[str] = DATE_FORMATS, sample_size: int = 500):
+        """
+        Args:
+            formats: Formatos a probar, en orden de prioridad
+            sample_size: Valores distintos que se usan para detectar el formato
+        """
+        self.formats = list(formats)
+        self.sample_size = sample_size
+        self.column_formats: Dict[str, Optional[str]] = {}
+
+    def parse_value(self, value: Any) -> Optional[datetime]:
+        """Parsea un valor suelto; None si no es una fecha reconocible"""
+        if value is None or pd.isna(value):
+            return None
+
+        try:
+            # Si ya es datetime, retornarlo
+            if isinstance(value, datetime):
+                return value
+
+            # Si es date, convertir a datetime
+            if isinstance(value, date):
+                return datetime.combine(value, datetime.min.time())
+
+            # Si es timestamp de pandas
+            if pd.api.types.is_datetime64_any_dtype(type(value)):
+                return pd.to_datetime(value).to_pydatetime()
+
+            # Si es string, parsear con múltiples formatos
+            if isinstance(value, str):
+                value = value.strip()
+                if not value:
+                    return None
+
+                for fmt in self.formats:
+                    try:
+                        return datetime.strptime(value, fmt)
+                    except ValueError:
+                        continue
+
+                # Último intento con pandas
+                try:
+                    return pd.to_datetime(value).to_pydatetime()
+                except (ValueError, TypeError, OverflowError):
+                    pass
+
+        except Exception as e:
+            logger.warning(f"No se pudo parsear la fecha {value}: {e}")
+
+        return None
+
+    def infer_format(self, values: pd.Index) -> Optional[str]:
+        """
+        Formato que reconoce más valores de la muestra (a igualdad, el de
+        mayor prioridad), o None si ninguno reconoce alguno
+        """
+        sample = values[: self.sample_size]
+        best_format, best_count = None, 0
+        for fmt in self.formats:
+            count = int(
+                pd.to_datetime(sample, format=fmt, errors="coerce").notna().sum()
+            )
+            if count > best_count:
+                best_format, best_count = fmt, count
+                if count == len(sample):
+                    break
+        return best_format
+
+    def _column_format(self, column: Optional[str], values: pd.Index) -> Optional[str]:
+        if column is not None and column in self.column_formats:
+            return self.column_formats[column]
+
+        fmt = self.infer_format(values)
+        if column is not None:
+            self.column_formats[column] = fmt
+            logger.debug(f"Formato de fecha detectado para '{column}': {fmt}")
+        return fmt
+
+    def parse_strings(
+        self, values: pd.Series, column: Optional[str] = None
+    ) -> pd.Series:
+        """
+        Parsea una columna de strings
+
+        Args:
+            values: Serie de strings (sin nulos)
+            column: Nombre con que se recuerda el formato detectado; por
+                defecto el nombre de la serie
+
+        Returns:
+            Serie de objetos (datetime o None) con el mismo índice
+        """
+        if column is None:
+            column = values.name
+
+        # Cada valor distinto se parsea una sola vez; el último casillero
+        # (código -1) queda en None para los nulos
+        codes, uniques = pd.factorize(values.str.strip())
+        parsed = np.full(len(uniques) + 1, None, dtype=object)
+        pending = np.flatnonzero(uniques != "")
+
+        if pending.size:
+            winner = self._column_format(column, uniques[pending])
+            formats = [winner] if winner else []
+            formats += [fmt for fmt in self.formats if fmt != winner]
+
+            for fmt in formats:
+                if not pending.size:
+                    break
+                converted = pd.to_datetime(
+                    uniques[pending], format=fmt, errors="coerce"
+                )
+                ok = converted.notna()
+                parsed[pending[ok]] = converted[ok].to_pydatetime()
+                pending = pending[~ok]
+
+        # Lo que ningún formato reconoce se parsea valor a valor
+        for pos in pending:
+            parsed[pos] = self.parse_value(uniques[pos])
+
+        return pd.Series(parsed[codes], index=values.index, dtype=object)
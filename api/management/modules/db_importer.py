@@ -2,29 +2,58 @@
 Importador para insertar/actualizar datos en la base de datos
 """
 
+import copy
 import logging
-from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
 
 if TYPE_CHECKING:
     from django.contrib.auth.models import AbstractUser
 else:
     AbstractUser = None
 from django.contrib.auth import get_user_model
-from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.core.exceptions import MultipleObjectsReturned, ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 
+from api.management.modules.lookup_cache import ImportLookupCache
 from api.models import Cama, Episodio, EpisodioServicio, Gestion, Paciente, Servicio
+from api.services.response_cache import (
+    MODELOS_VERSIONADOS,
+    bump_model_versions,
+    deferred_version_bumps,
+)
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+# Campos que pueden cambiar al fusionar un registro existente (modo bulk)
+PACIENTE_MERGE_FIELDS = [
+    "nombre",
+    "fecha_nacimiento",
+    "prevision_1",
+    "prevision_2",
+    "convenio",
+    "sexo",
+    "score_social",
+]
+EPISODIO_MERGE_FIELDS = ["cama", "fecha_egreso"]
+
 
 class DatabaseImporter:
     """
     Maneja la inserción y actualización de datos en la base de datos
     """
 
-    def __init__(self):
+    def __init__(self, bulk: bool = False, chunk_size: int = 1000):
+        """
+        Args:
+            bulk: Si es True, importa por lotes (un SELECT ... IN por lote,
+                luego bulk_create/bulk_update) en vez de fila a fila
+            chunk_size: Cantidad de filas por lote en modo bulk
+        """
+        self.bulk = bulk
+        self.chunk_size = chunk_size
         self.results = {
             "pacientes": {"created": 0, "updated": 0, "errors": 0},
             "camas": {"created": 0, "updated": 0, "errors": 0},
@@ -32,9 +61,19 @@ class DatabaseImporter:
             "gestiones": {"created": 0, "updated": 0, "errors": 0},
         }
         self.error_details = []
+        # False si la transacción completa se revirtió
+        self.success = False
+        # CMBD -> (RUT, código de cama) de los episodios que quedaron en la base
+        self.imported_episodios = {}
+        # Claves de las filas que fallaron, para excluir sus episodios de
+        # succeeded_episodios()
+        self.failed = {"cmbd": set(), "rut": set(), "codigo_cama": set()}
         # Mapeos para facilitar búsquedas
         self.episodio_to_paciente = {}
         self.codigo_cama_to_cama = {}
+        self.rut_to_paciente = {}
+        # Caché de claves foráneas para no consultar la BD por cada fila
+        self.lookups = ImportLookupCache()
 
     def import_all_data(self, mapped_data: Dict[str, List[Dict]]) -> Dict:
         """
@@ -49,24 +88,39 @@ class DatabaseImporter:
         try:
             logger.info("Iniciando importación de datos a la base de datos...")
 
-            # Usar transacción atómica para todo el proceso
-            with transaction.atomic():
+            if self.bulk:
+                import_pacientes = self._bulk_import_pacientes
+                import_camas = self._bulk_import_camas
+                import_episodios = self._bulk_import_episodios
+                import_gestiones = self._bulk_import_gestiones
+            else:
+                import_pacientes = self._import_pacientes
+                import_camas = self._import_camas
+                import_episodios = self._import_episodios
+                import_gestiones = self._import_gestiones
+
+            # Usar transacción atómica para todo el proceso; la caché de
+            # respuestas se invalida una vez al terminar, no por cada fila
+            with deferred_version_bumps(), transaction.atomic():
                 # 1. Importar pacientes primero
                 if "pacientes" in mapped_data:
-                    self._import_pacientes(mapped_data["pacientes"])
+                    import_pacientes(mapped_data["pacientes"])
 
                 # 2. Importar camas (independientes)
                 if "camas" in mapped_data:
-                    self._import_camas(mapped_data["camas"])
+                    import_camas(mapped_data["camas"])
 
                 # 3. Importar episodios (dependen de pacientes y camas)
                 if "episodios" in mapped_data:
-                    self._import_episodios(mapped_data["episodios"])
+                    import_episodios(mapped_data["episodios"])
 
                 # 4. Importar gestiones (dependen de episodios)
                 if "gestiones" in mapped_data:
-                    self._import_gestiones(mapped_data["gestiones"])
+                    import_gestiones(mapped_data["gestiones"])
 
+            # Los bulk_create/bulk_update no emiten señales
+            bump_model_versions(*MODELOS_VERSIONADOS)
+            self.success = True
             logger.info("Importación completada exitosamente")
 
             return self._get_results_summary()
@@ -91,6 +145,7 @@ class DatabaseImporter:
                 rut = paciente_data.get("rut")
                 if not rut:
                     self.results["pacientes"]["errors"] += 1
+                    self._mark_failed(paciente_data, "rut")
                     self.error_details.append(
                         f"Paciente sin RUT en episodio {paciente_data.get('episodio_cmbd')}"
                     )
@@ -101,109 +156,33 @@ class DatabaseImporter:
 
                 # Intentar obtener paciente existente
                 paciente, created = Paciente.objects.get_or_create(
-                    rut=rut,
-                    defaults={
-                        "nombre": paciente_data.get("nombre", ""),
-                        "sexo": paciente_data.get("sexo", "O"),
-                        "fecha_nacimiento": paciente_data.get("fecha_nacimiento"),
-                        "prevision_1": str(paciente_data.get("prevision_1", "OTRO"))[
-                            :20
-                        ],
-                        "prevision_2": (
-                            str(paciente_data.get("prevision_2", ""))[:20]
-                            if paciente_data.get("prevision_2")
-                            else None
-                        ),
-                        "convenio": paciente_data.get("convenio"),
-                        "score_social": paciente_data.get("score_social"),
-                    },
+                    rut=rut, defaults=self._paciente_defaults(paciente_data)
                 )
 
                 if created:
                     self.results["pacientes"]["created"] += 1
                     logger.debug(f"Paciente creado: {rut}")
-                else:
-                    # Actualizar datos si es necesario
-                    updated = False
-
-                    # Actualizar nombre si es diferente y no está vacío
-                    new_name = paciente_data.get("nombre", "").strip()
-                    if new_name and new_name != paciente.nombre:
-                        paciente.nombre = new_name
-                        updated = True
-
-                    # Actualizar fecha de nacimiento si no existe o si tenemos nueva información
-                    if not paciente.fecha_nacimiento and paciente_data.get(
-                        "fecha_nacimiento"
-                    ):
-                        paciente.fecha_nacimiento = paciente_data.get(
-                            "fecha_nacimiento"
-                        )
-                        updated = True
-
-                    # Actualizar previsión si no es 'OTRO' o si tenemos mejor información
-                    new_prevision_1 = paciente_data.get("prevision_1", "")[
-                        :20
-                    ]  # Truncar a 20 chars
-                    if new_prevision_1 and (
-                        paciente.prevision_1 == "OTRO" or not paciente.prevision_1
-                    ):
-                        paciente.prevision_1 = new_prevision_1
-                        updated = True
-
-                    # Actualizar previsión 2 si no existe
-                    new_prevision_2 = paciente_data.get("prevision_2")
-                    if new_prevision_2:
-                        new_prevision_2 = str(new_prevision_2)[
-                            :20
-                        ]  # Truncar a 20 chars
-                        if not paciente.prevision_2:
-                            paciente.prevision_2 = new_prevision_2
-                            updated = True
-
-                    # Actualizar convenio si no existe
-                    if paciente_data.get("convenio") and not paciente.convenio:
-                        paciente.convenio = paciente_data.get("convenio")
-                        updated = True
-
-                    # Actualizar sexo si no es 'O' y tenemos nueva información
-                    new_sexo = paciente_data.get("sexo", "O")
-                    logger.debug(
-                        f"Comparando sexo para {rut}: actual='{paciente.sexo}', nuevo='{new_sexo}'"
-                    )
-                    if new_sexo != "O" and paciente.sexo == "O":
-                        logger.info(
-                            f"Actualizando sexo de {rut}: '{paciente.sexo}' -> '{new_sexo}'"
-                        )
-                        paciente.sexo = new_sexo
-                        updated = True
-
-                    # Actualizar score social si no existe
-                    if paciente_data.get("score_social") and not paciente.score_social:
-                        paciente.score_social = paciente_data.get("score_social")
-                        updated = True
-                        logger.info(
-                            f"Actualizando score social de {rut}: '{paciente.score_social}'"
-                        )
-
-                    if updated:
-                        paciente.save()
-                        self.results["pacientes"]["updated"] += 1
-                        logger.debug(f"Paciente actualizado: {rut}")
+                elif self._merge_paciente(paciente, paciente_data):
+                    paciente.save()
+                    self.results["pacientes"]["updated"] += 1
+                    logger.debug(f"Paciente actualizado: {rut}")
 
                 # Guardar relación episodio_cmbd -> paciente
+                self.rut_to_paciente[rut] = paciente
                 episodio_cmbd = paciente_data.get("episodio_cmbd")
                 if episodio_cmbd:
                     self.episodio_to_paciente[episodio_cmbd] = paciente
 
             except ValidationError as e:
                 self.results["pacientes"]["errors"] += 1
+                self._mark_failed(paciente_data, "rut")
                 error_msg = f"Error validación paciente {rut}: {str(e)}"
                 self.error_details.append(error_msg)
                 logger.error(error_msg)
 
             except Exception as e:
                 self.results["pacientes"]["errors"] += 1
+                self._mark_failed(paciente_data, "rut")
                 error_msg = f"Error procesando paciente {paciente_data.get('rut', 'SIN_RUT')}: {str(e)}"
                 error_detail = f"Datos del paciente: {paciente_data}"
                 self.error_details.append(error_msg)
@@ -215,6 +194,88 @@ class DatabaseImporter:
 
                 logger.error(f"Traceback: {traceback.format_exc()}")
 
+    def _paciente_defaults(self, paciente_data: Dict) -> Dict:
+        """Valores iniciales de un paciente nuevo"""
+        return {
+            "nombre": paciente_data.get("nombre", ""),
+            "sexo": paciente_data.get("sexo", "O"),
+            "fecha_nacimiento": paciente_data.get("fecha_nacimiento"),
+            "prevision_1": str(paciente_data.get("prevision_1", "OTRO"))[:20],
+            "prevision_2": (
+                str(paciente_data.get("prevision_2", ""))[:20]
+                if paciente_data.get("prevision_2")
+                else None
+            ),
+            "convenio": paciente_data.get("convenio"),
+            "score_social": paciente_data.get("score_social"),
+        }
+
+    def _merge_paciente(self, paciente: Paciente, paciente_data: Dict) -> bool:
+        """
+        Fusiona los datos nuevos en un paciente existente (sin guardar)
+
+        Returns:
+            True si el paciente cambió
+        """
+        rut = paciente.rut
+        updated = False
+
+        # Actualizar nombre si es diferente y no está vacío
+        new_name = paciente_data.get("nombre", "").strip()
+        if new_name and new_name != paciente.nombre:
+            paciente.nombre = new_name
+            updated = True
+
+        # Actualizar fecha de nacimiento si no existe o si tenemos nueva información
+        if not paciente.fecha_nacimiento and paciente_data.get("fecha_nacimiento"):
+            paciente.fecha_nacimiento = paciente_data.get("fecha_nacimiento")
+            updated = True
+
+        # Actualizar previsión si no es 'OTRO' o si tenemos mejor información
+        new_prevision_1 = paciente_data.get("prevision_1", "")[
+            :20
+        ]  # Truncar a 20 chars
+        if new_prevision_1 and (
+            paciente.prevision_1 == "OTRO" or not paciente.prevision_1
+        ):
+            paciente.prevision_1 = new_prevision_1
+            updated = True
+
+        # Actualizar previsión 2 si no existe
+        new_prevision_2 = paciente_data.get("prevision_2")
+        if new_prevision_2:
+            new_prevision_2 = str(new_prevision_2)[:20]  # Truncar a 20 chars
+            if not paciente.prevision_2:
+                paciente.prevision_2 = new_prevision_2
+                updated = True
+
+        # Actualizar convenio si no existe
+        if paciente_data.get("convenio") and not paciente.convenio:
+            paciente.convenio = paciente_data.get("convenio")
+            updated = True
+
+        # Actualizar sexo si no es 'O' y tenemos nueva información
+        new_sexo = paciente_data.get("sexo", "O")
+        logger.debug(
+            f"Comparando sexo para {rut}: actual='{paciente.sexo}', nuevo='{new_sexo}'"
+        )
+        if new_sexo != "O" and paciente.sexo == "O":
+            logger.info(
+                f"Actualizando sexo de {rut}: '{paciente.sexo}' -> '{new_sexo}'"
+            )
+            paciente.sexo = new_sexo
+            updated = True
+
+        # Actualizar score social si no existe
+        if paciente_data.get("score_social") and not paciente.score_social:
+            paciente.score_social = paciente_data.get("score_social")
+            updated = True
+            logger.info(
+                f"Actualizando score social de {rut}: '{paciente.score_social}'"
+            )
+
+        return updated
+
     def _import_camas(self, camas_data: List[Dict]) -> None:
         """
         Importa datos de camas
@@ -248,37 +309,36 @@ class DatabaseImporter:
                 if created:
                     self.results["camas"]["created"] += 1
                     logger.debug(f"Cama creada: {codigo_cama}")
-                else:
-                    # Actualizar datos si es necesario
-                    updated = False
-
-                    if (
-                        cama_data.get("habitacion")
-                        and cama_data["habitacion"] != cama.habitacion
-                    ):
-                        cama.habitacion = cama_data["habitacion"]
-                        updated = True
-
-                    if updated:
-                        cama.save()
-                        self.results["camas"]["updated"] += 1
-                        logger.debug(f"Cama actualizada: {codigo_cama}")
+                elif self._merge_cama(cama, cama_data):
+                    cama.save()
+                    self.results["camas"]["updated"] += 1
+                    logger.debug(f"Cama actualizada: {codigo_cama}")
 
                 # Guardar en mapeo para facilitar búsquedas
                 self.codigo_cama_to_cama[codigo_cama] = cama
+                self.lookups.add_cama(cama)
 
             except ValidationError as e:
                 self.results["camas"]["errors"] += 1
+                self._mark_failed(cama_data, "codigo_cama")
                 error_msg = f"Error validación cama {cama_data.get('codigo_cama', 'SIN_CODIGO')}: {str(e)}"
                 self.error_details.append(error_msg)
                 logger.error(error_msg)
 
             except Exception as e:
                 self.results["camas"]["errors"] += 1
+                self._mark_failed(cama_data, "codigo_cama")
                 error_msg = f"Error procesando cama {cama_data.get('codigo_cama', 'SIN_CODIGO')}: {str(e)}"
                 self.error_details.append(error_msg)
                 logger.error(error_msg)
 
+    def _merge_cama(self, cama: Cama, cama_data: Dict) -> bool:
+        """Fusiona los datos nuevos en una cama existente (sin guardar)"""
+        if cama_data.get("habitacion") and cama_data["habitacion"] != cama.habitacion:
+            cama.habitacion = cama_data["habitacion"]
+            return True
+        return False
+
     def _import_episodios(self, episodios_data: List[Dict]) -> None:
         """
         Importa datos de episodios
@@ -313,48 +373,19 @@ class DatabaseImporter:
                 # Verificar si episodio ya existe
                 episodio, created = Episodio.objects.get_or_create(
                     episodio_cmbd=episodio_cmbd,
-                    defaults={
-                        "paciente": paciente,
-                        "cama": cama,
-                        "fecha_ingreso": episodio_data.get("fecha_ingreso"),
-                        "fecha_egreso": episodio_data.get("fecha_egreso"),
-                        "tipo_actividad": episodio_data.get(
-                            "tipo_actividad", "Hospitalización"
-                        ),
-                        "especialidad": episodio_data.get("especialidad"),
-                        "inlier_outlier_flag": episodio_data.get("inlier_outlier_flag"),
-                        "estancia_prequirurgica": episodio_data.get(
-                            "estancia_prequirurgica"
-                        ),
-                        "estancia_postquirurgica": episodio_data.get(
-                            "estancia_postquirurgica"
-                        ),
-                        "estancia_norma_grd": episodio_data.get("estancia_norma_grd"),
-                    },
+                    defaults=self._episodio_defaults(episodio_data, paciente, cama),
                 )
 
                 if created:
                     self.results["episodios"]["created"] += 1
                     logger.debug(f"Episodio creado: {episodio_cmbd}")
 
-                else:
-                    # Actualizar si es necesario
-                    updated = False
-
-                    # Actualizar cama si no tenía y ahora sí
-                    if not episodio.cama and cama:
-                        episodio.cama = cama
-                        updated = True
+                elif self._merge_episodio(episodio, episodio_data, cama):
+                    episodio.save()
+                    self.results["episodios"]["updated"] += 1
+                    logger.debug(f"Episodio actualizado: {episodio_cmbd}")
 
-                    # Actualizar fecha de egreso si no tenía
-                    if not episodio.fecha_egreso and episodio_data.get("fecha_egreso"):
-                        episodio.fecha_egreso = episodio_data.get("fecha_egreso")
-                        updated = True
-
-                    if updated:
-                        episodio.save()
-                        self.results["episodios"]["updated"] += 1
-                        logger.debug(f"Episodio actualizado: {episodio_cmbd}")
+                self.lookups.add_episodio(episodio)
 
                 # Actualizar servicios asociados al episodio
 
@@ -363,6 +394,7 @@ class DatabaseImporter:
 
                 # Actualizar el mapeo para otros episodios
                 self.episodio_to_paciente[episodio_cmbd] = paciente
+                self._mark_imported(episodio_data)
 
             except ValidationError as e:
                 self.results["episodios"]["errors"] += 1
@@ -387,6 +419,41 @@ class DatabaseImporter:
             f"Importación de episodios completada: {self.results['episodios']['created']} creados, {self.results['episodios']['updated']} actualizados, {self.results['episodios']['errors']} errores"
         )
 
+    def _episodio_defaults(
+        self, episodio_data: Dict, paciente: Paciente, cama: Optional[Cama]
+    ) -> Dict:
+        """Valores iniciales de un episodio nuevo"""
+        return {
+            "paciente": paciente,
+            "cama": cama,
+            "fecha_ingreso": episodio_data.get("fecha_ingreso"),
+            "fecha_egreso": episodio_data.get("fecha_egreso"),
+            "tipo_actividad": episodio_data.get("tipo_actividad", "Hospitalización"),
+            "especialidad": episodio_data.get("especialidad"),
+            "inlier_outlier_flag": episodio_data.get("inlier_outlier_flag"),
+            "estancia_prequirurgica": episodio_data.get("estancia_prequirurgica"),
+            "estancia_postquirurgica": episodio_data.get("estancia_postquirurgica"),
+            "estancia_norma_grd": episodio_data.get("estancia_norma_grd"),
+        }
+
+    def _merge_episodio(
+        self, episodio: Episodio, episodio_data: Dict, cama: Optional[Cama]
+    ) -> bool:
+        """Fusiona los datos nuevos en un episodio existente (sin guardar)"""
+        updated = False
+
+        # Actualizar cama si no tenía y ahora sí
+        if not episodio.cama and cama:
+            episodio.cama = cama
+            updated = True
+
+        # Actualizar fecha de egreso si no tenía
+        if not episodio.fecha_egreso and episodio_data.get("fecha_egreso"):
+            episodio.fecha_egreso = episodio_data.get("fecha_egreso")
+            updated = True
+
+        return updated
+
     def _import_gestiones(self, gestiones_data: List[Dict]) -> None:
         """
         Importa datos de gestiones
@@ -404,9 +471,10 @@ class DatabaseImporter:
 
                 # Buscar episodio
                 try:
-                    episodio = Episodio.objects.get(episodio_cmbd=episodio_cmbd)
+                    episodio = self.lookups.episodio(episodio_cmbd)
                 except Episodio.DoesNotExist:
                     self.results["gestiones"]["errors"] += 1
+                    self._mark_failed(gestion_data, "cmbd")
                     self.error_details.append(
                         f"No se encontró episodio {episodio_cmbd} para gestión"
                     )
@@ -415,60 +483,9 @@ class DatabaseImporter:
                 # Buscar usuario si se especifica
                 usuario = self._find_usuario(gestion_data.get("usuario_email"))
 
-                # Crear gestión con todos los campos disponibles
-                gestion_data_clean = {
-                    "episodio": episodio,
-                    "usuario": usuario,
-                    "tipo_gestion": gestion_data.get("tipo_gestion", "GESTION_CLINICA"),
-                    "estado_gestion": gestion_data.get("estado_gestion", "INICIADA"),
-                    "fecha_inicio": gestion_data.get("fecha_inicio"),
-                    "fecha_fin": gestion_data.get("fecha_fin"),
-                    "informe": gestion_data.get("informe"),
-                }
-
-                # Agregar campos de traslado si existen
-                # estado_traslado solo se incluye si existe y tipo_gestion es TRASLADO
-                if gestion_data.get("estado_traslado"):
-                    gestion_data_clean["estado_traslado"] = gestion_data.get(
-                        "estado_traslado"
-                    )
-                if gestion_data.get("tipo_traslado"):
-                    gestion_data_clean["tipo_traslado"] = gestion_data.get(
-                        "tipo_traslado"
-                    )
-                if gestion_data.get("motivo_traslado"):
-                    gestion_data_clean["motivo_traslado"] = gestion_data.get(
-                        "motivo_traslado"
-                    )
-                if gestion_data.get("centro_destinatario"):
-                    gestion_data_clean["centro_destinatario"] = gestion_data.get(
-                        "centro_destinatario"
-                    )
-                if gestion_data.get("tipo_solicitud_traslado"):
-                    gestion_data_clean["tipo_solicitud_traslado"] = gestion_data.get(
-                        "tipo_solicitud_traslado"
-                    )
-                if gestion_data.get("nivel_atencion_traslado"):
-                    gestion_data_clean["nivel_atencion_traslado"] = gestion_data.get(
-                        "nivel_atencion_traslado"
-                    )
-                if gestion_data.get("motivo_rechazo_traslado"):
-                    gestion_data_clean["motivo_rechazo_traslado"] = gestion_data.get(
-                        "motivo_rechazo_traslado"
-                    )
-                if gestion_data.get("motivo_cancelacion_traslado"):
-                    gestion_data_clean["motivo_cancelacion_traslado"] = (
-                        gestion_data.get("motivo_cancelacion_traslado")
-                    )
-                if gestion_data.get("fecha_finalizacion_traslado"):
-                    gestion_data_clean["fecha_finalizacion_traslado"] = (
-                        gestion_data.get("fecha_finalizacion_traslado")
-                    )
-
-                # Filtrar valores None
-                gestion_data_clean = {
-                    k: v for k, v in gestion_data_clean.items() if v is not None
-                }
+                gestion_data_clean = self._gestion_fields(
+                    gestion_data, episodio, usuario
+                )
 
                 gestion = Gestion.objects.create(**gestion_data_clean)
                 self.results["gestiones"]["created"] += 1
@@ -476,6 +493,7 @@ class DatabaseImporter:
 
             except ValidationError as e:
                 self.results["gestiones"]["errors"] += 1
+                self._mark_failed(gestion_data, "cmbd")
                 error_msg = (
                     f"Error validación gestión para episodio {episodio_cmbd}: {str(e)}"
                 )
@@ -484,10 +502,626 @@ class DatabaseImporter:
 
             except Exception as e:
                 self.results["gestiones"]["errors"] += 1
+                self._mark_failed(gestion_data, "cmbd")
                 error_msg = f"Error procesando gestión para episodio {gestion_data.get('episodio_cmbd', 'SIN_CMBD')}: {str(e)}"
                 self.error_details.append(error_msg)
                 logger.error(error_msg)
 
+    def _gestion_fields(self, gestion_data: Dict, episodio: Episodio, usuario) -> Dict:
+        """Campos de una gestión nueva, sin valores None"""
+        # Crear gestión con todos los campos disponibles
+        gestion_data_clean = {
+            "episodio": episodio,
+            "usuario": usuario,
+            "tipo_gestion": gestion_data.get("tipo_gestion", "GESTION_CLINICA"),
+            "estado_gestion": gestion_data.get("estado_gestion", "INICIADA"),
+            "fecha_inicio": gestion_data.get("fecha_inicio"),
+            "fecha_fin": gestion_data.get("fecha_fin"),
+            "informe": gestion_data.get("informe"),
+        }
+
+        # Agregar campos de traslado si existen
+        # estado_traslado solo se incluye si existe y tipo_gestion es TRASLADO
+        if gestion_data.get("estado_traslado"):
+            gestion_data_clean["estado_traslado"] = gestion_data.get("estado_traslado")
+        if gestion_data.get("tipo_traslado"):
+            gestion_data_clean["tipo_traslado"] = gestion_data.get("tipo_traslado")
+        if gestion_data.get("motivo_traslado"):
+            gestion_data_clean["motivo_traslado"] = gestion_data.get("motivo_traslado")
+        if gestion_data.get("centro_destinatario"):
+            gestion_data_clean["centro_destinatario"] = gestion_data.get(
+                "centro_destinatario"
+            )
+        if gestion_data.get("tipo_solicitud_traslado"):
+            gestion_data_clean["tipo_solicitud_traslado"] = gestion_data.get(
+                "tipo_solicitud_traslado"
+            )
+        if gestion_data.get("nivel_atencion_traslado"):
+            gestion_data_clean["nivel_atencion_traslado"] = gestion_data.get(
+                "nivel_atencion_traslado"
+            )
+        if gestion_data.get("motivo_rechazo_traslado"):
+            gestion_data_clean["motivo_rechazo_traslado"] = gestion_data.get(
+                "motivo_rechazo_traslado"
+            )
+        if gestion_data.get("motivo_cancelacion_traslado"):
+            gestion_data_clean["motivo_cancelacion_traslado"] = gestion_data.get(
+                "motivo_cancelacion_traslado"
+            )
+        if gestion_data.get("fecha_finalizacion_traslado"):
+            gestion_data_clean["fecha_finalizacion_traslado"] = gestion_data.get(
+                "fecha_finalizacion_traslado"
+            )
+
+        # Filtrar valores None
+        gestion_data_clean = {
+            k: v for k, v in gestion_data_clean.items() if v is not None
+        }
+
+        return gestion_data_clean
+
+    # ------------------------------------------------------------------
+    # Modo bulk: por cada lote se hace un SELECT ... IN por entidad, se
+    # fusiona en memoria con las mismas reglas del modo fila a fila y se
+    # escribe con bulk_create/bulk_update dentro de un savepoint. Si el
+    # lote falla al escribir, se reintenta fila a fila.
+    # ------------------------------------------------------------------
+
+    def _chunks(self, rows: List[Dict]) -> Iterator[List[Dict]]:
+        """Divide las filas en lotes de tamaño chunk_size"""
+        size = max(int(self.chunk_size or 1), 1)
+        for start in range(0, len(rows), size):
+            yield rows[start : start + size]
+
+    def _check_not_null(self, instance) -> None:
+        """
+        Replica la restricción NOT NULL antes de encolar una instancia, para
+        que una fila inválida no haga fallar el lote completo
+        """
+        for field in instance._meta.concrete_fields:
+            if (
+                field.null
+                or field.primary_key
+                or getattr(field, "auto_now", False)
+                or getattr(field, "auto_now_add", False)
+            ):
+                continue
+            if getattr(instance, field.attname) is None:
+                raise IntegrityError(
+                    f"NOT NULL constraint failed: {instance._meta.db_table}.{field.column}"
+                )
+
+    def _merge_results(
+        self,
+        model: str,
+        counts: Dict,
+        errors: List[str],
+        failed: Optional[Dict[str, set]] = None,
+        imported: Optional[List[Dict]] = None,
+    ) -> None:
+        """Suma los contadores, errores y filas fallidas de un lote confirmado"""
+        for key, value in counts.items():
+            self.results[model][key] += value
+        self.error_details.extend(errors)
+        for key, values in (failed or {}).items():
+            self.failed[key].update(values)
+        for episodio_data in imported or []:
+            self._mark_imported(episodio_data)
+
+    def _mark_failed(
+        self, data: Dict, key: str, failed: Optional[Dict[str, set]] = None
+    ) -> None:
+        """
+        Registra la clave (cmbd, rut o codigo_cama) de una fila que falló,
+        más el CMBD del episodio del que cuelga si lo trae
+        """
+        failed = self.failed if failed is None else failed
+        value = data.get("episodio_cmbd" if key == "cmbd" else key)
+        if value:
+            failed[key].add(value)
+        if data.get("episodio_cmbd"):
+            failed["cmbd"].add(data["episodio_cmbd"])
+
+    def _mark_imported(self, episodio_data: Dict) -> None:
+        """Registra un episodio que quedó en la base"""
+        self.imported_episodios[episodio_data["episodio_cmbd"]] = (
+            episodio_data.get("rut_paciente"),
+            episodio_data.get("codigo_cama"),
+        )
+
+    def succeeded_episodios(self) -> set:
+        """
+        CMBD de los episodios que quedaron en la base sin que fallara su
+        paciente, su cama ni ninguna de sus gestiones (vacío si la
+        transacción se revirtió)
+        """
+        if not self.success:
+            return set()
+        return {
+            cmbd
+            for cmbd, (rut, codigo_cama) in self.imported_episodios.items()
+            if cmbd not in self.failed["cmbd"]
+            and rut not in self.failed["rut"]
+            and codigo_cama not in self.failed["codigo_cama"]
+        }
+
+    def _bulk_import_pacientes(self, pacientes_data: List[Dict]) -> None:
+        """
+        Importa pacientes por lotes
+
+        Args:
+            pacientes_data: Lista de datos de pacientes
+        """
+        logger.info(f"Importando {len(pacientes_data)} pacientes (bulk)...")
+
+        for chunk in self._chunks(pacientes_data):
+            counts = {"created": 0, "updated": 0, "errors": 0}
+            errors = []
+            relations = {}
+
+            failed = defaultdict(set)
+            ruts = {data.get("rut") for data in chunk if data.get("rut")}
+            existing = {p.rut: p for p in Paciente.objects.filter(rut__in=ruts)}
+            to_create = {}
+            to_update = {}
+
+            for paciente_data in chunk:
+                rut = paciente_data.get("rut")
+                if not rut:
+                    counts["errors"] += 1
+                    self._mark_failed(paciente_data, "rut", failed)
+                    errors.append(
+                        f"Paciente sin RUT en episodio {paciente_data.get('episodio_cmbd')}"
+                    )
+                    continue
+
+                try:
+                    paciente = existing.get(rut)
+                    if paciente is None:
+                        paciente = Paciente(
+                            rut=rut, **self._paciente_defaults(paciente_data)
+                        )
+                        self._check_not_null(paciente)
+                        to_create[rut] = paciente
+                        counts["created"] += 1
+                    else:
+                        # Fusionar sobre una copia: si la fila falla a mitad,
+                        # el paciente queda como estaba
+                        candidato = copy.copy(paciente)
+                        if self._merge_paciente(candidato, paciente_data):
+                            paciente = candidato
+                            if rut in to_create:
+                                to_create[rut] = paciente
+                            else:
+                                to_update[rut] = paciente
+                            counts["updated"] += 1
+                    existing[rut] = paciente
+
+                    episodio_cmbd = paciente_data.get("episodio_cmbd")
+                    if episodio_cmbd:
+                        relations[episodio_cmbd] = paciente
+
+                except Exception as e:
+                    counts["errors"] += 1
+                    self._mark_failed(paciente_data, "rut", failed)
+                    error_msg = f"Error procesando paciente {rut}: {str(e)}"
+                    errors.append(error_msg)
+                    errors.append(f"Datos del paciente: {paciente_data}")
+                    logger.error(error_msg)
+
+            try:
+                with transaction.atomic():
+                    Paciente.objects.bulk_create(
+                        list(to_create.values()), batch_size=self.chunk_size
+                    )
+                    now = timezone.now()
+                    for paciente in to_update.values():
+                        paciente.updated_at = now
+                    Paciente.objects.bulk_update(
+                        list(to_update.values()),
+                        PACIENTE_MERGE_FIELDS + ["updated_at"],
+                        batch_size=self.chunk_size,
+                    )
+            except Exception as e:
+                logger.warning(
+                    f"Lote de {len(chunk)} pacientes falló en modo bulk ({e}); reintentando fila a fila"
+                )
+                self._import_pacientes(chunk)
+                continue
+
+            self._merge_results("pacientes", counts, errors, failed)
+            self.episodio_to_paciente.update(relations)
+            # Los pacientes que se fusionaron en memoria pero no cambiaron
+            # también quedan disponibles para los episodios
+            self.rut_to_paciente.update(existing)
+
+    def _bulk_import_camas(self, camas_data: List[Dict]) -> None:
+        """
+        Importa camas por lotes
+
+        Args:
+            camas_data: Lista de datos de camas
+        """
+        logger.info(f"Importando {len(camas_data)} camas (bulk)...")
+
+        for chunk in self._chunks(camas_data):
+            counts = {"created": 0, "updated": 0, "errors": 0}
+            errors = []
+
+            failed = defaultdict(set)
+            codigos = {d.get("codigo_cama") for d in chunk if d.get("codigo_cama")}
+            existing = defaultdict(list)
+            for cama in Cama.objects.filter(codigo_cama__in=codigos):
+                existing[cama.codigo_cama].append(cama)
+            to_create = {}
+            to_update = {}
+            resolved = {}
+
+            for cama_data in chunk:
+                codigo_cama = cama_data.get("codigo_cama")
+                if not codigo_cama:
+                    counts["errors"] += 1
+                    errors.append("Cama sin código")
+                    continue
+
+                try:
+                    camas = existing.get(codigo_cama, [])
+                    if len(camas) > 1:
+                        raise MultipleObjectsReturned(
+                            f"get() returned more than one Cama -- it returned {len(camas)}!"
+                        )
+
+                    if not camas:
+                        habitacion = cama_data.get("habitacion")
+                        if not habitacion or habitacion.strip() == "":
+                            # Generar habitación por defecto basada en el código de cama
+                            habitacion = f"HAB-{codigo_cama}"
+                        cama = Cama(codigo_cama=codigo_cama, habitacion=habitacion)
+                        to_create[codigo_cama] = cama
+                        existing[codigo_cama] = [cama]
+                        counts["created"] += 1
+                    else:
+                        cama = camas[0]
+                        if self._merge_cama(cama, cama_data):
+                            if codigo_cama not in to_create:
+                                to_update[codigo_cama] = cama
+                            counts["updated"] += 1
+
+                    resolved[codigo_cama] = cama
+
+                except Exception as e:
+                    counts["errors"] += 1
+                    self._mark_failed(cama_data, "codigo_cama", failed)
+                    error_msg = f"Error procesando cama {codigo_cama}: {str(e)}"
+                    errors.append(error_msg)
+                    logger.error(error_msg)
+
+            try:
+                with transaction.atomic():
+                    Cama.objects.bulk_create(
+                        list(to_create.values()), batch_size=self.chunk_size
+                    )
+                    Cama.objects.bulk_update(
+                        list(to_update.values()),
+                        ["habitacion"],
+                        batch_size=self.chunk_size,
+                    )
+            except Exception as e:
+                logger.warning(
+                    f"Lote de {len(chunk)} camas falló en modo bulk ({e}); reintentando fila a fila"
+                )
+                self._import_camas(chunk)
+                continue
+
+            self._merge_results("camas", counts, errors, failed)
+            self.codigo_cama_to_cama.update(resolved)
+            for cama in resolved.values():
+                self.lookups.add_cama(cama)
+
+    def _bulk_import_episodios(self, episodios_data: List[Dict]) -> None:
+        """
+        Importa episodios por lotes
+
+        Args:
+            episodios_data: Lista de datos de episodios
+        """
+        logger.info(f"Importando {len(episodios_data)} episodios (bulk)...")
+
+        for chunk in self._chunks(episodios_data):
+            counts = {"created": 0, "updated": 0, "errors": 0}
+            errors = []
+            relations = {}
+
+            cmbds = {d.get("episodio_cmbd") for d in chunk if d.get("episodio_cmbd")}
+            existing = defaultdict(list)
+            for episodio in Episodio.objects.filter(
+                episodio_cmbd__in=cmbds
+            ).select_related("paciente", "cama"):
+                existing[episodio.episodio_cmbd].append(episodio)
+
+            # Pacientes por RUT para episodios sin relación previa
+            ruts = {
+                d.get("rut_paciente")
+                for d in chunk
+                if d.get("rut_paciente")
+                and d.get("rut_paciente") not in self.rut_to_paciente
+            }
+            pacientes_by_rut = dict(self.rut_to_paciente)
+            pacientes_by_rut.update(
+                {p.rut: p for p in Paciente.objects.filter(rut__in=ruts)}
+            )
+
+            # Camas ocupadas (episodios activos) por cama
+            codigos = {d.get("codigo_cama") for d in chunk if d.get("codigo_cama")}
+            ocupadas = defaultdict(set)
+            for cama_id, episodio_id in Episodio.objects.filter(
+                cama__codigo_cama__in=codigos, fecha_egreso__isnull=True
+            ).values_list("cama_id", "id"):
+                ocupadas[cama_id].add(episodio_id)
+
+            to_create = {}
+            to_update = {}
+            servicios_pendientes = []
+            imported = []
+
+            for episodio_data in chunk:
+                episodio_cmbd = episodio_data.get("episodio_cmbd")
+                if not episodio_cmbd:
+                    counts["errors"] += 1
+                    errors.append("Episodio sin número CMBD")
+                    continue
+
+                try:
+                    episodios = existing.get(episodio_cmbd, [])
+
+                    # Buscar paciente por RUT o por episodio_cmbd ya procesado
+                    paciente = relations.get(
+                        episodio_cmbd
+                    ) or self.episodio_to_paciente.get(episodio_cmbd)
+                    if paciente is None and episodios:
+                        if len(episodios) > 1:
+                            raise MultipleObjectsReturned(
+                                f"get() returned more than one Episodio -- it returned {len(episodios)}!"
+                            )
+                        paciente = episodios[0].paciente
+                    if paciente is None and episodio_data.get("rut_paciente"):
+                        paciente = pacientes_by_rut.get(episodio_data["rut_paciente"])
+                    if paciente is None and episodio_data.get("nombre_paciente"):
+                        paciente = Paciente.objects.filter(
+                            nombre__icontains=episodio_data["nombre_paciente"]
+                        ).first()
+                    if not paciente:
+                        counts["errors"] += 1
+                        errors.append(
+                            f"No se encontró paciente para episodio {episodio_cmbd}"
+                        )
+                        continue
+
+                    cama = self._find_cama(episodio_data)
+
+                    if len(episodios) > 1:
+                        raise MultipleObjectsReturned(
+                            f"get() returned more than one Episodio -- it returned {len(episodios)}!"
+                        )
+
+                    if not episodios:
+                        episodio = Episodio(
+                            episodio_cmbd=episodio_cmbd,
+                            **self._episodio_defaults(episodio_data, paciente, cama),
+                        )
+                        self._validate_cama_libre(episodio, ocupadas)
+                        self._check_not_null(episodio)
+                        to_create[episodio_cmbd] = episodio
+                        counts["created"] += 1
+                    else:
+                        anterior = episodios[0]
+                        episodio = copy.copy(anterior)
+                        if self._merge_episodio(episodio, episodio_data, cama):
+                            self._validate_cama_libre(episodio, ocupadas)
+                            if anterior.cama_id:
+                                ocupadas[anterior.cama_id].discard(anterior.id)
+                            if episodio_cmbd in to_create:
+                                to_create[episodio_cmbd] = episodio
+                            else:
+                                to_update[episodio_cmbd] = episodio
+                            counts["updated"] += 1
+                        else:
+                            episodio = anterior
+
+                    if episodio.cama_id and not episodio.fecha_egreso:
+                        ocupadas[episodio.cama_id].add(episodio.id)
+                    existing[episodio_cmbd] = [episodio]
+
+                    servicios_pendientes.append(
+                        (episodio_cmbd, episodio_data.get("servicios", []))
+                    )
+                    relations[episodio_cmbd] = paciente
+                    imported.append(episodio_data)
+
+                except ValidationError as e:
+                    counts["errors"] += 1
+                    error_msg = f"Error validación episodio {episodio_cmbd}: {str(e)}"
+                    errors.append(error_msg)
+                    logger.error(error_msg)
+
+                except Exception as e:
+                    counts["errors"] += 1
+                    error_msg = f"Error procesando episodio {episodio_cmbd}: {str(e)}"
+                    errors.append(error_msg)
+                    errors.append(f"Datos del episodio: {episodio_data}")
+                    logger.error(error_msg)
+
+            try:
+                with transaction.atomic():
+                    # Primero las actualizaciones: liberan camas (egresos,
+                    # traslados) que los episodios nuevos pueden ocupar sin
+                    # violar episodios_cama_activa_uniq
+                    now = timezone.now()
+                    for episodio in to_update.values():
+                        episodio.updated_at = now
+                    Episodio.objects.bulk_update(
+                        list(to_update.values()),
+                        EPISODIO_MERGE_FIELDS + ["updated_at"],
+                        batch_size=self.chunk_size,
+                    )
+                    Episodio.objects.bulk_create(
+                        list(to_create.values()), batch_size=self.chunk_size
+                    )
+                    self._bulk_asociar_servicios(
+                        [
+                            (existing[cmbd][0], servicios)
+                            for cmbd, servicios in servicios_pendientes
+                        ]
+                    )
+            except Exception as e:
+                logger.warning(
+                    f"Lote de {len(chunk)} episodios falló en modo bulk ({e}); reintentando fila a fila"
+                )
+                self._import_episodios(chunk)
+                continue
+
+            self._merge_results("episodios", counts, errors, imported=imported)
+            self.episodio_to_paciente.update(relations)
+            for cmbd in relations:
+                self.lookups.add_episodio(existing[cmbd][0])
+
+        logger.info(
+            f"Importación de episodios completada: {self.results['episodios']['created']} creados, {self.results['episodios']['updated']} actualizados, {self.results['episodios']['errors']} errores"
+        )
+
+    def _validate_cama_libre(
+        self, episodio: Episodio, ocupadas: Dict[object, set]
+    ) -> None:
+        """
+        Regla de la restricción episodios_cama_activa_uniq: una cama no puede
+        tener dos episodios activos. Se revisa con el mapa de ocupación del
+        lote para informar la fila en vez de hacer fallar el lote completo
+        """
+        if episodio.cama and not episodio.fecha_egreso:
+            if ocupadas.get(episodio.cama_id, set()) - {episodio.id}:
+                raise ValidationError(
+                    f"La cama {episodio.cama.codigo_cama} ya está asignada a otro episodio activo."
+                )
+
+    def _bulk_asociar_servicios(
+        self, pendientes: List[Tuple[Episodio, List[Dict]]]
+    ) -> None:
+        """
+        Crea las relaciones EpisodioServicio de un lote con un solo bulk_create
+        """
+        codigos = {
+            info.get("codigo")
+            for _, servicios in pendientes
+            for info in servicios
+            if info.get("codigo")
+        }
+        if not codigos:
+            return
+
+        episodio_ids = {episodio.id for episodio, _ in pendientes}
+        asociados = set(
+            EpisodioServicio.objects.filter(episodio_id__in=episodio_ids).values_list(
+                "episodio_id", "servicio__codigo", "tipo"
+            )
+        )
+
+        nuevos = []
+        for episodio, servicios in pendientes:
+            for info in servicios:
+                codigo = info.get("codigo")
+                tipo = info.get("tipo")
+                if not codigo:
+                    continue
+
+                if (episodio.id, codigo, tipo) in asociados:
+                    continue
+
+                servicio = self.lookups.servicio(codigo)
+                if not servicio:
+                    logger.warning(f"Servicio {codigo} no encontrado")
+                    continue
+
+                nuevos.append(
+                    EpisodioServicio(
+                        episodio=episodio,
+                        servicio=servicio,
+                        fecha=info.get("fecha"),
+                        tipo=tipo,
+                    )
+                )
+                asociados.add((episodio.id, codigo, tipo))
+
+        EpisodioServicio.objects.bulk_create(nuevos, batch_size=self.chunk_size)
+        if nuevos:
+            logger.info(f"{len(nuevos)} servicios asociados a episodios del lote")
+
+    def _bulk_import_gestiones(self, gestiones_data: List[Dict]) -> None:
+        """
+        Importa gestiones por lotes
+
+        Args:
+            gestiones_data: Lista de datos de gestiones
+        """
+        logger.info(f"Importando {len(gestiones_data)} gestiones (bulk)...")
+
+        for chunk in self._chunks(gestiones_data):
+            counts = {"created": 0, "updated": 0, "errors": 0}
+            errors = []
+
+            cmbds = {d.get("episodio_cmbd") for d in chunk if d.get("episodio_cmbd")}
+            episodios = defaultdict(list)
+            for episodio in Episodio.objects.filter(episodio_cmbd__in=cmbds):
+                episodios[episodio.episodio_cmbd].append(episodio)
+
+            to_create = []
+            failed = defaultdict(set)
+
+            for gestion_data in chunk:
+                episodio_cmbd = gestion_data.get("episodio_cmbd")
+                if not episodio_cmbd:
+                    continue
+
+                try:
+                    encontrados = episodios.get(episodio_cmbd, [])
+                    if not encontrados:
+                        counts["errors"] += 1
+                        self._mark_failed(gestion_data, "cmbd", failed)
+                        errors.append(
+                            f"No se encontró episodio {episodio_cmbd} para gestión"
+                        )
+                        continue
+                    if len(encontrados) > 1:
+                        raise MultipleObjectsReturned(
+                            f"get() returned more than one Episodio -- it returned {len(encontrados)}!"
+                        )
+
+                    usuario = self._find_usuario(gestion_data.get("usuario_email"))
+                    gestion = Gestion(
+                        **self._gestion_fields(gestion_data, encontrados[0], usuario)
+                    )
+                    self._check_not_null(gestion)
+                    to_create.append(gestion)
+                    counts["created"] += 1
+
+                except Exception as e:
+                    counts["errors"] += 1
+                    self._mark_failed(gestion_data, "cmbd", failed)
+                    error_msg = f"Error procesando gestión para episodio {episodio_cmbd}: {str(e)}"
+                    errors.append(error_msg)
+                    logger.error(error_msg)
+
+            try:
+                with transaction.atomic():
+                    Gestion.objects.bulk_create(to_create, batch_size=self.chunk_size)
+            except Exception as e:
+                logger.warning(
+                    f"Lote de {len(chunk)} gestiones falló en modo bulk ({e}); reintentando fila a fila"
+                )
+                self._import_gestiones(chunk)
+                continue
+
+            self._merge_results("gestiones", counts, errors, failed)
+
     def _find_paciente_for_episodio(
         self, episodio_data: Dict, episodio_cmbd: int
     ) -> Optional[Paciente]:
@@ -507,7 +1141,7 @@ class DatabaseImporter:
 
         # Buscar en episodios ya existentes
         try:
-            episodio_existente = Episodio.objects.get(episodio_cmbd=episodio_cmbd)
+            episodio_existente = self.lookups.episodio(episodio_cmbd)
             return episodio_existente.paciente
         except Episodio.DoesNotExist:
             pass
@@ -517,6 +1151,8 @@ class DatabaseImporter:
 
         # Buscar por RUT si está disponible en los datos del episodio
         rut_paciente = episodio_data.get("rut_paciente")
+        if rut_paciente in self.rut_to_paciente:
+            return self.rut_to_paciente[rut_paciente]
         if rut_paciente:
             try:
                 return Paciente.objects.get(rut=rut_paciente)
@@ -551,24 +1187,20 @@ class DatabaseImporter:
         if not cama_codigo:
             return None
 
-        try:
-            # Buscar por código y habitación si ambos están disponibles
-            if habitacion:
-                return Cama.objects.get(codigo_cama=cama_codigo, habitacion=habitacion)
-            else:
-                # Buscar solo por código
-                return Cama.objects.get(codigo_cama=cama_codigo)
-        except Cama.DoesNotExist:
+        # Buscar por código y habitación si ambos están disponibles
+        camas = self.lookups.camas(cama_codigo, habitacion)
+        if not camas:
             logger.warning(
                 f"No se encontró cama {cama_codigo} en habitación {habitacion}"
             )
             return None
-        except Cama.MultipleObjectsReturned:
+        if len(camas) > 1:
             # Si hay múltiples camas con el mismo código, tomar la primera
             logger.warning(
                 f"Múltiples camas con código {cama_codigo}, tomando la primera"
             )
-            return Cama.objects.filter(codigo_cama=cama_codigo).first()
+            return self.lookups.camas(cama_codigo)[0]
+        return camas[0]
 
     def _find_usuario(self, email: str):
         """
@@ -583,11 +1215,10 @@ class DatabaseImporter:
         if not email:
             return None
 
-        try:
-            return User.objects.get(email=email)
-        except User.DoesNotExist:
+        usuario = self.lookups.usuario(email)
+        if usuario is None:
             logger.debug(f"No se encontró usuario con email: {email}")
-            return None
+        return usuario
 
     def _find_servicio_by_codigo(self, codigo: str) -> Optional[Servicio]:
         """
@@ -602,11 +1233,10 @@ class DatabaseImporter:
         if not codigo:
             return None
 
-        try:
-            return Servicio.objects.get(codigo=codigo)
-        except Servicio.DoesNotExist:
+        servicio = self.lookups.servicio(codigo)
+        if servicio is None:
             logger.debug(f"No se encontró servicio con código: {codigo}")
-            return None
+        return servicio
 
     def _check_episodio_servicio(
         self, episodio: Episodio, servicio_codigo: str, servicio_tipo: str = None
@@ -691,6 +1321,10 @@ class DatabaseImporter:
                 ),
             },
             "details": self.results,
+            # False si la transacción se revirtió: no quedó nada en la base
+            "success": self.success,
+            "succeeded_episodios": self.succeeded_episodios(),
+            "cache": self.lookups.summary(),
             "errors": self.error_details[
                 :50
             ],  # Limitar a 50 errores para no saturar logs
@@ -0,0 +1,136 @@
+"""
+Caché de planillas ya parseadas, para parsear cada Excel una sola vez
+
+Parsear un .xlsx con openpyxl es lo más caro de una importación. La primera
+lectura de un archivo guarda el DataFrame resultante y las siguientes
+(scoring, reintentos de un trabajo, reprocesar una carga) lo leen desde la
+caché. Las entradas se identifican por el SHA-256 del archivo y las columnas
+leídas, así que un archivo distinto nunca usa una entrada ajena.
+
+Se guardan con pickle de pandas: conserva tal cual las columnas object con
+tipos mezclados (texto, números, fechas) que trae un Excel, que Parquet o
+Arrow no aceptan sin convertirlas. Solo se leen archivos que escribió este
+módulo, en un directorio del servidor.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import time
+from typing import Iterable, Optional
+
+import pandas as pd
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Subirla cuando cambie cómo se parsea un Excel: invalida la caché
+CACHE_VERSION = 1
+SUFFIX = ".pkl"
+
+
+def default_cache_dir() -> str:
+    """settings.EXCEL_CACHE_DIR, o MEDIA_ROOT/cache/excel (compartida con los workers)"""
+    return getattr(settings, "EXCEL_CACHE_DIR", "") or os.path.join(
+        settings.MEDIA_ROOT, "cache", "excel"
+    )
+
+
+def file_sha256(file_path) -> str:
+    """SHA-256 del contenido de un archivo"""
+    sha256 = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class ParsedExcelCache:
+    """
+    DataFrames parseados por SHA-256 del archivo y columnas leídas:
+
+        cache = ParsedExcelCache(default_cache_dir())
+        df = cache.get(sha256)
+        if df is None:
+            df = pd.read_excel(path)
+            cache.put(sha256, df)
+
+    Las entradas sin usar en `max_age_days` (settings.EXCEL_CACHE_MAX_AGE_DAYS)
+    se borran al guardar una nueva.
+    """
+
+    def __init__(self, directory: str, max_age_days: Optional[float] = None):
+        self.directory = directory
+        if max_age_days is None:
+            max_age_days = getattr(settings, "EXCEL_CACHE_MAX_AGE_DAYS", 7)
+        self.max_age_days = max_age_days
+
+    def _path(self, sha256: str, columns=None, always: Iterable[str] = ()) -> str:
+        if columns is None:
+            key = "full"
+        else:
+            projection = json.dumps([sorted(map(str, columns)), sorted(always)])
+            key = hashlib.sha256(projection.encode()).hexdigest()[:16]
+        name = f"{sha256}-v{CACHE_VERSION}-{key}{SUFFIX}"
+        return os.path.join(self.directory, sha256[:2], name)
+
+    def get(
+        self, sha256: str, columns=None, always: Iterable[str] = ()
+    ) -> Optional[pd.DataFrame]:
+        """DataFrame guardado para esas columnas (None = hoja completa), o None"""
+        path = self._path(sha256, columns, always)
+        try:
+            df = pd.read_pickle(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Entrada de caché ilegible, se vuelve a parsear: {e}")
+            return None
+        # Marca de uso para prune()
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return df
+
+    def put(
+        self, sha256: str, df: pd.DataFrame, columns=None, always: Iterable[str] = ()
+    ) -> None:
+        """Guarda el DataFrame; un error de escritura solo deja de cachear"""
+        path = self._path(sha256, columns, always)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Escritura atómica: otro proceso nunca lee una entrada a medias
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    df.to_pickle(f, compression=None, protocol=5)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            logger.warning(f"No se pudo guardar {path} en la caché: {e}")
+            return
+        self.prune()
+
+    def prune(self) -> int:
+        """Borra las entradas sin usar en max_age_days; devuelve cuántas"""
+        if not self.max_age_days or not os.path.isdir(self.directory):
+            return 0
+        limit = time.time() - self.max_age_days * 86400
+        removed = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < limit:
+                        os.remove(path)
+                        removed += 1
+                except OSError:
+                    pass
+        if removed:
+            logger.info(f"Caché de Excel: {removed} entradas vencidas eliminadas")
+        return removed
@@ -3,14 +3,227 @@ Procesador para leer y combinar archivos Excel con pandas
 """
 
 import logging
-from datetime import date, datetime
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
+from django.conf import settings
+from openpyxl import load_workbook
+from pandas.io.common import dedup_names
+from pandas.io.parsers import TextParser
+
+from api.management.modules.data_mapper import CAMA_COLUMNS
+from api.management.modules.date_parser import DateParser
+from api.management.modules.excel_cache import ParsedExcelCache, file_sha256
 
 logger = logging.getLogger(__name__)
 
+# Firmas de archivo -> motor de pandas
+XLSX_MAGIC = b"PK\x03\x04"  # .xlsx (zip)
+XLS_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"  # .xls (OLE2)
+
+FINALIZACION_FORMATS = [
+    "%m/%d/%Y %I:%M:%S %p",  # "12/13/2023 1:41:00 PM"
+    "%m/%d/%Y %I:%M %p",  # "12/13/2023 1:41 PM"
+    "%m/%d/%Y %H:%M:%S",  # "12/13/2023 13:41:00"
+    "%m/%d/%Y %H:%M",  # "12/13/2023 13:41"
+]
+
+
+# Columnas de excel1 que usa combine_data, con sus nombres alternativos
+EXCEL1_COLUMN_ALIASES = {
+    "Tipo Actividad": [
+        "Tipo Actividad",
+        "tipo_actividad",
+        "Tipo de Actividad",
+    ],
+    "Estancia Inlier / Outlier": [
+        "Estancia Inlier / Outlier",
+        "estancia_inlier_outlier",
+        "Inlier/Outlier",
+    ],
+    "Especialidad médica de la intervención (des)": [
+        "Especialidad médica de la intervención (des)",
+        "especialidad_medica",
+        "Especialidad",
+    ],
+    "Estancias Prequirurgicas Int  -Episodio-": [
+        "Estancias Prequirurgicas Int  -Episodio-",
+        "estancia_prequirurgica",
+        "Prequirurgica",
+    ],
+    "Estancias Postquirurgicas Int  -Episodio-": [
+        "Estancias Postquirurgicas Int  -Episodio-",
+        "estancia_postquirurgica",
+        "Postquirurgica",
+    ],
+    "Estancia Norma GRD": [
+        "Estancia Norma GRD",
+        "estancia_norma_grd",
+        "Norma GRD",
+    ],
+}
+
+# Columnas de excel3 que se usan: cama y habitación (combine_data y el
+# DataMapper) y "CMBD", una de las claves del cruce de process_local_files
+EXCEL3_COLUMNS = CAMA_COLUMNS + ["HABITACION", "CMBD"]
+
+# Columnas que necesita cada etapa (None = todas). Las columnas de episodio
+# se leen siempre.
+COMBINE_COLUMNS = {
+    "excel1": [name for names in EXCEL1_COLUMN_ALIASES.values() for name in names],
+    "excel2": None,  # base de la combinación
+    "excel3": EXCEL3_COLUMNS,
+    "excel4": ["Puntaje"],
+}
+# process_local_files no proyecta excel1 ni excel2: son la base del cruce
+# por RUT y el DataMapper lee decenas de sus columnas (paciente, episodio,
+# gestiones, servicios)
+LOCAL_FILES_COLUMNS = {
+    "excel3": EXCEL3_COLUMNS,
+    "excel4": ["Puntaje"],
+}
+
+
+def detect_excel_engine(file_path) -> str:
+    """
+    Motor de pandas según los primeros bytes del archivo
+
+    Raises:
+        ValueError: si el archivo no es .xlsx ni .xls
+    """
+    with open(file_path, "rb") as f:
+        header = f.read(len(XLS_MAGIC))
+
+    if header.startswith(XLSX_MAGIC):
+        return "openpyxl"
+    if header.startswith(XLS_MAGIC):
+        return "xlrd"
+    raise ValueError(f"{Path(file_path).name} no es un archivo Excel (.xlsx o .xls)")
+
+
+def _xlsx_cell_value(cell):
+    """Valor de una celda tal como lo entrega pandas al leer con openpyxl"""
+    if cell.value is None:
+        return ""
+    if cell.data_type == "e":  # error (#N/A, #DIV/0!, ...)
+        return np.nan
+    if cell.data_type == "n":
+        value = int(cell.value)
+        return value if value == cell.value else float(cell.value)
+    return cell.value
+
+
+def _read_xlsx_columns(file_path, keep) -> pd.DataFrame:
+    """
+    Lee solo las columnas seleccionadas de la primera hoja de un .xlsx
+
+    Recorre la hoja fila a fila en modo read_only y guarda únicamente las
+    celdas de las columnas pedidas, así la memoria depende de cuántas columnas
+    se piden y no del ancho de la planilla. Los nombres de columna y los tipos
+    quedan igual que con pd.read_excel.
+    """
+    workbook = load_workbook(
+        file_path, read_only=True, data_only=True, keep_links=False
+    )
+    try:
+        sheet = workbook.worksheets[0]
+        sheet.reset_dimensions()
+        rows = sheet.iter_rows()
+
+        header = [_xlsx_cell_value(cell) for cell in next(rows, ())]
+        while header and header[-1] == "":
+            header.pop()
+        names = dedup_names(
+            [name if name != "" else f"Unnamed: {i}" for i, name in enumerate(header)],
+            False,
+        )
+        selected = [i for i, name in enumerate(names) if keep(name)]
+        if not selected:
+            return pd.DataFrame()
+
+        data = [[names[i] for i in selected]]
+        last_row_with_data = 0
+        for row in rows:
+            data.append(
+                [_xlsx_cell_value(row[i]) if i < len(row) else "" for i in selected]
+            )
+            # pandas descarta las filas vacías del final (en todo el ancho)
+            if any(cell.value not in (None, "") for cell in row):
+                last_row_with_data = len(data) - 1
+        data = data[: last_row_with_data + 1]
+    finally:
+        workbook.close()
+
+    df = TextParser(data, header=0, skip_blank_lines=False).read()
+    # Como en la hoja completa, donde los nombres pueden mezclar tipos
+    df.columns = pd.Index(df.columns, dtype=object)
+    return df
+
+
+def read_excel_file(
+    file_path,
+    columns: Optional[Iterable[str]] = None,
+    always: Iterable[str] = (),
+    cache_dir: Optional[str] = None,
+) -> Tuple[pd.DataFrame, str, float]:
+    """
+    Lee un Excel con el motor que corresponde a su formato
+
+    Función de módulo para poder ejecutarla en otro proceso.
+
+    Args:
+        file_path: Ruta al archivo
+        columns: Nombres de las columnas a leer (None = todas)
+        always: Columnas que se leen siempre si su nombre contiene alguno de
+            estos textos (sin distinguir mayúsculas)
+        cache_dir: Directorio de la caché de planillas parseadas (ver
+            excel_cache); si ya se parseó el mismo archivo no se vuelve a leer
+
+    Returns:
+        (DataFrame, motor usado o "cache", segundos de lectura)
+    """
+    start = time.perf_counter()
+    if columns is not None:
+        columns = list(columns)
+    wanted = set(columns or ())
+    always = [text.lower() for text in always]
+
+    def keep(name) -> bool:
+        name = str(name).strip()
+        return name in wanted or any(text in name.lower() for text in always)
+
+    cache = sha256 = None
+    if cache_dir:
+        cache = ParsedExcelCache(cache_dir)
+        sha256 = file_sha256(file_path)
+        df = cache.get(sha256, columns, always)
+        if df is None and columns is not None:
+            # La hoja completa ya parseada también sirve para una proyección
+            full = cache.get(sha256)
+            if full is not None:
+                df = full.loc[:, [keep(name) for name in full.columns]]
+        if df is not None:
+            return df, "cache", time.perf_counter() - start
+
+    engine = detect_excel_engine(file_path)
+
+    if columns is None:
+        df = pd.read_excel(file_path, engine=engine)
+    elif engine == "openpyxl":
+        df = _read_xlsx_columns(file_path, keep)
+    else:
+        df = pd.read_excel(file_path, engine=engine, usecols=keep)
+
+    if cache is not None:
+        cache.put(sha256, df, columns, always)
+    return df, engine, time.perf_counter() - start
+
 
 class ExcelProcessor:
     """
@@ -18,19 +231,48 @@ class ExcelProcessor:
     Compatible con archivos de OneDrive y locales
     """
 
-    def __init__(self):
+    def __init__(
+        self, max_workers: Optional[int] = None, cache_dir: Optional[str] = None
+    ):
+        """
+        Args:
+            max_workers: Procesos para leer los Excel en paralelo (por
+                defecto settings.EXCEL_LOAD_WORKERS, sin superar las CPU
+                disponibles; 1 = secuencial)
+            cache_dir: Caché de planillas parseadas (None = sin caché)
+        """
+        if max_workers is None:
+            max_workers = min(
+                getattr(settings, "EXCEL_LOAD_WORKERS", 4), os.cpu_count() or 1
+            )
+        self.max_workers = max_workers
+        self.cache_dir = cache_dir
+        self.load_timings: Dict[str, float] = {}
+        # Archivos leídos en el pool de procesos en la última carga
+        self.parallel_reads = 0
+        self._raw_frames: Dict[str, object] = {}
+        self._columns: Dict[str, Optional[List[str]]] = {}
         self.excel1_df = None
         self.excel2_df = None
         self.excel3_df = None
         self.excel4_df = None
         self.combined_df = None
-
-    def load_excel_files(self, file_paths: Dict[str, Path]) -> bool:
+        # Finalización de traslado: fecha "12/13/2023" + hora "1:41:00 PM"
+        self.finalizacion_parser = DateParser(FINALIZACION_FORMATS)
+        self.fecha_finalizacion_parser = DateParser(["%m/%d/%Y", "%Y-%m-%d"])
+
+    def load_excel_files(
+        self,
+        file_paths: Dict[str, Path],
+        columns: Optional[Dict[str, Optional[List[str]]]] = None,
+    ) -> bool:
         """
         Carga los cuatro archivos Excel en DataFrames
 
         Args:
             file_paths: Dict con nombres de archivo -> rutas locales
+            columns: Columnas a leer por archivo (ej: COMBINE_COLUMNS); los
+                archivos que no aparecen, o con None, se leen completos
 
         Returns:
             bool: True si todos los archivos se cargaron correctamente
@@ -47,6 +289,9 @@ class ExcelProcessor:
 
             # Cargar cada archivo
             logger.info("Cargando archivos Excel...")
+            start = time.perf_counter()
+            self._columns = columns or {}
+            self._read_in_parallel({name: file_paths[name] for name in expected_files})
 
             # Excel 1
             self.excel1_df = self._load_single_excel(file_paths["excel1"], "excel1")
@@ -68,13 +313,66 @@ class ExcelProcessor:
             if self.excel4_df is None:
                 return False
 
-            logger.info("Todos los archivos Excel cargados exitosamente")
+            logger.info(
+                f"Todos los archivos Excel cargados exitosamente "
+                f"en {time.perf_counter() - start:.2f}s"
+            )
             return True
 
         except Exception as e:
             logger.error(f"Error cargando archivos Excel: {str(e)}")
             return False
 
+        finally:
+            self._raw_frames = {}
+            self._columns = {}
+
+    def _read_in_parallel(self, file_paths: Dict[str, Path]) -> None:
+        """
+        Lee los archivos en un pool de procesos (parsear con openpyxl es
+        intensivo en CPU) y deja cada resultado, DataFrame o excepción, para
+        que _load_single_excel lo procese en orden
+        """
+        self.parallel_reads = 0
+        workers = min(self.max_workers, len(file_paths))
+        if workers <= 1:
+            return
+
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    name: pool.submit(
+                        read_excel_file,
+                        path,
+                        *self._read_args(name),
+                        cache_dir=self.cache_dir,
+                    )
+                    for name, path in file_paths.items()
+                }
+                for name, future in futures.items():
+                    try:
+                        self._raw_frames[name] = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        self._raw_frames[name] = e
+            self.parallel_reads = len(self._raw_frames)
+        except Exception as e:
+            # Sin pool disponible: _load_single_excel lee cada archivo
+            logger.warning(f"No se pudo leer en paralelo, se lee en secuencia: {e}")
+            self._raw_frames = {}
+            self.parallel_reads = 0
+
+    def _read_args(self, file_name: str) -> Tuple[Optional[List[str]], Tuple[str, ...]]:
+        """
+        Columnas a leer de un archivo; si hay proyección se agregan siempre
+        las de episodio, que _load_single_excel necesita para el cruce
+        """
+        columns = self._columns.get(file_name)
+        if columns is None:
+            return None, ()
+        return columns, ("episodio",)
+
     def _load_single_excel(
         self, file_path: Path, file_name: str
     ) -> Optional[pd.DataFrame]:
@@ -89,12 +387,17 @@ class ExcelProcessor:
             DataFrame o None si hay error
         """
         try:
-            # Intentar cargar con openpyxl primero
-            try:
-                df = pd.read_excel(file_path, engine="openpyxl")
-            except:
-                # Intentar con xlrd como fallback
-                df = pd.read_excel(file_path, engine="xlrd")
+            # Usar la lectura en paralelo si existe; si no, leer aquí
+            raw = self._raw_frames.pop(file_name, None)
+            if raw is None:
+                raw = read_excel_file(
+                    file_path, *self._read_args(file_name), cache_dir=self.cache_dir
+                )
+            elif isinstance(raw, Exception):
+                raise raw
+            df, engine, seconds = raw
+            self.load_timings[file_name] = seconds
+            logger.info(f"{file_name} leído con {engine} en {seconds:.2f}s")
 
             # NO limpiar nombres de columnas - mantener originales para mapeo específico
             df.columns = df.columns.str.strip()
@@ -213,40 +516,7 @@ class ExcelProcessor:
             # Agregar datos de excel1 (estadísticas del episodio)
             excel1_cols = ["episodio_cmbd"]
             # Buscar columnas específicas que pueden tener nombres ligeramente diferentes
-            possible_excel1_cols = {
-                "Tipo Actividad": [
-                    "Tipo Actividad",
-                    "tipo_actividad",
-                    "Tipo de Actividad",
-                ],
-                "Estancia Inlier / Outlier": [
-                    "Estancia Inlier / Outlier",
-                    "estancia_inlier_outlier",
-                    "Inlier/Outlier",
-                ],
-                "Especialidad médica de la intervención (des)": [
-                    "Especialidad médica de la intervención (des)",
-                    "especialidad_medica",
-                    "Especialidad",
-                ],
-                "Estancias Prequirurgicas Int  -Episodio-": [
-                    "Estancias Prequirurgicas Int  -Episodio-",
-                    "estancia_prequirurgica",
-                    "Prequirurgica",
-                ],
-                "Estancias Postquirurgicas Int  -Episodio-": [
-                    "Estancias Postquirurgicas Int  -Episodio-",
-                    "estancia_postquirurgica",
-                    "Postquirurgica",
-                ],
-                "Estancia Norma GRD": [
-                    "Estancia Norma GRD",
-                    "estancia_norma_grd",
-                    "Norma GRD",
-                ],
-            }
-
-            for target_col, possible_names in possible_excel1_cols.items():
+            for target_col, possible_names in EXCEL1_COLUMN_ALIASES.items():
                 for possible_name in possible_names:
                     if possible_name in excel1_clean.columns:
                         excel1_cols.append(possible_name)
@@ -909,9 +1179,10 @@ class ExcelProcessor:
             return pd.DataFrame()
 
         gestiones_data = []
+        fechas_finalizacion = self._fecha_finalizacion_traslado_column(self.combined_df)
 
         # Iterar por cada fila del DataFrame combinado
-        for idx, row in self.combined_df.iterrows():
+        for pos, (idx, row) in enumerate(self.combined_df.iterrows()):
             episodio_cmbd = row.get("episodio_cmbd")
 
             if pd.isna(episodio_cmbd) or str(episodio_cmbd).strip() == "":
@@ -962,9 +1233,9 @@ class ExcelProcessor:
                     gestion_data["motivo_cancelacion_traslado"] = (
                         self._extract_motivo_cancelacion_traslado(row)
                     )
-                    gestion_data["fecha_finalizacion_traslado"] = (
-                        self._extract_fecha_finalizacion_traslado(row)
-                    )
+                    gestion_data["fecha_finalizacion_traslado"] = fechas_finalizacion[
+                        pos
+                    ]
 
                 gestiones_data.append(gestion_data)
 
@@ -1168,69 +1439,62 @@ class ExcelProcessor:
                     return valor
         return ""
 
-    def _extract_fecha_finalizacion_traslado(self, row) -> str:
+    def _first_text_column(self, df: pd.DataFrame, columns: List[str]) -> np.ndarray:
         """
-        Extrae fecha de finalización del traslado combinando 'Fecha de Finalización' y 'Hora de Finalización'
-        Formato esperado: fecha "12/13/2023" y hora "1:41:00 PM"
+        Primer valor con texto (ni vacío ni 'nan') entre las columnas dadas,
+        fila a fila; None si no hay ninguno
         """
-        # Buscar columnas de fecha y hora
-        fecha_col = None
-        hora_col = None
+        result = np.full(len(df), None, dtype=object)
+        for col in columns:
+            if col not in df.columns:
+                continue
+            texto = df[col].astype(str).str.strip()
+            found = (
+                pd.isna(result)
+                & df[col].notna().to_numpy()
+                & (texto != "").to_numpy()
+                & (texto.str.lower() != "nan").to_numpy()
+            )
+            result[found] = texto.to_numpy()[found]
+        return result
 
-        fecha_columns = ["Fecha de Finalización", "fecha_finalizacion", "fecha_fin"]
-        for col in fecha_columns:
-            if col in row and not pd.isna(row[col]):
-                valor = str(row[col]).strip()
-                if valor and valor.lower() != "nan":
-                    fecha_col = valor
-                    break
+    def _fecha_finalizacion_traslado_column(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Fecha de finalización del traslado de cada fila, combinando 'Fecha de
+        Finalización' y 'Hora de Finalización' (ISO, o "" si no hay fecha)
+        Formato esperado: fecha "12/13/2023" y hora "1:41:00 PM"
+        """
+        fechas = self._first_text_column(
+            df, ["Fecha de Finalización", "fecha_finalizacion", "fecha_fin"]
+        )
+        horas = self._first_text_column(
+            df, ["Hora de Finalización", "hora_finalizacion", "hora_fin"]
+        )
+        result = np.full(len(df), "", dtype=object)
 
-        hora_columns = ["Hora de Finalización", "hora_finalizacion", "hora_fin"]
-        for col in hora_columns:
-            if col in row and not pd.isna(row[col]):
-                valor = str(row[col]).strip()
-                if valor and valor.lower() != "nan":
-                    hora_col = valor
-                    break
+        con_fecha = ~pd.isna(fechas)
+        con_hora = con_fecha & ~pd.isna(horas)
+        solo_fecha = con_fecha & pd.isna(horas)
 
-        if not fecha_col:
-            return ""
+        if con_hora.any():
+            fecha_hora = pd.Series(fechas[con_hora] + " " + horas[con_hora])
+            parsed = self.finalizacion_parser.parse_strings(
+                fecha_hora, column="fecha_hora_finalizacion"
+            )
+            result[con_hora] = [
+                "" if pd.isna(fecha_dt) else fecha_dt.isoformat() for fecha_dt in parsed
+            ]
 
-        try:
-            # Intentar parsear fecha y hora
-            if hora_col:
-                # Combinar fecha y hora
-                fecha_hora_str = f"{fecha_col} {hora_col}"
-                # Intentar diferentes formatos
-                formatos = [
-                    "%m/%d/%Y %I:%M:%S %p",  # "12/13/2023 1:41:00 PM"
-                    "%m/%d/%Y %I:%M %p",  # "12/13/2023 1:41 PM"
-                    "%m/%d/%Y %H:%M:%S",  # "12/13/2023 13:41:00"
-                    "%m/%d/%Y %H:%M",  # "12/13/2023 13:41"
-                ]
-                for fmt in formatos:
-                    try:
-                        fecha_dt = datetime.strptime(fecha_hora_str, fmt)
-                        return fecha_dt.isoformat()
-                    except ValueError:
-                        continue
-                # Si ningún formato funciona, intentar con pandas
-                try:
-                    fecha_dt = pd.to_datetime(fecha_hora_str)
-                    return fecha_dt.isoformat()
-                except:
-                    pass
-            else:
-                # Solo fecha
-                try:
-                    fecha_dt = pd.to_datetime(fecha_col)
-                    return fecha_dt.date().isoformat()
-                except:
-                    pass
-        except Exception as e:
-            logger.warning(f"Error parseando fecha de finalización de traslado: {e}")
+        if solo_fecha.any():
+            parsed = self.fecha_finalizacion_parser.parse_strings(
+                pd.Series(fechas[solo_fecha]), column="fecha_finalizacion"
+            )
+            result[solo_fecha] = [
+                "" if pd.isna(fecha_dt) else fecha_dt.date().isoformat()
+                for fecha_dt in parsed
+            ]
 
-        return ""
+        return result
 
     def process_local_files(
         self, file_paths: Dict[str, str]
@@ -1250,8 +1514,9 @@ class ExcelProcessor:
         # Convertir paths a Path objects para compatibilidad
         path_objects = {name: Path(path) for name, path in file_paths.items()}
 
-        # Usar el método existente de carga
-        if not self.load_excel_files(path_objects):
+        # Usar el método existente de carga (de excel3 solo se usan cama y
+        # habitación, de excel4 el puntaje)
+        if not self.load_excel_files(path_objects, columns=LOCAL_FILES_COLUMNS):
             raise ValueError("Error al cargar archivos Excel")
 
         logger.info(
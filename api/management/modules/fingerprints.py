@@ -0,0 +1,215 @@
+"""
+Importación incremental: huella (hash) del payload mapeado de cada episodio
+para enviar a la base solo los episodios nuevos o que cambiaron
+"""
+
+import hashlib
+import json
+import logging
+from collections import defaultdict
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from api.models import Episodio, HuellaEpisodio
+
+logger = logging.getLogger(__name__)
+
+# Subirla cuando cambie el mapeo: invalida todas las huellas guardadas
+FINGERPRINT_VERSION = 1
+
+
+def _normalize(value):
+    """Valor equivalente serializable en JSON, estable entre ejecuciones"""
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if value is None or value is pd.NaT:
+        return None
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    if isinstance(value, np.generic):
+        return _normalize(value.item())
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def fingerprint(payload: Dict) -> str:
+    """SHA-256 del payload normalizado (independiente del orden de las claves)"""
+    contenido = json.dumps(
+        [FINGERPRINT_VERSION, _normalize(payload)],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(contenido.encode()).hexdigest()
+
+
+def _cmbd(registro: Dict):
+    """CMBD del registro como int (None si no tiene o no es numérico)"""
+    try:
+        return int(registro.get("episodio_cmbd"))
+    except (TypeError, ValueError):
+        return None
+
+
+class FingerprintFilter:
+    """
+    Compara la huella de cada episodio del payload mapeado con la guardada
+    en huellas_episodio y deja en el payload solo lo que cambió:
+
+        filtro = FingerprintFilter()
+        mapped_data = filtro.filter_changed(mapped_data)
+        results = DatabaseImporter(...).import_data(mapped_data)
+        if results["success"]:
+            filtro.save(results["succeeded_episodios"])
+
+    La huella de un episodio cubre su paciente, su cama, sus servicios y sus
+    gestiones, así que un cambio en cualquiera de ellos lo vuelve a enviar.
+    Pacientes, camas y gestiones que no cuelgan de ningún episodio del
+    archivo se envían siempre.
+    """
+
+    def __init__(self, chunk_size: int = 2000):
+        self.chunk_size = chunk_size
+        self.skipped = 0
+        self.sent = 0
+        # CMBD -> huella de los episodios enviados, para save()
+        self._pending: Dict[int, str] = {}
+
+    def filter_changed(self, mapped_data: Dict[str, List[Dict]]) -> Dict:
+        """Copia de mapped_data sin los episodios que no cambiaron"""
+        episodios = mapped_data.get("episodios", [])
+        pacientes = mapped_data.get("pacientes", [])
+        camas = mapped_data.get("camas", [])
+        gestiones = mapped_data.get("gestiones", [])
+
+        # Episodios (CMBD) de los que cuelga cada registro
+        cmbds_por_rut = defaultdict(set)
+        cmbds_por_cama = defaultdict(set)
+        for episodio in episodios:
+            cmbd = _cmbd(episodio)
+            if cmbd is not None:
+                cmbds_por_rut[episodio.get("rut_paciente")].add(cmbd)
+                cmbds_por_cama[episodio.get("codigo_cama")].add(cmbd)
+
+        def de_paciente(paciente):
+            cmbds = set(cmbds_por_rut.get(paciente.get("rut"), ()))
+            if _cmbd(paciente) is not None:
+                cmbds.add(_cmbd(paciente))
+            return cmbds
+
+        def de_cama(cama):
+            return cmbds_por_cama.get(cama.get("codigo_cama"), set())
+
+        def de_gestion(gestion):
+            return {_cmbd(gestion)} - {None}
+
+        payloads = defaultdict(
+            lambda: {"pacientes": [], "episodio": [], "camas": [], "gestiones": []}
+        )
+        for clave, registros, de in [
+            ("pacientes", pacientes, de_paciente),
+            ("camas", camas, de_cama),
+            ("gestiones", gestiones, de_gestion),
+            ("episodio", episodios, lambda e: {_cmbd(e)} - {None}),
+        ]:
+            for registro in registros:
+                normalizado = _normalize(registro)
+                for cmbd in de(registro):
+                    payloads[cmbd][clave].append(normalizado)
+
+        huellas = {}
+        for cmbd in {c for e in episodios for c in [_cmbd(e)] if c is not None}:
+            payload = payloads[cmbd]
+            # El orden de las filas en el Excel no cambia la huella
+            for registros in payload.values():
+                registros.sort(key=lambda r: json.dumps(r, sort_keys=True))
+            huellas[cmbd] = fingerprint(payload)
+
+        sin_cambios = self._unchanged(huellas)
+        self._pending = {
+            cmbd: huella for cmbd, huella in huellas.items() if cmbd not in sin_cambios
+        }
+
+        def enviar(cmbds):
+            # Se omite solo lo que cuelga únicamente de episodios sin cambios
+            return not cmbds or not cmbds <= sin_cambios
+
+        filtrado = dict(mapped_data)
+        for clave, de in [
+            ("pacientes", de_paciente),
+            ("camas", de_cama),
+            ("gestiones", de_gestion),
+            ("episodios", lambda e: {_cmbd(e)} - {None}),
+        ]:
+            if clave in mapped_data:
+                filtrado[clave] = [r for r in mapped_data[clave] if enviar(de(r))]
+
+        self.sent = len(filtrado.get("episodios", []))
+        self.skipped = len(episodios) - self.sent
+        logger.info(
+            f"Importación incremental: {self.sent} episodios nuevos o con cambios, "
+            f"{self.skipped} sin cambios omitidos"
+        )
+        return filtrado
+
+    def _unchanged(self, huellas: Dict[int, str]) -> set:
+        """CMBD con la misma huella guardada y cuyo episodio sigue en la base"""
+        iguales = set()
+        cmbds = list(huellas)
+        for inicio in range(0, len(cmbds), self.chunk_size):
+            chunk = cmbds[inicio : inicio + self.chunk_size]
+            guardadas = HuellaEpisodio.objects.filter(
+                episodio_cmbd__in=chunk
+            ).values_list("episodio_cmbd", "huella")
+            iguales.update(c for c, huella in guardadas if huellas[c] == huella)
+        if not iguales:
+            return iguales
+        # Un episodio borrado en la app se vuelve a importar aunque no cambie
+        existentes = set()
+        iguales = list(iguales)
+        for inicio in range(0, len(iguales), self.chunk_size):
+            existentes.update(
+                Episodio.objects.filter(
+                    episodio_cmbd__in=iguales[inicio : inicio + self.chunk_size]
+                ).values_list("episodio_cmbd", flat=True)
+            )
+        return existentes
+
+    def save(self, succeeded: Iterable) -> int:
+        """
+        Guarda las huellas de los episodios enviados que el importador
+        reporta como importados sin errores (succeeded_episodios). Los demás
+        quedan sin huella y se vuelven a enviar en la próxima importación,
+        aunque el episodio ya exista en la base
+        """
+        importados = {
+            cmbd
+            for cmbd in (_cmbd({"episodio_cmbd": c}) for c in succeeded)
+            if cmbd in self._pending
+        }
+        HuellaEpisodio.objects.bulk_create(
+            [
+                HuellaEpisodio(episodio_cmbd=cmbd, huella=self._pending[cmbd])
+                for cmbd in importados
+            ],
+            batch_size=self.chunk_size,
+            update_conflicts=True,
+            unique_fields=["episodio_cmbd"],
+            update_fields=["huella", "actualizado_en"],
+        )
+        self._pending = {}
+        return len(importados)
+
+    def summary(self) -> Dict:
+        return {"sent": self.sent, "skipped": self.skipped}
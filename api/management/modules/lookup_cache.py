@@ -0,0 +1,126 @@
+"""
+Caché de búsquedas para resolver claves foráneas durante una importación
+"""
+
+import logging
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from django.contrib.auth import get_user_model
+
+from api.models import Cama, Episodio, Servicio
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+
+class ImportLookupCache:
+    """
+    Resuelve servicios, usuarios, camas y episodios sin ir a la base de datos
+    por cada fila.
+
+    Las tablas de referencia (servicios, usuarios, camas) se precargan con una
+    sola consulta la primera vez que se necesitan. Los episodios se guardan a
+    medida que se buscan o se crean. La caché vive lo que dura una importación.
+    """
+
+    def __init__(self):
+        self._servicios: Optional[Dict[str, Servicio]] = None
+        self._usuarios: Optional[Dict[str, object]] = None
+        self._camas: Optional[Dict[str, List[Cama]]] = None
+        self._episodios: Dict[int, Episodio] = {}
+        self.stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+    def _count(self, name: str, hit: bool) -> None:
+        self.stats[name]["hits" if hit else "misses"] += 1
+
+    # ------------------------------------------------------------------
+    # Servicios
+    # ------------------------------------------------------------------
+
+    def servicio(self, codigo: str) -> Optional[Servicio]:
+        """Servicio por código, o None si no existe"""
+        if self._servicios is None:
+            self._servicios = {}
+            for servicio in Servicio.objects.all():
+                self._servicios.setdefault(servicio.codigo, servicio)
+            logger.debug(f"Caché: {len(self._servicios)} servicios precargados")
+
+        servicio = self._servicios.get(codigo)
+        self._count("servicios", servicio is not None)
+        return servicio
+
+    # ------------------------------------------------------------------
+    # Usuarios
+    # ------------------------------------------------------------------
+
+    def usuario(self, email: str):
+        """Usuario por email, o None si no existe"""
+        if self._usuarios is None:
+            self._usuarios = {u.email: u for u in User.objects.exclude(email="")}
+            logger.debug(f"Caché: {len(self._usuarios)} usuarios precargados")
+
+        usuario = self._usuarios.get(email)
+        self._count("usuarios", usuario is not None)
+        return usuario
+
+    # ------------------------------------------------------------------
+    # Camas
+    # ------------------------------------------------------------------
+
+    def _load_camas(self) -> Dict[str, List[Cama]]:
+        if self._camas is None:
+            self._camas = defaultdict(list)
+            for cama in Cama.objects.order_by("codigo_cama", "pk"):
+                self._camas[cama.codigo_cama].append(cama)
+            logger.debug(f"Caché: {len(self._camas)} códigos de cama precargados")
+        return self._camas
+
+    def camas(self, codigo_cama: str, habitacion: Optional[str] = None) -> List[Cama]:
+        """
+        Camas con ese código (y habitación, si se indica), en el mismo orden
+        que usaría la base de datos
+        """
+        camas = self._load_camas().get(codigo_cama, [])
+        if habitacion:
+            camas = [c for c in camas if c.habitacion == habitacion]
+        self._count("camas", bool(camas))
+        return camas
+
+    def add_cama(self, cama: Cama) -> None:
+        """Registra una cama creada o modificada durante la importación"""
+        if self._camas is None:
+            # Aún no se precarga: la consulta inicial ya la incluirá
+            return
+        camas = [c for c in self._camas[cama.codigo_cama] if c.pk != cama.pk]
+        camas.append(cama)
+        camas.sort(key=lambda c: str(c.pk))
+        self._camas[cama.codigo_cama] = camas
+
+    # ------------------------------------------------------------------
+    # Episodios
+    # ------------------------------------------------------------------
+
+    def episodio(self, episodio_cmbd: int) -> Episodio:
+        """
+        Episodio por número CMBD
+
+        Raises:
+            Episodio.DoesNotExist / MultipleObjectsReturned, igual que .get()
+        """
+        episodio = self._episodios.get(episodio_cmbd)
+        self._count("episodios", episodio is not None)
+        if episodio is None:
+            episodio = Episodio.objects.select_related("paciente").get(
+                episodio_cmbd=episodio_cmbd
+            )
+            self._episodios[episodio_cmbd] = episodio
+        return episodio
+
+    def add_episodio(self, episodio: Episodio) -> None:
+        """Registra un episodio creado o modificado durante la importación"""
+        self._episodios[episodio.episodio_cmbd] = episodio
+
+    def summary(self) -> Dict[str, Dict[str, int]]:
+        """Aciertos y fallos por tabla"""
+        return {name: dict(counts) for name, counts in self.stats.items()}
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0013_episodio_ignorar"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="episodio",
+            index=models.Index(
+                condition=models.Q(("fecha_egreso__isnull", True)),
+                fields=["fecha_ingreso"],
+                name="episodios_activos_idx",
+            ),
+        ),
+    ]
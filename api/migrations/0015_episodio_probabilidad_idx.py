@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0014_episodio_activos_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="episodio",
+            index=models.Index(
+                fields=["probabilidad_extension"], name="episodios_probabilidad_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0015_episodio_probabilidad_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="episodio",
+            index=models.Index(
+                fields=["fecha_ingreso"], name="episodios_fecha_ingreso_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:50
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def verificar_cmbd_unicos(apps, schema_editor):
+    """Falla con un mensaje claro si hay episodios con el mismo CMBD"""
+    Episodio = apps.get_model("api", "Episodio")
+    duplicados = list(
+        Episodio.objects.values("episodio_cmbd")
+        .annotate(cantidad=Count("id"))
+        .filter(cantidad__gt=1)
+        .values_list("episodio_cmbd", flat=True)[:20]
+    )
+    if duplicados:
+        raise RuntimeError(
+            "Hay episodios con episodio_cmbd repetido; resolverlos antes de "
+            f"migrar. Ejemplos: {duplicados}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0016_episodio_fecha_ingreso_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="gestion",
+            index=models.Index(
+                fields=["estado_gestion", "fecha_inicio"],
+                name="gestiones_estado_fecha_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="gestion",
+            index=models.Index(
+                fields=["fecha_inicio"], name="gestiones_fecha_inicio_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="paciente",
+            index=models.Index(fields=["nombre"], name="pacientes_nombre_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="paciente",
+            index=models.Index(
+                condition=models.Q(("score_social__isnull", False)),
+                fields=["score_social"],
+                name="pacientes_score_social_idx",
+            ),
+        ),
+        migrations.RunPython(verificar_cmbd_unicos, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="episodio",
+            constraint=models.UniqueConstraint(
+                fields=("episodio_cmbd",), name="episodios_episodio_cmbd_uniq"
+            ),
+        ),
+    ]
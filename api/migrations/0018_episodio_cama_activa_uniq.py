@@ -0,0 +1,43 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:59
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def verificar_camas_activas(apps, schema_editor):
+    """Falla con un mensaje claro si una cama tiene varios episodios activos"""
+    Episodio = apps.get_model("api", "Episodio")
+    duplicadas = list(
+        Episodio.objects.filter(cama__isnull=False, fecha_egreso__isnull=True)
+        .values("cama__codigo_cama")
+        .annotate(cantidad=Count("id"))
+        .filter(cantidad__gt=1)
+        .values_list("cama__codigo_cama", flat=True)[:20]
+    )
+    if duplicadas:
+        raise RuntimeError(
+            "Hay camas con más de un episodio activo; resolverlas antes de "
+            f"migrar. Ejemplos: {duplicadas}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0017_indices_consultas"),
+    ]
+
+    operations = [
+        migrations.RunPython(verificar_camas_activas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="episodio",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("fecha_egreso__isnull", True)),
+                fields=("cama",),
+                name="episodios_cama_activa_uniq",
+                violation_error_message=(
+                    "La cama ya está asignada a otro episodio activo."
+                ),
+            ),
+        ),
+    ]
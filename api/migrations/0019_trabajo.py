@@ -0,0 +1,110 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:02
+
+import uuid
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0018_episodio_cama_activa_uniq"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Trabajo",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "tipo",
+                    models.CharField(
+                        choices=[
+                            ("procesar_archivo", "Procesar archivo cargado"),
+                            (
+                                "importar_excel",
+                                "Importar los 4 Excel y calcular scores",
+                            ),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("payload", models.JSONField(blank=True, default=dict)),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("PENDIENTE", "Pendiente"),
+                            ("PROCESANDO", "Procesando"),
+                            ("COMPLETADO", "Completado"),
+                            ("ERROR", "Error"),
+                        ],
+                        default="PENDIENTE",
+                        max_length=20,
+                    ),
+                ),
+                ("intentos", models.IntegerField(default=0)),
+                ("max_intentos", models.IntegerField(default=3)),
+                (
+                    "disponible_desde",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("worker", models.CharField(blank=True, default="", max_length=100)),
+                ("latido", models.DateTimeField(blank=True, null=True)),
+                ("resultado", models.JSONField(blank=True, default=dict)),
+                ("error", models.TextField(blank=True, default="")),
+                ("creado_en", models.DateTimeField(auto_now_add=True)),
+                ("iniciado_en", models.DateTimeField(blank=True, null=True)),
+                ("terminado_en", models.DateTimeField(blank=True, null=True)),
+                (
+                    "archivo",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="trabajos",
+                        to="api.archivocarga",
+                    ),
+                ),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="trabajos",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Trabajo",
+                "verbose_name_plural": "Trabajos",
+                "db_table": "trabajos",
+                "ordering": ["creado_en"],
+                "indexes": [
+                    models.Index(
+                        condition=models.Q(("estado", "PENDIENTE")),
+                        fields=["disponible_desde"],
+                        name="trabajos_pendientes_idx",
+                    ),
+                    models.Index(
+                        condition=models.Q(("estado", "PROCESANDO")),
+                        fields=["latido"],
+                        name="trabajos_procesando_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
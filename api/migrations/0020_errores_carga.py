@@ -0,0 +1,94 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:08
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.utils.dateparse import parse_datetime
+
+# ArchivoCarga.ERRORES_RESUMEN_MAX
+ERRORES_RESUMEN_MAX = 50
+
+
+def mover_errores_a_tabla(apps, schema_editor):
+    """Copia los errores del JSON a errores_carga y deja solo el resumen"""
+    ArchivoCarga = apps.get_model("api", "ArchivoCarga")
+    ErrorCarga = apps.get_model("api", "ErrorCarga")
+    for archivo in ArchivoCarga.objects.exclude(errores=[]).iterator():
+        registros = []
+        for error in archivo.errores or []:
+            registro = ErrorCarga(
+                archivo_id=archivo.pk,
+                fila=error.get("fila") or 0,
+                error=str(error.get("error", "")),
+                detalle=error.get("detalle"),
+            )
+            creado_en = parse_datetime(error.get("timestamp") or "")
+            if creado_en:
+                registro.creado_en = creado_en
+            registros.append(registro)
+        ErrorCarga.objects.bulk_create(registros, batch_size=1000)
+        if len(archivo.errores) > ERRORES_RESUMEN_MAX:
+            archivo.errores = archivo.errores[:ERRORES_RESUMEN_MAX]
+            archivo.save(update_fields=["errores"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0019_trabajo"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="archivocarga",
+            name="errores",
+            field=models.JSONField(
+                blank=True,
+                default=list,
+                help_text="Resumen: primeros errores encontrados (todos en errores_detalle)",
+            ),
+        ),
+        migrations.CreateModel(
+            name="ErrorCarga",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "fila",
+                    models.IntegerField(
+                        help_text="Fila del Excel (1 es el encabezado)"
+                    ),
+                ),
+                ("error", models.TextField()),
+                ("detalle", models.JSONField(blank=True, null=True)),
+                ("creado_en", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "archivo",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="errores_detalle",
+                        to="api.archivocarga",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Error de Carga",
+                "verbose_name_plural": "Errores de Carga",
+                "db_table": "errores_carga",
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(
+                        fields=["archivo", "id"], name="errores_carga_archivo_idx"
+                    )
+                ],
+            },
+        ),
+        migrations.RunPython(mover_errores_a_tabla, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0020_errores_carga"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivocarga",
+            name="etapa",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("LECTURA", "Leyendo archivo"),
+                    ("VALIDACION", "Validando estructura"),
+                    ("FILAS", "Procesando filas"),
+                    ("FINALIZADO", "Finalizado"),
+                ],
+                default="",
+                help_text="Etapa actual del procesamiento",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0021_archivocarga_etapa"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="HuellaEpisodio",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("episodio_cmbd", models.IntegerField(unique=True)),
+                (
+                    "huella",
+                    models.CharField(help_text="SHA-256 del payload", max_length=64),
+                ),
+                ("actualizado_en", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Huella de Episodio",
+                "verbose_name_plural": "Huellas de Episodio",
+                "db_table": "huellas_episodio",
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0022_huellas_episodio"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="archivocarga",
+            name="sha256",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="SHA-256 del contenido (cargas repetidas, ver api.services.cargas)",
+                max_length=64,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="archivocarga",
+            index=models.Index(
+                condition=models.Q(("sha256", ""), _negated=True),
+                fields=["sha256"],
+                name="archivos_carga_sha256_idx",
+            ),
+        ),
+    ]
@@ -2,10 +2,13 @@ from .archivo_carga import ArchivoCarga
 from .cama import Cama
 from .episodio import Episodio
 from .episodioServicio import EpisodioServicio
+from .error_carga import ErrorCarga
 from .gestion import Gestion
+from .huella_episodio import HuellaEpisodio
 from .nota import Nota
 from .paciente import Paciente
 from .servicio import Servicio
+from .trabajo import Trabajo
 from .usuario import User
 
 __all__ = [
@@ -18,4 +21,7 @@ __all__ = [
     "Cama",
     "Servicio",
     "EpisodioServicio",
+    "Trabajo",
+    "ErrorCarga",
+    "HuellaEpisodio",
 ]
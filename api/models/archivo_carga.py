@@ -2,7 +2,8 @@ import uuid
 
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.utils import timezone
+
+from .error_carga import ErrorCarga
 
 
 class ArchivoCarga(models.Model):
@@ -18,6 +19,13 @@ class ArchivoCarga(models.Model):
         ("PARCIAL", "Procesamiento Parcial"),
     ]
 
+    ETAPA_CHOICES = [
+        ("LECTURA", "Leyendo archivo"),
+        ("VALIDACION", "Validando estructura"),
+        ("FILAS", "Procesando filas"),
+        ("FINALIZADO", "Finalizado"),
+    ]
+
     TIPO_CHOICES = [
         ("users", "Usuarios"),
         ("pacientes", "Pacientes"),
@@ -31,10 +39,23 @@ class ArchivoCarga(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     nombre = models.CharField(max_length=255, help_text="Nombre original del archivo")
     archivo = models.FileField(upload_to="uploads/excel/")
+    sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        default="",
+        help_text="SHA-256 del contenido (cargas repetidas, ver api.services.cargas)",
+    )
     tipo = models.CharField(
         max_length=20, choices=TIPO_CHOICES, help_text="Tipo de datos en el archivo"
     )
     estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default="SUBIDO")
+    etapa = models.CharField(
+        max_length=20,
+        choices=ETAPA_CHOICES,
+        blank=True,
+        default="",
+        help_text="Etapa actual del procesamiento",
+    )
 
     # Timestamps
     fecha_carga = models.DateTimeField(auto_now_add=True)
@@ -57,7 +78,9 @@ class ArchivoCarga(models.Model):
         default=dict, blank=True, help_text="Log detallado del procesamiento"
     )
     errores = models.JSONField(
-        default=list, blank=True, help_text="Lista de errores encontrados"
+        default=list,
+        blank=True,
+        help_text="Resumen: primeros errores encontrados (todos en errores_detalle)",
     )
 
     # Usuario que subió el archivo
@@ -69,10 +92,20 @@ class ArchivoCarga(models.Model):
         related_name="archivos_subidos",
     )
 
+    # Errores que se copian al resumen JSON `errores`
+    ERRORES_RESUMEN_MAX = 50
+
     class Meta:
         verbose_name = "Archivo de Carga"
         verbose_name_plural = "Archivos de Carga"
         ordering = ["-fecha_carga"]
+        indexes = [
+            models.Index(
+                fields=["sha256"],
+                condition=~models.Q(sha256=""),
+                name="archivos_carga_sha256_idx",
+            ),
+        ]
 
     def clean(self):
         """Validaciones del modelo"""
@@ -94,18 +127,48 @@ class ArchivoCarga(models.Model):
         """Indica si hubo errores durante el procesamiento"""
         return self.filas_errores > 0 or len(self.errores) > 0
 
+    def _guardar(self, campos, errores=(), filas=None, inmediato=False):
+        """
+        Escribe los cambios, o los deja al ReporteProgreso activo (ver
+        api.services.progreso_carga) que los agrupa por tiempo o filas
+        """
+        reporte = getattr(self, "_reporte", None)
+        if reporte is not None:
+            reporte.registrar(
+                campos=campos, errores=errores, filas=filas, inmediato=inmediato
+            )
+            return
+        for registro in errores:
+            registro.save()
+        if campos:
+            self.save(update_fields=campos)
+
     def agregar_error(self, fila, error, detalle=None):
         """Método para agregar errores durante el procesamiento"""
-        error_info = {
-            "fila": fila,
-            "error": str(error),
-            "timestamp": timezone.now().isoformat(),
-        }
-        if detalle:
-            error_info["detalle"] = detalle
+        registro = ErrorCarga(
+            archivo=self, fila=fila, error=str(error), detalle=detalle
+        )
 
-        self.errores.append(error_info)
-        self.save(update_fields=["errores"])
+        # El JSON solo guarda los primeros: reescribirlo con cada error hace
+        # que las escrituras crezcan con el cuadrado de los errores
+        campos = []
+        if len(self.errores) < self.ERRORES_RESUMEN_MAX:
+            error_info = {
+                "fila": fila,
+                "error": registro.error,
+                "timestamp": registro.creado_en.isoformat(),
+            }
+            if detalle:
+                error_info["detalle"] = detalle
+            self.errores.append(error_info)
+            campos.append("errores")
+
+        self._guardar(campos, errores=[registro])
+
+    def cambiar_etapa(self, etapa):
+        """Guarda la etapa junto con lo pendiente, sin esperar al lote"""
+        self.etapa = etapa
+        self._guardar(["etapa"], inmediato=True)
 
     def actualizar_progreso(self, filas_procesadas, filas_errores=0):
         """Actualiza el progreso del procesamiento"""
@@ -127,11 +190,12 @@ class ArchivoCarga(models.Model):
                 # Si algunas filas se procesaron y otras tuvieron errores
                 self.estado = "PARCIAL"
 
-        self.save(
-            update_fields=[
+        self._guardar(
+            [
                 "filas_procesadas",
                 "filas_exitosas",
                 "filas_errores",
                 "estado",
-            ]
+            ],
+            filas=filas_intentadas,
         )
@@ -3,9 +3,236 @@ Modelos para la aplicación API
 """
 
 import uuid
+from datetime import datetime, time, timedelta
+from datetime import timezone as dt_timezone
 
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import (
+    BooleanField,
+    Case,
+    CharField,
+    Count,
+    DateField,
+    ExpressionWrapper,
+    F,
+    FloatField,
+    Func,
+    IntegerField,
+    Q,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+# Un episodio activo está en extensión crítica si supera la norma GRD en 4/3
+FACTOR_EXTENSION_CRITICA = 4 / 3
+
+# Semáforo de riesgo según probabilidad_extension (gray: ya superó la norma
+# o no tiene probabilidad)
+UMBRAL_RIESGO_ALTO = 0.45
+UMBRAL_RIESGO_MEDIO = 0.3
+SEMAFORO_COLORES = ["gray", "red", "yellow", "green"]
+
+# Alertas de episodios activos, en el orden en que se informan
+SCORE_SOCIAL_ALTO = 10
+ALERTAS = ["score_social_alto", "extension_critica", "prediccion_estadia_larga"]
+
+
+class DiasEntre(Func):
+    """Días calendario entre dos fechas (fin - inicio), como entero"""
+
+    arg_joiner = " - "
+    template = "(%(expressions)s)"
+    output_field = IntegerField()
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        fin, inicio = (compiler.compile(e) for e in self.get_source_expressions())
+        sql = f"CAST(julianday({fin[0]}) - julianday({inicio[0]}) AS integer)"
+        return sql, (*fin[1], *inicio[1])
+
+
+class FechaUTC(TruncDate):
+    """
+    Fecha (UTC) de un DateTimeField. En SQLite usa date() nativo en lugar de
+    la función Python de Django: los datetimes ya se guardan en UTC
+    """
+
+    def __init__(self, expression, **extra):
+        super().__init__(expression, tzinfo=dt_timezone.utc, **extra)
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        sql, params = compiler.compile(self.lhs)
+        return f"date({sql})", params
+
+
+class EpisodioQuerySet(models.QuerySet):
+    def con_dias_estadia(self, hoy=None):
+        """
+        Anota dias_estadia: días calendario (UTC) desde el ingreso hasta el
+        egreso, o hasta `hoy` si el episodio sigue activo
+        """
+        hoy = hoy or timezone.now().date()
+        fin = Coalesce(
+            FechaUTC("fecha_egreso"),
+            Value(hoy, output_field=DateField()),
+        )
+        inicio = FechaUTC("fecha_ingreso")
+        return self.annotate(dias_estadia=DiasEntre(fin, inicio))
+
+    @staticmethod
+    def supera_norma_q() -> Q:
+        """
+        Condición sobre un queryset anotado con con_dias_estadia(): con norma
+        GRD y estadía > norma * 4/3 (activo o no)
+        """
+        return (
+            Q(estancia_norma_grd__isnull=False)
+            & ~Q(estancia_norma_grd=0)
+            & Q(dias_estadia__gt=F("estancia_norma_grd") * FACTOR_EXTENSION_CRITICA)
+        )
+
+    @classmethod
+    def extension_critica_q(cls) -> Q:
+        """Extensión crítica: episodio activo que supera la norma en 4/3"""
+        return Q(fecha_egreso__isnull=True) & cls.supera_norma_q()
+
+    @staticmethod
+    def sin_extension_critica_q() -> Q:
+        """
+        Negación explícita de extension_critica_q() para episodios activos:
+        sin norma GRD, o con estadía <= norma * 4/3
+        """
+        return (
+            Q(estancia_norma_grd__isnull=True)
+            | Q(estancia_norma_grd=0)
+            | Q(dias_estadia__lte=F("estancia_norma_grd") * FACTOR_EXTENSION_CRITICA)
+        )
+
+    @classmethod
+    def semaforo_q(cls, color: str) -> Q:
+        """Condición del color de semáforo `color` (ver SEMAFORO_COLORES)"""
+        proba = "probabilidad_extension"
+        if color == "gray":
+            return cls.supera_norma_q() | Q(**{f"{proba}__isnull": True})
+
+        rangos = {
+            "red": Q(**{f"{proba}__gte": UMBRAL_RIESGO_ALTO}),
+            "yellow": Q(
+                **{
+                    f"{proba}__gte": UMBRAL_RIESGO_MEDIO,
+                    f"{proba}__lt": UMBRAL_RIESGO_ALTO,
+                }
+            ),
+            "green": Q(**{f"{proba}__lt": UMBRAL_RIESGO_MEDIO}),
+        }
+        return (
+            cls.sin_extension_critica_q()
+            & Q(**{f"{proba}__isnull": False})
+            & rangos[color]
+        )
+
+    @classmethod
+    def alerta_q(cls, alerta: str) -> Q:
+        """Condición de la alerta `alerta` (ver ALERTAS)"""
+        activo = Q(fecha_egreso__isnull=True)
+        condiciones = {
+            "score_social_alto": Q(paciente__score_social__gte=SCORE_SOCIAL_ALTO),
+            "extension_critica": cls.supera_norma_q(),
+            "prediccion_estadia_larga": Q(prediccion_extension=1)
+            & cls.sin_extension_critica_q(),
+        }
+        return activo & condiciones[alerta]
+
+    def con_clasificacion(self, hoy=None):
+        """
+        Anota dias_estadia, semaforo (color) y una columna booleana
+        alerta_<nombre> por cada alerta, calculados en SQL
+        """
+        colores = [
+            When(self.semaforo_q(color), then=Value(color))
+            for color in SEMAFORO_COLORES[:-1]
+        ]
+        alertas = {
+            f"alerta_{alerta}": Case(
+                When(self.alerta_q(alerta), then=Value(True)),
+                default=Value(False),
+                output_field=BooleanField(),
+            )
+            for alerta in ALERTAS
+        }
+        return self.con_dias_estadia(hoy).annotate(
+            semaforo=Case(
+                *colores,
+                default=Value(SEMAFORO_COLORES[-1]),
+                output_field=CharField(),
+            ),
+            **alertas,
+        )
+
+    def censo_activo(self, hoy=None):
+        """
+        Episodios activos anotados con dias_estadia y dias_sobre_norma
+        (dias_estadia - estancia_norma_grd, NULL si no hay norma)
+        """
+        return (
+            self.filter(fecha_egreso__isnull=True)
+            .con_dias_estadia(hoy)
+            .annotate(
+                dias_sobre_norma=ExpressionWrapper(
+                    F("dias_estadia") - F("estancia_norma_grd"),
+                    output_field=FloatField(),
+                )
+            )
+        )
+
+    def extensiones_criticas(self, hoy=None):
+        """Episodios activos en extensión crítica"""
+        return self.censo_activo(hoy).filter(self.extension_critica_q())
+
+    def alertas_prediccion(self, hoy=None):
+        """Episodios activos con predicción de extensión que aún no son críticos"""
+        return (
+            self.censo_activo(hoy)
+            .filter(prediccion_extension=1)
+            .filter(self.sin_extension_critica_q())
+        )
+
+    def estadisticas(self, hoy=None) -> dict:
+        """
+        Totales de episodios en una sola consulta agregada: total, activos,
+        suma de días de estadía, extensiones críticas y altas de hoy
+        """
+        hoy = hoy or timezone.now().date()
+        # Rango del día local en vez de fecha_egreso__date (evita convertir
+        # la zona horaria fila a fila)
+        inicio_dia = timezone.make_aware(datetime.combine(hoy, time.min))
+        fin_dia = timezone.make_aware(
+            datetime.combine(hoy + timedelta(days=1), time.min)
+        )
+        return self.con_dias_estadia(hoy).aggregate(
+            total=Count("id"),
+            activos=Count("id", filter=Q(fecha_egreso__isnull=True)),
+            dias=Sum("dias_estadia"),
+            criticas=Count("id", filter=self.extension_critica_q()),
+            altas_hoy=Count(
+                "id",
+                filter=Q(fecha_egreso__gte=inicio_dia, fecha_egreso__lt=fin_dia),
+            ),
+        )
+
+
+def es_conflicto_cama(error: IntegrityError) -> bool:
+    """
+    Si el IntegrityError viene de episodios_cama_activa_uniq. SQLite no
+    informa el nombre de la restricción, solo la columna
+    """
+    mensaje = str(error)
+    if "episodios_cama_activa_uniq" in mensaje:
+        return True
+    return connection.vendor == "sqlite" and "episodios.cama_id" in mensaje
 
 
 class Episodio(models.Model):
@@ -50,6 +277,8 @@ class Episodio(models.Model):
     )
     ignorar = models.BooleanField(default=False)
 
+    objects = EpisodioQuerySet.as_manager()
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -57,6 +286,38 @@ class Episodio(models.Model):
     class Meta:
         db_table = "episodios"
         ordering = ["fecha_ingreso"]
+        constraints = [
+            # Búsqueda por número CMBD (importador, scoring); es la clave natural
+            models.UniqueConstraint(
+                fields=["episodio_cmbd"], name="episodios_episodio_cmbd_uniq"
+            ),
+            # Una cama no puede tener dos episodios activos; al ser de la base
+            # de datos también cubre bulk_create/bulk_update y escrituras
+            # concurrentes
+            models.UniqueConstraint(
+                fields=["cama"],
+                condition=Q(fecha_egreso__isnull=True),
+                name="episodios_cama_activa_uniq",
+                violation_error_message=(
+                    "La cama ya está asignada a otro episodio activo."
+                ),
+            ),
+        ]
+        indexes = [
+            # Censo de activos (extensiones críticas, alertas, estadísticas)
+            models.Index(
+                fields=["fecha_ingreso"],
+                condition=Q(fecha_egreso__isnull=True),
+                name="episodios_activos_idx",
+            ),
+            # Rangos de fecha de ingreso (tendencia mensual)
+            models.Index(fields=["fecha_ingreso"], name="episodios_fecha_ingreso_idx"),
+            # Filtro por semáforo (rangos de probabilidad)
+            models.Index(
+                fields=["probabilidad_extension"],
+                name="episodios_probabilidad_idx",
+            ),
+        ]
         verbose_name = "Episodio"
         verbose_name_plural = "Episodios"
 
@@ -64,20 +325,22 @@ class Episodio(models.Model):
         return f"Episodio {self.id} - Paciente: {self.paciente.nombre}"
 
     def save(self, *args, **kwargs):
-        # Validar que la cama no esté asignada a otro episodio activo (solo si hay cama)
-        if self.cama and not self.fecha_egreso:
-            conflicto = (
-                Episodio.objects.filter(cama=self.cama, fecha_egreso__isnull=True)
-                .exclude(id=self.id)
-                .exists()
-            )
-            if conflicto:
-                raise ValidationError(
-                    f"La cama {self.cama.codigo_cama} ya está asignada a otro episodio activo."
-                )
+        if not self.cama_id or self.fecha_egreso:
+            super().save(*args, **kwargs)
+            return
 
-        # Siempre llamar a super().save() para guardar el objeto
-        super().save(*args, **kwargs)
+        # La restricción episodios_cama_activa_uniq valida que la cama no esté
+        # asignada a otro episodio activo; el savepoint deja usable la
+        # transacción del llamador si se viola
+        try:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+        except IntegrityError as e:
+            if not es_conflicto_cama(e):
+                raise
+            raise ValidationError(
+                f"La cama {self.cama.codigo_cama} ya está asignada a otro episodio activo."
+            ) from e
 
     @property
     def estancia_dias(self):
@@ -89,3 +352,41 @@ class Episodio(models.Model):
 
             today = date.today()
             return (today - self.fecha_ingreso.date()).days
+
+    def clasificacion_riesgo(self, hoy=None) -> tuple:
+        """
+        (semaforo, alertas) calculados en Python con las mismas reglas que
+        EpisodioQuerySet.con_clasificacion(), para instancias sin anotar
+        """
+        hoy = hoy or timezone.now().date()
+        inicio = self.fecha_ingreso.astimezone(dt_timezone.utc).date()
+        fin = (
+            self.fecha_egreso.astimezone(dt_timezone.utc).date()
+            if self.fecha_egreso
+            else hoy
+        )
+        norma = self.estancia_norma_grd
+        supera_norma = bool(norma) and (fin - inicio).days > norma * (
+            FACTOR_EXTENSION_CRITICA
+        )
+
+        proba = self.probabilidad_extension
+        if supera_norma or proba is None:
+            semaforo = "gray"
+        elif proba >= UMBRAL_RIESGO_ALTO:
+            semaforo = "red"
+        elif proba >= UMBRAL_RIESGO_MEDIO:
+            semaforo = "yellow"
+        else:
+            semaforo = "green"
+
+        alertas = []
+        if not self.fecha_egreso:
+            score_social = self.paciente.score_social if self.paciente_id else None
+            if score_social is not None and score_social >= SCORE_SOCIAL_ALTO:
+                alertas.append("score_social_alto")
+            if supera_norma:
+                alertas.append("extension_critica")
+            elif self.prediccion_extension == 1:
+                alertas.append("prediccion_estadia_larga")
+        return semaforo, alertas
@@ -0,0 +1,32 @@
+from django.db import models
+from django.utils import timezone
+
+
+class ErrorCarga(models.Model):
+    """
+    Error de una fila durante el procesamiento de un ArchivoCarga. Tabla de
+    solo inserción: el JSON ArchivoCarga.errores guarda solo los primeros
+    como resumen
+    """
+
+    archivo = models.ForeignKey(
+        "ArchivoCarga", on_delete=models.CASCADE, related_name="errores_detalle"
+    )
+    fila = models.IntegerField(help_text="Fila del Excel (1 es el encabezado)")
+    error = models.TextField()
+    detalle = models.JSONField(null=True, blank=True)
+    # Momento del error, no de la escritura (los errores se guardan en lotes)
+    creado_en = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = "errores_carga"
+        ordering = ["id"]
+        indexes = [
+            # Lectura paginada de los errores de un archivo
+            models.Index(fields=["archivo", "id"], name="errores_carga_archivo_idx"),
+        ]
+        verbose_name = "Error de Carga"
+        verbose_name_plural = "Errores de Carga"
+
+    def __str__(self):
+        return f"Fila {self.fila}: {self.error}"
@@ -159,6 +159,15 @@ class Gestion(models.Model):
     class Meta:
         db_table = "gestiones"
         ordering = ["fecha_inicio"]
+        indexes = [
+            # Listados por estado (pendientes, tareas) ordenados por fecha
+            models.Index(
+                fields=["estado_gestion", "fecha_inicio"],
+                name="gestiones_estado_fecha_idx",
+            ),
+            # Listado general ordenado por fecha de inicio
+            models.Index(fields=["fecha_inicio"], name="gestiones_fecha_inicio_idx"),
+        ]
         verbose_name = "Gestion"
         verbose_name_plural = "Gestiones"
 
@@ -0,0 +1,22 @@
+from django.db import models
+
+
+class HuellaEpisodio(models.Model):
+    """
+    Hash del payload mapeado de un episodio (paciente, episodio, cama,
+    servicios y gestiones) en la última importación de los Excel que lo
+    guardó. La importación incremental omite los episodios cuyo hash no
+    cambió (ver api.management.modules.fingerprints)
+    """
+
+    episodio_cmbd = models.IntegerField(unique=True)
+    huella = models.CharField(max_length=64, help_text="SHA-256 del payload")
+    actualizado_en = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "huellas_episodio"
+        verbose_name = "Huella de Episodio"
+        verbose_name_plural = "Huellas de Episodio"
+
+    def __str__(self):
+        return f"Episodio {self.episodio_cmbd}: {self.huella[:12]}"
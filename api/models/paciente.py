@@ -65,6 +65,16 @@ class Paciente(models.Model):
     class Meta:
         db_table = "pacientes"
         ordering = ["nombre"]
+        indexes = [
+            # Listado ordenado por nombre (orden por defecto)
+            models.Index(fields=["nombre"], name="pacientes_nombre_idx"),
+            # Top de score social (se recorre en orden descendente)
+            models.Index(
+                fields=["score_social"],
+                condition=models.Q(score_social__isnull=False),
+                name="pacientes_score_social_idx",
+            ),
+        ]
         verbose_name = "Paciente"
         verbose_name_plural = "Pacientes"
 
@@ -0,0 +1,84 @@
+import uuid
+
+from django.db import models
+from django.utils import timezone
+
+
+class Trabajo(models.Model):
+    """
+    Trabajo en segundo plano (procesamiento de Excel) encolado en la base de
+    datos y ejecutado por `manage.py run_workers`
+    """
+
+    ESTADO_CHOICES = [
+        ("PENDIENTE", "Pendiente"),
+        ("PROCESANDO", "Procesando"),
+        ("COMPLETADO", "Completado"),
+        ("ERROR", "Error"),
+    ]
+
+    TIPO_CHOICES = [
+        ("procesar_archivo", "Procesar archivo cargado"),
+        ("importar_excel", "Importar los 4 Excel y calcular scores"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    tipo = models.CharField(max_length=30, choices=TIPO_CHOICES)
+    payload = models.JSONField(default=dict, blank=True)
+    estado = models.CharField(
+        max_length=20, choices=ESTADO_CHOICES, default="PENDIENTE"
+    )
+    archivo = models.ForeignKey(
+        "ArchivoCarga",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="trabajos",
+    )
+    usuario = models.ForeignKey(
+        "User",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="trabajos",
+    )
+
+    # Reintentos: un intento fallido vuelve a PENDIENTE desde disponible_desde
+    intentos = models.IntegerField(default=0)
+    max_intentos = models.IntegerField(default=3)
+    disponible_desde = models.DateTimeField(default=timezone.now)
+
+    # Worker que lo ejecuta y último latido (para recuperar trabajos atascados)
+    worker = models.CharField(max_length=100, blank=True, default="")
+    latido = models.DateTimeField(null=True, blank=True)
+
+    resultado = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True, default="")
+
+    # Timestamps
+    creado_en = models.DateTimeField(auto_now_add=True)
+    iniciado_en = models.DateTimeField(null=True, blank=True)
+    terminado_en = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "trabajos"
+        ordering = ["creado_en"]
+        indexes = [
+            # Cola: pendientes por orden de disponibilidad
+            models.Index(
+                fields=["disponible_desde"],
+                condition=models.Q(estado="PENDIENTE"),
+                name="trabajos_pendientes_idx",
+            ),
+            # Recuperación de trabajos atascados
+            models.Index(
+                fields=["latido"],
+                condition=models.Q(estado="PROCESANDO"),
+                name="trabajos_procesando_idx",
+            ),
+        ]
+        verbose_name = "Trabajo"
+        verbose_name_plural = "Trabajos"
+
+    def __str__(self):
+        return f"Trabajo {self.id} - {self.tipo} ({self.estado})"
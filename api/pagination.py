@@ -0,0 +1,215 @@
+"""
+Clases de paginación de la API
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class OptionalPageNumberPagination(PageNumberPagination):
+    """
+    Paginación por página solo si el cliente la pide con ?page o ?page_size.
+    Sin esos parámetros la respuesta sigue siendo la lista completa, para no
+    romper a los clientes de endpoints que antes no paginaban.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if (
+            self.page_query_param not in params
+            and self.page_size_query_param not in params
+        ):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class ErroresCargaPagination(PageNumberPagination):
+    """Paginación de los errores de un archivo cargado (pueden ser miles)"""
+
+    page_size = 100
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+
+
+class ConteoAproximadoPaginator(Paginator):
+    """
+    Paginator cuyo total, para un listado sin filtros en PostgreSQL, es la
+    estimación de filas de pg_class.reltuples (se actualiza con ANALYZE) en
+    vez de un COUNT(*) que recorre la tabla. Con filtros, en otras bases o
+    si la tabla nunca se analizó, cuenta de forma exacta.
+    """
+
+    aproximado = False
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if connection.vendor == "postgresql" and query is not None and not query.where:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                    [query.model._meta.db_table],
+                )
+                fila = cursor.fetchone()
+            # reltuples es -1 si la tabla aún no tiene estadísticas
+            if fila and fila[0] >= 0:
+                self.aproximado = True
+                return fila[0]
+        return super().count
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginación por cursor (keyset) sobre el primer campo del ordering de la
+    vista más el id como desempate: cada página filtra desde la última fila
+    vista en vez de usar OFFSET, así que su costo no crece con la
+    profundidad y no hay COUNT(*).
+
+    El cursor es opaco (base64 de JSON) y solo se obtiene de los links
+    next/previous de la respuesta. El campo de orden debe ser una fecha no
+    nula.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def __init__(self, page_size):
+        self.page_size = page_size
+
+    def _ordering(self, view, queryset):
+        ordering = getattr(view, "ordering", None) or queryset.model._meta.ordering
+        if isinstance(ordering, str):
+            ordering = [ordering]
+        campo = ordering[0]
+        descendente = campo.startswith("-")
+        return campo.lstrip("-"), descendente
+
+    def _decodificar(self, cursor):
+        try:
+            datos = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return datetime.fromisoformat(datos["v"]), datos["id"], bool(datos["r"])
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise NotFound("Cursor inválido")
+
+    @staticmethod
+    def cursor_para(valor, pk, reverso=False):
+        """Cursor que apunta justo después (o antes, si reverso) de la fila"""
+        datos = {"v": valor.isoformat(), "id": str(pk), "r": reverso}
+        return base64.urlsafe_b64encode(json.dumps(datos).encode()).decode()
+
+    def _codificar(self, fila, reverso):
+        cursor = self.cursor_para(getattr(fila, self.campo), fila.pk, reverso)
+        return replace_query_param(self.base_url, self.cursor_query_param, cursor)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.campo, descendente = self._ordering(view, queryset)
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self._page_size(request)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        valor = pk = None
+        reverso = False
+        if cursor:
+            valor, pk, reverso = self._decodificar(cursor)
+
+        # Hacia atrás se recorre en el orden inverso y luego se da vuelta
+        hacia_menores = descendente != reverso
+        orden = "-" if hacia_menores else ""
+        queryset = queryset.order_by(f"{orden}{self.campo}", f"{orden}pk")
+        if cursor:
+            op = "lt" if hacia_menores else "gt"
+            cota = "lte" if hacia_menores else "gte"
+            # La cota simple sobre el campo deja usar su índice como rango
+            queryset = queryset.filter(**{f"{self.campo}__{cota}": valor}).filter(
+                Q(**{f"{self.campo}__{op}": valor})
+                | Q(**{self.campo: valor, f"pk__{op}": pk})
+            )
+
+        filas = list(queryset[: self.page_size + 1])
+        hay_mas = len(filas) > self.page_size
+        filas = filas[: self.page_size]
+        if reverso:
+            filas.reverse()
+
+        self.next = self.previous = None
+        if filas:
+            if hay_mas or reverso:
+                self.next = self._codificar(filas[-1], reverso=False)
+            if (hay_mas and reverso) or (cursor and not reverso):
+                self.previous = self._codificar(filas[0], reverso=True)
+        elif cursor:
+            # Página vacía: el link vuelve al inicio en el sentido contrario
+            self.previous = remove_query_param(self.base_url, self.cursor_query_param)
+        return filas
+
+    def _page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.next, "previous": self.previous, "results": data})
+
+
+class ListadoPagination(PageNumberPagination):
+    """
+    Paginación de los listados de alto volumen (episodios, gestiones, notas).
+
+    Por defecto es la paginación por página de siempre. Con parámetros:
+    - ?paginacion=cursor (o un ?cursor= de un link next/previous): keyset,
+      ver KeysetPagination
+    - ?conteo=aproximado: el total sale de las estadísticas de PostgreSQL
+      cuando el listado no tiene filtros (ver ConteoAproximadoPaginator)
+    """
+
+    modo_query_param = "paginacion"
+    conteo_query_param = "conteo"
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        self.keyset = None
+        if (
+            params.get(self.modo_query_param) == "cursor"
+            or KeysetPagination.cursor_query_param in params
+        ):
+            if "ordering" in params:
+                raise ValidationError(
+                    {"ordering": "No se admite con paginacion=cursor"}
+                )
+            self.keyset = KeysetPagination(self.page_size)
+            return self.keyset.paginate_queryset(queryset, request, view)
+
+        self.django_paginator_class = (
+            ConteoAproximadoPaginator
+            if params.get(self.conteo_query_param) == "aproximado"
+            else Paginator
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+
+        response = super().get_paginated_response(data)
+        if getattr(self.page.paginator, "aproximado", False):
+            response.data["count_aproximado"] = True
+        return response
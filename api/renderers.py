@@ -0,0 +1,21 @@
+"""
+Renderers de la API
+"""
+
+import json
+
+from rest_framework.renderers import BaseRenderer
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Acepta `Accept: text/event-stream` en los endpoints SSE. Las respuestas de
+    error (403, 404) se envían como un evento `error`
+    """
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return f"event: error\ndata: {json.dumps(data, default=str)}\n\n".encode()
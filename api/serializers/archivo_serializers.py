@@ -4,7 +4,7 @@ Serializadores para el manejo de archivos Excel
 
 from rest_framework import serializers
 
-from api.models import ArchivoCarga
+from api.models import ArchivoCarga, ErrorCarga
 
 
 class ArchivoCargaSerializer(serializers.ModelSerializer):
@@ -60,6 +60,11 @@ class CargaArchivoSerializer(serializers.Serializer):
     tipo = serializers.ChoiceField(
         choices=TIPOS_CHOICES, help_text="Tipo de datos contenidos en el archivo"
     )
+    forzar = serializers.BooleanField(
+        required=False,
+        default=False,
+        help_text="Procesar de nuevo aunque el mismo archivo ya se haya cargado",
+    )
 
     def validate_archivo(self, value):
         """Valida que el archivo sea un Excel válido"""
@@ -88,3 +93,11 @@ class EstadoProcesamientoSerializer(serializers.Serializer):
     errores = serializers.JSONField()
     fecha_carga = serializers.DateTimeField()
     fecha_procesamiento = serializers.DateTimeField(allow_null=True)
+
+
+class ErrorCargaSerializer(serializers.ModelSerializer):
+    """Serializador para los errores de procesamiento de un archivo"""
+
+    class Meta:
+        model = ErrorCarga
+        fields = ["id", "fila", "error", "detalle", "creado_en"]
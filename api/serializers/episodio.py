@@ -5,10 +5,46 @@ Serializers para el modelo Episodio
 from rest_framework import serializers
 
 from api.models import Episodio
+from api.models.episodio import ALERTAS
 from api.serializers.cama import CamaSerializer
 
 
-class EpisodioSerializer(serializers.ModelSerializer):
+class ClasificacionRiesgoMixin:
+    """
+    Semáforo y alertas de un episodio. Se leen de las anotaciones de
+    EpisodioQuerySet.con_clasificacion(); si la instancia no viene anotada
+    se calculan en Python con las mismas reglas
+    """
+
+    def _clasificacion(self, obj):
+        if hasattr(obj, "semaforo"):
+            alertas = [a for a in ALERTAS if getattr(obj, f"alerta_{a}")]
+            return obj.semaforo, alertas
+        return obj.clasificacion_riesgo()
+
+    def get_semaforo_riesgo(self, obj):
+        """
+        Color del semáforo según probabilidad de extensión.
+        Retorna dict con 'color' y 'probabilidad'.
+        - gray: episodio ya se extendió (supera norma * 4/3) o sin probabilidad
+        - green: probabilidad baja (< 0.3)
+        - yellow: probabilidad media (0.3 - 0.45)
+        - red: probabilidad alta (>= 0.45)
+        """
+        color, _ = self._clasificacion(obj)
+        return {"color": color, "probabilidad": obj.probabilidad_extension}
+
+    def get_alertas(self, obj):
+        """
+        Alertas de episodios activos (lista vacía si ya egresó):
+        score_social_alto, extension_critica y prediccion_estadia_larga
+        (esta última solo si aún no hay extensión crítica)
+        """
+        _, alertas = self._clasificacion(obj)
+        return alertas
+
+
+class EpisodioSerializer(ClasificacionRiesgoMixin, serializers.ModelSerializer):
     """
     Serializer completo para el modelo Episodio
     Incluye datos completos de la cama asociada
@@ -53,65 +89,6 @@ class EpisodioSerializer(serializers.ModelSerializer):
             "semaforo_riesgo",
         ]
 
-    def get_semaforo_riesgo(self, obj):
-        """
-        Calcula el color del semáforo según probabilidad de extensión.
-        Retorna dict con 'color' y 'probabilidad'.
-        - gray: episodio ya se extendió (tiene extensión crítica)
-        - green: probabilidad baja (< 0.3)
-        - yellow: probabilidad media (0.3 - 0.45)
-        - red: probabilidad alta (>= 0.45)
-        """
-        # Si ya tiene extensión crítica, mostrar gris
-        if obj.estancia_norma_grd and obj.estancia_dias:
-            umbral_critico = obj.estancia_norma_grd * (4 / 3)
-            if obj.estancia_dias > umbral_critico:
-                return {"color": "gray", "probabilidad": obj.probabilidad_extension}
-
-        # Si no tiene probabilidad, mostrar gris también
-        if obj.probabilidad_extension is None:
-            return {"color": "gray", "probabilidad": None}
-
-        # Clasificar según rangos de probabilidad
-        prob = obj.probabilidad_extension
-        if prob >= 0.45:
-            return {"color": "red", "probabilidad": prob}  # Alto riesgo
-        elif prob >= 0.3:
-            return {"color": "yellow", "probabilidad": prob}  # Riesgo medio
-        else:
-            return {"color": "green", "probabilidad": prob}  # Bajo riesgo
-
-    def get_alertas(self, obj):
-        """
-        Calcula las alertas para episodios activos (sin fecha_egreso).
-        Retorna lista de strings con los tipos de alerta.
-        """
-        # Solo calcular alertas para episodios activos
-        if obj.fecha_egreso:
-            return []
-
-        alertas = []
-
-        # 1. Score Social Alto (>= 10)
-        if obj.paciente and obj.paciente.score_social is not None:
-            if obj.paciente.score_social >= 10:
-                alertas.append("score_social_alto")
-
-        # 2. Extensión Crítica (días > norma_grd * 4/3)
-        tiene_extension_critica = False
-        if obj.estancia_norma_grd and obj.estancia_dias:
-            umbral_critico = obj.estancia_norma_grd * (4 / 3)
-            if obj.estancia_dias > umbral_critico:
-                alertas.append("extension_critica")
-                tiene_extension_critica = True
-
-        # 3. Predicción de Estadía Larga (modelo ML)
-        # Solo mostrar si NO tiene extensión crítica (no se ha pasado aún)
-        if obj.prediccion_extension == 1 and not tiene_extension_critica:
-            alertas.append("prediccion_estadia_larga")
-
-        return alertas
-
 
 class EpisodioCreateSerializer(serializers.ModelSerializer):
     """
@@ -153,7 +130,7 @@ class EpisodioUpdateSerializer(serializers.ModelSerializer):
         ]
 
 
-class EpisodioListSerializer(serializers.ModelSerializer):
+class EpisodioListSerializer(ClasificacionRiesgoMixin, serializers.ModelSerializer):
     """
     Serializer para listar episodios con información básica
     """
@@ -185,44 +162,3 @@ class EpisodioListSerializer(serializers.ModelSerializer):
             "alertas",
             "semaforo_riesgo",
         ]
-
-    def get_semaforo_riesgo(self, obj):
-        """Mismo método que EpisodioSerializer"""
-        if obj.estancia_norma_grd and obj.estancia_dias:
-            umbral_critico = obj.estancia_norma_grd * (4 / 3)
-            if obj.estancia_dias > umbral_critico:
-                return {"color": "gray", "probabilidad": obj.probabilidad_extension}
-
-        if obj.probabilidad_extension is None:
-            return {"color": "gray", "probabilidad": None}
-
-        prob = obj.probabilidad_extension
-        if prob >= 0.45:
-            return {"color": "red", "probabilidad": prob}
-        elif prob >= 0.3:
-            return {"color": "yellow", "probabilidad": prob}
-        else:
-            return {"color": "green", "probabilidad": prob}
-
-    def get_alertas(self, obj):
-        """Mismo método que EpisodioSerializer"""
-        if obj.fecha_egreso:
-            return []
-
-        alertas = []
-
-        if obj.paciente and obj.paciente.score_social is not None:
-            if obj.paciente.score_social >= 10:
-                alertas.append("score_social_alto")
-
-        tiene_extension_critica = False
-        if obj.estancia_norma_grd and obj.estancia_dias:
-            umbral_critico = obj.estancia_norma_grd * (4 / 3)
-            if obj.estancia_dias > umbral_critico:
-                alertas.append("extension_critica")
-                tiene_extension_critica = True
-
-        if obj.prediccion_extension == 1 and not tiene_extension_critica:
-            alertas.append("prediccion_estadia_larga")
-
-        return alertas
@@ -0,0 +1,118 @@
+"""
+Registro de los Excel subidos a las vistas de carga.
+
+Cada archivo se identifica por el SHA-256 de su contenido (lo calcula
+api.upload_handlers.Sha256UploadHandler mientras se recibe) y se guarda una
+sola vez en disco, en uploads/excel/<2 primeros>/<sha256><ext>. Si el mismo
+usuario vuelve a subir el mismo archivo del mismo tipo (reintento tras un
+timeout, doble clic):
+
+- con un trabajo pendiente o en curso, la carga se enlaza a ese trabajo;
+- ya procesado, se responde con el resultado anterior sin volver a encolar;
+- si terminó en ERROR o se pide `forzar`, se procesa de nuevo.
+"""
+
+import hashlib
+import logging
+import os
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from api.models import ArchivoCarga, Trabajo, User
+from api.services.trabajos import encolar
+
+logger = logging.getLogger(__name__)
+
+CARPETA_EXCEL = "uploads/excel"
+ESTADOS_EN_CURSO = {"PENDIENTE", "PROCESANDO"}
+
+
+def sha256_subida(request, archivo) -> str:
+    """SHA-256 de un archivo subido (lo relee solo si el handler no lo calculó)"""
+    for (_, nombre), digest in getattr(request, "upload_sha256", {}).items():
+        if nombre == archivo.name:
+            return digest
+    sha256 = hashlib.sha256()
+    for chunk in archivo.chunks():
+        sha256.update(chunk)
+    archivo.seek(0)
+    return sha256.hexdigest()
+
+
+def quiere_forzar(valor) -> bool:
+    """Interpreta el parámetro `forzar` de un formulario"""
+    return str(valor).strip().lower() in {"1", "true", "si", "sí", "yes", "on"}
+
+
+def en_curso(trabajo) -> bool:
+    return trabajo is not None and trabajo.estado in ESTADOS_EN_CURSO
+
+
+def guardar_contenido(archivo, sha256: str) -> str:
+    """Guarda el archivo en su ruta por contenido si aún no existe"""
+    extension = os.path.splitext(archivo.name)[1].lower()
+    nombre = f"{CARPETA_EXCEL}/{sha256[:2]}/{sha256}{extension}"
+    if not default_storage.exists(nombre):
+        guardado = default_storage.save(nombre, archivo)
+        if guardado != nombre:
+            # Otra carga lo guardó entremedio: el storage le puso un sufijo
+            default_storage.delete(guardado)
+    return nombre
+
+
+def _carga_previa(sha256, tipo, usuario):
+    """Última carga con el mismo contenido, tipo y usuario, con su trabajo"""
+    previa = (
+        ArchivoCarga.objects.filter(sha256=sha256, tipo=tipo, usuario=usuario)
+        .order_by("-fecha_carga")
+        .first()
+    )
+    if previa is None:
+        return None, None
+    trabajo = (
+        Trabajo.objects.filter(archivo=previa, tipo="procesar_archivo")
+        .order_by("-creado_en")
+        .first()
+    )
+    return previa, trabajo
+
+
+def registrar_carga(archivo, tipo, usuario, sha256, forzar=False):
+    """
+    Registra un archivo subido y encola su procesamiento, o reutiliza una
+    carga previa idéntica. Devuelve (archivo_carga, trabajo, duplicado)
+    """
+    with transaction.atomic():
+        if usuario is not None:
+            # Serializa las cargas del usuario: dos reintentos simultáneos del
+            # mismo archivo no encolan dos trabajos
+            User.objects.select_for_update().filter(pk=usuario.pk).first()
+
+        previa, trabajo = _carga_previa(sha256, tipo, usuario)
+        if previa is not None and trabajo is not None:
+            reutilizable = en_curso(trabajo) or (
+                not forzar
+                and trabajo.estado == "COMPLETADO"
+                and previa.estado != "ERROR"
+            )
+            if reutilizable:
+                logger.info(
+                    f"Carga repetida de {archivo.name} ({sha256[:12]}): se reutiliza "
+                    f"el archivo {previa.id} (trabajo {trabajo.estado})"
+                )
+                return previa, trabajo, True
+
+        archivo_carga = ArchivoCarga.objects.create(
+            # En disco queda con el hash: el nombre original se guarda aparte
+            nombre=archivo.name,
+            archivo=guardar_contenido(archivo, sha256),
+            sha256=sha256,
+            tipo=tipo,
+            usuario=usuario,
+            estado="SUBIDO",
+        )
+        trabajo = encolar(
+            "procesar_archivo", {"tipo": tipo}, archivo=archivo_carga, usuario=usuario
+        )
+    return archivo_carga, trabajo, False
@@ -0,0 +1,149 @@
+"""
+Eventos de progreso del procesamiento de un ArchivoCarga, para el stream SSE
+(api.views.archivo_views.eventos_procesamiento).
+
+Cada vez que se guarda un ArchivoCarga (el ReporteProgreso lo hace en lotes)
+se publica un evento pequeño con el estado, la etapa y los contadores. En
+PostgreSQL se publica con NOTIFY y cada proceso web tiene un solo hilo con
+LISTEN que lo reparte a las colas en memoria de los clientes conectados: los
+clientes que miran no hacen consultas salvo una relectura por keepalive, que
+cubre los avisos perdidos mientras el hilo se suscribe o reconecta. En otras
+bases (como SQLite) el evento solo llega a los clientes del mismo proceso y
+el stream vuelve a leer la fila cada cierto tiempo.
+"""
+
+import json
+import logging
+import queue
+import threading
+from collections import defaultdict
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+CANAL = "archivo_carga_progreso"
+# Campos de ArchivoCarga que viajan en el evento (no los JSON de errores y log)
+CAMPOS = ["estado", "etapa", "filas_totales", "filas_procesadas", "filas_errores"]
+ESTADOS_FINALES = {"COMPLETADO", "ERROR", "PARCIAL"}
+
+
+def usa_notify() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def evento_progreso(archivo_id, datos) -> dict:
+    """Evento a partir de los CAMPOS de un ArchivoCarga (dict)"""
+    evento = {"archivo_id": str(archivo_id)}
+    evento.update({campo: datos[campo] for campo in CAMPOS})
+    totales = datos["filas_totales"]
+    evento["porcentaje_completado"] = (
+        round(datos["filas_procesadas"] / totales * 100, 2) if totales else 0
+    )
+    return evento
+
+
+def snapshot(archivo_id):
+    """Evento con el estado actual en la base (None si el archivo no existe)"""
+    from api.models import ArchivoCarga
+
+    datos = ArchivoCarga.objects.filter(id=archivo_id).values(*CAMPOS).first()
+    return evento_progreso(archivo_id, datos) if datos is not None else None
+
+
+def es_final(evento) -> bool:
+    return evento["estado"] in ESTADOS_FINALES
+
+
+def publicar(archivo_carga):
+    """Publica el progreso de un ArchivoCarga recién guardado"""
+    evento = evento_progreso(
+        archivo_carga.id, {campo: getattr(archivo_carga, campo) for campo in CAMPOS}
+    )
+    if usa_notify():
+        # NOTIFY se entrega al confirmar la transacción, como on_commit
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [CANAL, json.dumps(evento)])
+    else:
+        transaction.on_commit(lambda: escucha.difundir(evento))
+
+
+class Escucha:
+    """
+    Suscripciones del proceso: una cola por cliente conectado, agrupadas por
+    archivo. En PostgreSQL un hilo con su propia conexión hace LISTEN y
+    reparte los avisos
+    """
+
+    ESPERA_RECONEXION = 5
+    ESPERA_AVISOS = 30
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._colas = defaultdict(set)
+        self._hilo = None
+        self._detener = None
+
+    def suscribir(self, archivo_id) -> queue.Queue:
+        cola = queue.Queue()
+        with self._lock:
+            self._colas[str(archivo_id)].add(cola)
+            if usa_notify() and (self._hilo is None or not self._hilo.is_alive()):
+                self._detener = threading.Event()
+                self._hilo = threading.Thread(
+                    target=self._escuchar,
+                    args=(self._detener,),
+                    name="eventos-carga",
+                    daemon=True,
+                )
+                self._hilo.start()
+        return cola
+
+    def desuscribir(self, archivo_id, cola):
+        with self._lock:
+            colas = self._colas.get(str(archivo_id))
+            if colas is not None:
+                colas.discard(cola)
+                if not colas:
+                    del self._colas[str(archivo_id)]
+
+    def detener(self, timeout=None):
+        """
+        Detiene el hilo LISTEN y cierra su conexión; la próxima suscripción
+        lo vuelve a iniciar
+        """
+        with self._lock:
+            hilo, detener = self._hilo, self._detener
+            self._hilo = self._detener = None
+        if hilo is not None:
+            detener.set()
+            hilo.join(timeout)
+
+    def difundir(self, evento):
+        """Entrega el evento a los clientes que miran ese archivo"""
+        with self._lock:
+            colas = list(self._colas.get(evento["archivo_id"], ()))
+        for cola in colas:
+            cola.put(evento)
+
+    def _escuchar(self, detener: threading.Event):
+        while not detener.is_set():
+            conexion = connections.create_connection(DEFAULT_DB_ALIAS)
+            try:
+                conexion.ensure_connection()
+                crudo = conexion.connection
+                crudo.autocommit = True
+                crudo.execute(f"LISTEN {CANAL}")
+                while not detener.is_set():
+                    for aviso in crudo.notifies(timeout=self.ESPERA_AVISOS):
+                        self.difundir(json.loads(aviso.payload))
+                        if detener.is_set():
+                            break
+            except Exception as e:
+                logger.warning(f"LISTEN {CANAL} interrumpido, reconectando: {e}")
+            finally:
+                conexion.close()
+            detener.wait(self.ESPERA_RECONEXION)
+
+
+escucha = Escucha()
@@ -9,7 +9,14 @@ import pandas as pd
 from django.core.exceptions import ValidationError
 from django.db import transaction
 
+from api.management.modules.excel_cache import ParsedExcelCache, default_cache_dir
 from api.models import ArchivoCarga
+from api.services.progreso_carga import ReporteProgreso
+from api.services.response_cache import (
+    MODELOS_VERSIONADOS,
+    bump_model_versions,
+    deferred_version_bumps,
+)
 
 
 class ExcelProcessor(ABC):
@@ -17,26 +24,48 @@ class ExcelProcessor(ABC):
     Clase base abstracta para procesadores de archivos Excel específicos por modelo
     """
 
+    # Filas validadas que se insertan juntas con bulk_create
+    TAMANO_LOTE = 500
+    # Claves por consulta IN al precargar
+    TAMANO_CONSULTA = 2000
+
     def __init__(self, archivo_carga: ArchivoCarga):
         self.archivo_carga = archivo_carga
         self.df: Optional[pd.DataFrame] = None
         self.errores: List[Dict] = []
         self.registros_procesados = 0
         self.registros_error = 0
+        # Mapas clave -> objeto (o True) que arma _precargar, con lo que ya
+        # está en la base
+        self.mapas: Dict[str, Dict] = {}
+        # Claves que usarán las filas del lote aún sin guardar (ver _registrar)
+        self._reservas: Dict[str, Dict] = {}
+        self._reservas_fila: List[Tuple[str, Any, Any]] = []
+        self._lote: List[Tuple[int, List[Any], List[Tuple[str, Any, Any]]]] = []
 
     def procesar_archivo(self) -> Dict[str, Any]:
         """
-        Método principal que procesa todo el archivo Excel
+        Método principal que procesa todo el archivo Excel. El progreso y los
+        errores se guardan en lotes (ver ReporteProgreso)
         """
+        with ReporteProgreso(self.archivo_carga):
+            try:
+                return self._procesar()
+            finally:
+                self.archivo_carga.cambiar_etapa("FINALIZADO")
+
+    def _procesar(self) -> Dict[str, Any]:
         try:
             # Actualizar estado a procesando
             self.archivo_carga.estado = "PROCESANDO"
-            self.archivo_carga.save(update_fields=["estado"])
+            self.archivo_carga.etapa = "LECTURA"
+            self.archivo_carga.save(update_fields=["estado", "etapa"])
 
             # Cargar archivo Excel
             self._cargar_excel()
 
             # Validar estructura
+            self.archivo_carga.cambiar_etapa("VALIDACION")
             if not self._validar_estructura():
                 # Si la estructura es inválida, finalizar con error
                 self._finalizar_procesamiento()
@@ -48,6 +77,7 @@ class ExcelProcessor(ABC):
                 }
 
             # Procesar filas
+            self.archivo_carga.cambiar_etapa("FILAS")
             self._procesar_filas()
 
             # Finalizar procesamiento
@@ -78,13 +108,23 @@ class ExcelProcessor(ABC):
     def _cargar_excel(self):
         """Carga el archivo Excel en un DataFrame de pandas"""
         try:
-            # Intentar cargar como xlsx primero, luego xls
-            try:
-                self.df = pd.read_excel(
-                    self.archivo_carga.archivo.path, engine="openpyxl"
-                )
-            except:
-                self.df = pd.read_excel(self.archivo_carga.archivo.path, engine="xlrd")
+            # Un archivo ya parseado (reproceso, reintento) sale de la caché
+            sha256 = getattr(self.archivo_carga, "sha256", "")
+            cache = ParsedExcelCache(default_cache_dir()) if sha256 else None
+            self.df = cache.get(sha256) if cache else None
+
+            if self.df is None:
+                # Intentar cargar como xlsx primero, luego xls
+                try:
+                    self.df = pd.read_excel(
+                        self.archivo_carga.archivo.path, engine="openpyxl"
+                    )
+                except:
+                    self.df = pd.read_excel(
+                        self.archivo_carga.archivo.path, engine="xlrd"
+                    )
+                if cache:
+                    cache.put(sha256, self.df)
 
             # Limpiar nombres de columnas (eliminar espacios y convertir a minúsculas)
             self.df.columns = [
@@ -99,40 +139,198 @@ class ExcelProcessor(ABC):
             raise ValidationError(f"Error al cargar archivo Excel: {str(e)}")
 
     def _procesar_filas(self):
-        """Procesa todas las filas del DataFrame"""
-        for index, fila in self.df.iterrows():
-            try:
-                # Convertir fila a diccionario y limpiar valores nulos
-                datos_fila = self._limpiar_fila(fila.to_dict())
-
-                # Validar fila específica del modelo
-                datos_validados = self._validar_fila(
-                    datos_fila, index + 2
-                )  # +2 porque Excel empieza en 1 y hay header
-
-                if datos_validados:
-                    # Procesar fila específica del modelo
-                    self._procesar_fila_modelo(datos_validados, index + 2)
-                    self.registros_procesados += 1
-                else:
-                    # Si la validación falló, incrementar contador de errores
+        """
+        Procesa todas las filas del DataFrame: precarga las entidades
+        referenciadas, valida cada fila contra esos mapas y guarda las
+        válidas en lotes
+        """
+        self._precargar()
+        self._lote = []
+
+        with deferred_version_bumps():
+            for index, fila in self.df.iterrows():
+                self._reservas_fila = []
+                try:
+                    # Convertir fila a diccionario y limpiar valores nulos
+                    datos_fila = self._limpiar_fila(fila.to_dict())
+
+                    # Validar fila específica del modelo
+                    datos_validados = self._validar_fila(
+                        datos_fila, index + 2
+                    )  # +2 porque Excel empieza en 1 y hay header
+
+                    if datos_validados:
+                        instancias = self._instancias_modelo(datos_validados, index + 2)
+                        if instancias is None:
+                            # Procesar fila específica del modelo
+                            self._procesar_fila_modelo(datos_validados, index + 2)
+                            self._confirmar_reservas(self._reservas_fila)
+                            self.registros_procesados += 1
+                        else:
+                            self._agregar_al_lote(index + 2, instancias)
+                            if len(self._lote) >= self.TAMANO_LOTE:
+                                self._guardar_lote()
+                    else:
+                        # Si la validación falló, incrementar contador de errores
+                        self.registros_error += 1
+
+                except Exception as e:
+                    self._agregar_error(index + 2, str(e))
                     self.registros_error += 1
 
-            except Exception as e:
-                self._agregar_error(index + 2, str(e))
-                self.registros_error += 1
+                # Actualizar progreso cada 10 filas (el reporte agrupa las escrituras)
+                if (index + 1) % 10 == 0:
+                    self.archivo_carga.actualizar_progreso(
+                        self.registros_procesados, self.registros_error
+                    )
 
-            # Actualizar progreso cada 10 filas
-            if (index + 1) % 10 == 0:
-                self.archivo_carga.actualizar_progreso(
-                    self.registros_procesados, self.registros_error
-                )
+            self._guardar_lote()
 
         # Actualizar progreso final después de procesar todas las filas
         self.archivo_carga.actualizar_progreso(
             self.registros_procesados, self.registros_error
         )
 
+    def _agregar_al_lote(self, numero_fila: int, instancias: List[Any]):
+        """Encola la fila; sus reservas quedan a la vista de las siguientes"""
+        for mapa, clave, valor in self._reservas_fila:
+            self._reservas.setdefault(mapa, {})[clave] = valor
+        self._lote.append((numero_fila, instancias, self._reservas_fila))
+        self._reservas_fila = []
+
+    def _guardar_lote(self):
+        """
+        Inserta las instancias del lote con un bulk_create por modelo, en el
+        orden en que aparecen (p. ej. pacientes antes que sus episodios). Si
+        falla (una restricción de la base), guarda fila por fila para
+        atribuir el error a su fila. Las claves que reservó cada fila pasan
+        a self.mapas solo si la fila quedó guardada
+        """
+        lote, self._lote = self._lote, []
+        if not lote:
+            return
+        por_modelo: Dict[Any, List[Any]] = {}
+        for _, instancias, _ in lote:
+            for instancia in instancias:
+                por_modelo.setdefault(type(instancia), []).append(instancia)
+
+        try:
+            with transaction.atomic():
+                for modelo, instancias in por_modelo.items():
+                    modelo.objects.bulk_create(instancias)
+            guardadas = lote
+            self.registros_procesados += len(lote)
+        except Exception:
+            guardadas = []
+            for fila in lote:
+                numero_fila, instancias, _ = fila
+                try:
+                    with transaction.atomic():
+                        for instancia in instancias:
+                            instancia.save(force_insert=True)
+                    guardadas.append(fila)
+                    self.registros_procesados += 1
+                except Exception as e:
+                    self._error_guardado(numero_fila, e)
+                    self.registros_error += 1
+
+        for _, _, reservas in lote:
+            for mapa, clave, _ in reservas:
+                self._reservas[mapa].pop(clave, None)
+        for _, _, reservas in guardadas:
+            self._confirmar_reservas(reservas)
+
+        # bulk_create no emite post_save: invalidar la caché de respuestas
+        for modelo in por_modelo:
+            if modelo._meta.model_name in MODELOS_VERSIONADOS:
+                bump_model_versions(modelo._meta.model_name)
+
+    def _precargar(self):
+        """
+        Hook: resuelve de una vez las entidades que referencian las filas
+        (una consulta IN por entidad) y las deja en self.mapas para que
+        _validar_fila no consulte por cada fila
+        """
+
+    def _instancias_modelo(self, datos: Dict, numero_fila: int) -> Optional[List]:
+        """
+        Hook: instancias sin guardar de la fila validada, para insertarlas en
+        lote. None (por defecto) la guarda con _procesar_fila_modelo
+        """
+        return None
+
+    def _error_guardado(self, numero_fila: int, error: Exception):
+        """Error de una fila que no se pudo insertar"""
+        self._agregar_error(numero_fila, str(error))
+
+    def _claves(self, columna: str, convertir=str) -> set:
+        """Valores distintos no nulos de una columna, como en _limpiar_fila"""
+        if self.df is None or columna not in self.df.columns:
+            return set()
+        claves = set()
+        for valor in self.df[columna].dropna().unique():
+            if isinstance(valor, str):
+                valor = valor.strip()
+            if valor == "":
+                continue
+            try:
+                claves.add(convertir(valor))
+            except (ValueError, TypeError, AttributeError):
+                # La fila fallará su propia validación de formato
+                continue
+        return claves
+
+    def _resolver(self, queryset, campo: str, claves, clave=None) -> Dict:
+        """
+        Mapa clave -> objeto de `queryset` con `campo` en `claves`, con una
+        consulta IN por cada TAMANO_CONSULTA claves. `clave(obj)` arma la
+        clave del mapa (por defecto el valor de `campo`)
+        """
+        clave = clave or (lambda obj: getattr(obj, campo))
+        claves = list(claves)
+        mapa = {}
+        for inicio in range(0, len(claves), self.TAMANO_CONSULTA):
+            filtro = {f"{campo}__in": claves[inicio : inicio + self.TAMANO_CONSULTA]}
+            for obj in queryset.filter(**filtro):
+                mapa[clave(obj)] = obj
+        return mapa
+
+    def _existentes(self, queryset, campo: str, claves) -> Dict:
+        """Como _resolver pero solo para saber qué claves existen"""
+        claves = list(claves)
+        mapa = {}
+        for inicio in range(0, len(claves), self.TAMANO_CONSULTA):
+            filtro = {f"{campo}__in": claves[inicio : inicio + self.TAMANO_CONSULTA]}
+            for valor in queryset.filter(**filtro).values_list(campo, flat=True):
+                mapa[valor] = True
+        return mapa
+
+    def _buscar(self, mapa: str, clave, consulta):
+        """
+        Valor de `clave` en un mapa de _precargar (None si no está). Sin
+        precarga (p. ej. al validar una fila suelta) lo resuelve `consulta()`.
+        Si la reservó una fila del lote pendiente, primero se guarda el lote:
+        la respuesta es lo que de verdad quedó en la base
+        """
+        if mapa not in self.mapas:
+            return consulta()
+        if clave in self._reservas.get(mapa, ()):
+            self._guardar_lote()
+        return self.mapas[mapa].get(clave)
+
+    def _registrar(self, mapa: str, clave, valor=True):
+        """
+        Reserva para la fila en curso lo que creará (para las siguientes);
+        pasa al mapa cuando la fila se guarda
+        """
+        if mapa in self.mapas:
+            self._reservas_fila.append((mapa, clave, valor))
+
+    def _confirmar_reservas(self, reservas: List[Tuple[str, Any, Any]]):
+        """Agrega a los mapas lo que creó una fila ya guardada"""
+        for mapa, clave, valor in reservas:
+            self.mapas[mapa][clave] = valor
+
     def _limpiar_fila(self, datos: Dict) -> Dict:
         """Limpia y normaliza los datos de una fila"""
         datos_limpios = {}
@@ -170,11 +368,6 @@ class ExcelProcessor(ABC):
                 self.registros_procesados, self.registros_error
             )
 
-        # Guardar errores en el archivo
-        if self.errores:
-            self.archivo_carga.errores = self.errores
-            self.archivo_carga.save(update_fields=["errores"])
-
     def _manejar_error(self, error: str):
         """Maneja errores globales del procesamiento"""
         self.archivo_carga.estado = "ERROR"
@@ -0,0 +1,321 @@
+"""
+Exportaciones en streaming (XLSX, CSV y NDJSON) de gestiones, episodios y
+pacientes.
+
+Las filas se leen con .values().iterator(), que en PostgreSQL usa un cursor
+del lado del servidor, y se escriben a medida que llegan: la memoria del
+worker no crece con la cantidad de filas.
+"""
+
+import csv
+import json
+import tempfile
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font, PatternFill
+from openpyxl.utils import get_column_letter
+
+from api.models import Gestion, Paciente
+
+# Filas por viaje al cursor del servidor
+EXPORT_CHUNK_SIZE = 2000
+# Filas de CSV/NDJSON agrupadas en cada trozo de la respuesta
+EXPORT_ROWS_PER_CHUNK = 500
+# Bytes por trozo al enviar el XLSX ya armado
+XLSX_READ_SIZE = 64 * 1024
+
+
+class Columna:
+    """
+    Columna de una exportación.
+
+    Args:
+        clave: nombre de la columna en NDJSON
+        encabezado: título de la columna en XLSX y CSV
+        campo: lookup de .values() cuyo valor se exporta tal cual
+        valor: función sobre la fila (dict de .values()) para valores derivados
+        campos: lookups que necesita `valor`
+    """
+
+    def __init__(
+        self,
+        clave: str,
+        encabezado: str,
+        campo: Optional[str] = None,
+        valor: Optional[Callable[[Dict[str, Any]], Any]] = None,
+        campos: Iterable[str] = (),
+    ):
+        self.clave = clave
+        self.encabezado = encabezado
+        self.campo = campo
+        self.valor = valor
+        self.campos = [campo] if campo else list(campos)
+
+    def extraer(self, fila: Dict[str, Any]) -> Any:
+        if self.valor is not None:
+            return self.valor(fila)
+        return fila[self.campo]
+
+
+def _display(model, campo: str, encabezado: str) -> Columna:
+    """Columna con la etiqueta legible de un campo con choices ('' si vacío)"""
+    etiquetas = dict(model._meta.get_field(campo).flatchoices)
+
+    def valor(fila):
+        codigo = fila[campo]
+        if not codigo:
+            return ""
+        return etiquetas.get(codigo, codigo)
+
+    return Columna(campo, encabezado, valor=valor, campos=[campo])
+
+
+def _texto(clave: str, encabezado: str, campo: str) -> Columna:
+    """Columna de texto donde los nulos se exportan como ''"""
+    return Columna(
+        clave, encabezado, valor=lambda fila: fila[campo] or "", campos=[campo]
+    )
+
+
+class Exportacion:
+    """Definición de una exportación: nombre de archivo, hoja y columnas"""
+
+    def __init__(self, nombre: str, hoja: str, columnas: List[Columna]):
+        self.nombre = nombre
+        self.hoja = hoja
+        self.columnas = columnas
+
+    @property
+    def encabezados(self) -> List[str]:
+        return [c.encabezado for c in self.columnas]
+
+    @property
+    def claves(self) -> List[str]:
+        return [c.clave for c in self.columnas]
+
+    def filas(self, queryset) -> Iterator[List[Any]]:
+        """Filas del queryset, leídas por cursor y con datetimes en hora local"""
+        campos = list(dict.fromkeys(c for col in self.columnas for c in col.campos))
+        tz = timezone.get_current_timezone()
+        for fila in queryset.values(*campos).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            valores = []
+            for columna in self.columnas:
+                valor = columna.extraer(fila)
+                if isinstance(valor, datetime) and valor.tzinfo is not None:
+                    # Excel no admite datetimes con zona horaria
+                    valor = valor.astimezone(tz).replace(tzinfo=None)
+                valores.append(valor)
+            yield valores
+
+
+class _Echo:
+    """Buffer de csv.writer que devuelve la línea en vez de guardarla"""
+
+    def write(self, value):
+        return value
+
+
+def _chunked(lineas: Iterable[str]) -> Iterator[bytes]:
+    buffer = []
+    for linea in lineas:
+        buffer.append(linea)
+        if len(buffer) >= EXPORT_ROWS_PER_CHUNK:
+            yield "".join(buffer).encode("utf-8")
+            buffer = []
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
+
+
+def stream_csv(exportacion: Exportacion, queryset) -> Iterator[bytes]:
+    writer = csv.writer(_Echo())
+
+    def lineas():
+        # BOM para que Excel reconozca UTF-8 (tildes y ñ)
+        yield "\ufeff" + writer.writerow(exportacion.encabezados)
+        for fila in exportacion.filas(queryset):
+            yield writer.writerow(fila)
+
+    return _chunked(lineas())
+
+
+def stream_ndjson(exportacion: Exportacion, queryset) -> Iterator[bytes]:
+    claves = exportacion.claves
+
+    def lineas():
+        for fila in exportacion.filas(queryset):
+            yield json.dumps(
+                dict(zip(claves, fila)), cls=DjangoJSONEncoder, ensure_ascii=False
+            ) + "\n"
+
+    return _chunked(lineas())
+
+
+def stream_xlsx(exportacion: Exportacion, queryset) -> Iterator[bytes]:
+    """
+    XLSX en modo write-only de openpyxl: cada fila se vuelca a un archivo
+    temporal al agregarla. El zip se arma al final, así que los bytes se
+    envían una vez escrita la última fila
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(exportacion.hoja)
+    for col_num in range(1, len(exportacion.columnas) + 1):
+        ws.column_dimensions[get_column_letter(col_num)].width = 20
+
+    header_fill = PatternFill(
+        start_color="671E75", end_color="671E75", fill_type="solid"
+    )
+    header_font = Font(bold=True, color="FFFFFF")
+    header_alignment = Alignment(horizontal="center", vertical="center")
+    encabezados = []
+    for encabezado in exportacion.encabezados:
+        cell = WriteOnlyCell(ws, value=encabezado)
+        cell.fill = header_fill
+        cell.font = header_font
+        cell.alignment = header_alignment
+        encabezados.append(cell)
+    ws.append(encabezados)
+
+    for fila in exportacion.filas(queryset):
+        ws.append(fila)
+
+    with tempfile.TemporaryFile() as tmp:
+        wb.save(tmp)
+        tmp.seek(0)
+        while chunk := tmp.read(XLSX_READ_SIZE):
+            yield chunk
+
+
+FORMATOS = {
+    "xlsx": (
+        stream_xlsx,
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ),
+    "csv": (stream_csv, "text/csv; charset=utf-8"),
+    "ndjson": (stream_ndjson, "application/x-ndjson; charset=utf-8"),
+}
+
+
+def respuesta_exportacion(
+    exportacion: Exportacion, queryset, formato: str = "xlsx"
+) -> StreamingHttpResponse:
+    """StreamingHttpResponse con la exportación del queryset en `formato`"""
+    stream, content_type = FORMATOS[formato]
+    response = StreamingHttpResponse(
+        stream(exportacion, queryset), content_type=content_type
+    )
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    response["Content-Disposition"] = (
+        f'attachment; filename="{exportacion.nombre}_{timestamp}.{formato}"'
+    )
+    return response
+
+
+def _duracion_dias(fila):
+    """Igual que Gestion.duracion_dias, sobre la fila de .values()"""
+    inicio, fin = fila["fecha_inicio"], fila["fecha_fin"]
+    if fin and inicio:
+        return (fin - inicio).days
+    if inicio:
+        return (timezone.now() - inicio).days
+    return None
+
+
+EXPORTACION_GESTIONES = Exportacion(
+    nombre="gestiones",
+    hoja="Gestiones",
+    columnas=[
+        Columna("episodio_cmbd", "Episodio CMBD", campo="episodio__episodio_cmbd"),
+        _texto("paciente_rut", "RUT Paciente", "episodio__paciente__rut"),
+        _texto("paciente_nombre", "Nombre Paciente", "episodio__paciente__nombre"),
+        _texto("usuario", "Usuario Responsable", "usuario__email"),
+        _display(Gestion, "tipo_gestion", "Tipo de Gestión"),
+        _display(Gestion, "estado_gestion", "Estado Gestión"),
+        Columna("fecha_inicio", "Fecha Inicio", campo="fecha_inicio"),
+        Columna("fecha_fin", "Fecha Fin", campo="fecha_fin"),
+        Columna(
+            "duracion_dias",
+            "Duración (días)",
+            valor=_duracion_dias,
+            campos=["fecha_inicio", "fecha_fin"],
+        ),
+        _texto("informe", "Informe", "informe"),
+        _display(Gestion, "estado_traslado", "Estado Traslado"),
+        _display(Gestion, "tipo_traslado", "Tipo Traslado"),
+        _texto("motivo_traslado", "Motivo Traslado", "motivo_traslado"),
+        _texto("centro_destinatario", "Centro Destinatario", "centro_destinatario"),
+        _display(Gestion, "tipo_solicitud_traslado", "Tipo Solicitud Traslado"),
+        _display(Gestion, "nivel_atencion_traslado", "Nivel Atención Traslado"),
+        _texto("motivo_rechazo_traslado", "Motivo Rechazo", "motivo_rechazo_traslado"),
+        _texto(
+            "motivo_cancelacion_traslado",
+            "Motivo Cancelación",
+            "motivo_cancelacion_traslado",
+        ),
+        Columna(
+            "fecha_finalizacion_traslado",
+            "Fecha Finalización Traslado",
+            campo="fecha_finalizacion_traslado",
+        ),
+        Columna("created_at", "Fecha Creación", campo="created_at"),
+        Columna("updated_at", "Última Actualización", campo="updated_at"),
+    ],
+)
+
+EXPORTACION_EPISODIOS = Exportacion(
+    nombre="episodios",
+    hoja="Episodios",
+    columnas=[
+        Columna("episodio_cmbd", "Episodio CMBD", campo="episodio_cmbd"),
+        _texto("paciente_rut", "RUT Paciente", "paciente__rut"),
+        _texto("paciente_nombre", "Nombre Paciente", "paciente__nombre"),
+        _texto("cama", "Cama", "cama__codigo_cama"),
+        Columna("fecha_ingreso", "Fecha Ingreso", campo="fecha_ingreso"),
+        Columna("fecha_egreso", "Fecha Egreso", campo="fecha_egreso"),
+        _texto("tipo_actividad", "Tipo Actividad", "tipo_actividad"),
+        _texto("especialidad", "Especialidad", "especialidad"),
+        Columna("estancia_norma_grd", "Estancia Norma GRD", campo="estancia_norma_grd"),
+        Columna("dias_estadia", "Días Estadía", campo="dias_estadia"),
+        Columna("semaforo", "Semáforo Riesgo", campo="semaforo"),
+        Columna(
+            "prediccion_extension", "Predicción Extensión", campo="prediccion_extension"
+        ),
+        Columna(
+            "probabilidad_extension",
+            "Probabilidad Extensión",
+            campo="probabilidad_extension",
+        ),
+    ],
+)
+
+EXPORTACION_PACIENTES = Exportacion(
+    nombre="pacientes",
+    hoja="Pacientes",
+    columnas=[
+        Columna("rut", "RUT", campo="rut"),
+        Columna("nombre", "Nombre", campo="nombre"),
+        _display(Paciente, "sexo", "Sexo"),
+        Columna("fecha_nacimiento", "Fecha Nacimiento", campo="fecha_nacimiento"),
+        _texto("prevision_1", "Previsión 1", "prevision_1"),
+        _texto("prevision_2", "Previsión 2", "prevision_2"),
+        _texto("convenio", "Convenio", "convenio"),
+        Columna("score_social", "Score Social", campo="score_social"),
+        Columna("created_at", "Fecha Creación", campo="created_at"),
+    ],
+)
+
+
+__all__ = [
+    "Columna",
+    "Exportacion",
+    "EXPORTACION_EPISODIOS",
+    "EXPORTACION_GESTIONES",
+    "EXPORTACION_PACIENTES",
+    "FORMATOS",
+    "respuesta_exportacion",
+]
@@ -0,0 +1,151 @@
+"""
+Registro de artefactos de ML (modelo y preprocessing) cargados una vez por
+proceso y recargados solo cuando cambia el archivo en disco.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Ruta base donde se guardan los pickles del modelo.
+MODELS_DIR = Path(__file__).resolve().parent.parent / "modelo"
+
+
+def _file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class _Artifact:
+    """Artefacto cargado, con la firma del archivo del que salió"""
+
+    def __init__(self, value: Any, stat_key: tuple, sha256: str, seconds: float):
+        self.value = value
+        self.stat_key = stat_key
+        self.sha256 = sha256
+        self.load_seconds = seconds
+        self.loaded_at = time.time()
+        # Estructuras construidas a partir del artefacto (se descartan con él)
+        self.derived: Dict[str, Any] = {}
+
+
+class ModelRegistry:
+    """
+    Caché de artefactos por proceso.
+
+    Cada get() compara mtime y tamaño del archivo con los de la carga
+    anterior (un stat). Si cambiaron, se calcula el SHA-256: un hash distinto
+    recarga el artefacto; uno igual (archivo solo tocado) lo reutiliza.
+    La versión de un artefacto son los primeros 12 caracteres de su hash.
+    """
+
+    def __init__(self, models_dir: Path = MODELS_DIR):
+        self.models_dir = Path(models_dir)
+        self._artifacts: Dict[str, _Artifact] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, float]] = {}
+
+    def _count(self, name: str, key: str, amount: float = 1) -> None:
+        counts = self.stats.setdefault(
+            name, {"hits": 0, "loads": 0, "reloads": 0, "load_seconds": 0.0}
+        )
+        counts[key] += amount
+
+    def get(self, name: str, loader: Callable[[Path], Any]) -> Any:
+        """
+        Artefacto `name` (relativo a models_dir), cargándolo con `loader`
+        la primera vez o cuando el archivo cambió
+
+        Raises:
+            FileNotFoundError: si el archivo no existe
+        """
+        path = self.models_dir / name
+        if not path.exists():
+            raise FileNotFoundError(f"No se encontró el artefacto en {path}")
+
+        stat = path.stat()
+        stat_key = (stat.st_mtime_ns, stat.st_size)
+
+        artifact = self._artifacts.get(name)
+        if artifact is not None and artifact.stat_key == stat_key:
+            self._count(name, "hits")
+            return artifact.value
+
+        with self._lock:
+            # Otro hilo pudo cargarlo mientras se esperaba el lock
+            artifact = self._artifacts.get(name)
+            if artifact is not None and artifact.stat_key == stat_key:
+                self._count(name, "hits")
+                return artifact.value
+
+            sha256 = _file_sha256(path)
+            if artifact is not None and artifact.sha256 == sha256:
+                artifact.stat_key = stat_key
+                self._count(name, "hits")
+                return artifact.value
+
+            start = time.perf_counter()
+            value = loader(path)
+            seconds = time.perf_counter() - start
+
+            self._artifacts[name] = _Artifact(value, stat_key, sha256, seconds)
+            self._count(name, "reloads" if artifact is not None else "loads")
+            self._count(name, "load_seconds", seconds)
+            logger.info(
+                f"Artefacto {name} {'recargado' if artifact else 'cargado'} "
+                f"(versión {sha256[:12]}) en {seconds:.2f}s"
+            )
+            return value
+
+    def derived(self, name: str, key: str, builder: Callable[[Any], Any]) -> Any:
+        """
+        Estructura derivada del artefacto `name` ya cargado (ej. tablas
+        precompiladas), construida con `builder` una vez por carga
+
+        Raises:
+            KeyError: si el artefacto aún no se carga
+        """
+        artifact = self._artifacts.get(name)
+        if artifact is None:
+            raise KeyError(f"El artefacto {name} no está cargado")
+
+        if key not in artifact.derived:
+            with self._lock:
+                if key not in artifact.derived:
+                    artifact.derived[key] = builder(artifact.value)
+        return artifact.derived[key]
+
+    def version(self, name: str) -> Optional[str]:
+        """Versión del artefacto cargado, o None si aún no se carga"""
+        artifact = self._artifacts.get(name)
+        return artifact.sha256[:12] if artifact else None
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Versión y contadores de cada artefacto cargado"""
+        return {
+            name: {
+                "version": artifact.sha256[:12],
+                "loaded_at": artifact.loaded_at,
+                "last_load_seconds": round(artifact.load_seconds, 4),
+                **self.stats.get(name, {}),
+            }
+            for name, artifact in self._artifacts.items()
+        }
+
+    def clear(self) -> None:
+        """Olvida todos los artefactos (la próxima lectura los recarga)"""
+        with self._lock:
+            self._artifacts.clear()
+            self.stats.clear()
+
+
+# Registro compartido por todo el proceso
+registry = ModelRegistry()
@@ -3,6 +3,7 @@ Procesadores específicos para cada modelo del sistema
 """
 
 import re
+import uuid
 from datetime import date, datetime
 from typing import Dict, List, Optional
 
@@ -16,6 +17,22 @@ from api.models import Cama, Episodio, Gestion, Paciente, Servicio, User
 from .excel_processor import ExcelProcessor
 
 
+def _obtener(modelo, **filtros):
+    """Objeto que cumple los filtros, o None si no existe"""
+    try:
+        return modelo.objects.get(**filtros)
+    except modelo.DoesNotExist:
+        return None
+
+
+def _clave_uuid(valor) -> str:
+    """UUID en forma canónica para buscar en los mapas; si no es UUID, el texto"""
+    try:
+        return str(uuid.UUID(str(valor)))
+    except ValueError:
+        return str(valor)
+
+
 class UserExcelProcessor(ExcelProcessor):
     """Procesador para archivos Excel de usuarios"""
 
@@ -50,7 +67,11 @@ class UserExcelProcessor(ExcelProcessor):
             r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$", datos["email"]
         ):
             errores_fila.append("Email no tiene formato válido")
-        elif User.objects.filter(email=datos["email"]).exists():
+        elif self._buscar(
+            "emails",
+            datos["email"],
+            lambda: User.objects.filter(email=datos["email"]).exists(),
+        ):
             errores_fila.append(f"Ya existe usuario con email {datos['email']}")
 
         # Nombre y apellido requeridos
@@ -75,10 +96,25 @@ class UserExcelProcessor(ExcelProcessor):
             self._agregar_error(numero_fila, "; ".join(errores_fila))
             return None
 
+        # Las filas siguientes ven el email como ya usado
+        self._registrar("emails", datos["email"])
         return datos
 
+    def _precargar(self):
+        """Emails del archivo que ya existen, en una consulta"""
+        self.mapas["emails"] = self._existentes(
+            User.objects, "email", self._claves("email")
+        )
+
     def _procesar_fila_modelo(self, datos: Dict, numero_fila: int):
         """Crea un nuevo usuario con los datos validados"""
+        User.objects.create(**self._datos_usuario(datos))
+
+    def _instancias_modelo(self, datos: Dict, numero_fila: int) -> List:
+        return [User(**self._datos_usuario(datos))]
+
+    def _datos_usuario(self, datos: Dict) -> Dict:
+        """Campos del usuario a partir de la fila validada"""
         user_data = {
             "email": datos["email"],
             "nombre": datos["nombre"],
@@ -92,9 +128,7 @@ class UserExcelProcessor(ExcelProcessor):
         # Generar password si no se proporciona
         password = datos.get("password", "temp123")
         user_data["password"] = make_password(password)
-
-        # Crear usuario
-        User.objects.create(**user_data)
+        return user_data
 
 
 class PacienteExcelProcessor(ExcelProcessor):
@@ -129,7 +163,11 @@ class PacienteExcelProcessor(ExcelProcessor):
             errores_fila.append("RUT es requerido")
         elif not self._validar_rut(datos["rut"]):
             errores_fila.append("RUT no tiene formato válido")
-        elif Paciente.objects.filter(rut=datos["rut"]).exists():
+        elif self._buscar(
+            "ruts",
+            str(datos["rut"]),
+            lambda: Paciente.objects.filter(rut=datos["rut"]).exists(),
+        ):
             errores_fila.append(f"Ya existe paciente con RUT {datos['rut']}")
 
         # Nombre requerido
@@ -168,10 +206,24 @@ class PacienteExcelProcessor(ExcelProcessor):
             self._agregar_error(numero_fila, "; ".join(errores_fila))
             return None
 
+        self._registrar("ruts", str(datos["rut"]))
         return datos
 
+    def _precargar(self):
+        """RUTs del archivo que ya existen, en una consulta"""
+        self.mapas["ruts"] = self._existentes(
+            Paciente.objects, "rut", self._claves("rut")
+        )
+
     def _procesar_fila_modelo(self, datos: Dict, numero_fila: int):
         """Crea un nuevo paciente con los datos validados"""
+        Paciente.objects.create(**self._datos_paciente(datos))
+
+    def _instancias_modelo(self, datos: Dict, numero_fila: int) -> List:
+        return [Paciente(**self._datos_paciente(datos))]
+
+    def _datos_paciente(self, datos: Dict) -> Dict:
+        """Campos del paciente a partir de la fila validada"""
         fecha_nacimiento = self._convertir_fecha(datos["fecha_nacimiento"])
 
         paciente_data = {
@@ -185,8 +237,7 @@ class PacienteExcelProcessor(ExcelProcessor):
             "convenio": datos.get("convenio", ""),
             "score_social": datos.get("score_social"),
         }
-
-        Paciente.objects.create(**paciente_data)
+        return paciente_data
 
 
 class CamaExcelProcessor(ExcelProcessor):
@@ -219,7 +270,11 @@ class CamaExcelProcessor(ExcelProcessor):
         # Número de cama requerido y único
         if not datos.get("numero"):
             errores_fila.append("Número de cama es requerido")
-        elif Cama.objects.filter(numero=datos["numero"]).exists():
+        elif self._buscar(
+            "camas",
+            str(datos["numero"]),
+            lambda: Cama.objects.filter(numero=datos["numero"]).exists(),
+        ):
             errores_fila.append(f"Ya existe cama con número {datos['numero']}")
 
         # Ubicación requerida
@@ -244,10 +299,24 @@ class CamaExcelProcessor(ExcelProcessor):
             self._agregar_error(numero_fila, "; ".join(errores_fila))
             return None
 
+        self._registrar("camas", str(datos["numero"]))
         return datos
 
+    def _precargar(self):
+        """Números de cama del archivo que ya existen, en una consulta"""
+        self.mapas["camas"] = self._existentes(
+            Cama.objects, "numero", self._claves("numero")
+        )
+
     def _procesar_fila_modelo(self, datos: Dict, numero_fila: int):
         """Crea una nueva cama con los datos validados"""
+        Cama.objects.create(**self._datos_cama(datos))
+
+    def _instancias_modelo(self, datos: Dict, numero_fila: int) -> List:
+        return [Cama(**self._datos_cama(datos))]
+
+    def _datos_cama(self, datos: Dict) -> Dict:
+        """Campos de la cama a partir de la fila validada"""
         cama_data = {
             "numero": datos["numero"],
             "ubicacion": datos["ubicacion"],
@@ -255,8 +324,7 @@ class CamaExcelProcessor(ExcelProcessor):
             "estado": datos["estado"].upper(),
             "observaciones": datos.get("observaciones", ""),
         }
-
-        Cama.objects.create(**cama_data)
+        return cama_data
 
 
 class EpisodioExcelProcessor(ExcelProcessor):
@@ -290,10 +358,14 @@ class EpisodioExcelProcessor(ExcelProcessor):
         if not datos.get("paciente_rut"):
             errores_fila.append("RUT del paciente es requerido")
         else:
-            try:
-                paciente = Paciente.objects.get(rut=datos["paciente_rut"])
+            paciente = self._buscar(
+                "pacientes",
+                str(datos["paciente_rut"]),
+                lambda: _obtener(Paciente, rut=datos["paciente_rut"]),
+            )
+            if paciente is not None:
                 datos["paciente"] = paciente
-            except Paciente.DoesNotExist:
+            else:
                 errores_fila.append(
                     f"No existe paciente con RUT {datos['paciente_rut']}"
                 )
@@ -302,10 +374,14 @@ class EpisodioExcelProcessor(ExcelProcessor):
         if not datos.get("cama_numero"):
             errores_fila.append("Número de cama es requerido")
         else:
-            try:
-                cama = Cama.objects.get(numero=datos["cama_numero"])
+            cama = self._buscar(
+                "camas",
+                str(datos["cama_numero"]),
+                lambda: _obtener(Cama, numero=datos["cama_numero"]),
+            )
+            if cama is not None:
                 datos["cama"] = cama
-            except Cama.DoesNotExist:
+            else:
                 errores_fila.append(f"No existe cama con número {datos['cama_numero']}")
 
         # Fecha de ingreso válida
@@ -349,8 +425,24 @@ class EpisodioExcelProcessor(ExcelProcessor):
 
         return datos
 
+    def _precargar(self):
+        """Pacientes y camas referenciados por el archivo, una consulta cada uno"""
+        self.mapas["pacientes"] = self._resolver(
+            Paciente.objects, "rut", self._claves("paciente_rut")
+        )
+        self.mapas["camas"] = self._resolver(
+            Cama.objects, "numero", self._claves("cama_numero")
+        )
+
     def _procesar_fila_modelo(self, datos: Dict, numero_fila: int):
         """Crea un nuevo episodio con los datos validados"""
+        Episodio.objects.create(**self._datos_episodio(datos))
+
+    def _instancias_modelo(self, datos: Dict, numero_fila: int) -> List:
+        return [Episodio(**self._datos_episodio(datos))]
+
+    def _datos_episodio(self, datos: Dict) -> Dict:
+        """Campos del episodio a partir de la fila validada"""
         episodio_data = {
             "paciente": datos["paciente"],
             "cama": datos["cama"],
@@ -363,7 +455,7 @@ class EpisodioExcelProcessor(ExcelProcessor):
         if "fecha_egreso_parsed" in datos:
             episodio_data["fecha_egreso"] = datos["fecha_egreso_parsed"]
 
-        Episodio.objects.create(**episodio_data)
+        return episodio_data
 
 
 class GestionExcelProcessor(ExcelProcessor):
@@ -397,20 +489,28 @@ class GestionExcelProcessor(ExcelProcessor):
         if not datos.get("episodio_id"):
             errores_fila.append("ID del episodio es requerido")
         else:
-            try:
-                episodio = Episodio.objects.get(id=datos["episodio_id"])
+            episodio = self._buscar(
+                "episodios",
+                _clave_uuid(datos["episodio_id"]),
+                lambda: _obtener(Episodio, id=datos["episodio_id"]),
+            )
+            if episodio is not None:
                 datos["episodio"] = episodio
-            except Episodio.DoesNotExist:
+            else:
                 errores_fila.append(f"No existe episodio con ID {datos['episodio_id']}")
 
         # Usuario debe existir
         if not datos.get("usuario_email"):
             errores_fila.append("Email del usuario es requerido")
         else:
-            try:
-                usuario = User.objects.get(email=datos["usuario_email"])
+            usuario = self._buscar(
+                "usuarios",
+                str(datos["usuario_email"]),
+                lambda: _obtener(User, email=datos["usuario_email"]),
+            )
+            if usuario is not None:
                 datos["usuario"] = usuario
-            except User.DoesNotExist:
+            else:
                 errores_fila.append(
                     f"No existe usuario con email {datos['usuario_email']}"
                 )
@@ -441,8 +541,28 @@ class GestionExcelProcessor(ExcelProcessor):
 
         return datos
 
+    def _precargar(self):
+        """Episodios y usuarios referenciados por el archivo, una consulta cada uno"""
+        # Los ids que no son UUID no existen (la fila lo informa)
+        self.mapas["episodios"] = self._resolver(
+            Episodio.objects,
+            "id",
+            self._claves("episodio_id", convertir=lambda v: uuid.UUID(str(v))),
+            clave=lambda episodio: str(episodio.id),
+        )
+        self.mapas["usuarios"] = self._resolver(
+            User.objects, "email", self._claves("usuario_email")
+        )
+
     def _procesar_fila_modelo(self, datos: Dict, numero_fila: int):
         """Crea una nueva gestión con los datos validados"""
+        Gestion.objects.create(**self._datos_gestion(datos))
+
+    def _instancias_modelo(self, datos: Dict, numero_fila: int) -> List:
+        return [Gestion(**self._datos_gestion(datos))]
+
+    def _datos_gestion(self, datos: Dict) -> Dict:
+        """Campos de la gestión a partir de la fila validada"""
         gestion_data = {
             "episodio": datos["episodio"],
             "usuario": datos["usuario"],
@@ -451,8 +571,7 @@ class GestionExcelProcessor(ExcelProcessor):
             "observaciones": datos.get("observaciones", ""),
             "prioridad": datos.get("prioridad", "NORMAL"),
         }
-
-        Gestion.objects.create(**gestion_data)
+        return gestion_data
 
     # Métodos auxiliares compartidos
     def _validar_rut(self, rut: str) -> bool:
@@ -557,7 +676,13 @@ class PacienteEpisodioExcelProcessor(ExcelProcessor):
             try:
                 episodio_num = int(datos["episodio"])
                 # Verificar que no existe ya un episodio con este número
-                if Episodio.objects.filter(episodio_cmbd=episodio_num).exists():
+                if self._buscar(
+                    "episodios_cmbd",
+                    episodio_num,
+                    lambda: Episodio.objects.filter(
+                        episodio_cmbd=episodio_num
+                    ).exists(),
+                ):
                     errores_fila.append(f"Ya existe episodio con número {episodio_num}")
                 datos["episodio_cmbd"] = episodio_num
             except (ValueError, TypeError):
@@ -567,22 +692,26 @@ class PacienteEpisodioExcelProcessor(ExcelProcessor):
         if not datos.get("cama") or not datos.get("habitacion"):
             errores_fila.append("Código de cama y habitación son requeridos")
         else:
-            try:
-                cama = Cama.objects.get(
-                    codigo_cama=datos["cama"], habitacion=datos["habitacion"]
-                )
-
+            cama = self._buscar(
+                "camas",
+                (str(datos["cama"]), str(datos["habitacion"])),
+                lambda: _obtener(
+                    Cama, codigo_cama=datos["cama"], habitacion=datos["habitacion"]
+                ),
+            )
+            if cama is not None:
                 # Verificar que la cama no esté ocupada por otro episodio activo
-                episodio_activo = cama.episodios.filter(
-                    fecha_egreso__isnull=True
-                ).first()
-                if episodio_activo:
+                if self._buscar(
+                    "camas_ocupadas",
+                    cama.id,
+                    lambda: cama.episodios.filter(fecha_egreso__isnull=True).exists(),
+                ):
                     errores_fila.append(
                         f"La cama {datos['cama']} ya está ocupada por episodio activo"
                     )
 
                 datos["cama_obj"] = cama
-            except Cama.DoesNotExist:
+            else:
                 errores_fila.append(
                     f"No existe cama {datos['cama']} en habitación {datos['habitacion']}"
                 )
@@ -606,8 +735,57 @@ class PacienteEpisodioExcelProcessor(ExcelProcessor):
             self._agregar_error(numero_fila, "; ".join(errores_fila))
             return None
 
+        # El episodio de esta fila ocupa la cama y el número CMBD
+        self._registrar("episodios_cmbd", datos["episodio_cmbd"])
+        self._registrar("camas_ocupadas", datos["cama_obj"].id)
         return datos
 
+    def _precargar(self):
+        """
+        Episodios, camas (y su ocupación) y pacientes referenciados por el
+        archivo, una consulta IN cada uno
+        """
+        self.mapas["episodios_cmbd"] = self._existentes(
+            Episodio.objects, "episodio_cmbd", self._claves("episodio", convertir=int)
+        )
+        self.mapas["camas"] = self._resolver(
+            Cama.objects,
+            "habitacion",
+            self._claves("habitacion"),
+            clave=lambda cama: (cama.codigo_cama, cama.habitacion),
+        )
+        self.mapas["camas_ocupadas"] = self._existentes(
+            Episodio.objects.filter(fecha_egreso__isnull=True),
+            "cama_id",
+            [cama.id for cama in self.mapas["camas"].values()],
+        )
+        self.mapas["pacientes"] = self._resolver(
+            Paciente.objects, "rut", self._claves("rut_paciente")
+        )
+
+    def _instancias_modelo(self, datos: Dict, numero_fila: int) -> List:
+        """Paciente nuevo (si no existe) y episodio de la fila, sin guardar"""
+        instancias = []
+        rut_paciente = str(datos["rut_paciente"])
+        paciente = self._buscar(
+            "pacientes", rut_paciente, lambda: _obtener(Paciente, rut=rut_paciente)
+        )
+        if paciente is None:
+            paciente = Paciente(**self._datos_paciente_nuevo(datos))
+            self._registrar("pacientes", rut_paciente, paciente)
+            instancias.append(paciente)
+        elif datos["nombre_paciente"] != paciente.nombre:
+            # Viene de la base: un paciente de una fila pendiente se guarda
+            # antes de buscarlo (ver _buscar)
+            paciente.nombre = datos["nombre_paciente"]
+            paciente.save(update_fields=["nombre"])
+
+        instancias.append(Episodio(**self._datos_episodio(datos, paciente)))
+        return instancias
+
+    def _error_guardado(self, numero_fila: int, error: Exception):
+        self._agregar_error(numero_fila, f"Error al procesar: {str(error)}")
+
     def _procesar_fila_modelo(self, datos: Dict, numero_fila: int):
         """Crea/actualiza paciente y crea episodio asociado"""
         try:
@@ -638,21 +816,26 @@ class PacienteEpisodioExcelProcessor(ExcelProcessor):
             return paciente
 
         except Paciente.DoesNotExist:
-            # Crear nuevo paciente con datos mínimos
-            # Nota: Los campos requeridos como sexo y fecha_nacimiento
-            # necesitarán valores por defecto o ser agregados al archivo
-            paciente_data = {
-                "rut": rut_paciente,
-                "nombre": datos["nombre_paciente"],
-                "sexo": "O",  # Valor por defecto - podría venir del archivo
-                "fecha_nacimiento": date(1900, 1, 1),  # Valor por defecto
-                "prevision_1": "OTRO",  # Valor por defecto
-            }
-
-            return Paciente.objects.create(**paciente_data)
+            return Paciente.objects.create(**self._datos_paciente_nuevo(datos))
+
+    def _datos_paciente_nuevo(self, datos: Dict) -> Dict:
+        """Paciente con datos mínimos a partir de la fila"""
+        # Nota: Los campos requeridos como sexo y fecha_nacimiento
+        # necesitarán valores por defecto o ser agregados al archivo
+        return {
+            "rut": datos["rut_paciente"],
+            "nombre": datos["nombre_paciente"],
+            "sexo": "O",  # Valor por defecto - podría venir del archivo
+            "fecha_nacimiento": date(1900, 1, 1),  # Valor por defecto
+            "prevision_1": "OTRO",  # Valor por defecto
+        }
 
     def _crear_episodio(self, datos: Dict, paciente: Paciente):
         """Crea un nuevo episodio para el paciente"""
+        return Episodio.objects.create(**self._datos_episodio(datos, paciente))
+
+    def _datos_episodio(self, datos: Dict, paciente: Paciente) -> Dict:
+        """Campos del episodio a partir de la fila validada"""
         episodio_data = {
             "paciente": paciente,
             "cama": datos["cama_obj"],
@@ -668,8 +851,7 @@ class PacienteEpisodioExcelProcessor(ExcelProcessor):
             "estancia_postquirurgica": None,
             "estancia_norma_grd": None,
         }
-
-        return Episodio.objects.create(**episodio_data)
+        return episodio_data
 
     def _validar_rut(self, rut: str) -> bool:
         """Valida formato de RUT chileno"""
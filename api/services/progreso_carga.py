@@ -0,0 +1,76 @@
+"""
+Reporte de progreso con buffer para el procesamiento de un ArchivoCarga.
+
+Mientras está activo, ArchivoCarga.agregar_error y actualizar_progreso no
+escriben en cada llamada: los contadores y errores se acumulan en memoria y
+se guardan juntos cada `cada_segundos` o cada `cada_filas` filas (los errores
+con un solo bulk_create en errores_carga). Al salir del bloque se guarda lo
+pendiente, también si hubo una excepción.
+
+    with ReporteProgreso(archivo_carga):
+        procesador.procesar_archivo()
+"""
+
+import time
+
+from api.models import ErrorCarga
+
+CADA_FILAS = 1000
+CADA_SEGUNDOS = 2.0
+
+
+class ReporteProgreso:
+    def __init__(
+        self, archivo_carga, cada_filas=CADA_FILAS, cada_segundos=CADA_SEGUNDOS
+    ):
+        self.archivo_carga = archivo_carga
+        self.cada_filas = cada_filas
+        self.cada_segundos = cada_segundos
+        self.escrituras = 0
+        self._campos = set()
+        self._errores = []
+        self._filas = self._filas_guardadas = 0
+        self._ultima = time.monotonic()
+
+    def __enter__(self):
+        self.archivo_carga._reporte = self
+        return self
+
+    def __exit__(self, *exc_info):
+        try:
+            self.flush()
+        finally:
+            self.archivo_carga._reporte = None
+        return False
+
+    def registrar(self, campos=(), errores=(), filas=None, inmediato=False):
+        """
+        Acumula cambios del ArchivoCarga y guarda si se cumplió el presupuesto
+        (o si `inmediato`, p. ej. un cambio de etapa)
+        """
+        self._campos.update(campos)
+        self._errores.extend(errores)
+        if filas is not None:
+            self._filas = filas
+
+        if (
+            inmediato
+            or self._filas - self._filas_guardadas >= self.cada_filas
+            or len(self._errores) >= self.cada_filas
+            or time.monotonic() - self._ultima >= self.cada_segundos
+        ):
+            self.flush()
+
+    def flush(self):
+        """Guarda los errores y campos pendientes"""
+        if self._errores:
+            ErrorCarga.objects.bulk_create(self._errores, batch_size=self.cada_filas)
+        if self._campos:
+            self.archivo_carga.save(update_fields=sorted(self._campos))
+        if self._errores or self._campos:
+            self.escrituras += 1
+
+        self._campos = set()
+        self._errores = []
+        self._filas_guardadas = self._filas
+        self._ultima = time.monotonic()
@@ -0,0 +1,218 @@
+"""
+Caché de respuestas del dashboard, versionada por modelo.
+
+Cada modelo (episodio, gestion, paciente) tiene un número de versión en la
+caché; la clave de una respuesta incluye las versiones de los modelos de los
+que depende, así que subir la versión (señales post_save/post_delete, fin de
+una importación) invalida todas esas respuestas sin tener que buscarlas.
+
+Los misses concurrentes de una misma clave calculan la respuesta una sola vez
+(single-flight): un lock por proceso y un lock en la caché entre procesos.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+# Modelos con versión de caché
+MODELOS_VERSIONADOS = ["episodio", "gestion", "paciente"]
+
+# Segundos máximos que se espera a que otro proceso calcule una respuesta
+SINGLE_FLIGHT_TIMEOUT = 30
+SINGLE_FLIGHT_POLL = 0.05
+
+_MISSING = object()
+_LOCKS = [threading.Lock() for _ in range(64)]
+_pending = threading.local()
+
+
+def _version_key(modelo: str) -> str:
+    return f"cache_version:{modelo}"
+
+
+def model_version(modelo: str) -> int:
+    """
+    Versión actual del modelo. Si no existe (caché nueva o desalojada) parte
+    desde el reloj en ms, para no reutilizar versiones anteriores
+    """
+    key = _version_key(modelo)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_model_versions(*modelos: str) -> None:
+    """Sube la versión de los modelos (invalida sus respuestas cacheadas)"""
+    pendientes = getattr(_pending, "modelos", None)
+    if pendientes is not None:
+        pendientes.update(modelos)
+        return
+
+    for modelo in modelos:
+        try:
+            cache.incr(_version_key(modelo))
+        except ValueError:
+            # La versión no existía: model_version() la crea desde el reloj
+            model_version(modelo)
+
+
+@contextmanager
+def deferred_version_bumps():
+    """
+    Agrupa las subidas de versión del bloque (ej. una importación que guarda
+    miles de filas) en una sola por modelo al salir
+    """
+    if getattr(_pending, "modelos", None) is not None:
+        yield
+        return
+
+    _pending.modelos = set()
+    try:
+        yield
+    finally:
+        modelos, _pending.modelos = _pending.modelos, None
+        if modelos:
+            bump_model_versions(*sorted(modelos))
+
+
+class CacheStats:
+    """Contadores por espacio de nombres: hits, misses y esperas single-flight"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def count(self, namespace: str, key: str) -> None:
+        with self._lock:
+            counts = self._counts.setdefault(
+                namespace, {"hits": 0, "misses": 0, "waits": 0}
+            )
+            counts[key] += 1
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            result = {}
+            for namespace, counts in self._counts.items():
+                total = counts["hits"] + counts["misses"]
+                result[namespace] = {
+                    **counts,
+                    "hit_ratio": round(counts["hits"] / total, 3) if total else None,
+                }
+            return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+stats = CacheStats()
+
+
+def get_or_compute(
+    namespace: str, key: str, compute: Callable[[], Any], timeout: int
+) -> Any:
+    """
+    Valor de `key` en la caché o calculado con `compute` (una sola vez aunque
+    haya misses concurrentes, en este u otros procesos)
+    """
+    value = cache.get(key, _MISSING)
+    if value is not _MISSING:
+        stats.count(namespace, "hits")
+        return value
+
+    with _LOCKS[hash(key) % len(_LOCKS)]:
+        # Otro hilo pudo calcularlo mientras se esperaba el lock
+        value = cache.get(key, _MISSING)
+        if value is not _MISSING:
+            stats.count(namespace, "waits")
+            return value
+
+        lock_key = f"{key}:lock"
+        if not cache.add(lock_key, 1, timeout=SINGLE_FLIGHT_TIMEOUT):
+            # Otro proceso lo está calculando: esperar su resultado
+            deadline = time.monotonic() + SINGLE_FLIGHT_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(SINGLE_FLIGHT_POLL)
+                value = cache.get(key, _MISSING)
+                if value is not _MISSING:
+                    stats.count(namespace, "waits")
+                    return value
+            logger.warning(f"Timeout esperando el cálculo de {key}, se calcula aquí")
+
+        stats.count(namespace, "misses")
+        try:
+            value = compute()
+            cache.set(key, value, timeout=timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+
+class _NoCachear(Exception):
+    """La respuesta no es cacheable (status distinto de 200)"""
+
+    def __init__(self, response):
+        self.response = response
+
+
+def cached_response(
+    namespace: str, modelos: Iterable[str], diario: bool = False, timeout=None
+):
+    """
+    Decorador de acciones de ViewSet: cachea response.data (solo status 200)
+    con clave por ruta, parámetros de la query y versión de `modelos`.
+
+    Args:
+        namespace: nombre de la respuesta en las métricas y la clave
+        modelos: modelos de MODELOS_VERSIONADOS de los que depende
+        diario: incluir la fecha local en la clave (respuestas que dependen de hoy)
+        timeout: segundos de vida (default settings.RESPONSE_CACHE_TIMEOUT)
+    """
+    modelos = list(modelos)
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(viewset, request, *args, **kwargs):
+            versiones = ":".join(str(model_version(m)) for m in modelos)
+            query = "&".join(
+                f"{k}={v}" for k, v in sorted(request.query_params.lists())
+            )
+            partes = [request.path, query, versiones]
+            if diario:
+                partes.append(timezone.localdate().isoformat())
+            digest = hashlib.sha1("|".join(partes).encode()).hexdigest()
+            key = f"response:{namespace}:{digest}"
+
+            def compute():
+                response = func(viewset, request, *args, **kwargs)
+                if response.status_code != 200:
+                    raise _NoCachear(response)
+                return response.data
+
+            try:
+                data = get_or_compute(
+                    namespace,
+                    key,
+                    compute,
+                    timeout if timeout is not None else settings.RESPONSE_CACHE_TIMEOUT,
+                )
+            except _NoCachear as e:
+                return e.response
+            return Response(data)
+
+        return wrapper
+
+    return decorator
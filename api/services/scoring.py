@@ -4,37 +4,42 @@ Pensado para llamarse tras la importación de los Excel.
 """
 
 import pickle
-from pathlib import Path
 
 import joblib
 import pandas as pd
 
-# Ruta base donde se guardan los pickles del modelo.
-_MODELS_DIR = Path(__file__).resolve().parent.parent / "modelo"
+from .model_registry import registry
 
+MODEL_NAME = "modelo.pkl"
+PREPROC_NAME = "preprocessing.pkl"
 
-def load_model(model_name: str = "modelo.pkl"):
-    """Carga y devuelve el modelo entrenado."""
-    model_path = _MODELS_DIR / model_name
-    if not model_path.exists():
-        raise FileNotFoundError(f"No se encontró el modelo en {model_path}")
-    return joblib.load(model_path)
 
-
-def load_preprocessing(preproc_name: str = "preprocessing.pkl"):
-    """Carga y devuelve el metadata de preprocesamiento."""
-    preproc_path = _MODELS_DIR / preproc_name
-    if not preproc_path.exists():
-        raise FileNotFoundError(f"No se encontró el preprocesamiento en {preproc_path}")
-    with open(preproc_path, "rb") as f:
+def _load_pickle(path):
+    with open(path, "rb") as f:
         return pickle.load(f)
 
 
+def load_model(model_name: str = MODEL_NAME):
+    """Devuelve el modelo entrenado (cargado una vez por proceso)."""
+    return registry.get(model_name, joblib.load)
+
+
+def load_preprocessing(preproc_name: str = PREPROC_NAME):
+    """Devuelve el metadata de preprocesamiento (cargado una vez por proceso)."""
+    return registry.get(preproc_name, _load_pickle)
+
+
+def preload_artifacts() -> None:
+    """Carga modelo y preprocessing de antemano (ej. al iniciar la app)."""
+    load_preprocessing()
+    load_model()
+
+
 def score_dataframe(
     df: pd.DataFrame,
     threshold: float | None = None,
-    model_name: str = "modelo.pkl",
-    preproc_name: str = "preprocessing.pkl",
+    model_name: str = MODEL_NAME,
+    preproc_name: str = PREPROC_NAME,
 ):
     """
     Ejecuta inferencia sobre un DataFrame ya preprocesado.
@@ -65,4 +70,4 @@ def score_dataframe(
     return result
 
 
-__all__ = ["load_model", "load_preprocessing", "score_dataframe"]
+__all__ = ["load_model", "load_preprocessing", "preload_artifacts", "score_dataframe"]
@@ -3,14 +3,24 @@ Construye las features del modelo a partir del Excel GRD (excel1) y ejecuta
 scoring usando el modelo/metadata guardados en api/modelo.
 """
 
+import logging
 import re
 
 import numpy as np
 import pandas as pd
+from django.db import connection, transaction
 
 from api.models import Episodio
 
-from .scoring import load_preprocessing, score_dataframe
+from .model_registry import registry
+from .response_cache import bump_model_versions
+from .scoring import PREPROC_NAME, load_preprocessing, score_dataframe
+
+logger = logging.getLogger(__name__)
+
+# Episodios por sentencia UPDATE (3 parámetros por fila, bajo el límite de
+# 32766 variables de SQLite y 65535 de PostgreSQL)
+SCORES_BATCH_SIZE = 10_000
 
 
 def _to_float(series: pd.Series) -> pd.Series:
@@ -46,26 +56,35 @@ def _map_ir_tipo(text: str) -> float:
     return mapping.get(t, -1)
 
 
-def _apply_encoders(features: pd.DataFrame, preproc: dict) -> pd.DataFrame:
-    """Aplica LabelEncoders guardados en preprocessing. Valores no vistos -> -1."""
+def build_encoder_tables(preproc: dict) -> dict:
+    """
+    Tabla de cada LabelEncoder del preprocessing: un Index con sus clases,
+    cuya posición es el código que asigna transform()
+    """
     encoders = preproc.get("encoders") or {}
-    if not encoders:
+    return {col: pd.Index(le.classes_) for col, le in encoders.items()}
+
+
+def _encoder_tables(preproc_name: str = PREPROC_NAME) -> dict:
+    """Tablas de encoders del preprocessing cargado, construidas una vez por carga"""
+    return registry.derived(preproc_name, "encoder_tables", build_encoder_tables)
+
+
+def _apply_encoders(
+    features: pd.DataFrame, preproc: dict, tables: dict | None = None
+) -> pd.DataFrame:
+    """Aplica LabelEncoders guardados en preprocessing. Valores no vistos -> -1."""
+    if tables is None:
+        tables = build_encoder_tables(preproc)
+    if not tables:
         return features
 
     feats = features.copy()
-    for col, le in encoders.items():
+    for col, classes in tables.items():
         if col not in feats.columns:
             continue
-        vals = feats[col].astype(str)
-        known = set(le.classes_)
-        mapped = []
-        for v in vals:
-            if v in known:
-                mapped.append(le.transform([v])[0])
-            else:
-                mapped.append(-1)
-        feats[col] = mapped
-        feats[col] = feats[col].astype(int)
+        # get_indexer devuelve -1 para los valores que no están en las clases
+        feats[col] = classes.get_indexer(feats[col].astype(str)).astype(int)
     return feats
 
 
@@ -172,12 +191,92 @@ def run_scoring_from_grd(df_grd: pd.DataFrame, threshold: float | None = None):
     )
 
     # Aplicar encoders guardados (categóricas -> numéricas)
-    features = _apply_encoders(features_raw, preproc)
+    features = _apply_encoders(features_raw, preproc, _encoder_tables())
 
     scored = score_dataframe(features, threshold=threshold)
     return scored
 
 
+def _scores_frame(episodio_ids: pd.Series, scored: pd.DataFrame) -> pd.DataFrame:
+    """
+    Scores por episodio_cmbd entero: descarta ids no numéricos y, si un
+    episodio se repite, se queda con la última fila (como el dict anterior)
+    """
+    ids = pd.to_numeric(
+        episodio_ids.astype(str).str.strip(), errors="coerce"
+    ).to_numpy()
+    frame = pd.DataFrame(
+        {
+            "episodio_cmbd": ids,
+            "pred": scored["pred_clase"].to_numpy(),
+            "proba": scored["pred_proba"].to_numpy(),
+        }
+    )
+    valid = np.isfinite(ids) & (np.mod(ids, 1) == 0)
+    frame = frame[valid].drop_duplicates("episodio_cmbd", keep="last")
+    frame["episodio_cmbd"] = frame["episodio_cmbd"].astype(np.int64)
+    return frame
+
+
+def write_scores_to_episodios(
+    scores: pd.DataFrame, batch_size: int = SCORES_BATCH_SIZE
+) -> dict:
+    """
+    Escribe prediccion_extension y probabilidad_extension con sentencias
+    UPDATE ... FROM (VALUES ...) por lotes, sin cargar instancias del ORM.
+
+    Args:
+        scores: DataFrame con columnas episodio_cmbd, pred y proba
+        batch_size: episodios por sentencia
+
+    Returns:
+        Contadores: scores, actualizados, positivos y sentencias ejecutadas
+    """
+    quote = connection.ops.quote_name
+    table = quote(Episodio._meta.db_table)
+    key = quote(Episodio._meta.get_field("episodio_cmbd").column)
+    pred_col = quote(Episodio._meta.get_field("prediccion_extension").column)
+    proba_col = quote(Episodio._meta.get_field("probabilidad_extension").column)
+
+    rows = [
+        (
+            int(epi),
+            int(pred),
+            None if proba is None or np.isnan(proba) else float(proba),
+        )
+        for epi, pred, proba in scores[["episodio_cmbd", "pred", "proba"]].itertuples(
+            index=False
+        )
+    ]
+    stats = {
+        "scores": len(rows),
+        "actualizados": 0,
+        "positivos": sum(1 for _, pred, _ in rows if pred == 1),
+        "sentencias": 0,
+    }
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start : start + batch_size]
+            placeholders = ", ".join(["(%s, %s, %s)"] * len(batch))
+            # VALUES nombra sus columnas column1..columnN en PostgreSQL y SQLite
+            cursor.execute(
+                f"UPDATE {table} SET "
+                f"{pred_col} = CAST(v.column2 AS integer), "
+                f"{proba_col} = CAST(v.column3 AS double precision) "
+                f"FROM (VALUES {placeholders}) AS v "
+                f"WHERE {table}.{key} = v.column1",
+                [value for row in batch for value in row],
+            )
+            stats["actualizados"] += max(cursor.rowcount, 0)
+            stats["sentencias"] += 1
+
+    # El UPDATE directo no emite señales: invalidar la caché de respuestas
+    if stats["actualizados"]:
+        bump_model_versions("episodio")
+    return stats
+
+
 def persist_scores_to_episodios(
     df_grd: pd.DataFrame, threshold: float | None = None
 ) -> int:
@@ -197,50 +296,24 @@ def persist_scores_to_episodios(
         raise ValueError("Falta columna de episodio en excel1 para mapear episodios.")
     df_grd = df_grd.rename(columns={epi_col: "episodio_cmbd"})
 
-    print("🔮 Calculando predicción de extensión...")
+    logger.info("🔮 Calculando predicción de extensión...")
 
     scored = run_scoring_from_grd(df_grd, threshold=threshold)
-    episodio_ids = df_grd["episodio_cmbd"].astype(str).tolist()
-
-    preds = dict(zip(episodio_ids, scored["pred_clase"].tolist()))
-    probas = dict(zip(episodio_ids, scored["pred_proba"].tolist()))
-
-    episodios = Episodio.objects.filter(episodio_cmbd__in=episodio_ids)
-    print(
-        "🔗 Episodios en BD a actualizar: "
-        f"{episodios.count()} de {len(episodio_ids)} solicitados"
+    scores = _scores_frame(df_grd["episodio_cmbd"], scored)
+    stats = write_scores_to_episodios(scores)
+
+    logger.info(
+        f"✅ Predicción de extensión: {stats['actualizados']} episodios actualizados "
+        f"de {len(df_grd)} filas ({stats['scores']} episodios válidos, "
+        f"{stats['positivos']} con prediccion_extension=1, "
+        f"{stats['sentencias']} sentencias)"
     )
-    updated = 0
-    positivos = []
-    for ep in episodios:
-        key = str(ep.episodio_cmbd)
-        if key in preds:
-            ep.prediccion_extension = int(preds[key])
-            proba = probas.get(key, None)
-            ep.probabilidad_extension = proba
-            print(
-                f"   → Episodio {key}: pred={ep.prediccion_extension}, "
-                f"proba={proba} (probabilidad guardada en DB)"
-            )
-            if ep.prediccion_extension == 1:
-                positivos.append((key, proba))
-            updated += 1
-    if updated:
-        Episodio.objects.bulk_update(
-            episodios, ["prediccion_extension", "probabilidad_extension"]
-        )
-        print(f"✅ Predicción de extensión actualizada para {updated} episodios")
-        if positivos:
-            print("⚠️  Episodios con prediccion_extension=1:")
-            for key, proba in positivos:
-                print(f"   • Episodio {key}: proba={proba}")
-        else:
-            print("ℹ️  No hay episodios con prediccion_extension=1 en esta corrida.")
-    return updated
+    return stats["actualizados"]
 
 
 __all__ = [
     "build_features_from_grd",
     "run_scoring_from_grd",
     "persist_scores_to_episodios",
+    "write_scores_to_episodios",
 ]
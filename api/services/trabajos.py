@@ -0,0 +1,352 @@
+"""
+Cola de trabajos en segundo plano respaldada por la base de datos.
+
+Las vistas de carga encolan un Trabajo y responden de inmediato; los procesos
+de `manage.py run_workers` los reclaman con SELECT ... FOR UPDATE SKIP LOCKED
+(varios workers nunca toman el mismo), los ejecutan y registran el resultado.
+
+- Un intento fallido vuelve a PENDIENTE con backoff exponencial hasta
+  max_intentos; después queda en ERROR.
+- Mientras corre, el worker actualiza `latido`. Un trabajo en PROCESANDO sin
+  latido reciente (el worker murió o se reinició el deploy) se devuelve a la
+  cola con recuperar_atascados().
+"""
+
+import logging
+import os
+import shutil
+import socket
+import threading
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.management.modules.excel_cache import default_cache_dir
+from api.management.modules.excel_processor import read_excel_file
+from api.models import ArchivoCarga, Trabajo
+from api.services.scoring_runner import persist_scores_to_episodios
+
+logger = logging.getLogger(__name__)
+
+
+class TrabajoNoReintentable(Exception):
+    """Error que no se corrige reintentando (datos inválidos, archivo borrado)"""
+
+
+# tipo -> función(trabajo) que devuelve el resultado (dict serializable)
+HANDLERS = {}
+# tipo -> función(trabajo) que se llama cuando el trabajo termina en ERROR
+AL_FALLAR = {}
+
+
+def handler(tipo, al_fallar=None):
+    """Registra la función que ejecuta los trabajos de un tipo"""
+
+    def decorador(funcion):
+        HANDLERS[tipo] = funcion
+        if al_fallar:
+            AL_FALLAR[tipo] = al_fallar
+        return funcion
+
+    return decorador
+
+
+def worker_id():
+    """Identificador del proceso actual, guardado en los trabajos que toma"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def encolar(tipo, payload=None, archivo=None, usuario=None, trabajo_id=None):
+    """
+    Crea un trabajo PENDIENTE disponible de inmediato. `trabajo_id` permite
+    fijar el id de antemano (p. ej. para nombrar la carpeta de sus archivos)
+    """
+    trabajo = Trabajo.objects.create(
+        id=trabajo_id or uuid.uuid4(),
+        tipo=tipo,
+        payload=payload or {},
+        archivo=archivo,
+        usuario=usuario,
+        max_intentos=settings.TRABAJOS_MAX_INTENTOS,
+    )
+    logger.info(f"Trabajo {trabajo.id} ({tipo}) encolado")
+    return trabajo
+
+
+def reclamar(worker=None):
+    """
+    Toma el próximo trabajo disponible y lo pasa a PROCESANDO, o None si no
+    hay. SKIP LOCKED hace que workers concurrentes salten las filas que otro
+    ya está reclamando en vez de esperarlas; el update condicionado al estado
+    cubre las bases sin FOR UPDATE (SQLite serializa las escrituras).
+    """
+    worker = worker or worker_id()
+    ahora = timezone.now()
+    with transaction.atomic():
+        trabajo = (
+            Trabajo.objects.select_for_update(skip_locked=True)
+            .filter(estado="PENDIENTE", disponible_desde__lte=ahora)
+            .order_by("disponible_desde")
+            .first()
+        )
+        if trabajo is None:
+            return None
+
+        cambios = {
+            "estado": "PROCESANDO",
+            "intentos": trabajo.intentos + 1,
+            "worker": worker,
+            "latido": ahora,
+            "iniciado_en": ahora,
+            "error": "",
+        }
+        tomado = Trabajo.objects.filter(pk=trabajo.pk, estado="PENDIENTE").update(
+            **cambios
+        )
+        if not tomado:
+            return None
+
+    for campo, valor in cambios.items():
+        setattr(trabajo, campo, valor)
+    return trabajo
+
+
+def _latidos(trabajo, detener):
+    """Actualiza el latido del trabajo hasta que termine (hilo aparte)"""
+    try:
+        while not detener.wait(settings.TRABAJOS_LATIDO_SEGUNDOS):
+            Trabajo.objects.filter(
+                pk=trabajo.pk, estado="PROCESANDO", worker=trabajo.worker
+            ).update(latido=timezone.now())
+    except Exception as e:
+        logger.warning(f"No se pudo registrar el latido de {trabajo.id}: {e}")
+    finally:
+        connection.close()
+
+
+def _backoff(intentos):
+    return timedelta(seconds=settings.TRABAJOS_BACKOFF_SEGUNDOS * 2 ** (intentos - 1))
+
+
+def _fallar(trabajo):
+    """Hook del tipo para un trabajo que quedó en ERROR definitivo"""
+    al_fallar = AL_FALLAR.get(trabajo.tipo)
+    if al_fallar is None:
+        return
+    try:
+        al_fallar(trabajo)
+    except Exception as e:
+        logger.error(f"Error en al_fallar de {trabajo.id}: {e}", exc_info=True)
+
+
+def ejecutar(trabajo):
+    """
+    Corre un trabajo ya reclamado y deja el estado final. Devuelve el estado.
+    Las actualizaciones se condicionan al worker para no pisar un trabajo
+    que se dio por atascado y ya tomó otro proceso.
+    """
+    pendiente = Trabajo.objects.filter(
+        pk=trabajo.pk, estado="PROCESANDO", worker=trabajo.worker
+    )
+    detener = threading.Event()
+    latido = threading.Thread(target=_latidos, args=(trabajo, detener), daemon=True)
+    latido.start()
+    try:
+        funcion = HANDLERS.get(trabajo.tipo)
+        if funcion is None:
+            raise TrabajoNoReintentable(f"Tipo de trabajo desconocido: {trabajo.tipo}")
+        resultado = funcion(trabajo)
+    except Exception as e:
+        reintentar = (
+            not isinstance(e, TrabajoNoReintentable)
+            and trabajo.intentos < trabajo.max_intentos
+        )
+        trabajo.error = traceback.format_exc()
+        if reintentar:
+            trabajo.estado = "PENDIENTE"
+            trabajo.disponible_desde = timezone.now() + _backoff(trabajo.intentos)
+            logger.warning(
+                f"Trabajo {trabajo.id} falló (intento {trabajo.intentos}/"
+                f"{trabajo.max_intentos}), se reintenta desde "
+                f"{trabajo.disponible_desde}: {e}"
+            )
+            pendiente.update(
+                estado=trabajo.estado,
+                disponible_desde=trabajo.disponible_desde,
+                error=trabajo.error,
+                worker="",
+            )
+        else:
+            trabajo.estado = "ERROR"
+            trabajo.terminado_en = timezone.now()
+            logger.error(f"Trabajo {trabajo.id} falló definitivamente: {e}")
+            if pendiente.update(
+                estado=trabajo.estado,
+                terminado_en=trabajo.terminado_en,
+                error=trabajo.error,
+            ):
+                _fallar(trabajo)
+    else:
+        trabajo.estado = "COMPLETADO"
+        trabajo.resultado = resultado or {}
+        trabajo.terminado_en = timezone.now()
+        pendiente.update(
+            estado=trabajo.estado,
+            resultado=trabajo.resultado,
+            terminado_en=trabajo.terminado_en,
+        )
+        logger.info(f"Trabajo {trabajo.id} completado")
+    finally:
+        detener.set()
+        latido.join()
+    return trabajo.estado
+
+
+def recuperar_atascados(timeout=None):
+    """
+    Devuelve a la cola los trabajos en PROCESANDO sin latido en `timeout`
+    segundos (su worker murió); si ya agotaron los intentos quedan en ERROR.
+    Devuelve cuántos se recuperaron.
+    """
+    timeout = timeout or settings.TRABAJOS_TIMEOUT_ATASCADO
+    limite = timezone.now() - timedelta(seconds=timeout)
+    recuperados = 0
+    atascados = Trabajo.objects.filter(estado="PROCESANDO", latido__lt=limite)
+    for trabajo in atascados:
+        mismo = Trabajo.objects.filter(
+            pk=trabajo.pk, estado="PROCESANDO", worker=trabajo.worker
+        )
+        mensaje = f"Worker {trabajo.worker} sin latido desde {trabajo.latido}"
+        if trabajo.intentos < trabajo.max_intentos:
+            if mismo.update(
+                estado="PENDIENTE",
+                disponible_desde=timezone.now(),
+                error=mensaje,
+                worker="",
+            ):
+                if trabajo.archivo_id:
+                    ArchivoCarga.objects.filter(
+                        pk=trabajo.archivo_id, estado="PROCESANDO"
+                    ).update(estado="SUBIDO")
+                recuperados += 1
+                logger.warning(f"Trabajo {trabajo.id} atascado, vuelve a la cola")
+        elif mismo.update(estado="ERROR", terminado_en=timezone.now(), error=mensaje):
+            trabajo.error = mensaje
+            _fallar(trabajo)
+            logger.error(f"Trabajo {trabajo.id} atascado sin intentos restantes")
+    return recuperados
+
+
+def procesar_pendientes(worker=None, limite=None):
+    """Ejecuta trabajos hasta vaciar la cola (o `limite`). Devuelve cuántos"""
+    procesados = 0
+    while limite is None or procesados < limite:
+        trabajo = reclamar(worker)
+        if trabajo is None:
+            break
+        ejecutar(trabajo)
+        procesados += 1
+    return procesados
+
+
+# ============================================
+# Handlers
+# ============================================
+
+
+def _archivo_en_error(trabajo):
+    ArchivoCarga.objects.filter(pk=trabajo.archivo_id).exclude(
+        estado__in=["COMPLETADO", "PARCIAL"]
+    ).update(estado="ERROR")
+    archivo = ArchivoCarga.objects.filter(pk=trabajo.archivo_id).first()
+    if archivo:
+        archivo.agregar_error(
+            0, f"Error crítico durante procesamiento: {trabajo.error.strip()}"
+        )
+
+
+@handler("procesar_archivo", al_fallar=_archivo_en_error)
+def procesar_archivo(trabajo):
+    """Procesa un ArchivoCarga con el procesador de su tipo"""
+    from api.views.archivo_views import obtener_procesador
+
+    tipo = trabajo.payload["tipo"]
+    try:
+        archivo_carga = ArchivoCarga.objects.get(id=trabajo.archivo_id)
+    except ArchivoCarga.DoesNotExist:
+        raise TrabajoNoReintentable(f"Archivo con ID {trabajo.archivo_id} no existe")
+    logger.info(f"Iniciando procesamiento de archivo {archivo_carga.id} tipo {tipo}")
+
+    procesador_class = obtener_procesador(tipo)
+    if not procesador_class:
+        raise TrabajoNoReintentable(f"Tipo de procesador no válido: {tipo}")
+
+    # Cambiar estado a PROCESANDO antes de comenzar
+    archivo_carga.estado = "PROCESANDO"
+    archivo_carga.fecha_procesamiento = timezone.now()
+    archivo_carga.save(update_fields=["estado", "fecha_procesamiento"])
+
+    # El procesador registra los errores de filas en el ArchivoCarga
+    resultado = procesador_class(archivo_carga).procesar_archivo()
+    logger.info(
+        f"Procesamiento completado para archivo {archivo_carga.id}: "
+        f"{resultado.get('estado')}"
+    )
+    return {
+        "estado": resultado.get("estado"),
+        "filas_procesadas": resultado.get("filas_procesadas"),
+        "filas_error": resultado.get("filas_error"),
+    }
+
+
+# Carpeta (en MEDIA_ROOT, compartida entre web y workers) de cada importación
+CARPETA_IMPORTACIONES = "uploads/importaciones"
+
+
+def carpeta_importacion(trabajo_id):
+    return f"{CARPETA_IMPORTACIONES}/{trabajo_id}"
+
+
+def _limpiar_importacion(trabajo):
+    carpeta = default_storage.path(carpeta_importacion(trabajo.id))
+    try:
+        shutil.rmtree(carpeta)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"No se pudo limpiar directorio {carpeta}: {str(e)}")
+
+
+@handler("importar_excel", al_fallar=_limpiar_importacion)
+def importar_excel(trabajo):
+    """Importa los 4 Excel subidos juntos y calcula los scores desde excel1"""
+    carpeta = default_storage.path(carpeta_importacion(trabajo.id))
+    if not os.path.isdir(carpeta):
+        raise TrabajoNoReintentable(f"No existen los archivos en {carpeta}")
+
+    call_command("importar_excel_local", folder=carpeta, bulk=True, verbosity=2)
+
+    # Scoring (predicciones ML); un error aquí no invalida la importación
+    actualizados = None
+    try:
+        # Ya parseado por importar_excel_local: se lee desde la caché
+        df_grd, _, _ = read_excel_file(
+            os.path.join(carpeta, "excel1.xlsx"), cache_dir=default_cache_dir()
+        )
+        logger.info("🔮 Iniciando scoring desde excel1 (GRD)")
+        actualizados = persist_scores_to_episodios(df_grd=df_grd)
+        logger.info("✅ Scoring ejecutado. Episodios actualizados: %s", actualizados)
+    except Exception as scoring_err:
+        logger.error(f"Error en scoring: {scoring_err}")
+
+    _limpiar_importacion(trabajo)
+    return {
+        "files_processed": trabajo.payload.get("files", []),
+        "episodios_scoreados": actualizados,
+    }
@@ -0,0 +1,33 @@
+"""
+Señales de la app: invalidan la caché de respuestas al cambiar los modelos y
+publican el progreso de las cargas de Excel
+"""
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.models import ArchivoCarga, Episodio, Gestion, Paciente
+from api.services.eventos_carga import publicar
+from api.services.response_cache import bump_model_versions
+
+MODELOS_CACHE = {Episodio: "episodio", Gestion: "gestion", Paciente: "paciente"}
+
+
+@receiver(post_save, sender=Episodio)
+@receiver(post_save, sender=Gestion)
+@receiver(post_save, sender=Paciente)
+@receiver(post_delete, sender=Episodio)
+@receiver(post_delete, sender=Gestion)
+@receiver(post_delete, sender=Paciente)
+def invalidar_cache_respuestas(sender, **kwargs):
+    # Al confirmar: antes, otra petición podría cachear las filas previas al
+    # commit bajo la versión nueva. Dentro de deferred_version_bumps el
+    # callback se suma a la subida agrupada
+    modelo = MODELOS_CACHE[sender]
+    transaction.on_commit(lambda: bump_model_versions(modelo))
+
+
+@receiver(post_save, sender=ArchivoCarga)
+def publicar_progreso_carga(sender, instance, **kwargs):
+    publicar(instance)
@@ -1,13 +1,22 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.urls import reverse
 from rest_framework.test import APITestCase
 
+from api.services.response_cache import stats as cache_stats
+
 User = get_user_model()
 
 
 class AuthenticatedAPITestCase(APITestCase):
     """Clase base para tests autenticados con el usuario admin base"""
 
+    def _pre_setup(self):
+        super()._pre_setup()
+        # La caché no se revierte con la transacción de cada test
+        cache.clear()
+        cache_stats.clear()
+
     def authenticate_admin(self):
         """Crea (si no existe) y autentica al usuario admin base"""
         # Crear usuario admin en la BD de test
@@ -0,0 +1,126 @@
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+from api.management.modules.date_parser import DateParser
+from api.management.modules.excel_processor import ExcelProcessor
+
+
+@pytest.fixture
+def parser():
+    return DateParser()
+
+
+class TestDateParserValue:
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            ("2024-10-26 15:30:00", datetime(2024, 10, 26, 15, 30)),
+            ("26/10/2024", datetime(2024, 10, 26)),
+            ("10/26/2024", datetime(2024, 10, 26)),
+            ("01/02/2024", datetime(2024, 2, 1)),  # prioridad: día primero
+            ("2024-10-26T15:30:00", datetime(2024, 10, 26, 15, 30)),  # pandas
+            (date(2024, 1, 5), datetime(2024, 1, 5)),
+            ("  ", None),
+            ("garbage", None),
+            (None, None),
+        ],
+    )
+    def test_parse_value(self, parser, value, expected):
+        assert parser.parse_value(value) == expected
+
+
+class TestDateParserColumn:
+    def test_formato_ganador_se_aplica_a_toda_la_columna(self, parser):
+        values = pd.Series(["12/13/2023", "12/31/2023", "01/02/2024"], name="fecha")
+
+        result = parser.parse_strings(values)
+
+        assert parser.column_formats == {"fecha": "%m/%d/%Y"}
+        # El valor ambiguo se lee con el formato de la columna
+        assert list(result) == [
+            datetime(2023, 12, 13),
+            datetime(2023, 12, 31),
+            datetime(2024, 1, 2),
+        ]
+
+    def test_outliers_y_vacios(self, parser):
+        values = pd.Series(
+            [
+                "26/10/2024",
+                " 27/10/2024 ",
+                "2024-10-28",
+                "2024-10-29T08:00:00",
+                "x",
+                "",
+            ],
+            index=[5, 5, 6, 7, 8, 9],
+            name="fecha",
+        )
+
+        result = parser.parse_strings(values)
+
+        assert list(result.index) == [5, 5, 6, 7, 8, 9]
+        assert list(result) == [
+            datetime(2024, 10, 26),
+            datetime(2024, 10, 27),
+            datetime(2024, 10, 28),
+            datetime(2024, 10, 29, 8),
+            None,
+            None,
+        ]
+
+    def test_formato_se_recuerda_por_columna(self, parser, monkeypatch):
+        parser.parse_strings(pd.Series(["26/10/2024"], name="fecha"))
+
+        def falla(values):
+            raise AssertionError("no debería volver a inferir")
+
+        monkeypatch.setattr(parser, "infer_format", falla)
+        result = parser.parse_strings(pd.Series(["05/11/2024"], name="fecha"))
+
+        assert result.iloc[0] == datetime(2024, 11, 5)
+
+    def test_equivale_a_parse_value_sin_ambiguedad(self, parser):
+        values = pd.Series(
+            ["2024-01-31", "31/01/2024 10:15", "1/2/2024", "31.01.2024", "xx"] * 3
+        )
+
+        result = parser.parse_strings(values)
+
+        assert list(result) == [parser.parse_value(v) for v in values]
+
+
+def test_fecha_finalizacion_traslado_column():
+    df = pd.DataFrame(
+        {
+            "Fecha de Finalización": [
+                "12/13/2023",
+                "12/13/2023",
+                "2023-12-14",
+                None,
+                "nan",
+                "garbage",
+            ],
+            "Hora de Finalización": [
+                "1:41:00 PM",
+                "13:41",
+                None,
+                "1:41 PM",
+                None,
+                "1 PM",
+            ],
+        }
+    )
+
+    result = ExcelProcessor()._fecha_finalizacion_traslado_column(df)
+
+    assert list(result) == [
+        "2023-12-13T13:41:00",
+        "2023-12-13T13:41:00",
+        "2023-12-14",
+        "",
+        "",
+        "",
+    ]
@@ -0,0 +1,219 @@
+from datetime import datetime, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api.management.modules.db_importer import DatabaseImporter
+from api.models import Cama, Episodio, EpisodioServicio, Gestion, Paciente, Servicio
+
+
+def _mapped_data(ingreso):
+    return {
+        "pacientes": [
+            {
+                "rut": "12.345.678-9",
+                "nombre": "Paciente Uno",
+                "sexo": "O",
+                "fecha_nacimiento": datetime(1990, 1, 1),
+                "prevision_1": "OTRO",
+                "episodio_cmbd": 1,
+            },
+            {
+                "rut": "98.765.432-1",
+                "nombre": "Paciente Dos",
+                "sexo": "M",
+                "fecha_nacimiento": datetime(1980, 5, 5),
+                "prevision_1": "ISAPRE",
+                "episodio_cmbd": 2,
+            },
+            # Fila repetida: se fusiona con la anterior del mismo RUT
+            {
+                "rut": "12.345.678-9",
+                "nombre": "Paciente Uno",
+                "sexo": "F",
+                "fecha_nacimiento": datetime(1990, 1, 1),
+                "prevision_1": "FONASA",
+                "score_social": 7,
+                "episodio_cmbd": 3,
+            },
+            {"nombre": "Sin RUT", "episodio_cmbd": 4},
+        ],
+        "camas": [
+            {"codigo_cama": "CAMA-001", "habitacion": "HAB-101"},
+            {"codigo_cama": "CAMA-002", "habitacion": ""},
+            {"codigo_cama": "CAMA-001", "habitacion": "HAB-102"},
+            {"habitacion": "HAB-999"},
+        ],
+        "episodios": [
+            {
+                "episodio_cmbd": 1,
+                "codigo_cama": "CAMA-001",
+                "fecha_ingreso": ingreso,
+                "tipo_actividad": "Hospitalización",
+                "servicios": [
+                    {"codigo": "MED", "tipo": "INGRESO", "fecha": ingreso},
+                    {"codigo": "MED", "tipo": "INGRESO", "fecha": ingreso},
+                    {"codigo": "NOEXISTE", "tipo": "TRASLADO"},
+                ],
+            },
+            {
+                "episodio_cmbd": 2,
+                "codigo_cama": "CAMA-002",
+                "fecha_ingreso": ingreso,
+                "fecha_egreso": ingreso + timedelta(days=3),
+            },
+            # Misma cama que el episodio 1, activo: conflicto
+            {"episodio_cmbd": 3, "codigo_cama": "CAMA-001", "fecha_ingreso": ingreso},
+            {"episodio_cmbd": 99, "fecha_ingreso": ingreso},
+        ],
+        "gestiones": [
+            {"episodio_cmbd": 1, "tipo_gestion": "ALTA", "fecha_inicio": ingreso},
+            {"episodio_cmbd": 2, "tipo_gestion": "ALTA", "fecha_inicio": ingreso},
+            {"episodio_cmbd": 404, "tipo_gestion": "ALTA", "fecha_inicio": ingreso},
+        ],
+    }
+
+
+class DatabaseImporterBulkTest(TestCase):
+    """Tests del modo bulk de DatabaseImporter"""
+
+    def setUp(self):
+        self.ingreso = timezone.now() - timedelta(days=5)
+        Servicio.objects.create(codigo="MED", descripcion="Medicina")
+
+    def _snapshot(self):
+        pacientes = {
+            p.rut: (p.nombre, p.sexo, p.prevision_1, p.score_social)
+            for p in Paciente.objects.all()
+        }
+        camas = sorted(Cama.objects.values_list("codigo_cama", "habitacion"))
+        episodios = sorted(
+            Episodio.objects.values_list(
+                "episodio_cmbd", "paciente__rut", "cama__codigo_cama", "fecha_egreso"
+            )
+        )
+        servicios = sorted(
+            EpisodioServicio.objects.values_list(
+                "episodio__episodio_cmbd", "servicio__codigo", "tipo"
+            )
+        )
+        gestiones = sorted(Gestion.objects.values_list("episodio__episodio_cmbd"))
+        return pacientes, camas, episodios, servicios, gestiones
+
+    def _run(self, importer):
+        return importer.import_all_data(_mapped_data(self.ingreso))
+
+    def test_bulk_equivale_a_fila_a_fila(self):
+        """El modo bulk debe dejar la misma BD y los mismos contadores"""
+        fila = DatabaseImporter()
+        result_fila = self._run(fila)
+        snapshot_fila = self._snapshot()
+
+        for model in (Gestion, EpisodioServicio, Episodio, Cama, Paciente):
+            model.objects.all().delete()
+
+        bulk = DatabaseImporter(bulk=True, chunk_size=2)
+        result_bulk = self._run(bulk)
+
+        self.assertEqual(result_bulk["details"], result_fila["details"])
+        self.assertEqual(result_bulk["summary"], result_fila["summary"])
+        self.assertEqual(self._snapshot(), snapshot_fila)
+        self.assertEqual(
+            [e for e in bulk.error_details if "Datos del" not in e],
+            [e for e in fila.error_details if "Datos del" not in e],
+        )
+
+    def test_reglas_de_fusion_en_bulk(self):
+        """Solo se sobreescriben los campos vacíos o 'OTRO'"""
+        Paciente.objects.create(
+            rut="12.345.678-9",
+            nombre="Paciente Uno",
+            sexo="M",
+            fecha_nacimiento=datetime(1990, 1, 1),
+            prevision_1="ISAPRE",
+            score_social=3,
+        )
+        otro = Paciente.objects.create(
+            rut="11.111.111-1",
+            nombre="Paciente Otro",
+            sexo="O",
+            fecha_nacimiento=datetime(1970, 1, 1),
+            prevision_1="OTRO",
+        )
+        episodio = Episodio.objects.create(
+            episodio_cmbd=10,
+            paciente=otro,
+            fecha_ingreso=self.ingreso,
+            fecha_egreso=self.ingreso + timedelta(days=1),
+        )
+
+        importer = DatabaseImporter(bulk=True)
+        importer.import_all_data(
+            {
+                "pacientes": [
+                    {
+                        "rut": "12.345.678-9",
+                        "nombre": "Paciente Uno",
+                        "sexo": "F",
+                        "prevision_1": "FONASA",
+                        "score_social": 9,
+                    },
+                    {"rut": "11.111.111-1", "prevision_1": "FONASA", "sexo": "F"},
+                ],
+                "episodios": [
+                    {
+                        "episodio_cmbd": 10,
+                        "fecha_ingreso": self.ingreso,
+                        "fecha_egreso": self.ingreso + timedelta(days=9),
+                    }
+                ],
+            }
+        )
+
+        uno = Paciente.objects.get(rut="12.345.678-9")
+        self.assertEqual(uno.prevision_1, "ISAPRE")
+        self.assertEqual(uno.sexo, "M")
+        self.assertEqual(uno.score_social, 3)
+
+        otro.refresh_from_db()
+        self.assertEqual(otro.prevision_1, "FONASA")
+        self.assertEqual(otro.sexo, "F")
+
+        episodio.refresh_from_db()
+        self.assertEqual(episodio.fecha_egreso, self.ingreso + timedelta(days=1))
+        self.assertEqual(importer.results["pacientes"]["updated"], 1)
+        self.assertEqual(importer.results["episodios"]["updated"], 0)
+
+    def test_conflicto_de_cama_con_episodio_existente(self):
+        """Una cama con episodio activo en BD no se asigna a otro episodio"""
+        paciente = Paciente.objects.create(
+            rut="12.345.678-9",
+            nombre="Paciente Uno",
+            sexo="F",
+            fecha_nacimiento=datetime(1990, 1, 1),
+        )
+        cama = Cama.objects.create(codigo_cama="CAMA-001", habitacion="HAB-101")
+        Episodio.objects.create(
+            episodio_cmbd=1, paciente=paciente, cama=cama, fecha_ingreso=self.ingreso
+        )
+
+        importer = DatabaseImporter(bulk=True)
+        importer.import_all_data(
+            {
+                "episodios": [
+                    {
+                        "episodio_cmbd": 2,
+                        "rut_paciente": "12.345.678-9",
+                        "codigo_cama": "CAMA-001",
+                        "fecha_ingreso": self.ingreso,
+                    }
+                ]
+            }
+        )
+
+        self.assertEqual(Episodio.objects.count(), 1)
+        self.assertEqual(importer.results["episodios"]["errors"], 1)
+        self.assertIn(
+            "La cama CAMA-001 ya está asignada a otro episodio activo.",
+            importer.error_details[0],
+        )
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from api.management.modules.db_importer import DatabaseImporter
+from api.models import Cama, Episodio, Gestion, Paciente, Servicio
+
+User = get_user_model()
+
+
+class ImportLookupCacheTest(TestCase):
+    """Tests de la caché de búsquedas del importador"""
+
+    def setUp(self):
+        self.importer = DatabaseImporter()
+
+        self.paciente = Paciente.objects.create(
+            rut="12.345.678-9",
+            nombre="Paciente Test",
+            sexo="F",
+            fecha_nacimiento=datetime(1990, 1, 1),
+        )
+        self.cama = Cama.objects.create(codigo_cama="CAMA-001", habitacion="HAB-101")
+        self.episodio = Episodio.objects.create(
+            episodio_cmbd=1,
+            paciente=self.paciente,
+            cama=self.cama,
+            fecha_ingreso=timezone.now() - timedelta(days=5),
+        )
+        self.usuario = User.objects.create_user(
+            email="usuario@test.com", password="password123"
+        )
+        Servicio.objects.create(codigo="MED", descripcion="Medicina")
+
+    def test_tablas_de_referencia_se_precargan_una_vez(self):
+        """Servicios, usuarios y camas se consultan una sola vez"""
+        with self.assertNumQueries(3):
+            for _ in range(5):
+                self.assertIsNotNone(self.importer._find_servicio_by_codigo("MED"))
+                self.assertIsNotNone(self.importer._find_usuario("usuario@test.com"))
+                self.assertEqual(
+                    self.importer._find_cama(
+                        {"codigo_cama": "CAMA-001", "habitacion": "HAB-101"}
+                    ),
+                    self.cama,
+                )
+            self.assertIsNone(self.importer._find_servicio_by_codigo("NOEXISTE"))
+
+        stats = self.importer.lookups.summary()
+        self.assertEqual(stats["servicios"], {"hits": 5, "misses": 1})
+        self.assertEqual(stats["usuarios"], {"hits": 5, "misses": 0})
+        self.assertEqual(stats["camas"], {"hits": 5, "misses": 0})
+
+    def test_episodios_se_reutilizan_y_aparecen_en_resumen(self):
+        """Las gestiones del mismo episodio no repiten la búsqueda"""
+        gestiones_data = [
+            {
+                "episodio_cmbd": 1,
+                "tipo_gestion": "CONTROL",
+                "estado_gestion": "INICIADA",
+                "fecha_inicio": timezone.now(),
+                "usuario_email": "usuario@test.com",
+            }
+            for _ in range(3)
+        ]
+
+        result = self.importer.import_all_data({"gestiones": gestiones_data})
+
+        self.assertEqual(Gestion.objects.count(), 3)
+        self.assertEqual(result["cache"]["episodios"], {"hits": 2, "misses": 1})
+        self.assertEqual(result["cache"]["usuarios"], {"hits": 3, "misses": 0})
+
+    def test_cama_creada_en_la_importacion_se_registra(self):
+        """Una cama creada después de la precarga también se resuelve"""
+        self.importer._find_cama({"codigo_cama": "CAMA-001"})
+        self.importer._import_camas([{"codigo_cama": "CAMA-002", "habitacion": "H2"}])
+
+        cama = self.importer._find_cama({"codigo_cama": "CAMA-002"})
+
+        self.assertIsNotNone(cama)
+        self.assertEqual(cama.habitacion, "H2")
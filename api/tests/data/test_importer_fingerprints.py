@@ -0,0 +1,222 @@
+import copy
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.management.modules.db_importer import DatabaseImporter
+from api.management.modules.fingerprints import FingerprintFilter, fingerprint
+from api.models import Episodio, Gestion, HuellaEpisodio, Paciente
+
+
+def _mapped_data(ingreso, n=20):
+    return {
+        "pacientes": [
+            {
+                "rut": f"{10_000_000 + i}-{i % 10}",
+                "nombre": f"Paciente {i}",
+                "sexo": "F",
+                "fecha_nacimiento": datetime(1980, 1, 1),
+                "prevision_1": "FONASA",
+            }
+            for i in range(n)
+        ],
+        "camas": [
+            {"codigo_cama": f"CAMA-{i}", "habitacion": f"HAB-{i}"} for i in range(n)
+        ],
+        "episodios": [
+            {
+                "episodio_cmbd": i + 1,
+                "rut_paciente": f"{10_000_000 + i}-{i % 10}",
+                "codigo_cama": f"CAMA-{i}",
+                "fecha_ingreso": ingreso,
+                "tipo_actividad": "Hospitalización",
+                "servicios": [],
+            }
+            for i in range(n)
+        ],
+        "gestiones": [
+            {"episodio_cmbd": i + 1, "tipo_gestion": "ALTA", "fecha_inicio": ingreso}
+            for i in range(n)
+        ],
+    }
+
+
+def _importar(mapped_data):
+    """Filtra, importa y guarda huellas como el comando importar_excel_local"""
+    filtro = FingerprintFilter()
+    filtrado = filtro.filter_changed(copy.deepcopy(mapped_data))
+    with CaptureQueriesContext(connection) as queries:
+        results = DatabaseImporter(bulk=True).import_all_data(filtrado)
+    if results["success"]:
+        filtro.save(results["succeeded_episodios"])
+    return filtro, filtrado, len(queries)
+
+
+class FingerprintTest(TestCase):
+    def test_huella_estable_ante_tipos_y_orden_de_claves(self):
+        ingreso = datetime(2024, 1, 1, 8, 30)
+        a = {"cmbd": np.int64(1), "egreso": pd.NaT, "ingreso": pd.Timestamp(ingreso)}
+        b = {"ingreso": ingreso, "egreso": None, "cmbd": 1}
+
+        self.assertEqual(fingerprint(a), fingerprint(b))
+        self.assertNotEqual(fingerprint(a), fingerprint({**b, "cmbd": 2}))
+
+
+class ImportacionIncrementalTest(TestCase):
+    """Solo los episodios nuevos o con cambios llegan a la base"""
+
+    def setUp(self):
+        self.ingreso = timezone.now() - timedelta(days=5)
+        self.datos = _mapped_data(self.ingreso)
+
+    def test_reimportar_sin_cambios_no_envia_nada(self):
+        primero, _, queries_completa = _importar(self.datos)
+        self.assertEqual((primero.sent, primero.skipped), (20, 0))
+        self.assertEqual(HuellaEpisodio.objects.count(), 20)
+
+        segundo, filtrado, queries_delta = _importar(self.datos)
+
+        self.assertEqual((segundo.sent, segundo.skipped), (0, 20))
+        self.assertEqual(
+            {k: len(v) for k, v in filtrado.items()},
+            {"pacientes": 0, "camas": 0, "episodios": 0, "gestiones": 0},
+        )
+        self.assertLess(queries_delta, queries_completa / 4)
+        # Las gestiones no se duplican al reimportar
+        self.assertEqual(Gestion.objects.count(), 20)
+
+    def test_solo_se_envian_los_episodios_que_cambiaron(self):
+        _importar(self.datos)
+
+        datos = copy.deepcopy(self.datos)
+        datos["pacientes"][3]["nombre"] = "Paciente Renombrado"
+        datos["gestiones"].append(
+            {
+                "episodio_cmbd": 8,
+                "tipo_gestion": "TRASLADO",
+                "fecha_inicio": self.ingreso,
+            }
+        )
+        datos["episodios"].append(
+            {
+                "episodio_cmbd": 100,
+                "rut_paciente": datos["pacientes"][0]["rut"],
+                "fecha_ingreso": self.ingreso,
+            }
+        )
+
+        filtro, filtrado, _ = _importar(datos)
+
+        self.assertEqual(filtro.skipped, 18)
+        self.assertEqual(
+            sorted(e["episodio_cmbd"] for e in filtrado["episodios"]), [4, 8, 100]
+        )
+        # El episodio 1 no cambió, pero su paciente también cuelga del 100
+        self.assertEqual(
+            sorted(p["rut"] for p in filtrado["pacientes"]),
+            sorted(datos["pacientes"][i]["rut"] for i in (0, 3, 7)),
+        )
+        self.assertEqual(
+            Paciente.objects.get(rut=datos["pacientes"][3]["rut"]).nombre,
+            "Paciente Renombrado",
+        )
+        self.assertTrue(Episodio.objects.filter(episodio_cmbd=100).exists())
+
+    def test_episodio_borrado_o_fallido_se_vuelve_a_enviar(self):
+        _importar(self.datos)
+        Episodio.objects.filter(episodio_cmbd=5).delete()
+
+        filtro, filtrado, _ = _importar(self.datos)
+
+        self.assertEqual([e["episodio_cmbd"] for e in filtrado["episodios"]], [5])
+        self.assertTrue(Episodio.objects.filter(episodio_cmbd=5).exists())
+
+        # Sin huella guardada si el episodio no quedó en la base
+        HuellaEpisodio.objects.all().delete()
+        datos = copy.deepcopy(self.datos)
+        datos["episodios"][0]["rut_paciente"] = None
+        datos["episodios"][0]["episodio_cmbd"] = 500
+        _importar(datos)
+        self.assertFalse(HuellaEpisodio.objects.filter(episodio_cmbd=500).exists())
+
+    def test_actualizacion_fallida_se_reintenta(self):
+        _importar(self.datos)
+        datos = copy.deepcopy(self.datos)
+        egreso = self.ingreso + timedelta(days=2)
+        datos["episodios"][3]["fecha_egreso"] = egreso
+        datos["gestiones"].append(
+            {
+                "episodio_cmbd": 8,
+                "tipo_gestion": "TRASLADO",
+                "fecha_inicio": self.ingreso,
+            }
+        )
+
+        merge = DatabaseImporter._merge_episodio
+        gestion_fields = DatabaseImporter._gestion_fields
+
+        def merge_que_falla(importer, episodio, episodio_data, cama):
+            if episodio.episodio_cmbd == 4:
+                raise ValueError("falla la actualización")
+            return merge(importer, episodio, episodio_data, cama)
+
+        def gestion_que_falla(importer, gestion_data, episodio, usuario):
+            if gestion_data["tipo_gestion"] == "TRASLADO":
+                raise ValueError("falla la gestión")
+            return gestion_fields(importer, gestion_data, episodio, usuario)
+
+        with patch.object(
+            DatabaseImporter, "_merge_episodio", merge_que_falla
+        ), patch.object(DatabaseImporter, "_gestion_fields", gestion_que_falla):
+            filtro, filtrado, _ = _importar(datos)
+
+        self.assertEqual(filtro.sent, 2)
+        # Los episodios siguen en la base, pero sin la huella nueva
+        self.assertIsNone(Episodio.objects.get(episodio_cmbd=4).fecha_egreso)
+        self.assertFalse(Gestion.objects.filter(tipo_gestion="TRASLADO").exists())
+
+        filtro, filtrado, _ = _importar(datos)
+
+        self.assertEqual(
+            sorted(e["episodio_cmbd"] for e in filtrado["episodios"]), [4, 8]
+        )
+        self.assertEqual(Episodio.objects.get(episodio_cmbd=4).fecha_egreso, egreso)
+        self.assertTrue(Gestion.objects.filter(tipo_gestion="TRASLADO").exists())
+
+        # Ya importados: la siguiente corrida no los envía
+        filtro, _, _ = _importar(datos)
+        self.assertEqual(filtro.sent, 0)
+
+    def test_importacion_revertida_no_guarda_huellas(self):
+        with patch.object(
+            DatabaseImporter,
+            "_bulk_import_gestiones",
+            side_effect=RuntimeError("se cae la conexión"),
+        ):
+            results = DatabaseImporter(bulk=True).import_all_data(
+                copy.deepcopy(self.datos)
+            )
+
+        self.assertFalse(results["success"])
+        self.assertEqual(results["succeeded_episodios"], set())
+        self.assertFalse(Episodio.objects.exists())
+
+    def test_modo_fila_excluye_episodios_con_gestion_fallida(self):
+        gestion_fields = DatabaseImporter._gestion_fields
+
+        def gestion_que_falla(importer, gestion_data, episodio, usuario):
+            if gestion_data["episodio_cmbd"] == 3:
+                raise ValueError("falla la gestión")
+            return gestion_fields(importer, gestion_data, episodio, usuario)
+
+        with patch.object(DatabaseImporter, "_gestion_fields", gestion_que_falla):
+            results = DatabaseImporter().import_all_data(copy.deepcopy(self.datos))
+
+        self.assertTrue(results["success"])
+        self.assertEqual(results["succeeded_episodios"], set(range(1, 21)) - {3})
@@ -0,0 +1,340 @@
+from datetime import date, datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api.management.modules.data_mapper import DataMapper
+
+
+def _same(a, b):
+    """Igualdad estricta: mismos tipos de fecha y mismos None/NaT"""
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, (datetime, date)) or isinstance(b, (datetime, date)):
+        return type(a) is type(b) and a == b
+    if a is None or b is None:
+        return a is b
+    if isinstance(a, float) and np.isnan(a):
+        return isinstance(b, float) and np.isnan(b)
+    return a == b
+
+
+@pytest.fixture
+def combined_df():
+    """Mezcla los casos de los tests de mapeo con valores sucios"""
+    return pd.DataFrame(
+        {
+            "RUT": [
+                "11.111.111-1",
+                "22222222-2",
+                " 33333333K ",
+                None,
+                "nan",
+                "11.111.111-1",
+                "1234567-8",
+                np.nan,
+            ],
+            "Nombre": [
+                "María González Pérez",
+                " Carlos Martínez Silva ",
+                "Ana",
+                "Paciente Sin RUT",
+                "X",
+                "Duplicado",
+                None,
+                "Y",
+            ],
+            "Sexo  (Desc)": ["Femenino", "Masculino", " f ", "F", None, "M", "x", ""],
+            "Fecha de Nacimiento": [
+                "15/05/1980",
+                "1975-08-22",
+                "12/31/1990",
+                "01/01/1990",
+                None,
+                "garbage",
+                "2024-10-26T15:30:00",
+                "",
+            ],
+            "Convenio": [
+                "FONASA",
+                None,
+                "Convenio con un nombre muy largo",
+                "",
+                0,
+                None,
+                "A",
+                None,
+            ],
+            "Nombre de la aseguradora": [
+                None,
+                "ISAPRE TEST",
+                "Aseg",
+                None,
+                "B",
+                None,
+                None,
+                "C",
+            ],
+            "score_social": [1, None, 3, 4, None, 6, 7, 8],
+            "CAMA": ["C001", " C002 ", "C001", None, "nan", "C003", "", "C001"],
+            "HABITACION": ["101", "", None, "104", "105", "nan", "107", "101"],
+            "CÓDIGO EPISODIO CMBD": [101, 102, None, 104, 105, 106, 0, 108],
+            "Fecha Ingreso completa": [
+                "01/01/2025",
+                "05/01/2025 10:30",
+                "10/01/2025",
+                None,
+                "2025-01-05 10:11:12",
+                "13/02/24",
+                "1/2/2025",
+                "nan",
+            ],
+            "Fecha alta": [
+                "03/01/2025",
+                None,
+                "nan",
+                "20/01/2025",
+                "",
+                "x",
+                None,
+                None,
+            ],
+            "Tipo Actividad": [
+                "Cirugía",
+                "Hospitalización",
+                None,
+                "Urgencia",
+                "",
+                "A",
+                "B",
+                "C",
+            ],
+            "Estancia Inlier / Outlier": [
+                "Inlier",
+                "Outlier",
+                None,
+                "Inlier",
+                None,
+                None,
+                None,
+                None,
+            ],
+            "Especialidad médica de la intervención (des)": [
+                "Cardiología",
+                None,
+                "P",
+                None,
+                "",
+                "Q",
+                None,
+                None,
+            ],
+            "Estancias Prequirurgicas Int  -Episodio-": [
+                1.0,
+                0.0,
+                2.5,
+                None,
+                "3",
+                "x",
+                None,
+                None,
+            ],
+            "Estancia Norma GRD": [3.0, 4.0, 2.0, None, None, None, None, 1.0],
+            "Servicio Ingreso (Código)": [
+                "MED ",
+                None,
+                "nan",
+                "CIR",
+                "",
+                None,
+                None,
+                "UCI",
+            ],
+            "Servicio Egreso (Código)_2": [
+                "CIR",
+                "MED",
+                None,
+                None,
+                None,
+                None,
+                None,
+                "nan",
+            ],
+            "Conjunto de Servicios Traslado": [
+                "[UCI][MED]",
+                None,
+                "[X]",
+                "sin",
+                5,
+                None,
+                None,
+                "[A]",
+            ],
+            "Fecha       (tr1)": [
+                "02/01/2025",
+                None,
+                "garbage",
+                None,
+                None,
+                None,
+                None,
+                None,
+            ],
+            "Fecha       (tr2)": [
+                "03/01/2025 08:00",
+                None,
+                None,
+                None,
+                None,
+                None,
+                None,
+                None,
+            ],
+            "¿Qué gestión se solicito?": [
+                "Homecare",
+                "Transferencia",
+                "Cobertura",
+                None,
+                "traslado",
+                "nan",
+                "Corte Cuentas",
+                "Homecare UCCC",
+            ],
+            "Fecha admisión": [
+                "01/01/2025",
+                "05/01/2025",
+                None,
+                "10/01/2025",
+                "",
+                "x",
+                None,
+                None,
+            ],
+            "Informe": ["Informe 1", "", None, "Informe 4", None, None, 0, "I"],
+            "Estado": [None, None, None, None, "ACEPTADO", None, None, None],
+            "Tipo de Traslado": [
+                None,
+                "Interno",
+                None,
+                None,
+                "Externo",
+                None,
+                None,
+                None,
+            ],
+            "Fecha de Finalización": [
+                None,
+                "12/13/2023",
+                None,
+                None,
+                "2023-12-14",
+                None,
+                None,
+                None,
+            ],
+            "Hora de Finalización": [
+                None,
+                "1:41:00 PM",
+                None,
+                None,
+                "xx",
+                None,
+                None,
+                None,
+            ],
+        },
+        index=[0, 0, 1, 2, 3, 3, 4, 5],
+    )
+
+
+@pytest.fixture
+def tabla_df():
+    """Tabla ya procesada (columnas en minúscula) para _map_episodios/_map_gestiones"""
+    return pd.DataFrame(
+        {
+            "episodio_cmbd": [101, 102, None, 104],
+            "rut": ["11.111.111-1", "22.222.222-2", "33.333.333-3", None],
+            "nombre": ["María", "Carlos", "Test", None],
+            "fecha_ingreso": ["01/01/2025", "02/01/2025", "10/01/2025", "x"],
+            "fecha_alta": ["03/01/2025", "07/01/2025", None, None],
+            "tipo_actividad": [None, "Cirugía", None, "U"],
+            "servicio": ["Cardio", "Trauma", "Pediatría", None],
+            "cama": ["C001", "C002", "C003", None],
+            "habitacion": ["101", "102", "103", None],
+            "estancia_dias": [1, None, "3", "x"],
+            "tipo_gestion": ["HOMECARE", "Traslado", "COBERTURA", None],
+            "estado_gestion": ["INICIADA", None, "CERRADA", "progreso"],
+            "fecha_inicio": ["01/01/2025", "02/01/2025", "03/01/2025", None],
+            "fecha_fin": ["05/01/2025", None, "07/01/2025", "2025-01-09"],
+            "observaciones": ["Obs1", "Obs2", "Obs3", None],
+            "usuario_responsable": ["user1@test.com", None, "user3@test.com", None],
+            "valor_gestion": [100.0, None, 200.0, None],
+        }
+    )
+
+
+@pytest.fixture
+def fixed_now(monkeypatch):
+    import django.utils.timezone as timezone
+
+    now = datetime(2025, 1, 20, 12, 0, 0)
+    monkeypatch.setattr(timezone, "now", lambda: now)
+    return now
+
+
+class TestDataMapperColumnarParity:
+    """El mapeo columnar debe producir exactamente lo mismo que el fila a fila"""
+
+    @pytest.mark.parametrize(
+        "method",
+        [
+            "_map_pacientes_from_combined",
+            "_map_camas_from_combined",
+            "_map_episodios_from_combined",
+            "_map_gestiones_from_combined",
+        ],
+    )
+    def test_combined(self, combined_df, fixed_now, method):
+        filas = getattr(DataMapper(vectorized=False), method)(combined_df.copy())
+        columnar = getattr(DataMapper(vectorized=True), method)(combined_df.copy())
+
+        assert filas
+        assert _same(columnar, filas)
+
+    def test_map_gestiones_tabla(self, tabla_df):
+        filas = DataMapper(vectorized=False)._map_gestiones(tabla_df.copy())
+        columnar = DataMapper(vectorized=True)._map_gestiones(tabla_df.copy())
+
+        assert _same(columnar, filas)
+
+    def test_map_episodios_tabla(self, tabla_df):
+        # Sin fecha de ingreso se usa datetime.now(): se compara aparte
+        tabla_df = tabla_df.iloc[:3]
+        filas = DataMapper(vectorized=False)._map_episodios(tabla_df.copy())
+        columnar = DataMapper(vectorized=True)._map_episodios(tabla_df.copy())
+
+        assert _same(columnar, filas)
+
+    def test_map_all_data(self, combined_df, fixed_now):
+        filas = DataMapper(vectorized=False).map_all_data({"combined": combined_df})
+        columnar = DataMapper(vectorized=True).map_all_data({"combined": combined_df})
+
+        assert _same(columnar, filas)
+
+    def test_fechas_timestamp_se_conservan(self):
+        """Una columna datetime64 entrega los mismos Timestamp que el fila a fila"""
+        df = pd.DataFrame(
+            {
+                "CÓDIGO EPISODIO CMBD": [1, 2],
+                "RUT": ["11.111.111-1", "22.222.222-2"],
+                "Fecha Ingreso completa": pd.to_datetime(["2025-01-01", None]),
+            }
+        )
+        filas = DataMapper(vectorized=False)._map_episodios_from_combined(df)
+        columnar = DataMapper(vectorized=True)._map_episodios_from_combined(df)
+
+        assert _same(columnar, filas)
+        assert isinstance(columnar[0]["fecha_ingreso"], pd.Timestamp)
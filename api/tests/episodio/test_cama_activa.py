@@ -0,0 +1,73 @@
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.models import Cama, Episodio, Paciente
+
+
+class CamaActivaUnicaTest(TestCase):
+    """Restricción episodios_cama_activa_uniq: un episodio activo por cama"""
+
+    def setUp(self):
+        self.paciente = Paciente.objects.create(
+            rut="12.345.678-9",
+            nombre="Paciente",
+            sexo="F",
+            fecha_nacimiento=date(1970, 1, 1),
+        )
+        self.cama = Cama.objects.create(codigo_cama="CAMA-001", habitacion="HAB-1")
+        self.ahora = timezone.now()
+
+    def _episodio(self, cmbd, **kwargs):
+        return Episodio(
+            paciente=self.paciente,
+            episodio_cmbd=cmbd,
+            fecha_ingreso=self.ahora,
+            tipo_actividad="Hospitalización",
+            **kwargs,
+        )
+
+    def test_save_traduce_la_violacion_a_validation_error(self):
+        self._episodio(1, cama=self.cama).save()
+
+        with self.assertRaisesMessage(
+            ValidationError,
+            "La cama CAMA-001 ya está asignada a otro episodio activo.",
+        ):
+            self._episodio(2, cama=self.cama).save()
+
+        # El savepoint deja la transacción usable después del error
+        self.assertEqual(Episodio.objects.count(), 1)
+
+    def test_save_no_consulta_la_ocupacion(self):
+        with CaptureQueriesContext(connection) as queries:
+            self._episodio(1, cama=self.cama).save()
+
+        selects = [q for q in queries.captured_queries if "SELECT" in q["sql"]]
+        self.assertEqual(selects, [])
+
+    def test_cama_liberada_por_egreso_se_puede_reasignar(self):
+        episodio = self._episodio(1, cama=self.cama)
+        episodio.save()
+        episodio.fecha_egreso = self.ahora
+        episodio.save()
+
+        self._episodio(2, cama=self.cama).save()
+        # Los egresados no cuentan: puede haber varios en la misma cama
+        self._episodio(3, cama=self.cama, fecha_egreso=self.ahora).save()
+        self.assertEqual(Episodio.objects.filter(cama=self.cama).count(), 3)
+
+    def test_bulk_create_tambien_respeta_la_restriccion(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Episodio.objects.bulk_create(
+                [self._episodio(1, cama=self.cama), self._episodio(2, cama=self.cama)]
+            )
+        self.assertFalse(Episodio.objects.exists())
+
+    def test_episodios_sin_cama_no_se_restringen(self):
+        Episodio.objects.bulk_create([self._episodio(1), self._episodio(2)])
+        self.assertEqual(Episodio.objects.filter(cama__isnull=True).count(), 2)
@@ -0,0 +1,105 @@
+import random
+from datetime import date, timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from api.models import Episodio, Paciente
+from api.tests.base_test import AuthenticatedAPITestCase
+
+
+def _dias(ep, hoy):
+    return (hoy - ep.fecha_ingreso.date()).days
+
+
+def _es_critica(ep, hoy):
+    return bool(ep.estancia_norma_grd) and _dias(ep, hoy) > ep.estancia_norma_grd * (
+        4 / 3
+    )
+
+
+class CensoActivoTest(AuthenticatedAPITestCase):
+    """Tests de extensiones_criticas y alertas_prediccion filtradas en SQL"""
+
+    def setUp(self):
+        self.authenticate_admin()
+        paciente = Paciente.objects.create(
+            rut="12.345.678-9",
+            nombre="Juan Pérez",
+            sexo="M",
+            fecha_nacimiento=date(1980, 1, 1),
+        )
+        rng = random.Random(0)
+        ahora = timezone.now()
+        for cmbd in range(120):
+            Episodio.objects.create(
+                paciente=paciente,
+                episodio_cmbd=cmbd,
+                fecha_ingreso=ahora - timedelta(minutes=rng.randint(0, 60 * 24 * 40)),
+                fecha_egreso=ahora if rng.random() < 0.2 else None,
+                estancia_norma_grd=rng.choice([None, 0, 2.5, 5.3, 7, 12.75]),
+                prediccion_extension=rng.choice([None, 0, 1]),
+            )
+        self.hoy = timezone.now().date()
+        self.activos = list(Episodio.objects.filter(fecha_egreso__isnull=True))
+
+    def _ids(self, data):
+        return sorted(str(fila["id"]) for fila in data)
+
+    def test_extensiones_criticas_igual_al_calculo_en_python(self):
+        response = self.client.get(reverse("episodio-extensiones-criticas"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        esperados = [ep for ep in self.activos if _es_critica(ep, self.hoy)]
+        self.assertEqual(
+            self._ids(response.data), self._ids([{"id": ep.id} for ep in esperados])
+        )
+        fila = response.data[0]
+        ep = Episodio.objects.get(id=fila["id"])
+        self.assertEqual(
+            set(fila),
+            {
+                "id",
+                "episodio",
+                "paciente",
+                "dias_estadia",
+                "fecha_ingreso",
+                "dias_esperados",
+            },
+        )
+        self.assertEqual(fila["episodio"], str(ep.episodio_cmbd))
+        self.assertEqual(fila["paciente"], "Juan Pérez")
+        self.assertEqual(fila["dias_estadia"], _dias(ep, self.hoy))
+        self.assertEqual(fila["dias_esperados"], ep.estancia_norma_grd)
+
+    def test_alertas_prediccion_igual_al_calculo_en_python(self):
+        response = self.client.get(reverse("episodio-alertas-prediccion"))
+
+        esperados = [
+            {"id": ep.id}
+            for ep in self.activos
+            if ep.prediccion_extension == 1 and not _es_critica(ep, self.hoy)
+        ]
+        self.assertEqual(self._ids(response.data), self._ids(esperados))
+
+    def test_orden_y_paginacion(self):
+        url = reverse("episodio-extensiones-criticas")
+
+        completo = self.client.get(url, {"ordering": "-dias_sobre_norma"}).data
+        sobre_norma = [f["dias_estadia"] - f["dias_esperados"] for f in completo]
+        self.assertEqual(sobre_norma, sorted(sobre_norma, reverse=True))
+
+        with self.assertNumQueries(3):  # usuario + count + página
+            pagina = self.client.get(
+                url, {"ordering": "-dias_sobre_norma", "page": 2, "page_size": 5}
+            ).data
+        self.assertEqual(pagina["count"], len(completo))
+        self.assertEqual(pagina["results"], completo[5:10])
+
+    def test_ordering_invalido(self):
+        response = self.client.get(
+            reverse("episodio-extensiones-criticas"), {"ordering": "paciente__rut"}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
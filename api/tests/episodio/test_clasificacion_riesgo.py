@@ -0,0 +1,110 @@
+import random
+from datetime import date, timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from api.models import Episodio, Paciente
+from api.serializers import EpisodioSerializer
+from api.tests.base_test import AuthenticatedAPITestCase
+
+
+class ClasificacionRiesgoTest(AuthenticatedAPITestCase):
+    """Tests del semáforo y alertas calculados en SQL y de sus filtros"""
+
+    def setUp(self):
+        self.authenticate_admin()
+        rng = random.Random(0)
+        pacientes = [
+            Paciente.objects.create(
+                rut=f"{i}.111.111-1",
+                nombre=f"Paciente {i}",
+                sexo="F",
+                fecha_nacimiento=date(1980, 1, 1),
+                score_social=score,
+            )
+            for i, score in enumerate([None, 3, 10, 15])
+        ]
+        ahora = timezone.now()
+        for cmbd in range(150):
+            ingreso = ahora - timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+            egreso = None
+            if rng.random() < 0.3:
+                egreso = min(ingreso + timedelta(days=rng.randint(0, 20)), ahora)
+            Episodio.objects.create(
+                paciente=rng.choice(pacientes),
+                episodio_cmbd=cmbd,
+                fecha_ingreso=ingreso,
+                fecha_egreso=egreso,
+                estancia_norma_grd=rng.choice([None, 0, 2.5, 5.3, 7, 12.75]),
+                prediccion_extension=rng.choice([None, 0, 1]),
+                probabilidad_extension=rng.choice(
+                    [None, 0.1, 0.29999, 0.3, 0.44, 0.45, 0.9]
+                ),
+            )
+        self.url = reverse("episodio-list")
+
+    def test_sql_igual_a_calculo_en_python(self):
+        for ep in Episodio.objects.select_related("paciente").con_clasificacion():
+            semaforo, alertas = ep.clasificacion_riesgo()
+            self.assertEqual(ep.semaforo, semaforo)
+            self.assertEqual(alertas, EpisodioSerializer(ep).data["alertas"])
+
+    def test_serializer_sin_anotar_usa_fallback(self):
+        ep = Episodio.objects.first()
+        anotado = Episodio.objects.con_clasificacion().get(pk=ep.pk)
+
+        self.assertEqual(
+            EpisodioSerializer(ep).data["semaforo_riesgo"],
+            EpisodioSerializer(anotado).data["semaforo_riesgo"],
+        )
+        self.assertEqual(
+            EpisodioSerializer(ep).data["alertas"],
+            EpisodioSerializer(anotado).data["alertas"],
+        )
+
+    def test_filtros_semaforo_y_alerta(self):
+        anotados = list(Episodio.objects.con_clasificacion())
+        esperados = {
+            str(ep.id)
+            for ep in anotados
+            if ep.semaforo in ("red", "yellow") and ep.alerta_score_social_alto
+        }
+
+        response = self.client.get(
+            self.url,
+            {
+                "semaforo": ["red", "yellow"],
+                "alerta": "score_social_alto",
+                "page_size": 500,
+            },
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], len(esperados))
+        recibidos = set()
+        page = 1
+        while True:
+            for fila in response.data["results"]:
+                recibidos.add(str(fila["id"]))
+                self.assertIn(fila["semaforo_riesgo"]["color"], ("red", "yellow"))
+                self.assertIn("score_social_alto", fila["alertas"])
+            if not response.data["next"]:
+                break
+            page += 1
+            response = self.client.get(
+                self.url,
+                {
+                    "semaforo": ["red", "yellow"],
+                    "alerta": "score_social_alto",
+                    "page": page,
+                },
+            )
+        self.assertTrue(esperados)
+        self.assertEqual(recibidos, esperados)
+
+    def test_filtro_invalido(self):
+        response = self.client.get(self.url, {"semaforo": "purple"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,104 @@
+import random
+from datetime import date, timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from api.models import Episodio, Paciente
+from api.tests.base_test import AuthenticatedAPITestCase
+
+
+def _estadisticas_python(episodios):
+    """Cálculo original en Python, usado como referencia"""
+    hoy = timezone.now().date()
+    activos = [ep for ep in episodios if ep.fecha_egreso is None]
+    egresados = [ep for ep in episodios if ep.fecha_egreso is not None]
+    dias = [(ep.fecha_egreso.date() - ep.fecha_ingreso.date()).days for ep in egresados]
+    dias += [(hoy - ep.fecha_ingreso.date()).days for ep in activos]
+    criticas = sum(
+        1
+        for ep in activos
+        if ep.estancia_norma_grd
+        and (hoy - ep.fecha_ingreso.date()).days > ep.estancia_norma_grd * (4 / 3)
+    )
+    return {
+        "total_episodios": len(episodios),
+        "episodios_activos": len(activos),
+        "episodios_egresados": len(egresados),
+        "promedio_estadia_dias": round(sum(dias) / len(dias), 1) if dias else 0,
+        "extensiones_criticas": criticas,
+        "altas_hoy": sum(
+            1 for ep in egresados if timezone.localtime(ep.fecha_egreso).date() == hoy
+        ),
+    }
+
+
+class EpisodioEstadisticasTest(AuthenticatedAPITestCase):
+    """Tests de GET /api/episodios/estadisticas/ agregado en la base de datos"""
+
+    def setUp(self):
+        self.authenticate_admin()
+        self.paciente = Paciente.objects.create(
+            rut="12.345.678-9",
+            nombre="Juan Pérez",
+            sexo="M",
+            fecha_nacimiento=date(1980, 1, 1),
+        )
+        self.url = reverse("episodio-estadisticas")
+
+    def _crear(self, cmbd, ingreso, egreso=None, norma=None):
+        return Episodio.objects.create(
+            paciente=self.paciente,
+            episodio_cmbd=cmbd,
+            fecha_ingreso=ingreso,
+            fecha_egreso=egreso,
+            estancia_norma_grd=norma,
+        )
+
+    def test_sin_episodios(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_episodios"], 0)
+        self.assertEqual(response.data["promedio_estadia_dias"], 0)
+        self.assertEqual(response.data["extensiones_criticas"], 0)
+
+    def test_conteos_y_extensiones_criticas(self):
+        ahora = timezone.now()
+        self._crear(1, ahora - timedelta(days=10), norma=6)  # 10 > 8: crítica
+        self._crear(2, ahora - timedelta(days=8), norma=6)  # 8 > 8: no
+        self._crear(3, ahora - timedelta(days=10), norma=0)  # sin norma
+        self._crear(4, ahora - timedelta(days=3))
+        self._crear(5, ahora - timedelta(days=9), ahora - timedelta(days=2), norma=1)
+
+        with self.assertNumQueries(2):  # usuario autenticado + agregado
+            data = self.client.get(self.url).data
+
+        self.assertEqual(data["total_episodios"], 5)
+        self.assertEqual(data["episodios_activos"], 4)
+        self.assertEqual(data["episodios_egresados"], 1)
+        self.assertEqual(
+            data["promedio_estadia_dias"], round((10 + 8 + 10 + 3 + 7) / 5, 1)
+        )
+        self.assertEqual(data["extensiones_criticas"], 1)
+
+    def test_paridad_con_calculo_en_python(self):
+        rng = random.Random(0)
+        ahora = timezone.now()
+        for cmbd in range(200):
+            ingreso = ahora - timedelta(minutes=rng.randint(0, 60 * 24 * 60))
+            egreso = None
+            if rng.random() < 0.5:
+                egreso = ingreso + timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+                egreso = min(egreso, ahora)
+            if rng.random() < 0.1:
+                egreso = ahora - timedelta(minutes=rng.randint(0, 60 * 30))
+            norma = rng.choice([None, 0, 2.5, 5.3, 7, 12.75])
+            self._crear(cmbd, ingreso, egreso, norma)
+
+        data = self.client.get(self.url).data
+        esperado = _estadisticas_python(list(Episodio.objects.all()))
+
+        for key, value in esperado.items():
+            self.assertEqual(data[key], value, key)
@@ -0,0 +1,92 @@
+from datetime import date, datetime
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from api.models import Episodio, Paciente
+from api.tests.base_test import AuthenticatedAPITestCase
+
+
+def _inicio_mes(meses_atras, dia=1, hora=0):
+    hoy = timezone.localdate()
+    anio, mes = hoy.year, hoy.month - meses_atras
+    while mes < 1:
+        anio, mes = anio - 1, mes + 12
+    return timezone.make_aware(datetime(anio, mes, dia, hora, 30))
+
+
+class TendenciaEstadiaTest(AuthenticatedAPITestCase):
+    """Tests de GET /api/episodios/tendencia_estadia/ agregado por mes"""
+
+    def setUp(self):
+        self.authenticate_admin()
+        self.url = reverse("episodio-tendencia-estadia")
+        self.pacientes = [
+            Paciente.objects.create(
+                rut=f"{i}.111.111-1",
+                nombre=f"Paciente {i}",
+                sexo="F",
+                fecha_nacimiento=date(1980, 1, 1),
+            )
+            for i in range(3)
+        ]
+        cmbd = 0
+        # (meses atrás, paciente, especialidad)
+        for meses_atras, paciente, especialidad in [
+            (0, 0, "Cardiología"),
+            (0, 0, "Cardiología"),  # mismo paciente, cuenta una vez
+            (0, 1, None),
+            (1, 2, "Cirugía"),
+            (13, 0, "Cirugía"),
+            (30, 1, "Cirugía"),  # fuera de cualquier ventana probada
+        ]:
+            cmbd += 1
+            Episodio.objects.create(
+                paciente=self.pacientes[paciente],
+                episodio_cmbd=cmbd,
+                fecha_ingreso=_inicio_mes(meses_atras),
+                fecha_egreso=_inicio_mes(meses_atras, dia=2),
+                especialidad=especialidad,
+            )
+
+    def test_serie_calendario_de_12_meses(self):
+        data = self.client.get(self.url).data
+
+        self.assertEqual(len(data), 12)
+        hoy = timezone.localdate()
+        self.assertEqual(data[-1]["periodo"], hoy.strftime("%Y-%m"))
+        periodos = [fila["periodo"] for fila in data]
+        self.assertEqual(periodos, sorted(set(periodos)))
+        self.assertEqual(data[-1]["pacientes"], 2)
+        self.assertEqual(data[-2]["pacientes"], 1)
+        self.assertEqual(sum(fila["pacientes"] for fila in data), 3)
+        self.assertEqual(set(data[0]), {"mes", "periodo", "pacientes"})
+
+    def test_ventana_configurable_y_detalle(self):
+        data = self.client.get(self.url, {"months": 24, "por": "especialidad"}).data
+
+        self.assertEqual(len(data), 24)
+        self.assertEqual(data[-1]["detalle"], {"Cardiología": 1, "Sin dato": 1})
+        self.assertEqual(data[-14]["detalle"], {"Cirugía": 1})
+        self.assertEqual(data[0]["detalle"], {})
+
+    def test_resultado_en_cache_hasta_cambiar_episodios(self):
+        primero = self.client.get(self.url).data
+        with self.assertNumQueries(1):  # solo el usuario autenticado
+            segundo = self.client.get(self.url).data
+        self.assertEqual(primero, segundo)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Episodio.objects.create(
+                paciente=self.pacientes[2],
+                episodio_cmbd=99,
+                fecha_ingreso=_inicio_mes(0, hora=1),
+            )
+        tercero = self.client.get(self.url).data
+        self.assertEqual(tercero[-1]["pacientes"], primero[-1]["pacientes"] + 1)
+
+    def test_parametros_invalidos(self):
+        for params in [{"months": 0}, {"months": "x"}, {"por": "paciente"}]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,133 @@
+import hashlib
+import io
+import os
+import tempfile
+from unittest.mock import patch
+
+import pandas as pd
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from api.models import ArchivoCarga, Trabajo
+from api.tests.base_test import AuthenticatedAPITestCase
+
+
+def contenido_excel(columnas):
+    buffer = io.BytesIO()
+    pd.DataFrame([{c: "x" for c in columnas}]).to_excel(buffer, index=False)
+    return buffer.getvalue()
+
+
+class DeduplicacionCargasTest(AuthenticatedAPITestCase):
+    """Cargas repetidas del mismo archivo (mismo SHA-256, tipo y usuario)"""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.authenticate_admin()
+        self.contenido = contenido_excel(["codigo_cama", "habitacion"])
+        self.sha256 = hashlib.sha256(self.contenido).hexdigest()
+
+    def _subir(self, contenido=None, url=None, campo="archivo", **datos):
+        archivo = SimpleUploadedFile("camas.xlsx", contenido or self.contenido)
+        return self.client.post(
+            url or reverse("cargar_archivo"),
+            {campo: archivo, "tipo": "CAMAS", **datos},
+            format="multipart",
+        )
+
+    def _terminar(self, archivo_id, estado_trabajo="COMPLETADO", estado="COMPLETADO"):
+        Trabajo.objects.filter(archivo_id=archivo_id).update(estado=estado_trabajo)
+        ArchivoCarga.objects.filter(id=archivo_id).update(estado=estado)
+
+    def test_guarda_el_hash_y_el_contenido_una_sola_vez(self):
+        primera = self._subir()
+        self._terminar(primera.data["archivo_id"])
+        self._subir(forzar=True)
+
+        self.assertEqual(ArchivoCarga.objects.count(), 2)
+        rutas = set()
+        for carga in ArchivoCarga.objects.all():
+            self.assertEqual(carga.sha256, self.sha256)
+            self.assertEqual(carga.nombre, "camas.xlsx")
+            rutas.add(carga.archivo.name)
+        self.assertEqual(rutas, {f"uploads/excel/{self.sha256[:2]}/{self.sha256}.xlsx"})
+        carpeta = os.path.dirname(default_storage.path(rutas.pop()))
+        self.assertEqual(len(os.listdir(carpeta)), 1)
+        with default_storage.open(ArchivoCarga.objects.first().archivo.name) as f:
+            self.assertEqual(f.read(), self.contenido)
+
+    def test_el_hash_se_calcula_al_recibir_el_archivo(self):
+        # Sin el upload handler, cargas tendría que volver a leer el archivo
+        with patch("api.services.cargas.hashlib") as relectura:
+            self._subir()
+
+        relectura.sha256.assert_not_called()
+        self.assertEqual(ArchivoCarga.objects.get().sha256, self.sha256)
+
+    def test_repetida_en_curso_se_enlaza_al_mismo_trabajo(self):
+        primera = self._subir()
+        # Por otro endpoint: el mismo archivo del mismo usuario
+        segunda = self._subir(url=reverse("archivo-upload"), campo="file")
+
+        self.assertEqual(segunda.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(segunda.data["duplicado"])
+        self.assertEqual(
+            str(segunda.data["archivo_id"]), str(primera.data["archivo_id"])
+        )
+        self.assertEqual(
+            str(segunda.data["trabajo_id"]), str(primera.data["trabajo_id"])
+        )
+        self.assertEqual(Trabajo.objects.count(), 1)
+
+    def test_repetida_ya_procesada_devuelve_el_resultado_anterior(self):
+        primera = self._subir()
+        self._terminar(primera.data["archivo_id"])
+
+        segunda = self._subir(url=reverse("frontend_upload"))
+
+        self.assertEqual(segunda.status_code, status.HTTP_200_OK)
+        self.assertTrue(segunda.data["duplicado"])
+        self.assertEqual(segunda.data["archivo_id"], str(primera.data["archivo_id"]))
+        self.assertEqual(segunda.data["estado"], "COMPLETADO")
+        self.assertEqual(Trabajo.objects.count(), 1)
+
+    def test_se_reprocesa_si_fallo_o_se_fuerza(self):
+        primera = self._subir()
+        self._terminar(primera.data["archivo_id"], "ERROR", "ERROR")
+
+        segunda = self._subir()
+        self.assertEqual(segunda.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(segunda.data["duplicado"])
+
+        self._terminar(segunda.data["archivo_id"])
+        tercera = self._subir(forzar=True)
+        self.assertFalse(tercera.data["duplicado"])
+        self.assertEqual(Trabajo.objects.count(), 3)
+
+    def test_otro_contenido_no_es_duplicado(self):
+        primera = self._subir()
+        segunda = self._subir(contenido_excel(["codigo_cama", "otra"]))
+
+        self.assertFalse(segunda.data["duplicado"])
+        self.assertNotEqual(segunda.data["archivo_id"], primera.data["archivo_id"])
+
+    def test_reproceso_no_vuelve_a_parsear_el_excel(self):
+        self._subir()
+        call_command("run_workers", una_vez=True, stdout=io.StringIO())
+        primera = ArchivoCarga.objects.get()
+
+        segunda = self._subir(forzar=True)
+        with patch.object(pd, "read_excel", side_effect=AssertionError("parseado")):
+            call_command("run_workers", una_vez=True, stdout=io.StringIO())
+
+        segunda = ArchivoCarga.objects.get(id=segunda.data["archivo_id"])
+        self.assertEqual(segunda.filas_totales, primera.filas_totales)
+        self.assertEqual(segunda.estado, primera.estado)
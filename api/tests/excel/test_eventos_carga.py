@@ -0,0 +1,275 @@
+import json
+import queue
+from unittest import skipUnless
+from unittest.mock import patch
+
+import pandas as pd
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+
+from api.models import ArchivoCarga, User
+from api.services import eventos_carga
+from api.services.excel_processor import ExcelProcessor
+from api.tests.base_test import AuthenticatedAPITestCase
+
+
+def eventos(chunks):
+    """Eventos `progreso` (data como dict) de los chunks SSE"""
+    resultado = []
+    for chunk in chunks:
+        texto = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if texto.startswith("event: progreso"):
+            resultado.append(json.loads(texto.split("data: ", 1)[1]))
+    return resultado
+
+
+class UnaFilaProcessor(ExcelProcessor):
+    def _cargar_excel(self):
+        self.df = pd.DataFrame({"valor": [1]})
+        self.archivo_carga.filas_totales = 1
+
+    def _validar_estructura(self):
+        return True
+
+    def _validar_fila(self, datos, numero_fila):
+        return datos
+
+    def _procesar_fila_modelo(self, datos, numero_fila):
+        pass
+
+    def get_columnas_requeridas(self):
+        return ["valor"]
+
+    def get_columnas_opcionales(self):
+        return []
+
+
+@override_settings(SSE_INTERVALO_SONDEO=0.01, SSE_DURACION_MAXIMA=5)
+class EventosProcesamientoTest(AuthenticatedAPITestCase):
+    """
+    GET /api/excel/eventos/<id>/: stream SSE del progreso. Sin NOTIFY: los
+    eventos llegan por on_commit (el NOTIFY real se prueba en EventosNotifyTest)
+    """
+
+    def setUp(self):
+        sin_notify = patch("api.services.eventos_carga.usa_notify", return_value=False)
+        sin_notify.start()
+        self.addCleanup(sin_notify.stop)
+        self.addCleanup(eventos_carga.escucha.detener, 5)
+        self.authenticate_admin()
+        self.user = User.objects.get(email="admin@ucchristus.cl")
+        self.archivo = ArchivoCarga.objects.create(
+            nombre="x.xlsx",
+            archivo="uploads/excel/x.xlsx",
+            tipo="camas",
+            usuario=self.user,
+            estado="PROCESANDO",
+            etapa="FILAS",
+            filas_totales=100,
+        )
+        self.url = reverse("eventos_procesamiento", args=[self.archivo.id])
+
+    def _abrir(self):
+        response = self.client.get(self.url, HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        return response
+
+    def test_envia_el_estado_actual_y_cierra_si_es_final(self):
+        self.archivo.actualizar_progreso(98, 2)
+
+        response = self._abrir()
+
+        recibidos = eventos(response.streaming_content)
+        self.assertEqual(len(recibidos), 1)
+        self.assertEqual(recibidos[0]["estado"], "PARCIAL")
+        self.assertEqual(recibidos[0]["filas_errores"], 2)
+        self.assertEqual(recibidos[0]["porcentaje_completado"], 98.0)
+
+    def test_empuja_los_eventos_que_publica_el_procesador(self):
+        response = self._abrir()
+        stream = iter(response.streaming_content)
+        self.assertTrue(next(stream).startswith(b"retry:"))
+        self.assertEqual(eventos([next(stream)])[0]["etapa"], "FILAS")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.archivo.actualizar_progreso(40, 0)
+        self.assertEqual(eventos([next(stream)])[0]["filas_procesadas"], 40)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.archivo.actualizar_progreso(100, 0)
+        final = eventos(stream)
+        self.assertEqual([e["estado"] for e in final], ["COMPLETADO"])
+
+    def test_sin_notify_relee_el_progreso(self):
+        response = self._abrir()
+        stream = iter(response.streaming_content)
+        next(stream), next(stream)
+
+        # Escrito por otro proceso: no pasa por la cola de este
+        ArchivoCarga.objects.filter(id=self.archivo.id).update(
+            filas_procesadas=100, estado="COMPLETADO"
+        )
+
+        self.assertEqual(eventos(stream)[-1]["estado"], "COMPLETADO")
+
+    @override_settings(SSE_KEEPALIVE_SEGUNDOS=0.01)
+    def test_con_notify_relee_el_progreso_si_se_pierde_el_aviso(self):
+        with patch(
+            "api.services.eventos_carga.usa_notify", return_value=True
+        ), patch.object(eventos_carga.Escucha, "_escuchar"), patch(
+            "api.views.archivo_views.connection"
+        ):
+            response = self._abrir()
+            stream = iter(response.streaming_content)
+            next(stream), next(stream)
+
+            # Terminó antes de que el hilo LISTEN se suscribiera: no hay aviso
+            ArchivoCarga.objects.filter(id=self.archivo.id).update(
+                filas_procesadas=100, estado="COMPLETADO"
+            )
+
+            self.assertEqual(eventos(stream)[-1]["estado"], "COMPLETADO")
+
+    def test_procesador_publica_cada_etapa(self):
+        publicados = []
+        with patch.object(eventos_carga.escucha, "difundir", publicados.append):
+            with self.captureOnCommitCallbacks(execute=True):
+                UnaFilaProcessor(self.archivo).procesar_archivo()
+
+        etapas = [e["etapa"] for e in publicados]
+        self.assertEqual(etapas[0], "LECTURA")
+        self.assertEqual(etapas[-1], "FINALIZADO")
+        self.assertIn("FILAS", etapas)
+        self.assertEqual(publicados[-1]["estado"], "COMPLETADO")
+
+    def test_otro_usuario_no_puede_ver_el_stream(self):
+        otro = User.objects.create_user(
+            email="otro@ucchristus.cl",
+            password="otro12345",
+            nombre="Otro",
+            apellido="UC",
+            rut="22.222.222-2",
+            rol="ENFERMERO",
+        )
+        self.client.force_authenticate(user=otro)
+
+        response = self.client.get(self.url, HTTP_ACCEPT="text/event-stream")
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertTrue(response.content.startswith(b"event: error"))
+
+
+@skipUnless(connection.vendor == "postgresql", "LISTEN/NOTIFY es de PostgreSQL")
+@override_settings(SSE_KEEPALIVE_SEGUNDOS=60, SSE_DURACION_MAXIMA=10)
+class EventosNotifyTest(APITransactionTestCase):
+    """El stream recibe los NOTIFY confirmados a través del hilo LISTEN"""
+
+    def setUp(self):
+        espera = patch.object(eventos_carga.escucha, "ESPERA_AVISOS", 0.1)
+        espera.start()
+        self.addCleanup(espera.stop)
+        self.user = User.objects.create_user(
+            email="notify@ucchristus.cl",
+            password="notify123",
+            nombre="Notify",
+            apellido="UC",
+            rut="33.333.333-3",
+            rol="ADMIN",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.archivo = ArchivoCarga.objects.create(
+            nombre="x.xlsx",
+            archivo="uploads/excel/x.xlsx",
+            tipo="camas",
+            usuario=self.user,
+            estado="PROCESANDO",
+            etapa="FILAS",
+            filas_totales=100,
+        )
+
+    def tearDown(self):
+        # El hilo LISTEN tiene su propia conexión: sin cerrarla no se puede
+        # borrar la base de tests
+        eventos_carga.escucha.detener(timeout=5)
+
+    def _esperar_listen(self):
+        """Espera a que el hilo LISTEN reciba avisos"""
+        cola = eventos_carga.escucha.suscribir("sonda")
+        try:
+            for _ in range(50):
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT pg_notify(%s, %s)",
+                        [eventos_carga.CANAL, json.dumps({"archivo_id": "sonda"})],
+                    )
+                try:
+                    cola.get(timeout=0.1)
+                    return
+                except queue.Empty:
+                    pass
+            self.fail("El hilo LISTEN no se suscribió")
+        finally:
+            eventos_carga.escucha.desuscribir("sonda", cola)
+
+    def test_empuja_los_avisos_confirmados(self):
+        response = self.client.get(
+            reverse("eventos_procesamiento", args=[self.archivo.id]),
+            HTTP_ACCEPT="text/event-stream",
+        )
+        stream = iter(response.streaming_content)
+        next(stream), next(stream)
+        self._esperar_listen()
+
+        # Sin transacción abierta: cada guardado confirma y envía su NOTIFY
+        self.archivo.actualizar_progreso(40, 0)
+        self.assertEqual(eventos([next(stream)])[0]["filas_procesadas"], 40)
+
+        self.archivo.actualizar_progreso(100, 0)
+        self.assertEqual([e["estado"] for e in eventos(stream)], ["COMPLETADO"])
+
+
+class EscuchaTest(AuthenticatedAPITestCase):
+    def test_difunde_solo_a_los_suscritos_del_archivo(self):
+        escucha = eventos_carga.Escucha()
+        self.addCleanup(escucha.detener, 5)
+        cola_a = escucha.suscribir("a")
+        cola_b = escucha.suscribir("b")
+
+        escucha.difundir({"archivo_id": "a", "estado": "PROCESANDO"})
+        escucha.desuscribir("a", cola_a)
+        escucha.difundir({"archivo_id": "a", "estado": "COMPLETADO"})
+
+        self.assertEqual(cola_a.get_nowait()["estado"], "PROCESANDO")
+        self.assertTrue(cola_a.empty())
+        self.assertTrue(cola_b.empty())
+
+    @patch("api.services.eventos_carga.usa_notify", return_value=True)
+    @patch("api.services.eventos_carga.connections")
+    def test_detener_termina_el_hilo_listen(self, mock_connections, _):
+        conexion = mock_connections.create_connection.return_value
+        conexion.ensure_connection.side_effect = OSError("sin base")
+        escucha = eventos_carga.Escucha()
+        escucha.suscribir("a")
+        hilo = escucha._hilo
+
+        escucha.detener(timeout=5)
+
+        self.assertFalse(hilo.is_alive())
+        conexion.close.assert_called()
+
+    @patch("api.services.eventos_carga.usa_notify", return_value=True)
+    @patch("api.services.eventos_carga.connection")
+    def test_en_postgresql_publica_con_notify(self, mock_connection, _):
+        archivo = ArchivoCarga(estado="PROCESANDO", filas_totales=10)
+
+        eventos_carga.publicar(archivo)
+
+        cursor = mock_connection.cursor.return_value.__enter__.return_value
+        sql, (canal, payload) = cursor.execute.call_args.args
+        self.assertIn("pg_notify", sql)
+        self.assertEqual(canal, eventos_carga.CANAL)
+        self.assertEqual(json.loads(payload)["archivo_id"], str(archivo.id))
@@ -7,6 +7,7 @@ import pytest
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import RequestFactory
 
+from api.models import Trabajo
 from api.views import excel_import
 
 
@@ -61,14 +62,14 @@ def test_upload_excel_files_invalid_format(rf):
     assert "Formato inválido" in data["error"]
 
 
-@patch("api.views.excel_import.call_command")
-def test_upload_excel_files_success(mock_call, rf):
+@pytest.mark.django_db
+def test_upload_excel_files_encola_trabajo(rf, settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
     files = make_files()
     request = rf.post("/upload", data=files)
-    mock_call.return_value = None
     response = excel_import.upload_excel_files(request)
     data = json.loads(response.content)
-    assert response.status_code == 200
+    assert response.status_code == 202
     assert data["success"] is True
     assert set(data["data"]["files_processed"]) == {
         "excel1",
@@ -77,29 +78,17 @@ def test_upload_excel_files_success(mock_call, rf):
         "excel4",
     }
 
-
-@patch("api.views.excel_import.call_command", side_effect=Exception("fallo"))
-@patch("api.views.excel_import.logger")
-def test_upload_excel_files_import_command_fails(mock_logger, mock_call, rf):
-    files = make_files()
-    request = rf.post("/upload", data=files)
-    response = excel_import.upload_excel_files(request)
-    data = json.loads(response.content)
-    assert response.status_code == 500
-    assert not data["success"]
-    mock_logger.error.assert_called()
-
-
-@patch(
-    "api.views.excel_import.shutil.rmtree", side_effect=Exception("permiso denegado")
-)
-@patch("api.views.excel_import.call_command")
-@patch("api.views.excel_import.logger")
-def test_upload_excel_files_cleanup_warns(mock_logger, mock_call, mock_rmtree, rf):
-    files = make_files()
-    request = rf.post("/upload", data=files)
-    excel_import.upload_excel_files(request)
-    mock_logger.warning.assert_called()
+    trabajo = Trabajo.objects.get(id=data["trabajo_id"])
+    assert trabajo.tipo == "importar_excel"
+    assert trabajo.estado == "PENDIENTE"
+    # Los archivos quedan en MEDIA para que los lea el worker
+    carpeta = tmp_path / "uploads" / "importaciones" / str(trabajo.id)
+    assert sorted(p.name for p in carpeta.iterdir()) == [
+        "excel1.xlsx",
+        "excel2.xlsx",
+        "excel3.xlsx",
+        "excel4.xlsx",
+    ]
 
 
 @patch("api.views.excel_import.logger")
@@ -1,10 +1,18 @@
 import logging
+import os
 from pathlib import Path
 
 import pandas as pd
 import pytest
 
-from api.management.modules.excel_processor import ExcelProcessor
+from api.management.modules.data_mapper import DataMapper
+from api.management.modules.excel_cache import ParsedExcelCache
+from api.management.modules.excel_processor import (
+    COMBINE_COLUMNS,
+    ExcelProcessor,
+    detect_excel_engine,
+    read_excel_file,
+)
 
 
 @pytest.fixture
@@ -219,6 +227,30 @@ def test_process_local_files(sample_excel_files):
     assert len(result["combined"]) > 0
 
 
+def test_process_local_files_proyecta_excel3(sample_excel_files, monkeypatch):
+    archivos = {k: str(v) for k, v in sample_excel_files.items()}
+    archivos["excel3"] = str(sample_excel_files["excel3"].with_name("camas.xlsx"))
+    pd.DataFrame(
+        {
+            "EPISODIO": ["EP001", "EP002"],
+            "CAMA": ["101", "102"],
+            "HABITACION": ["H101", "H102"],
+            "MEDICO_TRATANTE": ["Dr. Juan", "Dra. María"],
+        }
+    ).to_excel(archivos["excel3"], index=False)
+    proyectado = ExcelProcessor(max_workers=1).process_local_files(archivos)
+    monkeypatch.setattr(
+        "api.management.modules.excel_processor.LOCAL_FILES_COLUMNS", {}
+    )
+    completo = ExcelProcessor(max_workers=1).process_local_files(archivos)
+
+    assert "MEDICO_TRATANTE" not in proyectado["excel3"].columns
+    assert "MEDICO_TRATANTE" in completo["excel3"].columns
+    mapeado = DataMapper().map_processed_data(proyectado)
+    assert len(mapeado["camas"]) == 2
+    assert mapeado == DataMapper().map_processed_data(completo)
+
+
 # --- 🔹 Casos de error extremos ---
 def test_combine_data_with_missing_column(sample_excel_files):
     processor = ExcelProcessor()
@@ -449,3 +481,158 @@ def test_load_excel_files_exception_during_excel3(monkeypatch, processor):
         }
     )
     assert result is False
+
+
+# === Lectura en paralelo ===
+
+
+def test_detect_excel_engine(tmp_path):
+    xlsx = tmp_path / "a.xlsx"
+    pd.DataFrame({"a": [1]}).to_excel(xlsx, index=False)
+    xls = tmp_path / "b.xls"
+    xls.write_bytes(b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\x00" * 100)
+    otro = tmp_path / "c.xlsx"
+    otro.write_text("no es un excel")
+
+    assert detect_excel_engine(xlsx) == "openpyxl"
+    assert detect_excel_engine(xls) == "xlrd"
+    with pytest.raises(ValueError):
+        detect_excel_engine(otro)
+
+
+def test_load_excel_files_parallel_equals_sequential(sample_excel_files):
+    paralelo = ExcelProcessor(max_workers=4)
+    secuencial = ExcelProcessor(max_workers=1)
+
+    assert paralelo.load_excel_files(sample_excel_files) is True
+    assert secuencial.load_excel_files(sample_excel_files) is True
+
+    for name in ["excel1_df", "excel2_df", "excel3_df", "excel4_df"]:
+        pd.testing.assert_frame_equal(
+            getattr(paralelo, name), getattr(secuencial, name)
+        )
+    assert set(paralelo.load_timings) == {"excel1", "excel2", "excel3", "excel4"}
+
+
+def test_load_excel_files_parallel_invalid_file(sample_excel_files, tmp_path):
+    invalid = tmp_path / "invalid.xlsx"
+    invalid.write_text("no es un excel")
+    sample_excel_files["excel3"] = invalid
+
+    processor = ExcelProcessor(max_workers=4)
+
+    assert processor.load_excel_files(sample_excel_files) is False
+    assert processor.excel2_df is not None
+    assert processor._raw_frames == {}
+
+
+# === Lectura proyectada ===
+
+
+def test_read_excel_file_columns_equals_full_read(tmp_path):
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["EPISODIO", "CAMA", "Otra", "CAMA", None, "Puntaje"])
+    sheet.append([1, "C001", "x", "dup", "y", 3])
+    sheet.append([])  # fila vacía al medio: se conserva
+    sheet.append([2, None, "solo otra"])
+    sheet.append([3, "007", None, None, None, 2.5, "más ancho"])
+    sheet.append([None] * 6)  # filas vacías al final: se descartan
+    path = tmp_path / "proyectado.xlsx"
+    workbook.save(path)
+
+    full = pd.read_excel(path, engine="openpyxl")
+    projected, engine, _ = read_excel_file(path, ["CAMA", "CAMA.1"], ("episodio",))
+
+    assert engine == "openpyxl"
+    pd.testing.assert_frame_equal(projected, full[["EPISODIO", "CAMA", "CAMA.1"]])
+
+
+def test_combine_data_with_projected_columns(sample_excel_files):
+    completo = ExcelProcessor(max_workers=1)
+    proyectado = ExcelProcessor(max_workers=1)
+
+    assert completo.load_excel_files(sample_excel_files) is True
+    assert (
+        proyectado.load_excel_files(sample_excel_files, columns=COMBINE_COLUMNS) is True
+    )
+    assert "MEDICO_TRATANTE" not in proyectado.excel3_df.columns
+    assert completo.combine_data() and proyectado.combine_data()
+
+    pd.testing.assert_frame_equal(proyectado.combined_df, completo.combined_df)
+
+
+# === Caché de planillas parseadas ===
+
+
+def _sin_parsear(monkeypatch):
+    """Falla si se vuelve a parsear un Excel"""
+
+    def parsear(*args, **kwargs):
+        raise AssertionError("el Excel se parseó de nuevo")
+
+    monkeypatch.setattr(pd, "read_excel", parsear)
+    monkeypatch.setattr(
+        "api.management.modules.excel_processor._read_xlsx_columns", parsear
+    )
+
+
+def test_read_excel_file_parsea_una_sola_vez(sample_excel_files, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    path = sample_excel_files["excel1"]
+    primero, engine, _ = read_excel_file(path, cache_dir=cache_dir)
+    assert engine == "openpyxl"
+
+    _sin_parsear(monkeypatch)
+    segundo, engine, _ = read_excel_file(path, cache_dir=cache_dir)
+    # Una proyección sale de la hoja completa ya parseada
+    proyectado, _, _ = read_excel_file(
+        path, ["Tipo Actividad"], ("episodio",), cache_dir=cache_dir
+    )
+
+    assert engine == "cache"
+    pd.testing.assert_frame_equal(segundo, primero)
+    pd.testing.assert_frame_equal(
+        proyectado, primero[["CÓDIGO EPISODIO CMBD", "Tipo Actividad"]]
+    )
+
+
+def test_cache_se_identifica_por_contenido(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    path = tmp_path / "datos.xlsx"
+    pd.DataFrame({"a": [1]}).to_excel(path, index=False)
+    read_excel_file(path, cache_dir=cache_dir)
+
+    # Mismo nombre, otro contenido: no usa la entrada anterior
+    pd.DataFrame({"a": [2]}).to_excel(path, index=False)
+    df, engine, _ = read_excel_file(path, cache_dir=cache_dir)
+
+    assert engine == "openpyxl"
+    assert df["a"].tolist() == [2]
+
+
+def test_load_excel_files_con_cache(sample_excel_files, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "cache")
+    primero = ExcelProcessor(max_workers=1, cache_dir=cache_dir)
+    assert primero.load_excel_files(sample_excel_files, columns=COMBINE_COLUMNS)
+
+    _sin_parsear(monkeypatch)
+    segundo = ExcelProcessor(max_workers=1, cache_dir=cache_dir)
+    assert segundo.load_excel_files(sample_excel_files, columns=COMBINE_COLUMNS)
+
+    for name in ["excel1_df", "excel2_df", "excel3_df", "excel4_df"]:
+        pd.testing.assert_frame_equal(getattr(segundo, name), getattr(primero, name))
+
+
+def test_cache_borra_entradas_vencidas(tmp_path):
+    cache = ParsedExcelCache(str(tmp_path), max_age_days=1)
+    cache.put("ab" * 32, pd.DataFrame({"a": [1]}))
+    vieja = cache._path("ab" * 32)
+    os.utime(vieja, (0, 0))
+
+    cache.put("cd" * 32, pd.DataFrame({"a": [2]}))
+
+    assert cache.get("ab" * 32) is None
+    assert cache.get("cd" * 32)["a"].tolist() == [2]
@@ -0,0 +1,201 @@
+from datetime import date
+from unittest.mock import patch
+
+import pandas as pd
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from api.models import ArchivoCarga, Cama, Episodio, ErrorCarga, Paciente
+from api.services.processors import (
+    PacienteEpisodioExcelProcessor,
+    PacienteExcelProcessor,
+)
+
+
+def procesar(clase, filas, **atributos):
+    """Procesa `filas` (lista de dicts) como si fueran un Excel subido"""
+
+    class EnMemoria(clase):
+        def _cargar_excel(self):
+            self.df = pd.DataFrame(filas)
+
+    for nombre, valor in atributos.items():
+        setattr(EnMemoria, nombre, valor)
+
+    archivo = ArchivoCarga.objects.create(
+        nombre="x.xlsx", archivo="uploads/excel/x.xlsx", tipo="pacientes"
+    )
+    with CaptureQueriesContext(connection) as queries:
+        EnMemoria(archivo).procesar_archivo()
+    errores = dict(
+        ErrorCarga.objects.filter(archivo=archivo).values_list("fila", "error")
+    )
+    return queries, errores
+
+
+def _consultas(queries, tabla):
+    """SELECT e INSERT sobre `tabla` (sin contar las escrituras del progreso)"""
+    sqls = [q["sql"] for q in queries.captured_queries]
+    return (
+        sum(s.startswith("SELECT") and f'FROM "{tabla}"' in s for s in sqls),
+        sum(s.startswith(f'INSERT INTO "{tabla}"') for s in sqls),
+    )
+
+
+def filas_pacientes(n, inicio=0):
+    return [
+        {
+            "rut": f"{10000000 + inicio + i}-{i % 10}",
+            "nombre": f"Paciente {i}",
+            "sexo": "F",
+            "fecha_nacimiento": "1980-01-01",
+            "prevision": "FONASA",
+        }
+        for i in range(n)
+    ]
+
+
+class PrevalidacionPacientesTest(TestCase):
+    """Validación contra una precarga por IN e inserción en lotes"""
+
+    def test_consultas_no_dependen_de_la_cantidad_de_filas(self):
+        conteos = []
+        for n, inicio in [(10, 0), (200, 1000)]:
+            queries, errores = procesar(
+                PacienteExcelProcessor, filas_pacientes(n, inicio), TAMANO_LOTE=50
+            )
+            self.assertEqual(errores, {})
+            conteos.append(_consultas(queries, "pacientes"))
+
+        selects_10, _ = conteos[0]
+        selects_200, inserts_200 = conteos[1]
+        self.assertEqual(selects_10, selects_200)
+        self.assertEqual(selects_200, 1)
+        # 200 filas en lotes de 50 (SQLite puede partir cada lote)
+        self.assertLess(inserts_200, 20)
+        self.assertEqual(Paciente.objects.count(), 210)
+
+    def test_mensajes_de_duplicados_se_mantienen(self):
+        existente = filas_pacientes(1)[0]
+        procesar(PacienteExcelProcessor, [existente])
+
+        nuevo = filas_pacientes(1, inicio=5)[0]
+        _, errores = procesar(PacienteExcelProcessor, [existente, nuevo, nuevo])
+
+        self.assertEqual(
+            errores,
+            {
+                2: f"Ya existe paciente con RUT {existente['rut']}",
+                4: f"Ya existe paciente con RUT {nuevo['rut']}",
+            },
+        )
+        self.assertEqual(Paciente.objects.count(), 2)
+
+    def test_fila_que_falla_al_guardar_no_reserva_su_rut(self):
+        fila = filas_pacientes(1)[0]
+        filas = [dict(fila, nombre="Falla"), fila]
+        guardar = Paciente.save
+
+        def save(paciente, *args, **kwargs):
+            if paciente.nombre == "Falla":
+                raise IntegrityError("falla")
+            return guardar(paciente, *args, **kwargs)
+
+        with patch.object(
+            Paciente.objects, "bulk_create", side_effect=IntegrityError("lote")
+        ), patch.object(Paciente, "save", autospec=True, side_effect=save):
+            _, errores = procesar(PacienteExcelProcessor, filas)
+
+        self.assertEqual(list(errores), [2])
+        self.assertEqual(Paciente.objects.get(rut=fila["rut"]).nombre, fila["nombre"])
+
+
+class PrevalidacionPacienteEpisodioTest(TestCase):
+    def setUp(self):
+        self.camas = [
+            Cama.objects.create(codigo_cama=f"C{i}", habitacion="H1") for i in range(4)
+        ]
+        self.paciente = Paciente.objects.create(
+            rut="11111111-1",
+            nombre="Antiguo",
+            sexo="F",
+            fecha_nacimiento=date(1970, 1, 1),
+        )
+        Episodio.objects.create(
+            paciente=self.paciente,
+            cama=self.camas[0],
+            episodio_cmbd=1,
+            fecha_ingreso=timezone.now(),
+        )
+
+    def _fila(self, episodio, cama, rut="22222222-2", nombre="Nueva"):
+        return {
+            "rut_paciente": rut,
+            "nombre_paciente": nombre,
+            "episodio": episodio,
+            "habitacion": "H1",
+            "cama": cama,
+            "categoria_tratamiento": "Médica",
+            "fecha_admision": "2024-01-01",
+        }
+
+    def test_valida_contra_la_precarga_y_crea_pacientes_y_episodios(self):
+        filas = [
+            self._fila(1, "C1"),  # número CMBD ya existe
+            self._fila(2, "C0"),  # cama ocupada por un episodio activo
+            self._fila(3, "C9"),  # cama inexistente
+            self._fila(4, "C1"),  # paciente nuevo
+            self._fila(5, "C2"),  # mismo paciente nuevo, otra cama
+            self._fila(6, "C2"),  # cama que ocupó la fila anterior
+            self._fila(4, "C3"),  # número que usó una fila anterior
+            self._fila(7, "C3", rut="11111111-1", nombre="Renombrado"),
+        ]
+
+        queries, errores = procesar(PacienteEpisodioExcelProcessor, filas)
+
+        self.assertEqual(
+            errores,
+            {
+                2: "Ya existe episodio con número 1",
+                3: "La cama C0 ya está ocupada por episodio activo",
+                4: "No existe cama C9 en habitación H1",
+                7: "La cama C2 ya está ocupada por episodio activo",
+                8: "Ya existe episodio con número 4",
+            },
+        )
+        # Las filas 5 y 6 usan claves de una fila aún sin guardar: el lote se
+        # inserta antes de validarlas
+        self.assertEqual(_consultas(queries, "episodios"), (2, 3))
+        self.assertEqual(_consultas(queries, "pacientes"), (1, 1))
+
+        nuevo = Paciente.objects.get(rut="22222222-2")
+        self.assertEqual(
+            sorted(nuevo.episodios.values_list("episodio_cmbd", flat=True)), [4, 5]
+        )
+        self.paciente.refresh_from_db()
+        self.assertEqual(self.paciente.nombre, "Renombrado")
+        self.assertEqual(
+            Episodio.objects.get(episodio_cmbd=7).cama_id, self.camas[3].id
+        )
+
+    def test_fila_que_falla_al_guardar_no_deja_su_paciente_a_las_siguientes(self):
+        filas = [self._fila(4, "C1"), self._fila(5, "C2")]
+        guardar = Episodio.save
+
+        def save(episodio, *args, **kwargs):
+            if episodio.episodio_cmbd == 4:
+                raise IntegrityError("falla")
+            return guardar(episodio, *args, **kwargs)
+
+        with patch.object(
+            Episodio.objects, "bulk_create", side_effect=IntegrityError("lote")
+        ), patch.object(Episodio, "save", autospec=True, side_effect=save):
+            _, errores = procesar(PacienteEpisodioExcelProcessor, filas)
+
+        self.assertEqual(list(errores), [2])
+        nuevo = Paciente.objects.get(rut="22222222-2")
+        self.assertEqual(
+            list(nuevo.episodios.values_list("episodio_cmbd", flat=True)), [5]
+        )
@@ -0,0 +1,137 @@
+import pandas as pd
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+
+from api.models import ArchivoCarga, ErrorCarga
+from api.services.excel_processor import ExcelProcessor
+from api.services.progreso_carga import ReporteProgreso
+from api.tests.base_test import AuthenticatedAPITestCase
+
+
+class RechazaTodoProcessor(ExcelProcessor):
+    """Procesador en memoria cuyas filas fallan todas la validación"""
+
+    def _cargar_excel(self):
+        self.df = pd.DataFrame({"valor": range(self.archivo_carga.filas_totales)})
+
+    def _validar_estructura(self):
+        return True
+
+    def _validar_fila(self, datos, numero_fila):
+        self._agregar_error(numero_fila, f"Valor inválido: {datos['valor']}")
+        return None
+
+    def _procesar_fila_modelo(self, datos, numero_fila):
+        pass
+
+    def get_columnas_requeridas(self):
+        return ["valor"]
+
+    def get_columnas_opcionales(self):
+        return []
+
+
+def _escrituras(queries):
+    sqls = [q["sql"] for q in queries.captured_queries]
+    return (
+        sum(s.startswith('UPDATE "api_archivocarga"') for s in sqls),
+        sum(s.startswith('INSERT INTO "errores_carga"') for s in sqls),
+    )
+
+
+class ReporteProgresoTest(TestCase):
+    """Errores y progreso de ArchivoCarga guardados en lotes"""
+
+    def setUp(self):
+        self.archivo = ArchivoCarga.objects.create(
+            nombre="x.xlsx", archivo="uploads/excel/x.xlsx", tipo="camas"
+        )
+
+    def test_archivo_con_muchos_errores_escribe_en_lotes(self):
+        self.archivo.filas_totales = 2500
+
+        with CaptureQueriesContext(connection) as queries:
+            RechazaTodoProcessor(self.archivo).procesar_archivo()
+
+        updates, inserts = _escrituras(queries)
+        # Antes: un UPDATE del JSON completo por error y otro cada 10 filas
+        self.assertLessEqual(updates, 6)
+        # 3 bulk_create; SQLite los parte según su límite de parámetros
+        self.assertLessEqual(inserts, 20)
+
+        self.archivo.refresh_from_db()
+        self.assertEqual(self.archivo.estado, "ERROR")
+        self.assertEqual(self.archivo.filas_errores, 2500)
+        self.assertEqual(len(self.archivo.errores), ArchivoCarga.ERRORES_RESUMEN_MAX)
+        self.assertEqual(self.archivo.errores[0]["fila"], 2)
+        filas = list(self.archivo.errores_detalle.values_list("fila", flat=True))
+        self.assertEqual(filas, list(range(2, 2502)))
+
+    def test_nada_se_escribe_antes_del_presupuesto(self):
+        with ReporteProgreso(self.archivo, cada_filas=100, cada_segundos=60) as rep:
+            self.archivo.agregar_error(2, "malo")
+            self.archivo.actualizar_progreso(0, 50)
+            self.assertFalse(ErrorCarga.objects.exists())
+            self.assertEqual(ArchivoCarga.objects.get().filas_errores, 0)
+
+            # Alcanzar el presupuesto de filas guarda todo junto
+            self.archivo.actualizar_progreso(0, 100)
+            self.assertEqual(rep.escrituras, 1)
+            self.assertEqual(ErrorCarga.objects.count(), 1)
+            self.assertEqual(ArchivoCarga.objects.get().filas_errores, 100)
+
+    def test_presupuesto_de_tiempo(self):
+        with ReporteProgreso(self.archivo, cada_filas=1000, cada_segundos=0) as rep:
+            self.archivo.agregar_error(2, "malo")
+            self.archivo.agregar_error(3, "malo")
+            self.assertEqual(rep.escrituras, 2)
+            self.assertEqual(ErrorCarga.objects.count(), 2)
+
+    def test_guarda_lo_pendiente_si_hay_excepcion(self):
+        with self.assertRaises(RuntimeError):
+            with ReporteProgreso(self.archivo, cada_segundos=60):
+                self.archivo.agregar_error(0, "Error global: se cortó")
+                raise RuntimeError("fallo")
+
+        self.assertEqual(ErrorCarga.objects.get().error, "Error global: se cortó")
+        self.assertIsNone(self.archivo._reporte)
+
+    def test_sin_reporte_el_resumen_lleno_solo_inserta(self):
+        self.archivo.errores = [{"fila": i, "error": "x"} for i in range(50)]
+        self.archivo.save()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.archivo.agregar_error(99, "otro")
+
+        self.assertEqual(_escrituras(queries), (0, 1))
+        self.assertEqual(len(ArchivoCarga.objects.get().errores), 50)
+
+
+class ErroresArchivoEndpointTest(AuthenticatedAPITestCase):
+    """GET /api/excel/errores/<id>/: errores completos y paginados"""
+
+    def setUp(self):
+        self.authenticate_admin()
+        self.archivo = ArchivoCarga.objects.create(
+            nombre="x.xlsx", archivo="uploads/excel/x.xlsx", tipo="camas"
+        )
+        ErrorCarga.objects.bulk_create(
+            ErrorCarga(archivo=self.archivo, fila=i + 2, error=f"Error {i}")
+            for i in range(250)
+        )
+
+    def test_lista_paginada(self):
+        url = reverse("errores_archivo", args=[self.archivo.id])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 250)
+        self.assertEqual(len(response.data["results"]), 100)
+        self.assertEqual(response.data["results"][0]["fila"], 2)
+
+        response = self.client.get(url, {"page": 3})
+        self.assertEqual(len(response.data["results"]), 50)
+        self.assertEqual(response.data["results"][-1]["error"], "Error 249")
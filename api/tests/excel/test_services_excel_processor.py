@@ -25,6 +25,9 @@ class DummyArchivo:
     def actualizar_progreso(self, procesadas, errores):
         self.filas_totales = procesadas + errores
 
+    def cambiar_etapa(self, etapa):
+        self.etapa = etapa
+
     def agregar_error(self, fila, error, detalle=None):
         self.errores.append({"fila": fila, "error": error, "detalle": detalle})
 
@@ -0,0 +1,307 @@
+import io
+import multiprocessing
+import os
+import signal
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch
+
+import pandas as pd
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from api.management.commands.run_workers import _iniciar_worker
+from api.management.modules.excel_processor import ExcelProcessor
+from api.models import ArchivoCarga, Trabajo
+from api.services import trabajos
+from api.tests.base_test import AuthenticatedAPITestCase
+
+
+def excel(columnas, nombre="camas.xlsx"):
+    buffer = io.BytesIO()
+    pd.DataFrame([{c: "x" for c in columnas}]).to_excel(buffer, index=False)
+    return SimpleUploadedFile(nombre, buffer.getvalue())
+
+
+@override_settings(TRABAJOS_BACKOFF_SEGUNDOS=10, TRABAJOS_MAX_INTENTOS=3)
+class ColaTrabajosTest(AuthenticatedAPITestCase):
+    """Cola de trabajos en la base: encolado, reclamo, reintentos y recuperación"""
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.authenticate_admin()
+
+    def _trabajo(self, tipo="prueba", **kwargs):
+        return Trabajo.objects.create(tipo=tipo, **kwargs)
+
+    # ------------------------------------------------------------
+    # Endpoints de carga
+    # ------------------------------------------------------------
+
+    def test_cargas_responden_202_con_el_trabajo(self):
+        cargas = [
+            (reverse("cargar_archivo"), "archivo"),
+            (reverse("archivo-upload"), "file"),
+            (reverse("frontend_upload"), "archivo"),
+        ]
+        for url, campo in cargas:
+            with self.subTest(url=url):
+                response = self.client.post(
+                    url, {campo: excel(["otra"]), "tipo": "CAMAS"}, format="multipart"
+                )
+
+                self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+                trabajo = Trabajo.objects.get(id=response.data["trabajo_id"])
+                self.assertEqual(trabajo.tipo, "procesar_archivo")
+                self.assertEqual(trabajo.estado, "PENDIENTE")
+                self.assertEqual(
+                    str(trabajo.archivo_id), str(response.data["archivo_id"])
+                )
+
+    def test_run_workers_rechaza_una_cache_local_al_proceso(self):
+        caches_locmem = {
+            "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+        }
+        with override_settings(CACHES=caches_locmem):
+            with self.assertRaisesMessage(CommandError, "caché compartida"):
+                call_command("run_workers", stdout=io.StringIO())
+
+    def test_worker_procesa_la_carga_y_expone_el_estado(self):
+        response = self.client.post(
+            reverse("cargar_archivo"),
+            {"archivo": excel(["otra"]), "tipo": "CAMAS"},
+            format="multipart",
+        )
+        trabajo_id = response.data["trabajo_id"]
+
+        call_command("run_workers", una_vez=True, stdout=io.StringIO())
+
+        response = self.client.get(reverse("estado_trabajo", args=[trabajo_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["estado"], "COMPLETADO")
+        self.assertEqual(response.data["intentos"], 1)
+        # Los errores de datos quedan en el ArchivoCarga, no fallan el trabajo
+        archivo = ArchivoCarga.objects.get(id=response.data["archivo_id"])
+        self.assertIsNotNone(archivo.fecha_procesamiento)
+        self.assertTrue(archivo.errores)
+        self.assertEqual(response.data["resultado"]["estado"], archivo.estado)
+
+    # ------------------------------------------------------------
+    # Reclamo
+    # ------------------------------------------------------------
+
+    def test_reclamar_entrega_cada_trabajo_una_vez_y_respeta_disponibilidad(self):
+        primero = self._trabajo()
+        self._trabajo(disponible_desde=timezone.now() + timedelta(minutes=5))
+
+        tomado = trabajos.reclamar("w1")
+        self.assertEqual(tomado.pk, primero.pk)
+        self.assertEqual((tomado.estado, tomado.intentos), ("PROCESANDO", 1))
+        self.assertIsNone(trabajos.reclamar("w2"))
+
+    def test_update_condicionado_evita_doble_reclamo(self):
+        trabajo = self._trabajo()
+        # Otro worker lo toma entre el SELECT y el UPDATE
+        original = Trabajo.objects.select_for_update
+
+        def select_y_robar(**kwargs):
+            qs = original(**kwargs)
+            Trabajo.objects.filter(pk=trabajo.pk).update(
+                estado="PROCESANDO", worker="otro"
+            )
+            return qs
+
+        with patch.object(Trabajo.objects, "select_for_update", select_y_robar):
+            self.assertIsNone(trabajos.reclamar("w1"))
+        self.assertEqual(Trabajo.objects.get(pk=trabajo.pk).worker, "otro")
+
+    # ------------------------------------------------------------
+    # Reintentos
+    # ------------------------------------------------------------
+
+    def test_fallo_reintenta_con_backoff_y_luego_queda_en_error(self):
+        fallas = []
+
+        def falla(trabajo):
+            fallas.append(trabajo.intentos)
+            raise RuntimeError("conexión perdida")
+
+        trabajo = self._trabajo(max_intentos=3)
+        with patch.dict(trabajos.HANDLERS, {"prueba": falla}):
+            for intento, espera in [(1, 10), (2, 20)]:
+                antes = timezone.now()
+                self.assertEqual(trabajos.ejecutar(trabajos.reclamar()), "PENDIENTE")
+                trabajo.refresh_from_db()
+                self.assertEqual(trabajo.intentos, intento)
+                self.assertIn("conexión perdida", trabajo.error)
+                self.assertGreaterEqual(
+                    trabajo.disponible_desde, antes + timedelta(seconds=espera)
+                )
+                # Aún no disponible: se adelanta para el siguiente intento
+                self.assertIsNone(trabajos.reclamar())
+                Trabajo.objects.filter(pk=trabajo.pk).update(
+                    disponible_desde=timezone.now()
+                )
+
+            self.assertEqual(trabajos.ejecutar(trabajos.reclamar()), "ERROR")
+
+        self.assertEqual(fallas, [1, 2, 3])
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.estado, "ERROR")
+        self.assertIsNotNone(trabajo.terminado_en)
+
+    def test_error_no_reintentable_falla_de_inmediato(self):
+        archivo = ArchivoCarga.objects.create(
+            nombre="x.xlsx", archivo="uploads/excel/x.xlsx", tipo="CAMAS"
+        )
+        trabajo = trabajos.encolar("procesar_archivo", {"tipo": "NO_EXISTE"}, archivo)
+
+        self.assertEqual(trabajos.ejecutar(trabajos.reclamar()), "ERROR")
+
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.intentos, 1)
+        self.assertIn("Tipo de procesador no válido", trabajo.error)
+        archivo.refresh_from_db()
+        self.assertEqual(archivo.estado, "ERROR")
+        self.assertTrue(archivo.errores)
+
+    # ------------------------------------------------------------
+    # Recuperación de workers caídos
+    # ------------------------------------------------------------
+
+    def test_recuperar_atascados(self):
+        hace_rato = timezone.now() - timedelta(hours=1)
+        archivo = ArchivoCarga.objects.create(
+            nombre="x.xlsx",
+            archivo="uploads/excel/x.xlsx",
+            tipo="CAMAS",
+            estado="PROCESANDO",
+        )
+        reintentable = self._trabajo(
+            tipo="procesar_archivo",
+            archivo=archivo,
+            estado="PROCESANDO",
+            worker="muerto",
+            latido=hace_rato,
+            intentos=1,
+        )
+        agotado = self._trabajo(
+            estado="PROCESANDO", worker="muerto", latido=hace_rato, intentos=3
+        )
+        vivo = self._trabajo(
+            estado="PROCESANDO", worker="vivo", latido=timezone.now(), intentos=1
+        )
+
+        self.assertEqual(trabajos.recuperar_atascados(timeout=60), 1)
+
+        estados = dict(Trabajo.objects.values_list("pk", "estado"))
+        self.assertEqual(estados[reintentable.pk], "PENDIENTE")
+        self.assertEqual(estados[agotado.pk], "ERROR")
+        self.assertEqual(estados[vivo.pk], "PROCESANDO")
+        archivo.refresh_from_db()
+        self.assertEqual(archivo.estado, "SUBIDO")
+
+    def test_worker_desplazado_no_pisa_el_nuevo_intento(self):
+        trabajo = self._trabajo()
+        viejo = trabajos.reclamar("viejo")
+        # Se dio por atascado y lo tomó otro worker
+        Trabajo.objects.filter(pk=trabajo.pk).update(
+            estado="PENDIENTE", latido=timezone.now() - timedelta(hours=1)
+        )
+        nuevo = trabajos.reclamar("nuevo")
+
+        with patch.dict(trabajos.HANDLERS, {"prueba": lambda t: {"ok": True}}):
+            trabajos.ejecutar(viejo)
+
+        trabajo.refresh_from_db()
+        self.assertEqual((trabajo.estado, trabajo.worker), ("PROCESANDO", "nuevo"))
+        self.assertEqual(nuevo.intentos, 2)
+
+    # ------------------------------------------------------------
+    # Importación de los 4 Excel
+    # ------------------------------------------------------------
+
+    def _importacion(self):
+        trabajo = trabajos.encolar("importar_excel", {"files": ["excel1"]})
+        carpeta = trabajos.carpeta_importacion(trabajo.id)
+        default_storage.save(f"{carpeta}/excel1.xlsx", excel(["Episodio CMBD"]))
+        return trabajo, default_storage.path(carpeta)
+
+    @patch("api.services.trabajos.persist_scores_to_episodios", return_value=1)
+    @patch("api.services.trabajos.call_command")
+    def test_importar_excel_importa_scorea_y_limpia(self, mock_call, mock_scores):
+        trabajo, carpeta = self._importacion()
+
+        self.assertEqual(trabajos.ejecutar(trabajos.reclamar()), "COMPLETADO")
+
+        mock_call.assert_called_once_with(
+            "importar_excel_local", folder=carpeta, bulk=True, verbosity=2
+        )
+        mock_scores.assert_called_once()
+        trabajo.refresh_from_db()
+        self.assertEqual(trabajo.resultado["episodios_scoreados"], 1)
+        self.assertFalse(os.path.exists(carpeta))
+
+    @patch("api.services.trabajos.call_command", side_effect=Exception("fallo"))
+    def test_importar_excel_conserva_archivos_para_reintentar(self, mock_call):
+        trabajo, carpeta = self._importacion()
+
+        self.assertEqual(trabajos.ejecutar(trabajos.reclamar()), "PENDIENTE")
+        self.assertTrue(os.path.exists(carpeta))
+
+        # Agotados los intentos se limpian
+        Trabajo.objects.filter(pk=trabajo.pk).update(
+            intentos=trabajo.max_intentos - 1, disponible_desde=timezone.now()
+        )
+        self.assertEqual(trabajos.ejecutar(trabajos.reclamar()), "ERROR")
+        self.assertFalse(os.path.exists(carpeta))
+
+
+class ProcesoWorkerTest(SimpleTestCase):
+    """Procesos de run_workers: la carga de Excel puede abrir su pool"""
+
+    def setUp(self):
+        carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(carpeta.cleanup)
+        self.archivos = {}
+        for nombre in ["excel1", "excel2", "excel3", "excel4"]:
+            ruta = os.path.join(carpeta.name, f"{nombre}.xlsx")
+            pd.DataFrame({"Episodio": [1, 2], "dato": ["a", "b"]}).to_excel(
+                ruta, index=False
+            )
+            self.archivos[nombre] = ruta
+
+    @override_settings(EXCEL_LOAD_WORKERS=4)
+    @patch("os.cpu_count", return_value=4)
+    def test_un_trabajo_del_worker_lee_los_excel_en_paralelo(self, _):
+        contexto = multiprocessing.get_context("fork")
+        resultados = contexto.Queue()
+        pendientes = [object()]
+
+        def ejecutar(trabajo):
+            # Lo que hace importar_excel_local dentro del trabajo
+            processor = ExcelProcessor()
+            cargado = processor.load_excel_files(self.archivos)
+            resultados.put((cargado, processor.parallel_reads))
+            os.kill(os.getpid(), signal.SIGTERM)
+
+        with patch.object(
+            trabajos,
+            "reclamar",
+            lambda worker: pendientes.pop() if pendientes else None,
+        ), patch.object(trabajos, "ejecutar", ejecutar):
+            proceso = _iniciar_worker(contexto, 0.01)
+        self.addCleanup(proceso.kill)
+
+        self.assertEqual(resultados.get(timeout=60), (True, 4))
+        proceso.join(timeout=30)
+        self.assertEqual(proceso.exitcode, 0)
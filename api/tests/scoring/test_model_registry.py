@@ -0,0 +1,89 @@
+import os
+import pickle
+
+import pytest
+
+from api.services.model_registry import ModelRegistry
+
+
+def _write(path, value, mtime_ns=None):
+    with open(path, "wb") as f:
+        pickle.dump(value, f)
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+class CountingLoader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, path):
+        self.calls += 1
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(tmp_path)
+
+
+def test_carga_una_vez_y_reutiliza(registry, tmp_path):
+    _write(tmp_path / "modelo.pkl", {"v": 1})
+    loader = CountingLoader()
+
+    first = registry.get("modelo.pkl", loader)
+    second = registry.get("modelo.pkl", loader)
+
+    assert first is second
+    assert loader.calls == 1
+    assert registry.stats["modelo.pkl"]["loads"] == 1
+    assert registry.stats["modelo.pkl"]["hits"] == 1
+
+
+def test_archivo_tocado_sin_cambios_no_recarga(registry, tmp_path):
+    path = tmp_path / "modelo.pkl"
+    _write(path, {"v": 1}, mtime_ns=1_000_000_000)
+    loader = CountingLoader()
+    registry.get("modelo.pkl", loader)
+    version = registry.version("modelo.pkl")
+
+    os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+    registry.get("modelo.pkl", loader)
+
+    assert loader.calls == 1
+    assert registry.version("modelo.pkl") == version
+
+
+def test_contenido_nuevo_recarga_y_cambia_version(registry, tmp_path):
+    path = tmp_path / "modelo.pkl"
+    _write(path, {"v": 1}, mtime_ns=1_000_000_000)
+    loader = CountingLoader()
+    registry.get("modelo.pkl", loader)
+    version = registry.version("modelo.pkl")
+
+    _write(path, {"v": 2}, mtime_ns=2_000_000_000)
+    value = registry.get("modelo.pkl", loader)
+
+    assert value == {"v": 2}
+    assert loader.calls == 2
+    assert registry.stats["modelo.pkl"]["reloads"] == 1
+    assert registry.version("modelo.pkl") != version
+
+
+def test_archivo_inexistente(registry):
+    with pytest.raises(FileNotFoundError):
+        registry.get("no_existe.pkl", CountingLoader())
+    assert registry.version("no_existe.pkl") is None
+
+
+def test_summary_y_clear(registry, tmp_path):
+    _write(tmp_path / "modelo.pkl", {"v": 1})
+    registry.get("modelo.pkl", CountingLoader())
+
+    summary = registry.summary()
+    assert summary["modelo.pkl"]["version"] == registry.version("modelo.pkl")
+    assert summary["modelo.pkl"]["loads"] == 1
+
+    registry.clear()
+    assert registry.summary() == {}
@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pandas as pd
+from django.test import TestCase
+from django.utils import timezone
+
+from api.models import Episodio, Paciente
+from api.services.scoring_runner import (
+    persist_scores_to_episodios,
+    write_scores_to_episodios,
+)
+
+
+class PersistScoresTest(TestCase):
+    """Tests de la escritura por lotes de predicciones en episodios"""
+
+    def setUp(self):
+        paciente = Paciente.objects.create(
+            rut="12.345.678-9",
+            nombre="Paciente Test",
+            sexo="F",
+            fecha_nacimiento=datetime(1990, 1, 1),
+        )
+        for cmbd in [10, 20, 30, 40]:
+            Episodio.objects.create(
+                episodio_cmbd=cmbd,
+                paciente=paciente,
+                fecha_ingreso=timezone.now() - timedelta(days=5),
+            )
+
+    def _prediccion(self, cmbd):
+        return Episodio.objects.values_list(
+            "prediccion_extension", "probabilidad_extension"
+        ).get(episodio_cmbd=cmbd)
+
+    def test_escribe_por_lotes(self):
+        scores = pd.DataFrame(
+            {
+                "episodio_cmbd": [10, 20, 30, 99],
+                "pred": [1, 0, 1, 1],
+                "proba": [0.9, 0.1, float("nan"), 0.8],
+            }
+        )
+
+        with self.assertNumQueries(4):  # 2 lotes + savepoint y su release
+            stats = write_scores_to_episodios(scores, batch_size=2)
+
+        self.assertEqual(
+            stats, {"scores": 4, "actualizados": 3, "positivos": 3, "sentencias": 2}
+        )
+        self.assertEqual(self._prediccion(10), (1, 0.9))
+        self.assertEqual(self._prediccion(20), (0, 0.1))
+        self.assertEqual(self._prediccion(30), (1, None))
+        self.assertEqual(self._prediccion(40), (None, None))
+
+    def test_persist_desde_grd(self):
+        df_grd = pd.DataFrame(
+            {"Episodio CMBD": ["10", "20.0", "abc", "10", None], "x": range(5)}
+        )
+        scored = pd.DataFrame(
+            {"pred_clase": [0, 1, 1, 1, 0], "pred_proba": [0.2, 0.7, 0.9, 0.6, 0.3]}
+        )
+        with patch(
+            "api.services.scoring_runner.run_scoring_from_grd", return_value=scored
+        ):
+            updated = persist_scores_to_episodios(df_grd)
+
+        self.assertEqual(updated, 2)
+        # El episodio repetido se queda con la última fila
+        self.assertEqual(self._prediccion(10), (1, 0.6))
+        self.assertEqual(self._prediccion(20), (1, 0.7))
@@ -0,0 +1,77 @@
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import LabelEncoder
+
+from api.services.model_registry import ModelRegistry
+from api.services.scoring_runner import _apply_encoders, build_encoder_tables
+
+
+def _legacy_encode(le, values):
+    """Codificación valor a valor con LabelEncoder (no vistos -> -1)"""
+    known = set(le.classes_)
+    return [le.transform([v])[0] if v in known else -1 for v in values]
+
+
+@pytest.fixture
+def preproc():
+    rng = np.random.default_rng(0)
+    prevision = LabelEncoder().fit([str(v) for v in range(20)])
+    diagnostico = LabelEncoder().fit([f"D{v:04d}" for v in rng.integers(0, 5000, 300)])
+    return {"encoders": {"prevision": prevision, "diagnostico": diagnostico}}
+
+
+def test_paridad_con_label_encoder(preproc):
+    rng = np.random.default_rng(1)
+    features = pd.DataFrame(
+        {
+            "prevision": rng.integers(-5, 25, 2000),
+            "diagnostico": [f"D{v:04d}" for v in rng.integers(0, 5000, 2000)],
+            "edad": rng.random(2000),
+        }
+    )
+    features.loc[::97, "diagnostico"] = None
+
+    result = _apply_encoders(features, preproc, build_encoder_tables(preproc))
+
+    for col, le in preproc["encoders"].items():
+        expected = _legacy_encode(le, features[col].astype(str))
+        assert result[col].tolist() == expected
+        assert result[col].dtype == int
+    assert (result[col] == -1).any()
+    pd.testing.assert_series_equal(result["edad"], features["edad"])
+
+
+def test_sin_encoders_devuelve_features(preproc):
+    features = pd.DataFrame({"edad": [1.0]})
+
+    assert _apply_encoders(features, {}) is features
+    # Columnas del encoder ausentes en las features se ignoran
+    assert _apply_encoders(features, preproc).equals(features)
+
+
+def test_tablas_se_construyen_una_vez_por_carga(tmp_path, preproc):
+    with open(tmp_path / "preprocessing.pkl", "wb") as f:
+        pickle.dump(preproc, f)
+    registry = ModelRegistry(tmp_path)
+    builds = []
+
+    def builder(value):
+        builds.append(value)
+        return build_encoder_tables(value)
+
+    def load(path):
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    registry.get("preprocessing.pkl", load)
+    first = registry.derived("preprocessing.pkl", "encoder_tables", builder)
+    registry.get("preprocessing.pkl", load)
+    second = registry.derived("preprocessing.pkl", "encoder_tables", builder)
+
+    assert first is second
+    assert len(builds) == 1
+    with pytest.raises(KeyError):
+        registry.derived("modelo.pkl", "encoder_tables", builder)
@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework import status
+
+from api.models import Episodio, Gestion, Paciente, User
+from api.tests.base_test import AuthenticatedAPITestCase
+
+
+class ExportarTest(AuthenticatedAPITestCase):
+    """Tests de las exportaciones en streaming (XLSX, CSV y NDJSON)"""
+
+    def setUp(self):
+        self.authenticate_admin()
+        self.paciente = Paciente.objects.create(
+            rut="12.345.678-9",
+            nombre="José Núñez",
+            sexo="M",
+            fecha_nacimiento=date(1980, 1, 1),
+        )
+        Paciente.objects.create(
+            rut="11.111.111-1",
+            nombre="Ana Rojas",
+            sexo="F",
+            fecha_nacimiento=date(1990, 5, 2),
+            score_social=12,
+        )
+        self.usuario = User.objects.create(
+            nombre="Felipe", apellido="Abarca", email="gestor@test.cl"
+        )
+        self.episodio = Episodio.objects.create(
+            paciente=self.paciente,
+            episodio_cmbd=123,
+            fecha_ingreso=timezone.now() - timedelta(days=5),
+            especialidad="Cardiología",
+            probabilidad_extension=0.5,
+        )
+        self.inicio = timezone.now() - timedelta(days=3)
+        Gestion.objects.create(
+            episodio=self.episodio,
+            usuario=self.usuario,
+            tipo_gestion="TRASLADO",
+            estado_gestion="EN_PROGRESO",
+            fecha_inicio=self.inicio,
+        )
+        Gestion.objects.create(
+            episodio=self.episodio,
+            tipo_gestion="GESTION_CLINICA",
+            estado_gestion="COMPLETADA",
+            fecha_inicio=self.inicio,
+            fecha_fin=self.inicio + timedelta(days=2),
+        )
+
+    def _contenido(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content)
+
+    def test_exportar_excel_gestiones(self):
+        response = self.client.get(reverse("gestion-exportar-excel"))
+
+        wb = load_workbook(io.BytesIO(self._contenido(response)))
+        ws = wb["Gestiones"]
+        filas = list(ws.iter_rows(values_only=True))
+        self.assertEqual(len(filas), 3)
+        encabezados = filas[0]
+        self.assertEqual(encabezados[0], "Episodio CMBD")
+        self.assertEqual(len(encabezados), 21)
+        self.assertTrue(ws["A1"].font.bold)
+
+        por_estado = {fila[5]: dict(zip(encabezados, fila)) for fila in filas[1:]}
+        traslado = por_estado["En Progreso"]
+        self.assertEqual(traslado["Episodio CMBD"], 123)
+        self.assertEqual(traslado["RUT Paciente"], "12.345.678-9")
+        self.assertEqual(traslado["Usuario Responsable"], "gestor@test.cl")
+        self.assertEqual(traslado["Tipo de Gestión"], "Traslado")
+        self.assertEqual(traslado["Duración (días)"], 3)
+        self.assertEqual(
+            traslado["Fecha Inicio"].replace(microsecond=0),
+            timezone.localtime(self.inicio).replace(tzinfo=None, microsecond=0),
+        )
+        self.assertEqual(por_estado["Completada"]["Usuario Responsable"], None)
+        self.assertEqual(por_estado["Completada"]["Duración (días)"], 2)
+
+    def test_csv_con_filtros_del_listado(self):
+        response = self.client.get(
+            reverse("gestion-exportar"),
+            {"formato": "csv", "estado_gestion": "COMPLETADA"},
+        )
+
+        contenido = self._contenido(response).decode("utf-8")
+        self.assertTrue(contenido.startswith("\ufeff"))
+        filas = list(csv.reader(io.StringIO(contenido.lstrip("\ufeff"))))
+        self.assertEqual(len(filas), 2)
+        self.assertEqual(filas[1][5], "Completada")
+        self.assertIn("text/csv", response["Content-Type"])
+
+    def test_ndjson_episodios_con_semaforo(self):
+        response = self.client.get(reverse("episodio-exportar"), {"formato": "ndjson"})
+
+        lineas = self._contenido(response).decode("utf-8").splitlines()
+        self.assertEqual(len(lineas), 1)
+        fila = json.loads(lineas[0])
+        self.assertEqual(fila["episodio_cmbd"], 123)
+        self.assertEqual(fila["paciente_nombre"], "José Núñez")
+        self.assertEqual(fila["dias_estadia"], 5)
+        self.assertEqual(fila["semaforo"], "red")
+
+    def test_pacientes_con_busqueda(self):
+        response = self.client.get(
+            reverse("paciente-exportar"), {"formato": "ndjson", "search": "Ana"}
+        )
+
+        filas = [
+            json.loads(linea)
+            for linea in self._contenido(response).decode("utf-8").splitlines()
+        ]
+        self.assertEqual(
+            [(f["rut"], f["sexo"], f["score_social"]) for f in filas],
+            [("11.111.111-1", "Mujer", 12)],
+        )
+
+    def test_formato_invalido(self):
+        response = self.client.get(reverse("paciente-exportar"), {"formato": "pdf"})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
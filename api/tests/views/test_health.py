@@ -23,6 +23,7 @@ def test_health_check_ok(rf):
     assert data["status"] == "healthy"
     assert data["database"] == "connected"
     assert "UC Christus Backend is running" in data["message"]
+    assert isinstance(data["cache"], dict)
 
 
 @pytest.mark.django_db
@@ -39,3 +40,19 @@ def test_health_check_db_error(rf):
     assert data["database"] == "disconnected"
     assert "error" in data
     assert "DB error" in data["error"]
+
+
+@pytest.mark.django_db
+def test_health_check_informa_version_de_modelos(rf):
+    """Debe informar la versión de los modelos ya cargados, sin forzar su carga"""
+    request = rf.get("/health/")
+    fake_registry = MagicMock()
+    fake_registry.summary.return_value = {"modelo.pkl": {"version": "abc123def456"}}
+
+    with patch("api.views.health.connection.cursor"), patch(
+        "api.views.health.registry", fake_registry
+    ):
+        response = health_check(request)
+
+    data = json.loads(response.content)
+    assert data["ml_models"] == {"modelo.pkl": "abc123def456"}
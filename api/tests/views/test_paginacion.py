@@ -0,0 +1,115 @@
+from datetime import date, timedelta
+from unittest import skipUnless
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+
+from api.models import Episodio, Paciente
+from api.tests.base_test import AuthenticatedAPITestCase
+
+
+class PaginacionListadosTest(AuthenticatedAPITestCase):
+    """Paginación por página, por cursor (keyset) y con conteo aproximado"""
+
+    @classmethod
+    def setUpTestData(cls):
+        paciente = Paciente.objects.create(
+            rut="12.345.678-9",
+            nombre="Paciente",
+            sexo="F",
+            fecha_nacimiento=date(1970, 1, 1),
+        )
+        ahora = timezone.now().replace(microsecond=0)
+        # Fechas repetidas de a tres para ejercitar el desempate por id
+        Episodio.objects.bulk_create(
+            Episodio(
+                paciente=paciente,
+                episodio_cmbd=i,
+                fecha_ingreso=ahora - timedelta(hours=i // 3),
+                tipo_actividad="Hospitalización",
+            )
+            for i in range(50)
+        )
+        cls.esperado = [
+            str(pk)
+            for pk in Episodio.objects.order_by("-fecha_ingreso", "-id").values_list(
+                "id", flat=True
+            )
+        ]
+
+    def setUp(self):
+        self.authenticate_admin()
+        self.url = reverse("episodio-list")
+
+    def _ids(self, response):
+        return [fila["id"] for fila in response.data["results"]]
+
+    def test_paginacion_por_pagina_sin_cambios(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 50)
+        self.assertEqual(len(response.data["results"]), 20)
+        self.assertNotIn("count_aproximado", response.data)
+
+    def test_cursor_recorre_todo_sin_repetir_ni_saltar(self):
+        response = self.client.get(self.url, {"paginacion": "cursor", "page_size": 7})
+        self.assertIsNone(response.data["previous"])
+        paginas = [self._ids(response)]
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            paginas.append(self._ids(response))
+
+        self.assertEqual(sum(paginas, []), self.esperado)
+        self.assertEqual(len(paginas), 8)
+
+        # Volver hacia atrás entrega las mismas páginas
+        for pagina in reversed(paginas[:-1]):
+            response = self.client.get(response.data["previous"])
+            self.assertEqual(self._ids(response), pagina)
+        self.assertIsNone(response.data["previous"])
+
+    def test_cursor_no_cuenta_filas(self):
+        response = self.client.get(self.url, {"paginacion": "cursor"})
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(response.data["next"])
+        self.assertFalse(
+            [q for q in queries.captured_queries if "COUNT(" in q["sql"].upper()]
+        )
+
+    def test_cursor_invalido_u_ordering(self):
+        response = self.client.get(self.url, {"cursor": "no-es-un-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(
+            self.url, {"paginacion": "cursor", "ordering": "fecha_egreso"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cursor_en_gestiones_y_notas(self):
+        for nombre in ["gestion-list", "nota-list"]:
+            response = self.client.get(reverse(nombre), {"paginacion": "cursor"})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(set(response.data), {"next", "previous", "results"})
+
+    def test_conteo_aproximado_con_filtros_es_exacto(self):
+        response = self.client.get(
+            self.url, {"conteo": "aproximado", "tipo_actividad": "Hospitalización"}
+        )
+
+        self.assertEqual(response.data["count"], 50)
+        self.assertNotIn("count_aproximado", response.data)
+
+    @skipUnless(connection.vendor == "postgresql", "usa pg_class.reltuples")
+    def test_conteo_aproximado_usa_estadisticas(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE episodios")
+
+        response = self.client.get(self.url, {"conteo": "aproximado"})
+
+        self.assertTrue(response.data["count_aproximado"])
+        self.assertEqual(response.data["count"], 50)
@@ -0,0 +1,188 @@
+import json
+import re
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+
+from api.models import Episodio, Gestion, Paciente
+from api.tests.base_test import AuthenticatedAPITestCase
+
+# Tablas que crecen con la operación: en ellas no se acepta un scan secuencial
+TABLAS_GRANDES = {"pacientes", "episodios", "gestiones", "episodios_servicio", "notas"}
+
+# Endpoints cuyas consultas deben resolverse con índices. No se incluyen los
+# agregados sobre la tabla completa (estadisticas), que la leen entera por diseño
+ENDPOINTS = [
+    ("paciente-list", {}),
+    ("paciente-score-social-top", {"limit": 5}),
+    ("episodio-list", {}),
+    ("episodio-activos", {}),
+    ("episodio-extensiones-criticas", {}),
+    ("episodio-alertas-prediccion", {}),
+    ("episodio-tendencia-estadia", {"months": 3}),
+    ("gestion-list", {}),
+    ("gestion-list", {"estado_gestion": "INICIADA"}),
+    ("gestion-pendientes", {}),
+    ("gestion-tareas-pendientes", {}),
+]
+
+
+@contextmanager
+def capturar_selects():
+    """SQL y parámetros de cada SELECT ejecutado dentro del bloque"""
+    consultas = []
+
+    def wrapper(execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith("SELECT"):
+            consultas.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield consultas
+
+
+# COUNT(*) de la paginación sin filtros: lee la tabla entera por definición
+COUNT_TABLA_COMPLETA = re.compile(
+    r'^SELECT COUNT\(\*\) AS "__count" FROM (?!.* WHERE )'
+)
+
+
+def _alias_de_tablas(sql):
+    """Alias (T3, U0...) -> tabla, para leer los planes de SQLite"""
+    return {alias: tabla for tabla, alias in re.findall(r'"(\w+)" (\w+)', sql)}
+
+
+def _indices_parciales(cursor):
+    """Índices con WHERE: recorrerlos enteros no lee toda la tabla"""
+    if connection.vendor == "postgresql":
+        cursor.execute(
+            "SELECT indexname FROM pg_indexes WHERE indexdef LIKE '% WHERE %'"
+        )
+    else:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND sql LIKE '% WHERE %'"
+        )
+    return {fila[0] for fila in cursor.fetchall()}
+
+
+def recorridos_completos(sql, params):
+    """
+    Tablas que el plan recorre completas: scan secuencial, o recorrido de un
+    índice entero no parcial que no filtra por él (se acepta solo para un
+    top-N con LIMIT)
+    """
+    with connection.cursor() as cursor:
+        parciales = _indices_parciales(cursor)
+        if connection.vendor == "postgresql":
+            # Con tablas chicas el planner prefiere el scan aunque haya
+            # índice; desactivarlo deja el scan solo si no hay índice útil
+            cursor.execute("SET enable_seqscan = off")
+            try:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+            finally:
+                cursor.execute("RESET enable_seqscan")
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+
+            tablas, pendientes = [], [(plan[0]["Plan"], False)]
+            while pendientes:
+                nodo, con_limit = pendientes.pop()
+                tipo = nodo["Node Type"]
+                if tipo == "Seq Scan" or (
+                    tipo == "Index Scan"
+                    and "Index Cond" not in nodo
+                    and nodo["Index Name"] not in parciales
+                    and not con_limit
+                ):
+                    tablas.append(nodo["Relation Name"])
+                con_limit = con_limit or tipo == "Limit"
+                pendientes.extend((hijo, con_limit) for hijo in nodo.get("Plans", []))
+            return tablas
+
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        alias = _alias_de_tablas(sql)
+        con_limit = " LIMIT " in sql.upper()
+        tablas = []
+        for *_, detalle in cursor.fetchall():
+            match = re.match(r"SCAN (\w+)(?: USING INDEX (\w+))?$", detalle)
+            if match and not (
+                match.group(2) and (con_limit or match.group(2) in parciales)
+            ):
+                tablas.append(alias.get(match.group(1), match.group(1)))
+        return tablas
+
+
+class QueryPlansTest(AuthenticatedAPITestCase):
+    """
+    Corre EXPLAIN sobre las consultas de cada endpoint con la base poblada y
+    falla si alguna recorre completa una tabla grande
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        ahora = timezone.now()
+        pacientes = Paciente.objects.bulk_create(
+            Paciente(
+                rut=f"{i}.000.000-{i % 10}",
+                nombre=f"Paciente {i:04d}",
+                sexo="M" if i % 2 else "F",
+                fecha_nacimiento=date(1950, 1, 1) + timedelta(days=i),
+                score_social=i % 15 if i % 3 else None,
+            )
+            for i in range(1, 201)
+        )
+        episodios = Episodio.objects.bulk_create(
+            Episodio(
+                paciente=pacientes[i % len(pacientes)],
+                episodio_cmbd=1000 + i,
+                fecha_ingreso=ahora - timedelta(days=i % 90, hours=i % 24),
+                fecha_egreso=ahora if i % 4 == 0 else None,
+                tipo_actividad="HOSPITALIZACIÓN",
+                estancia_norma_grd=(i % 9) or None,
+                prediccion_extension=i % 2,
+                probabilidad_extension=(i % 100) / 100,
+            )
+            for i in range(400)
+        )
+        estados = ["INICIADA", "EN_PROGRESO", "COMPLETADA", "CANCELADA"]
+        Gestion.objects.bulk_create(
+            Gestion(
+                episodio=episodios[i],
+                tipo_gestion="GESTION_CLINICA",
+                estado_gestion=estados[i % len(estados)],
+                fecha_inicio=ahora - timedelta(hours=i),
+            )
+            for i in range(400)
+        )
+
+    def setUp(self):
+        self.authenticate_admin()
+
+    def test_endpoints_sin_recorridos_completos(self):
+        for nombre, params in ENDPOINTS:
+            with self.subTest(endpoint=nombre, params=params):
+                with capturar_selects() as consultas:
+                    response = self.client.get(reverse(nombre), params)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(consultas)
+
+                for sql, sql_params in consultas:
+                    if COUNT_TABLA_COMPLETA.match(sql):
+                        continue
+                    scans = set(recorridos_completos(sql, sql_params)) & TABLAS_GRANDES
+                    self.assertFalse(
+                        scans, f"Recorrido completo de {sorted(scans)} en:\n{sql}"
+                    )
+
+    def test_busqueda_por_cmbd_y_rut_usa_indice(self):
+        # Consultas del importador y del scoring por clave natural
+        for queryset in [
+            Episodio.objects.filter(episodio_cmbd=1010),
+            Paciente.objects.filter(rut="10.000.000-0"),
+        ]:
+            sql, params = queryset.query.sql_with_params()
+            self.assertFalse(recorridos_completos(sql, params), sql)
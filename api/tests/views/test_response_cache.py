@@ -0,0 +1,267 @@
+import os
+import runpy
+import threading
+import time
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from api.models import Episodio, Gestion, Paciente
+from api.services import response_cache
+from api.services.response_cache import (
+    bump_model_versions,
+    deferred_version_bumps,
+    get_or_compute,
+    model_version,
+    stats,
+)
+from api.tests.base_test import AuthenticatedAPITestCase
+
+
+class ResponseCacheViewsTest(AuthenticatedAPITestCase):
+    """Caché de respuestas de los endpoints del dashboard"""
+
+    def setUp(self):
+        self.authenticate_admin()
+        self.paciente = Paciente.objects.create(
+            rut="12.345.678-9",
+            nombre="Paciente",
+            sexo="M",
+            fecha_nacimiento=date(1950, 1, 1),
+            score_social=8,
+        )
+        self.episodio = Episodio.objects.create(
+            paciente=self.paciente,
+            episodio_cmbd=1,
+            fecha_ingreso=timezone.now() - timedelta(days=3),
+        )
+
+    def test_segunda_llamada_sale_de_cache(self):
+        url = reverse("gestion-estadisticas")
+        primero = self.client.get(url)
+        with self.assertNumQueries(1):  # solo el usuario autenticado
+            segundo = self.client.get(url)
+
+        self.assertEqual(primero.data, segundo.data)
+        resumen = stats.summary()["gestiones_estadisticas"]
+        self.assertEqual((resumen["hits"], resumen["misses"]), (1, 1))
+        self.assertEqual(resumen["hit_ratio"], 0.5)
+
+    def test_guardar_modelo_invalida_respuestas(self):
+        url = reverse("gestion-tareas-pendientes")
+        self.assertEqual(self.client.get(url).data, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Gestion.objects.create(
+                episodio=self.episodio,
+                tipo_gestion="TRASLADO",
+                estado_gestion="INICIADA",
+                fecha_inicio=timezone.now(),
+            )
+        self.assertEqual(len(self.client.get(url).data), 1)
+
+        # Un cambio en paciente también invalida (tareas depende de los tres)
+        self.paciente.nombre = "Otro nombre"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.paciente.save()
+        self.client.get(url)
+        self.assertEqual(stats.summary()["gestiones_tareas_pendientes"]["misses"], 3)
+
+    def test_borrar_modelo_invalida_respuestas(self):
+        url = reverse("paciente-score-social-faltante")
+        Paciente.objects.create(
+            rut="1.111.111-1",
+            nombre="Sin score",
+            sexo="F",
+            fecha_nacimiento=date(1960, 1, 1),
+        )
+        self.assertEqual(self.client.get(url).data["sin_score_social"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Paciente.objects.filter(rut="1.111.111-1").get().delete()
+        self.assertEqual(self.client.get(url).data["sin_score_social"], 0)
+
+    def test_version_sube_recien_al_confirmar(self):
+        antes = model_version("paciente")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.paciente.nombre = "Otro nombre"
+            self.paciente.save()
+            # Sin confirmar, otra petición aún ve las filas anteriores
+            self.assertEqual(model_version("paciente"), antes)
+
+        self.assertGreater(model_version("paciente"), antes)
+
+    def test_parametros_forman_parte_de_la_clave(self):
+        Paciente.objects.create(
+            rut="2.222.222-2",
+            nombre="Segundo",
+            sexo="F",
+            fecha_nacimiento=date(1970, 1, 1),
+            score_social=12,
+        )
+        url = reverse("paciente-score-social-top")
+
+        self.assertEqual(len(self.client.get(url, {"limit": 1}).data["top"]), 1)
+        self.assertEqual(len(self.client.get(url, {"limit": 2}).data["top"]), 2)
+
+    def test_errores_no_se_cachean(self):
+        url = reverse("episodio-tendencia-estadia")
+        self.client.get(url, {"months": 0})
+        self.client.get(url, {"months": 0})
+
+        self.assertEqual(stats.summary()["episodios_tendencia_estadia"]["misses"], 2)
+
+
+class ResponseCacheServiceTest(SimpleTestCase):
+    """Versiones por modelo y single-flight"""
+
+    def setUp(self):
+        cache.clear()
+        stats.clear()
+
+    def test_bump_sube_la_version(self):
+        antes = model_version("gestion")
+        bump_model_versions("gestion")
+        self.assertEqual(model_version("gestion"), antes + 1)
+
+    def test_bumps_diferidos_se_aplican_una_vez(self):
+        antes = model_version("episodio")
+        with deferred_version_bumps():
+            for _ in range(5):
+                bump_model_versions("episodio")
+            self.assertEqual(model_version("episodio"), antes)
+        self.assertEqual(model_version("episodio"), antes + 1)
+
+    def test_single_flight_calcula_una_vez(self):
+        llamadas = []
+
+        def compute():
+            llamadas.append(1)
+            time.sleep(0.2)
+            return {"valor": 42}
+
+        resultados = []
+        barrera = threading.Barrier(8)
+
+        def worker():
+            barrera.wait()
+            resultados.append(get_or_compute("prueba", "clave", compute, 60))
+
+        hilos = [threading.Thread(target=worker) for _ in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(len(llamadas), 1)
+        self.assertEqual(resultados, [{"valor": 42}] * 8)
+        resumen = stats.summary()["prueba"]
+        self.assertEqual(resumen["misses"], 1)
+        self.assertEqual(resumen["hits"] + resumen["waits"], 7)
+
+    def test_espera_el_calculo_de_otro_proceso(self):
+        # Lock tomado por "otro proceso": se espera a que publique el valor
+        cache.add("clave:lock", 1)
+        threading.Timer(0.1, cache.set, args=("clave", "remoto")).start()
+
+        valor = get_or_compute("prueba", "clave", lambda: "local", 60)
+
+        self.assertEqual(valor, "remoto")
+        self.assertEqual(stats.summary()["prueba"]["waits"], 1)
+
+    def test_timeout_del_lock_calcula_localmente(self):
+        cache.add("clave:lock", 1)
+        original = response_cache.SINGLE_FLIGHT_TIMEOUT
+        response_cache.SINGLE_FLIGHT_TIMEOUT = 0.1
+        try:
+            with self.assertLogs(response_cache.logger, "WARNING"):
+                valor = get_or_compute("prueba", "clave", lambda: "local", 60)
+        finally:
+            response_cache.SINGLE_FLIGHT_TIMEOUT = original
+
+        self.assertEqual(valor, "local")
+
+
+class FakeRedis:
+    """Cliente redis en memoria con lo que usa RedisCache de Django"""
+
+    datos = {}
+
+    def __init__(self, connection_pool=None):
+        pass
+
+    def get(self, key):
+        return self.datos.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.datos:
+            return None
+        # redis guarda los enteros como texto
+        self.datos[key] = value if isinstance(value, bytes) else str(value).encode()
+        return True
+
+    def exists(self, key):
+        return int(key in self.datos)
+
+    def incr(self, key, amount=1):
+        valor = int(self.datos[key]) + amount
+        self.datos[key] = str(valor).encode()
+        return valor
+
+    def delete(self, *keys):
+        return sum(self.datos.pop(key, None) is not None for key in keys)
+
+
+REDIS_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://localhost:6379/0",
+    }
+}
+
+
+@override_settings(CACHES=REDIS_CACHES)
+@patch("redis.Redis", FakeRedis)
+class RedisBackendTest(SimpleTestCase):
+    """CACHE_BACKEND=redis: versiones y single-flight sobre RedisCache"""
+
+    def setUp(self):
+        FakeRedis.datos = {}
+
+    def test_settings_configura_redis(self):
+        with patch.dict(
+            os.environ, {"CACHE_BACKEND": "redis", "REDIS_URL": "redis://cache:6379/1"}
+        ):
+            configuracion = runpy.run_path(
+                str(settings.BASE_DIR / "config" / "settings.py")
+            )
+
+        self.assertEqual(
+            configuracion["CACHES"]["default"],
+            {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://cache:6379/1",
+            },
+        )
+
+    def test_versiones_y_respuestas_en_redis(self):
+        antes = model_version("episodio")
+        bump_model_versions("episodio")
+        self.assertEqual(model_version("episodio"), antes + 1)
+
+        calculos = []
+        for _ in range(2):
+            valor = get_or_compute(
+                "prueba", "clave", lambda: calculos.append(1) or {"n": 1}, 60
+            )
+        self.assertEqual(valor, {"n": 1})
+        self.assertEqual(len(calculos), 1)
+        self.assertIn(":1:cache_version:episodio", FakeRedis.datos)
+        # El lock single-flight se libera al terminar
+        self.assertNotIn(":1:clave:lock", FakeRedis.datos)
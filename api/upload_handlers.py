@@ -0,0 +1,33 @@
+"""
+Upload handlers de la API
+"""
+
+import hashlib
+
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class Sha256UploadHandler(FileUploadHandler):
+    """
+    Calcula el SHA-256 de cada archivo mientras Django lo recibe, sin volver a
+    leerlo. Va primero en FILE_UPLOAD_HANDLERS: deja pasar los chunks a los
+    handlers de Django (memoria o archivo temporal) y guarda el hash en
+    `request.upload_sha256[(campo, nombre)]` (ver api.services.cargas)
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self._hash = hashlib.sha256()
+
+    def receive_data_chunk(self, raw_data, start):
+        self._hash.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not hasattr(self.request, "upload_sha256"):
+            self.request.upload_sha256 = {}
+        self.request.upload_sha256[(self.field_name, self.file_name)] = (
+            self._hash.hexdigest()
+        )
+        # El archivo lo arma el handler siguiente
+        return None
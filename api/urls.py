@@ -16,7 +16,10 @@ from api.views import (
 from api.views.archivo_views import (
     cargar_archivo,
     eliminar_archivo,
+    errores_archivo,
     estado_procesamiento,
+    estado_trabajo,
+    eventos_procesamiento,
     lista_archivos,
     plantilla_excel,
 )
@@ -79,7 +82,15 @@ urlpatterns = [
         estado_procesamiento,
         name="estado_procesamiento",
     ),
+    path("excel/errores/<uuid:archivo_id>/", errores_archivo, name="errores_archivo"),
+    path(
+        "excel/eventos/<uuid:archivo_id>/",
+        eventos_procesamiento,
+        name="eventos_procesamiento",
+    ),
     path("excel/lista/", lista_archivos, name="lista_archivos"),
+    # Estado de los trabajos en segundo plano (cargas encoladas)
+    path("trabajos/<uuid:trabajo_id>/", estado_trabajo, name="estado_trabajo"),
     path(
         "excel/eliminar/<uuid:archivo_id>/", eliminar_archivo, name="eliminar_archivo"
     ),
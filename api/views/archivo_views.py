@@ -2,20 +2,28 @@
 Vistas para el manejo de carga de archivos Excel
 """
 
+import json
 import logging
-import threading
+import queue
+import time
 
+from django.conf import settings
+from django.db import connection
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
 from rest_framework import permissions, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
 from rest_framework.parsers import FormParser, MultiPartParser
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 
-from api.models import ArchivoCarga
+from api.models import ArchivoCarga, Trabajo
+from api.pagination import ErroresCargaPagination
+from api.renderers import EventStreamRenderer
 from api.serializers.archivo_serializers import (
     ArchivoCargaSerializer,
     CargaArchivoSerializer,
+    ErrorCargaSerializer,
     EstadoProcesamientoSerializer,
 )
 from api.services import (
@@ -25,7 +33,9 @@ from api.services import (
     PacienteEpisodioExcelProcessor,
     PacienteExcelProcessor,
     UserExcelProcessor,
+    eventos_carga,
 )
+from api.services.cargas import en_curso, registrar_carga, sha256_subida
 
 logger = logging.getLogger(__name__)
 
@@ -43,58 +53,6 @@ def obtener_procesador(tipo: str):
     return procesadores.get(tipo)
 
 
-def procesar_archivo_async(archivo_carga_id: int, tipo: str):
-    """Función para procesar el archivo en background"""
-    archivo_carga = None
-    try:
-        archivo_carga = ArchivoCarga.objects.get(id=archivo_carga_id)
-        logger.info(
-            f"Iniciando procesamiento de archivo {archivo_carga_id} tipo {tipo}"
-        )
-
-        # Validar que el procesador existe
-        procesador_class = obtener_procesador(tipo)
-        if not procesador_class:
-            archivo_carga.estado = "ERROR"
-            archivo_carga.agregar_error(0, f"Tipo de procesador no válido: {tipo}")
-            archivo_carga.save()
-            logger.error(f"Procesador no encontrado para tipo: {tipo}")
-            return
-
-        # Cambiar estado a PROCESANDO antes de comenzar
-        archivo_carga.estado = "PROCESANDO"
-        archivo_carga.fecha_procesamiento = timezone.now()
-        archivo_carga.save(update_fields=["estado", "fecha_procesamiento"])
-
-        # Crear instancia del procesador y procesar
-        procesador = procesador_class(archivo_carga)
-        resultado = procesador.procesar_archivo()
-
-        logger.info(
-            f"Procesamiento completado para archivo {archivo_carga_id}: {resultado}"
-        )
-
-    except ArchivoCarga.DoesNotExist:
-        logger.error(f"Archivo con ID {archivo_carga_id} no encontrado")
-    except Exception as e:
-        logger.error(
-            f"Error crítico procesando archivo {archivo_carga_id}: {str(e)}",
-            exc_info=True,
-        )
-        # Asegurar que el estado se actualice incluso en errores críticos
-        if archivo_carga:
-            try:
-                archivo_carga.estado = "ERROR"
-                archivo_carga.agregar_error(
-                    0, f"Error crítico durante procesamiento: {str(e)}"
-                )
-                archivo_carga.save(update_fields=["estado"])
-            except Exception as save_error:
-                logger.error(
-                    f"Error adicional al guardar estado de error: {save_error}"
-                )
-
-
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 def cargar_archivo(request):
@@ -112,25 +70,29 @@ def cargar_archivo(request):
     archivo = serializer.validated_data["archivo"]
     tipo = serializer.validated_data["tipo"]
 
-    # Crear registro de archivo
-    archivo_carga = ArchivoCarga.objects.create(
-        archivo=archivo, tipo=tipo, usuario=request.user, estado="SUBIDO"
+    # Registrar y procesar en background (manage.py run_workers), o reutilizar
+    # la carga previa del mismo archivo
+    archivo_carga, trabajo, duplicado = registrar_carga(
+        archivo,
+        tipo,
+        request.user,
+        sha256_subida(request, archivo),
+        forzar=serializer.validated_data["forzar"],
     )
 
-    # Procesar en background
-    thread = threading.Thread(
-        target=procesar_archivo_async, args=(archivo_carga.id, tipo)
-    )
-    thread.daemon = True
-    thread.start()
-
     return Response(
         {
-            "mensaje": "Archivo cargado exitosamente, procesamiento iniciado",
+            "mensaje": (
+                "Archivo ya cargado anteriormente"
+                if duplicado
+                else "Archivo cargado exitosamente, procesamiento encolado"
+            ),
             "archivo_id": archivo_carga.id,
+            "trabajo_id": trabajo.id,
             "estado": archivo_carga.estado,
+            "duplicado": duplicado,
         },
-        status=status.HTTP_201_CREATED,
+        status=(status.HTTP_202_ACCEPTED if en_curso(trabajo) else status.HTTP_200_OK),
     )
 
 
@@ -168,6 +130,144 @@ def estado_procesamiento(request, archivo_id):
     return Response(serializer.data)
 
 
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+@renderer_classes([EventStreamRenderer, JSONRenderer])
+def eventos_procesamiento(request, archivo_id):
+    """
+    Stream SSE (text/event-stream) con el progreso del procesamiento de un
+    archivo: un evento `progreso` con estado, etapa y contadores al conectar
+    y cada vez que el procesador guarda avance. Se cierra al llegar a un
+    estado final o tras SSE_DURACION_MAXIMA (el cliente se reconecta).
+    EventSource no envía el header Authorization: el frontend lo consume con
+    fetch y un ReadableStream
+    """
+    archivo_carga = get_object_or_404(
+        ArchivoCarga.objects.only("id", "usuario_id"), id=archivo_id
+    )
+
+    if archivo_carga.usuario_id != request.user.pk and not request.user.is_staff:
+        return Response(
+            {"error": "No tienes permisos para ver este archivo"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    response = StreamingHttpResponse(
+        _stream_progreso(archivo_id), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Sin buffer en nginx/proxies para que cada evento llegue al enviarse
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+def _evento_sse(evento) -> str:
+    return f"event: progreso\ndata: {json.dumps(evento)}\n\n"
+
+
+def _stream_progreso(archivo_id):
+    notify = eventos_carga.usa_notify()
+    # Sin LISTEN/NOTIFY se relee la fila (solo los contadores) cada intervalo
+    espera = (
+        settings.SSE_KEEPALIVE_SEGUNDOS if notify else settings.SSE_INTERVALO_SONDEO
+    )
+    # Suscribirse antes de leer el estado para no perder eventos entre medio
+    cola = eventos_carga.escucha.suscribir(archivo_id)
+    try:
+        yield f"retry: {settings.SSE_RETRY_MS}\n\n"
+        ultimo = eventos_carga.snapshot(archivo_id)
+        if ultimo is None:
+            return
+        yield _evento_sse(ultimo)
+        if eventos_carga.es_final(ultimo):
+            return
+        if notify:
+            # Los eventos llegan por el hilo LISTEN: no retener una conexión
+            # por cliente conectado
+            connection.close()
+
+        limite = time.monotonic() + settings.SSE_DURACION_MAXIMA
+        while time.monotonic() < limite:
+            try:
+                evento = cola.get(timeout=espera)
+            except queue.Empty:
+                # También con NOTIFY: un aviso enviado antes de que el hilo
+                # LISTEN se suscribiera, o mientras reconecta, se pierde
+                evento = eventos_carga.snapshot(archivo_id)
+                if notify:
+                    connection.close()
+            if evento is None or evento == ultimo:
+                # Comentario SSE: mantiene viva la conexión a través de proxies
+                yield ": ping\n\n"
+                continue
+            ultimo = evento
+            yield _evento_sse(evento)
+            if eventos_carga.es_final(evento):
+                return
+    finally:
+        eventos_carga.escucha.desuscribir(archivo_id, cola)
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def errores_archivo(request, archivo_id):
+    """
+    Listar (paginado) todos los errores de procesamiento de un archivo; el
+    campo `errores` del archivo solo trae los primeros
+    """
+    archivo_carga = get_object_or_404(ArchivoCarga, id=archivo_id)
+
+    if archivo_carga.usuario != request.user and not request.user.is_staff:
+        return Response(
+            {"error": "No tienes permisos para ver este archivo"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    paginator = ErroresCargaPagination()
+    errores = paginator.paginate_queryset(
+        archivo_carga.errores_detalle.order_by("id"), request
+    )
+    serializer = ErrorCargaSerializer(errores, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(["GET"])
+@permission_classes([permissions.IsAuthenticated])
+def estado_trabajo(request, trabajo_id):
+    """
+    Consultar el estado de un trabajo en segundo plano (id devuelto por los
+    endpoints de carga con 202)
+    """
+    trabajo = get_object_or_404(Trabajo, id=trabajo_id)
+
+    if (
+        trabajo.usuario_id is not None
+        and trabajo.usuario_id != request.user.pk
+        and not request.user.is_staff
+    ):
+        return Response(
+            {"error": "No tienes permisos para ver este trabajo"},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    return Response(
+        {
+            "id": trabajo.id,
+            "tipo": trabajo.tipo,
+            "estado": trabajo.estado,
+            "intentos": trabajo.intentos,
+            "max_intentos": trabajo.max_intentos,
+            "archivo_id": trabajo.archivo_id,
+            "resultado": trabajo.resultado,
+            # Solo la última línea del traceback
+            "error": trabajo.error.strip().splitlines()[-1] if trabajo.error else "",
+            "creado_en": trabajo.creado_en,
+            "iniciado_en": trabajo.iniciado_en,
+            "terminado_en": trabajo.terminado_en,
+        }
+    )
+
+
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticated])
 def lista_archivos(request):
@@ -2,8 +2,12 @@
 Views para el modelo Episodio
 """
 
-from django.db.models import Avg, Count, Q
+from datetime import date, datetime, time
+
+from django.db.models import Avg, Count, F, Q
+from django.db.models.functions import TruncMonth
 from django.utils import timezone
+from django_filters import FilterSet, MultipleChoiceFilter
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
@@ -12,15 +16,73 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from api.models import Episodio, EpisodioServicio
+from api.models.episodio import ALERTAS, SEMAFORO_COLORES, EpisodioQuerySet
+from api.pagination import ListadoPagination, OptionalPageNumberPagination
 from api.serializers import (
     EpisodioCreateSerializer,
     EpisodioSerializer,
     EpisodioServicioSerializer,
     EpisodioUpdateSerializer,
 )
+from api.services.exports import EXPORTACION_EPISODIOS
+from api.services.response_cache import cached_response
+from api.views.exportar import ExportarMixin
+
+# Campos por los que se puede ordenar el censo de activos (?ordering=)
+CENSO_ORDERING_FIELDS = ["dias_estadia", "dias_sobre_norma", "fecha_ingreso"]
+
+# Tendencia mensual de pacientes
+TENDENCIA_MAX_MESES = 120
+TENDENCIA_AGRUPACIONES = ["especialidad", "tipo_actividad"]
+MESES_NOMBRES = [
+    "Ene",
+    "Feb",
+    "Mar",
+    "Abr",
+    "May",
+    "Jun",
+    "Jul",
+    "Ago",
+    "Sep",
+    "Oct",
+    "Nov",
+    "Dic",
+]
+
+
+class EpisodioFilterSet(FilterSet):
+    """
+    Filtros de episodios, incluidos semáforo y alertas calculados en SQL:
+    ?semaforo=red&alerta=extension_critica (repetibles; valores combinados con OR)
+    """
+
+    semaforo = MultipleChoiceFilter(
+        choices=[(c, c) for c in SEMAFORO_COLORES], method="filter_semaforo"
+    )
+    alerta = MultipleChoiceFilter(
+        choices=[(a, a) for a in ALERTAS], method="filter_alerta"
+    )
+
+    def filter_semaforo(self, queryset, name, value):
+        return self._filter_any(queryset, value, EpisodioQuerySet.semaforo_q)
 
+    def filter_alerta(self, queryset, name, value):
+        return self._filter_any(queryset, value, EpisodioQuerySet.alerta_q)
 
-class EpisodioViewSet(viewsets.ModelViewSet):
+    def _filter_any(self, queryset, values, condicion):
+        if not values:
+            return queryset
+        q = Q()
+        for value in values:
+            q |= condicion(value)
+        return queryset.filter(q)
+
+    class Meta:
+        model = Episodio
+        fields = ["paciente", "tipo_actividad", "especialidad"]
+
+
+class EpisodioViewSet(ExportarMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión completa de episodios
 
@@ -31,17 +93,33 @@ class EpisodioViewSet(viewsets.ModelViewSet):
     - PUT /api/episodios/{id}/ - Actualizar episodio completo
     - PATCH /api/episodios/{id}/ - Actualizar episodio parcial
     - DELETE /api/episodios/{id}/ - Eliminar episodio
+    - GET /api/episodios/exportar/?formato=xlsx|csv|ndjson - Exportar listado
+
+    El listado admite ?paginacion=cursor y ?conteo=aproximado (ver
+    ListadoPagination).
     """
 
     queryset = Episodio.objects.select_related("paciente", "cama").all()
     permission_classes = [IsAuthenticated]
+    pagination_class = ListadoPagination
 
     # Filtros y búsqueda
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ["paciente", "tipo_actividad", "especialidad"]
+    filterset_class = EpisodioFilterSet
     search_fields = ["episodio_cmbd", "paciente__nombre"]
     ordering_fields = ["fecha_ingreso", "fecha_egreso", "created_at"]
     ordering = ["-fecha_ingreso"]
+    exportacion = EXPORTACION_EPISODIOS
+
+    def get_queryset(self):
+        """
+        Las acciones que serializan episodios completos traen el semáforo y
+        las alertas calculados en la misma consulta
+        """
+        queryset = super().get_queryset()
+        if self.action in ["list", "retrieve", "activos", "exportar"]:
+            queryset = queryset.con_clasificacion()
+        return queryset
 
     def get_serializer_class(self):
         """Retorna el serializer apropiado según la acción"""
@@ -62,54 +140,27 @@ class EpisodioViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=False, methods=["get"])
+    @cached_response("episodios_estadisticas", ["episodio"], diario=True)
     def estadisticas(self, request):
         """
         Endpoint para estadísticas generales de episodios
         GET /api/episodios/estadisticas/
         """
-        queryset = self.get_queryset()
-        episodios_activos = queryset.filter(fecha_egreso__isnull=True)
-        episodios_egresados = queryset.filter(fecha_egreso__isnull=False)
-
-        # Calcular promedio de estadía (TODOS los episodios)
-        total_dias = 0
-        count = 0
-        hoy = timezone.now().date()
-
-        # Episodios cerrados: usar fecha de egreso
-        for ep in episodios_egresados:
-            if ep.fecha_egreso and ep.fecha_ingreso:
-                dias = (ep.fecha_egreso.date() - ep.fecha_ingreso.date()).days
-                total_dias += dias
-                count += 1
-
-        # Episodios activos: usar fecha actual (hasta hoy)
-        for ep in episodios_activos:
-            if ep.fecha_ingreso:
-                dias = (hoy - ep.fecha_ingreso.date()).days
-                total_dias += dias
-                count += 1
-
-        promedio_estadia = round(total_dias / count, 1) if count > 0 else 0
-
-        # Contar extensiones críticas (calculado dinámicamente)
-        extensiones_criticas = 0
-        for ep in episodios_activos:
-            dias_estadia = (hoy - ep.fecha_ingreso.date()).days
-            if ep.estancia_norma_grd and dias_estadia > ep.estancia_norma_grd * (4 / 3):
-                extensiones_criticas += 1
-
-        # Altas de hoy
-        altas_hoy = episodios_egresados.filter(fecha_egreso__date=hoy).count()
+        # Una sola consulta: conteos, días de estadía (egreso o hasta hoy)
+        # y extensiones críticas se calculan en la base de datos
+        totales = self.get_queryset().estadisticas()
+
+        total = totales["total"]
+        promedio_estadia = round((totales["dias"] or 0) / total, 1) if total else 0
 
         return Response(
             {
-                "total_episodios": queryset.count(),
-                "episodios_activos": episodios_activos.count(),
-                "episodios_egresados": episodios_egresados.count(),
+                "total_episodios": total,
+                "episodios_activos": totales["activos"],
+                "episodios_egresados": total - totales["activos"],
                 "promedio_estadia_dias": promedio_estadia,
-                "extensiones_criticas": extensiones_criticas,
-                "altas_hoy": altas_hoy,
+                "extensiones_criticas": totales["criticas"],
+                "altas_hoy": totales["altas_hoy"],
             }
         )
 
@@ -118,82 +169,94 @@ class EpisodioViewSet(viewsets.ModelViewSet):
         """
         Listar episodios con extensión crítica (outliers activos)
         GET /api/episodios/extensiones_criticas/
-        """
-        episodios = (
-            self.get_queryset()
-            .filter(fecha_egreso__isnull=True)
-            .select_related("paciente")
-        )
 
-        data = []
-        hoy = timezone.now().date()
-        for ep in episodios:
-            dias_estadia = (hoy - ep.fecha_ingreso.date()).days
-            if ep.estancia_norma_grd:
-                if dias_estadia > ep.estancia_norma_grd * (4 / 3):
-                    data.append(
-                        {
-                            "id": ep.id,
-                            "episodio": str(ep.episodio_cmbd),
-                            "paciente": ep.paciente.nombre,
-                            "dias_estadia": dias_estadia,
-                            "fecha_ingreso": ep.fecha_ingreso,
-                            "dias_esperados": ep.estancia_norma_grd,
-                        }
-                    )
-            # Si no hay norma, puedes decidir si mostrar o no
-
-        return Response(data)
+        Parámetros opcionales:
+        - ordering: dias_estadia, dias_sobre_norma o fecha_ingreso (con - para desc)
+        - page / page_size: paginar la respuesta
+        """
+        episodios = self.get_queryset().extensiones_criticas()
+        return self._listado_censo(request, episodios)
 
     @action(detail=False, methods=["get"])
+    @cached_response("episodios_tendencia_estadia", ["episodio"], diario=True)
     def tendencia_estadia(self, request):
         """
-        Obtener tendencia de pacientes por mes (últimos 12 meses)
+        Obtener tendencia de pacientes por mes calendario
         GET /api/episodios/tendencia_estadia/
-        """
-        from collections import defaultdict
-        from datetime import timedelta
-
-        hoy = timezone.now().date()
-        hace_12_meses = hoy - timedelta(days=365)
 
-        # Obtener episodios de los últimos 12 meses
-        episodios = self.get_queryset().filter(fecha_ingreso__gte=hace_12_meses)
+        Parámetros opcionales:
+        - months: cantidad de meses hacia atrás, incluido el actual (default 12)
+        - por: especialidad o tipo_actividad, agrega el detalle por grupo
 
-        # Agrupar por mes
-        meses_data = defaultdict(set)  # usar set para contar pacientes únicos
+        El resultado se guarda en caché por día y versión de los episodios.
+        """
+        try:
+            months = int(request.query_params.get("months", 12))
+        except ValueError:
+            months = 0
+        if not 1 <= months <= TENDENCIA_MAX_MESES:
+            return Response(
+                {"error": f"months debe ser un entero entre 1 y {TENDENCIA_MAX_MESES}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        for ep in episodios:
-            mes_anio = ep.fecha_ingreso.strftime("%Y-%m")
-            meses_data[mes_anio].add(ep.paciente_id)
+        por = request.query_params.get("por")
+        if por is not None and por not in TENDENCIA_AGRUPACIONES:
+            return Response(
+                {
+                    "error": f"por inválido: {por}. "
+                    f"Opciones: {', '.join(TENDENCIA_AGRUPACIONES)}"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        # Preparar los últimos 12 meses en orden
-        resultado = []
-        meses_nombres = [
-            "Ene",
-            "Feb",
-            "Mar",
-            "Abr",
-            "May",
-            "Jun",
-            "Jul",
-            "Ago",
-            "Sep",
-            "Oct",
-            "Nov",
-            "Dic",
-        ]
+        return Response(self._tendencia_mensual(timezone.localdate(), months, por))
 
-        for i in range(11, -1, -1):
-            fecha_mes = hoy - timedelta(days=30 * i)
-            mes_key = fecha_mes.strftime("%Y-%m")
-            mes_nombre = meses_nombres[int(fecha_mes.strftime("%m")) - 1]
+    def _tendencia_mensual(self, hoy, months, por):
+        """Pacientes distintos por mes calendario (hora local) de ingreso"""
+        # Serie de meses calendario, del más antiguo al actual
+        serie = []
+        anio, mes = hoy.year, hoy.month
+        for _ in range(months):
+            serie.append(date(anio, mes, 1))
+            anio, mes = (anio, mes - 1) if mes > 1 else (anio - 1, 12)
+        serie.reverse()
 
-            resultado.append(
-                {"mes": mes_nombre, "pacientes": len(meses_data.get(mes_key, set()))}
-            )
+        episodios = self.get_queryset().filter(
+            fecha_ingreso__gte=timezone.make_aware(datetime.combine(serie[0], time.min))
+        )
+        por_mes = episodios.annotate(mes_ingreso=TruncMonth("fecha_ingreso")).values(
+            "mes_ingreso"
+        )
+        totales = {
+            fila["mes_ingreso"].date(): fila["pacientes"]
+            for fila in por_mes.annotate(
+                pacientes=Count("paciente", distinct=True)
+            ).order_by()
+        }
+
+        detalle = {}
+        if por:
+            for fila in (
+                por_mes.values("mes_ingreso", por)
+                .annotate(pacientes=Count("paciente", distinct=True))
+                .order_by()
+            ):
+                grupo = fila[por] or "Sin dato"
+                mes_detalle = detalle.setdefault(fila["mes_ingreso"].date(), {})
+                mes_detalle[grupo] = mes_detalle.get(grupo, 0) + fila["pacientes"]
 
-        return Response(resultado)
+        resultado = []
+        for inicio_mes in serie:
+            item = {
+                "mes": MESES_NOMBRES[inicio_mes.month - 1],
+                "periodo": inicio_mes.strftime("%Y-%m"),
+                "pacientes": totales.get(inicio_mes, 0),
+            }
+            if por:
+                item["detalle"] = detalle.get(inicio_mes, {})
+            resultado.append(item)
+        return resultado
 
     @action(detail=False, methods=["get"])
     def alertas_prediccion(self, request):
@@ -204,37 +267,58 @@ class EpisodioViewSet(viewsets.ModelViewSet):
         Retorna episodios activos que:
         - Tienen prediccion_extension = 1 (modelo ML predice extensión)
         - NO están ya en extensión crítica (no se han pasado)
+
+        Acepta los mismos parámetros ordering / page / page_size que
+        extensiones_criticas
+        """
+        episodios = self.get_queryset().alertas_prediccion()
+        return self._listado_censo(request, episodios)
+
+    def _listado_censo(self, request, episodios):
         """
-        episodios = (
-            self.get_queryset()
-            .filter(fecha_egreso__isnull=True, prediccion_extension=1)
-            .select_related("paciente")
+        Respuesta de un queryset de censo_activo(): filas con los campos
+        justos (sin instanciar modelos), ordenadas y paginadas si se pide
+        """
+        ordering = request.query_params.get("ordering", "fecha_ingreso")
+        campo = ordering.lstrip("-")
+        if campo not in CENSO_ORDERING_FIELDS:
+            return Response(
+                {
+                    "error": f"ordering inválido: {ordering}. "
+                    f"Opciones: {', '.join(CENSO_ORDERING_FIELDS)}"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        orden = (
+            F(campo).desc(nulls_last=True)
+            if ordering.startswith("-")
+            else F(campo).asc(nulls_last=True)
         )
 
-        data = []
-        hoy = timezone.now().date()
-
-        for ep in episodios:
-            dias_estadia = (hoy - ep.fecha_ingreso.date()).days
-
-            # Verificar que NO esté en extensión crítica
-            tiene_extension_critica = False
-            if ep.estancia_norma_grd and dias_estadia > ep.estancia_norma_grd * (4 / 3):
-                tiene_extension_critica = True
-
-            # Solo incluir si NO tiene extensión crítica (aún no se ha pasado)
-            if not tiene_extension_critica:
-                data.append(
-                    {
-                        "id": ep.id,
-                        "episodio": str(ep.episodio_cmbd),
-                        "paciente": ep.paciente.nombre,
-                        "dias_estadia": dias_estadia,
-                        "dias_esperados": ep.estancia_norma_grd,
-                        "fecha_ingreso": ep.fecha_ingreso,
-                    }
-                )
+        filas = episodios.order_by(orden, "id").values(
+            "id",
+            "episodio_cmbd",
+            "paciente__nombre",
+            "dias_estadia",
+            "fecha_ingreso",
+            "estancia_norma_grd",
+        )
 
+        paginator = OptionalPageNumberPagination()
+        page = paginator.paginate_queryset(filas, request, view=self)
+        data = [
+            {
+                "id": fila["id"],
+                "episodio": str(fila["episodio_cmbd"]),
+                "paciente": fila["paciente__nombre"],
+                "dias_estadia": fila["dias_estadia"],
+                "fecha_ingreso": fila["fecha_ingreso"],
+                "dias_esperados": fila["estancia_norma_grd"],
+            }
+            for fila in (page if page is not None else filas)
+        ]
+        if page is not None:
+            return paginator.get_paginated_response(data)
         return Response(data)
 
     @action(detail=True, methods=["get"], url_path="servicios")
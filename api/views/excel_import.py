@@ -3,17 +3,14 @@ Vista para manejar la importación de archivos Excel desde el frontend
 """
 
 import logging
-import os
-import shutil
-import tempfile
+import uuid
 
-import pandas as pd
-from django.core.management import call_command
+from django.core.files.storage import default_storage
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
-from api.services.scoring_runner import persist_scores_to_episodios
+from api.services.trabajos import carpeta_importacion, encolar
 
 logger = logging.getLogger(__name__)
 
@@ -22,7 +19,8 @@ logger = logging.getLogger(__name__)
 @require_http_methods(["POST"])
 def upload_excel_files(request):
     """
-    Endpoint para recibir los 4 archivos Excel y procesarlos
+    Endpoint para recibir los 4 archivos Excel y encolar su procesamiento.
+    Responde 202 con el id del trabajo (ver GET /api/trabajos/<id>/)
     """
     try:
         # Verificar que se hayan subido los 4 archivos
@@ -57,72 +55,30 @@ def upload_excel_files(request):
                     status=400,
                 )
 
-        # Crear directorio temporal para los archivos
-        temp_dir = tempfile.mkdtemp()
-        temp_files = {}
-
-        try:
-            # Guardar archivos temporalmente
-            for file_key, file_obj in uploaded_files.items():
-                temp_file_path = os.path.join(temp_dir, f"{file_key}.xlsx")
-                with open(temp_file_path, "wb") as temp_file:
-                    for chunk in file_obj.chunks():
-                        temp_file.write(chunk)
-                temp_files[file_key] = temp_file_path
-
-            # Ejecutar el comando de importación
-            try:
-                call_command("importar_excel_local", folder=temp_dir, verbosity=2)
-
-                # ============================================
-                # 🔥 ADDED: SCORING STEP (ML predictions)
-                # ============================================
-                try:
-                    # Cargar excel1 como GRD para scoring
-                    df_grd = pd.read_excel(temp_files["excel1"])
-                    logger.info("🔮 Iniciando scoring desde excel1 (GRD)")
-
-                    # Persist scoring results to Episodio.prediccion_extension
-                    updated = persist_scores_to_episodios(df_grd=df_grd)
-
-                    logger.info(
-                        "✅ Scoring ejecutado. Episodios actualizados: %s", updated
-                    )
-
-                except Exception as scoring_err:
-                    logger.error(f"Error en scoring: {scoring_err}")
-                # ============================================
-
-                return JsonResponse(
-                    {
-                        "success": True,
-                        "message": "Archivos procesados exitosamente",
-                        "data": {
-                            "files_processed": list(uploaded_files.keys()),
-                            "temp_dir": temp_dir,  # debugging only
-                        },
-                    }
-                )
-
-            except Exception as e:
-                logger.error(f"Error ejecutando comando de importación: {str(e)}")
-                return JsonResponse(
-                    {
-                        "success": False,
-                        "error": "Error en el procesamiento",
-                        "message": f"Error al procesar los archivos: {str(e)}",
-                    },
-                    status=500,
-                )
+        # Guardar los archivos en MEDIA (compartida con los workers) y encolar
+        # la importación + scoring para manage.py run_workers
+        trabajo_id = uuid.uuid4()
+        carpeta = carpeta_importacion(trabajo_id)
+        for file_key, file_obj in uploaded_files.items():
+            default_storage.save(f"{carpeta}/{file_key}.xlsx", file_obj)
+
+        usuario = getattr(request, "user", None)
+        trabajo = encolar(
+            "importar_excel",
+            {"files": list(uploaded_files.keys())},
+            usuario=usuario if usuario and usuario.is_authenticated else None,
+            trabajo_id=trabajo_id,
+        )
 
-        finally:
-            # Limpiar archivos temporales
-            try:
-                shutil.rmtree(temp_dir)
-            except Exception as e:
-                logger.warning(
-                    f"No se pudo limpiar directorio temporal {temp_dir}: {str(e)}"
-                )
+        return JsonResponse(
+            {
+                "success": True,
+                "message": "Archivos recibidos, procesamiento en cola",
+                "trabajo_id": str(trabajo.id),
+                "data": {"files_processed": list(uploaded_files.keys())},
+            },
+            status=202,
+        )
 
     except Exception as e:
         logger.error(f"Error general en upload_excel_files: {str(e)}")
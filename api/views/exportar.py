@@ -0,0 +1,37 @@
+"""
+Mixin de exportación en streaming para los ViewSets
+"""
+
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from api.services.exports import FORMATOS, respuesta_exportacion
+
+
+class ExportarMixin:
+    """
+    Agrega GET /exportar/?formato=xlsx|csv|ndjson al ViewSet.
+
+    Exporta el mismo queryset que el listado (con sus filtros, búsqueda y
+    orden), sin paginar. El ViewSet define `exportacion`.
+    """
+
+    exportacion = None
+
+    @action(detail=False, methods=["get"])
+    def exportar(self, request):
+        formato = request.query_params.get("formato", "xlsx")
+        if formato not in FORMATOS:
+            return Response(
+                {
+                    "error": f"formato inválido: {formato}. "
+                    f"Opciones: {', '.join(FORMATOS)}"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return self.exportar_queryset(formato)
+
+    def exportar_queryset(self, formato: str):
+        queryset = self.filter_queryset(self.get_queryset())
+        return respuesta_exportacion(self.exportacion, queryset, formato)
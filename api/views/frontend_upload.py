@@ -3,7 +3,6 @@ Vista específica para subida de archivos Excel desde el frontend
 """
 
 import logging
-import threading
 
 from django.http import JsonResponse
 from django.utils.decorators import method_decorator
@@ -14,7 +13,7 @@ from rest_framework.response import Response
 
 from api.models import ArchivoCarga
 from api.serializers.archivo_serializers import CargaArchivoSerializer
-from api.views.archivo_views import procesar_archivo_async
+from api.services.cargas import en_curso, registrar_carga, sha256_subida
 
 logger = logging.getLogger(__name__)
 
@@ -76,34 +75,40 @@ def upload_excel_frontend(request):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Crear registro de archivo
-        archivo_carga = ArchivoCarga.objects.create(
-            archivo=archivo, tipo=tipo, usuario=request.user, estado="SUBIDO"
+        # Registrar y procesar en background (manage.py run_workers), o
+        # reutilizar la carga previa del mismo archivo
+        archivo_carga, trabajo, duplicado = registrar_carga(
+            archivo,
+            tipo,
+            request.user,
+            sha256_subida(request, archivo),
+            forzar=serializer.validated_data["forzar"],
         )
 
         logger.info(
             f"Usuario {request.user.email} subió archivo {archivo.name} de tipo {tipo}"
         )
 
-        # Procesar en background
-        thread = threading.Thread(
-            target=procesar_archivo_async, args=(archivo_carga.id, tipo)
-        )
-        thread.daemon = True
-        thread.start()
-
         # Respuesta exitosa para el frontend
         return Response(
             {
                 "success": True,
-                "message": "Archivo cargado exitosamente. El procesamiento ha comenzado.",
+                "message": (
+                    "Este archivo ya se había cargado. Se muestra la carga anterior."
+                    if duplicado
+                    else "Archivo cargado exitosamente. El procesamiento está en cola."
+                ),
+                "duplicado": duplicado,
                 "archivo_id": str(archivo_carga.id),
+                "trabajo_id": str(trabajo.id),
                 "estado": archivo_carga.estado,
                 "nombre_archivo": archivo.name,
                 "tipo": tipo,
                 "fecha_carga": archivo_carga.fecha_carga,
             },
-            status=status.HTTP_201_CREATED,
+            status=(
+                status.HTTP_202_ACCEPTED if en_curso(trabajo) else status.HTTP_200_OK
+            ),
         )
 
     except Exception as e:
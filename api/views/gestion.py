@@ -2,25 +2,26 @@
 Views para el modelo Gestion
 """
 
-from datetime import datetime
-
 from django.db.models import Count, Q
-from django.http import HttpResponse
 from django_filters import CharFilter, FilterSet
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import status, viewsets
+from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
 from api.models import Gestion
+from api.pagination import ListadoPagination
 from api.serializers import (
     GestionCreateSerializer,
     GestionListSerializer,
     GestionSerializer,
     GestionUpdateSerializer,
 )
+from api.services.exports import EXPORTACION_GESTIONES
+from api.services.response_cache import cached_response
+from api.views.exportar import ExportarMixin
 
 
 class GestionFilterSet(FilterSet):
@@ -47,7 +48,7 @@ class GestionFilterSet(FilterSet):
         fields = ["estado_gestion", "tipo_gestion", "episodio", "usuario"]
 
 
-class GestionViewSet(viewsets.ModelViewSet):
+class GestionViewSet(ExportarMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión completa de gestiones
 
@@ -58,6 +59,10 @@ class GestionViewSet(viewsets.ModelViewSet):
     - PUT /api/gestiones/{id}/ - Actualizar gestión completa
     - PATCH /api/gestiones/{id}/ - Actualizar gestión parcial
     - DELETE /api/gestiones/{id}/ - Eliminar gestión
+    - GET /api/gestiones/exportar/?formato=xlsx|csv|ndjson - Exportar listado
+
+    El listado admite ?paginacion=cursor y ?conteo=aproximado (ver
+    ListadoPagination).
     """
 
     queryset = Gestion.objects.select_related(
@@ -65,6 +70,7 @@ class GestionViewSet(viewsets.ModelViewSet):
     ).all()
     serializer_class = GestionSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ListadoPagination
 
     # Filtros y búsqueda
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
@@ -72,6 +78,7 @@ class GestionViewSet(viewsets.ModelViewSet):
     search_fields = ["tipo_gestion", "informe"]
     ordering_fields = ["fecha_inicio", "fecha_fin", "created_at"]
     ordering = ["-fecha_inicio"]
+    exportacion = EXPORTACION_GESTIONES
 
     def get_serializer_class(self):
         """
@@ -98,6 +105,7 @@ class GestionViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
     @action(detail=False, methods=["get"])
+    @cached_response("gestiones_estadisticas", ["gestion"])
     def estadisticas(self, request):
         """
         Estadísticas de gestiones para el dashboard
@@ -140,6 +148,7 @@ class GestionViewSet(viewsets.ModelViewSet):
         )
 
     @action(detail=False, methods=["get"])
+    @cached_response("gestiones_tareas_pendientes", ["gestion", "episodio", "paciente"])
     def tareas_pendientes(self, request):
         """
         Lista de tareas pendientes formateadas para el dashboard
@@ -180,143 +189,8 @@ class GestionViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"], url_path="exportar-excel")
     def exportar_excel(self, request):
         """
-        Exporta todas las gestiones a un archivo Excel
+        Exporta las gestiones a un archivo Excel
         GET /api/gestiones/exportar-excel/
-        Requiere: openpyxl
+        Equivale a GET /api/gestiones/exportar/?formato=xlsx
         """
-        try:
-            from openpyxl import Workbook
-            from openpyxl.styles import Alignment, Font, PatternFill
-            from openpyxl.utils import get_column_letter
-        except ImportError:
-            return Response(
-                {
-                    "error": "La librería openpyxl no está instalada. Use exportar-csv en su lugar."
-                },
-                status=status.HTTP_501_NOT_IMPLEMENTED,
-            )
-
-        # Crear workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Gestiones"
-
-        # Estilo para encabezados
-        header_fill = PatternFill(
-            start_color="671E75", end_color="671E75", fill_type="solid"
-        )
-        header_font = Font(bold=True, color="FFFFFF")
-
-        # Encabezados
-        headers = [
-            "Episodio CMBD",
-            "RUT Paciente",
-            "Nombre Paciente",
-            "Usuario Responsable",
-            "Tipo de Gestión",
-            "Estado Gestión",
-            "Fecha Inicio",
-            "Fecha Fin",
-            "Duración (días)",
-            "Informe",
-            "Estado Traslado",
-            "Tipo Traslado",
-            "Motivo Traslado",
-            "Centro Destinatario",
-            "Tipo Solicitud Traslado",
-            "Nivel Atención Traslado",
-            "Motivo Rechazo",
-            "Motivo Cancelación",
-            "Fecha Finalización Traslado",
-            "Fecha Creación",
-            "Última Actualización",
-        ]
-
-        # Escribir encabezados con estilo
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num)
-            cell.value = header
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-
-        # Escribir datos
-        gestiones = self.get_queryset()
-
-        # Función helper para convertir datetime con timezone a naive
-        def to_naive_datetime(dt):
-            """Convierte datetime aware a naive para compatibilidad con Excel"""
-            if dt is None:
-                return None
-            if hasattr(dt, "tzinfo") and dt.tzinfo is not None:
-                # Convertir a la zona horaria local y quitar el tzinfo
-                from django.utils import timezone
-
-                local_dt = timezone.localtime(dt)
-                return local_dt.replace(tzinfo=None)
-            return dt
-
-        for row_num, gestion in enumerate(gestiones, 2):
-            data = [
-                gestion.episodio.episodio_cmbd if gestion.episodio else "",
-                (
-                    gestion.episodio.paciente.rut
-                    if gestion.episodio and gestion.episodio.paciente
-                    else ""
-                ),
-                (
-                    gestion.episodio.paciente.nombre
-                    if gestion.episodio and gestion.episodio.paciente
-                    else ""
-                ),
-                gestion.usuario.email if gestion.usuario else "",
-                gestion.get_tipo_gestion_display(),
-                gestion.get_estado_gestion_display(),
-                to_naive_datetime(gestion.fecha_inicio),
-                to_naive_datetime(gestion.fecha_fin),
-                gestion.duracion_dias,
-                gestion.informe or "",
-                (
-                    gestion.get_estado_traslado_display()
-                    if gestion.estado_traslado
-                    else ""
-                ),
-                (gestion.get_tipo_traslado_display() if gestion.tipo_traslado else ""),
-                gestion.motivo_traslado or "",
-                gestion.centro_destinatario or "",
-                (
-                    gestion.get_tipo_solicitud_traslado_display()
-                    if gestion.tipo_solicitud_traslado
-                    else ""
-                ),
-                (
-                    gestion.get_nivel_atencion_traslado_display()
-                    if gestion.nivel_atencion_traslado
-                    else ""
-                ),
-                gestion.motivo_rechazo_traslado or "",
-                gestion.motivo_cancelacion_traslado or "",
-                to_naive_datetime(gestion.fecha_finalizacion_traslado),
-                to_naive_datetime(gestion.created_at),
-                to_naive_datetime(gestion.updated_at),
-            ]
-
-            for col_num, value in enumerate(data, 1):
-                ws.cell(row=row_num, column=col_num, value=value)
-
-        # Ajustar ancho de columnas
-        for col_num in range(1, len(headers) + 1):
-            column_letter = get_column_letter(col_num)
-            ws.column_dimensions[column_letter].width = 20
-
-        # Crear respuesta
-        response = HttpResponse(
-            content_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        response["Content-Disposition"] = (
-            f'attachment; filename="gestiones_{timestamp}.xlsx"'
-        )
-
-        wb.save(response)
-        return response
+        return self.exportar_queryset("xlsx")
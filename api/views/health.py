@@ -7,6 +7,9 @@ from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
+from api.services.model_registry import registry
+from api.services.response_cache import stats as cache_stats
+
 
 @csrf_exempt
 @require_http_methods(["GET"])
@@ -24,6 +27,10 @@ def health_check(request):
                 "status": "healthy",
                 "database": "connected",
                 "message": "UC Christus Backend is running",
+                "ml_models": {
+                    name: info["version"] for name, info in registry.summary().items()
+                },
+                "cache": cache_stats.summary(),
             }
         )
 
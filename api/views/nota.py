@@ -6,6 +6,7 @@ from rest_framework import viewsets
 from rest_framework.permissions import IsAuthenticated
 
 from api.models import Nota
+from api.pagination import ListadoPagination
 from api.serializers import (
     NotaCreateSerializer,
     NotaListSerializer,
@@ -25,10 +26,14 @@ class NotaViewSet(viewsets.ModelViewSet):
     - PUT /api/notas/{id}/ - Actualizar nota completa
     - PATCH /api/notas/{id}/ - Actualizar nota parcial
     - DELETE /api/notas/{id}/ - Eliminar nota
+
+    El listado admite ?paginacion=cursor y ?conteo=aproximado (ver
+    ListadoPagination).
     """
 
     queryset = Nota.objects.select_related("gestion", "usuario").all()
     permission_classes = [IsAuthenticated]
+    pagination_class = ListadoPagination
 
     def get_serializer_class(self):
         """
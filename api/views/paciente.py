@@ -16,9 +16,12 @@ from api.serializers import (
     PacienteListSerializer,
     PacienteSerializer,
 )
+from api.services.exports import EXPORTACION_PACIENTES
+from api.services.response_cache import cached_response
+from api.views.exportar import ExportarMixin
 
 
-class PacienteViewSet(viewsets.ModelViewSet):
+class PacienteViewSet(ExportarMixin, viewsets.ModelViewSet):
     """
     ViewSet para gestión completa de pacientes
 
@@ -29,6 +32,7 @@ class PacienteViewSet(viewsets.ModelViewSet):
     - PUT /api/pacientes/{id}/ - Actualizar paciente completo
     - PATCH /api/pacientes/{id}/ - Actualizar paciente parcial
     - DELETE /api/pacientes/{id}/ - Eliminar paciente
+    - GET /api/pacientes/exportar/?formato=xlsx|csv|ndjson - Exportar listado
     """
 
     queryset = Paciente.objects.all()
@@ -40,6 +44,7 @@ class PacienteViewSet(viewsets.ModelViewSet):
     search_fields = ["nombre", "rut"]
     ordering_fields = ["nombre", "fecha_nacimiento", "created_at"]
     ordering = ["nombre"]
+    exportacion = EXPORTACION_PACIENTES
 
     def get_serializer_class(self):
         """
@@ -94,6 +99,7 @@ class PacienteViewSet(viewsets.ModelViewSet):
         )
 
     @action(detail=False, methods=["get"], url_path="score_social_faltante")
+    @cached_response("pacientes_score_social_faltante", ["paciente"])
     def score_social_faltante(self, request):
         """
         Contar pacientes sin score social (sólo aquellos con score_social = NULL)
@@ -104,6 +110,7 @@ class PacienteViewSet(viewsets.ModelViewSet):
         return Response({"sin_score_social": sin_score}, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["get"], url_path="score_social_top")
+    @cached_response("pacientes_score_social_top", ["paciente"])
     def score_social_top(self, request):
         """
         Top N pacientes con mayor score social (mayor = más crítico)
@@ -154,6 +161,11 @@ class PacienteViewSet(viewsets.ModelViewSet):
         Endpoint para obtener los episodios de un paciente específico
         GET /api/pacientes/{id}/episodios/
         """
-        episodios = Episodio.objects.filter(paciente__id=pk).order_by("-fecha_ingreso")
+        episodios = (
+            Episodio.objects.filter(paciente__id=pk)
+            .select_related("cama")
+            .con_clasificacion()
+            .order_by("-fecha_ingreso")
+        )
         serializer = EpisodioSerializer(episodios, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -1,5 +1,4 @@
 import logging
-import threading
 
 from django.shortcuts import get_object_or_404
 from rest_framework import permissions, status
@@ -9,7 +8,12 @@ from rest_framework.views import APIView
 
 from api.models.archivo_carga import ArchivoCarga
 from api.serializers.archivo_serializers import CargaArchivoSerializer
-from api.views.archivo_views import procesar_archivo_async
+from api.services.cargas import (
+    en_curso,
+    quiere_forzar,
+    registrar_carga,
+    sha256_subida,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -109,39 +113,43 @@ class ArchivoUploadView(APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # Crear registro de archivo con campos actualizados
-            archivo = ArchivoCarga.objects.create(
-                nombre=file.name,
-                archivo=file,
-                tipo=tipo.upper(),
-                usuario=request.user,
-                estado="SUBIDO",
+            # Registrar el archivo y encolar su procesamiento (manage.py
+            # run_workers), o reutilizar la carga previa del mismo archivo
+            archivo, trabajo, duplicado = registrar_carga(
+                file,
+                tipo.upper(),
+                request.user,
+                sha256_subida(request, file),
+                forzar=quiere_forzar(request.data.get("forzar", "")),
             )
 
             logger.info(
                 f"Usuario {request.user.email} subió archivo {file.name} de tipo {tipo}"
             )
 
-            # Iniciar procesamiento en background
-            thread = threading.Thread(
-                target=procesar_archivo_async, args=(archivo.id, tipo.upper())
-            )
-            thread.daemon = True
-            thread.start()
-
             # Respuesta exitosa para el frontend
             return Response(
                 {
                     "success": True,
-                    "message": "Archivo cargado exitosamente. El procesamiento ha comenzado.",
+                    "message": (
+                        "Este archivo ya se había cargado. Se muestra la carga anterior."
+                        if duplicado
+                        else "Archivo cargado exitosamente. El procesamiento está en cola."
+                    ),
+                    "duplicado": duplicado,
                     "archivo_id": str(archivo.id),
+                    "trabajo_id": str(trabajo.id),
                     "estado": archivo.estado,
                     "nombre_archivo": archivo.nombre,
                     "tipo": archivo.tipo,
                     "fecha_carga": archivo.fecha_carga,
                     "usuario": request.user.email,
                 },
-                status=status.HTTP_201_CREATED,
+                status=(
+                    status.HTTP_202_ACCEPTED
+                    if en_curso(trabajo)
+                    else status.HTTP_200_OK
+                ),
             )
 
         except Exception as e:
@@ -3,6 +3,7 @@ Django settings for config project.
 """
 
 import os
+import tempfile
 from datetime import timedelta
 from pathlib import Path
 
@@ -124,6 +125,13 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# El primero calcula el SHA-256 de cada archivo mientras se recibe
+FILE_UPLOAD_HANDLERS = [
+    "api.upload_handlers.Sha256UploadHandler",
+    "django.core.files.uploadhandler.MemoryFileUploadHandler",
+    "django.core.files.uploadhandler.TemporaryFileUploadHandler",
+]
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # === AUTH USER ===
@@ -170,3 +178,71 @@ SIMPLE_JWT = {
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
     "TOKEN_OBTAIN_SERIALIZER": "api.serializers.auth.CustomTokenObtainPairSerializer",
 }
+
+# === IMPORTACIÓN EXCEL ===
+# Procesos para leer en paralelo los cuatro Excel (1 = secuencial)
+EXCEL_LOAD_WORKERS = int(os.getenv("EXCEL_LOAD_WORKERS", "4"))
+# Caché de planillas ya parseadas (vacío = MEDIA_ROOT/cache/excel) y días
+# sin uso tras los que se borra una entrada
+EXCEL_CACHE_DIR = os.getenv("EXCEL_CACHE_DIR", "")
+EXCEL_CACHE_MAX_AGE_DAYS = float(os.getenv("EXCEL_CACHE_MAX_AGE_DAYS", "7"))
+
+# === MODELO ML ===
+# Cargar modelo y preprocessing al iniciar la app (AppConfig.ready)
+ML_PRELOAD_ON_STARTUP = os.getenv("ML_PRELOAD_ON_STARTUP", "false").lower() in [
+    "true",
+    "1",
+    "yes",
+]
+
+# === CACHÉ ===
+# locmem (un proceso), file (varios procesos en un nodo) o redis (REDIS_URL,
+# requiere el paquete redis; sirve cualquier servidor compatible). Con
+# run_workers debe ser file o redis: los workers invalidan las respuestas
+# cacheadas por el proceso web
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem").lower()
+if CACHE_BACKEND == "redis":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+        }
+    }
+elif CACHE_BACKEND == "file":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv(
+                "CACHE_DIR", os.path.join(tempfile.gettempdir(), "ucchristus_cache")
+            ),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "ucchristus",
+        }
+    }
+
+# Segundos que vive una respuesta cacheada del dashboard (además se invalida
+# al cambiar los modelos de los que depende)
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", "300"))
+
+# === TRABAJOS EN SEGUNDO PLANO (manage.py run_workers) ===
+TRABAJOS_PROCESOS = int(os.getenv("TRABAJOS_PROCESOS", "2"))
+TRABAJOS_MAX_INTENTOS = int(os.getenv("TRABAJOS_MAX_INTENTOS", "3"))
+# Espera antes del reintento n: BACKOFF * 2^(n-1) segundos
+TRABAJOS_BACKOFF_SEGUNDOS = int(os.getenv("TRABAJOS_BACKOFF_SEGUNDOS", "30"))
+TRABAJOS_LATIDO_SEGUNDOS = int(os.getenv("TRABAJOS_LATIDO_SEGUNDOS", "30"))
+# Un trabajo en PROCESANDO sin latido por este tiempo se da por atascado
+TRABAJOS_TIMEOUT_ATASCADO = int(os.getenv("TRABAJOS_TIMEOUT_ATASCADO", "300"))
+
+# === STREAM SSE DE PROGRESO (api/excel/eventos/<id>/) ===
+# Cada cliente conectado ocupa un hilo de gunicorn (--threads) hasta que el
+# archivo termina o se cumple la duración máxima; luego el cliente reconecta
+SSE_DURACION_MAXIMA = int(os.getenv("SSE_DURACION_MAXIMA", "300"))
+SSE_KEEPALIVE_SEGUNDOS = int(os.getenv("SSE_KEEPALIVE_SEGUNDOS", "15"))
+# Sin PostgreSQL (LISTEN/NOTIFY) el stream relee el progreso con este intervalo
+SSE_INTERVALO_SONDEO = float(os.getenv("SSE_INTERVALO_SONDEO", "2"))
+SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "3000"))